@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+graph_snapshot.py: Compact in-memory snapshot of the document graph
+
+This component:
+1. Loads Document nodes and the typed edges between them from Neo4j in two queries,
+   on the sync or the async driver
+2. Stores adjacency as CSR arrays (outgoing and incoming) with edge type codes
+3. Precomputes PageRank, degree and community IDs (label propagation)
+4. Answers centrality, reachability and impact questions locally, so GraphRAG
+   scoring and impact analysis avoid variable-length Neo4j traversals
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from neo4j import AsyncDriver, Driver, Query
+
+NODES_QUERY = """
+MATCH (d:Document)
+RETURN d.id as id, d.document_type as type, d.title as title
+"""
+
+EDGES_QUERY = """
+MATCH (a:Document)-[r]->(b:Document)
+RETURN a.id as source, b.id as target, type(r) as type
+"""
+
+# Relationship types followed (against their direction) for dependency chains
+DEPENDENCY_TYPES = ("DEPENDS_ON", "IMPLEMENTS", "REFERENCES")
+
+
+def _csr(n: int, rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """CSR index pointer, column indices and edge order for (row, col) pairs"""
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols[order].astype(np.int32), order
+
+
+def pagerank(
+    n: int, sources: np.ndarray, targets: np.ndarray, iterations: int = 20, damping: float = 0.85
+) -> np.ndarray:
+    """Power-iteration PageRank over directed edges (dangling mass spread uniformly)"""
+    if n == 0:
+        return np.zeros(0)
+    out_degree = np.bincount(sources, minlength=n).astype(np.float64)
+    dangling = out_degree == 0
+    rank = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        share = np.divide(rank, out_degree, out=np.zeros(n), where=~dangling)
+        incoming = np.bincount(targets, weights=share[sources], minlength=n)
+        rank = (1.0 - damping) / n + damping * (incoming + rank[dangling].sum() / n)
+    return rank
+
+
+def label_propagation(
+    n: int, indptr: np.ndarray, indices: np.ndarray, max_passes: int = 10
+) -> np.ndarray:
+    """Community IDs by label propagation on an undirected CSR graph
+
+    Each pass moves every node at once to the most frequent label among itself
+    and its neighbors (the smallest label on ties), counted over all CSR edges
+    with array operations. Counting the node itself keeps pairs from swapping
+    labels forever.
+    """
+    labels = np.arange(n, dtype=np.int64)
+    nodes = np.arange(n, dtype=np.int64)
+    rows = np.concatenate([np.repeat(nodes, np.diff(indptr)), nodes])
+    cols = np.concatenate([indices.astype(np.int64), nodes])
+    for _ in range(max_passes):
+        # (node, label) pairs with their counts, sorted by node then label
+        keys, counts = np.unique(rows * n + labels[cols], return_counts=True)
+        key_nodes, key_labels = np.divmod(keys, n)
+        order = np.lexsort((key_labels, -counts, key_nodes))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = key_nodes[order][1:] != key_nodes[order][:-1]
+        best = np.empty(n, dtype=np.int64)
+        best[key_nodes[order][first]] = key_labels[order][first]
+        if np.array_equal(best, labels):
+            break
+        labels = best
+    # Compact labels to 0..k-1
+    _, compact = np.unique(labels, return_inverse=True)
+    return compact.astype(np.int32)
+
+
+@dataclass
+class GraphSnapshot:
+    """CSR adjacency of Document nodes with precomputed centrality"""
+
+    ids: List[str]
+    types: List[str]
+    titles: List[str]
+    relationship_types: List[str]
+    out_indptr: np.ndarray
+    out_indices: np.ndarray
+    out_edge_types: np.ndarray
+    in_indptr: np.ndarray
+    in_indices: np.ndarray
+    in_edge_types: np.ndarray
+    undirected_indptr: np.ndarray
+    undirected_indices: np.ndarray
+    pagerank: np.ndarray
+    degree: np.ndarray
+    community: np.ndarray
+    built_at: float = field(default_factory=time.time)
+    graph_epoch: int = 0
+    index: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not self.index:
+            self.index = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        self._max_pagerank = float(self.pagerank.max()) if len(self.pagerank) else 0.0
+
+    @classmethod
+    def from_edges(
+        cls,
+        nodes: Sequence[Tuple[str, Optional[str], Optional[str]]],
+        edges: Iterable[Tuple[str, str, str]],
+        pagerank_iterations: int = 20,
+        graph_epoch: int = 0,
+    ) -> "GraphSnapshot":
+        """Build a snapshot from (id, type, title) nodes and (source, target, type) edges"""
+        ids = [node[0] for node in nodes]
+        index = {doc_id: i for i, doc_id in enumerate(ids)}
+        n = len(ids)
+
+        relationship_types: List[str] = []
+        type_codes: Dict[str, int] = {}
+        sources, targets, codes = [], [], []
+        for source, target, rel_type in edges:
+            if source not in index or target not in index:
+                continue
+            if rel_type not in type_codes:
+                type_codes[rel_type] = len(relationship_types)
+                relationship_types.append(rel_type)
+            sources.append(index[source])
+            targets.append(index[target])
+            codes.append(type_codes[rel_type])
+
+        src = np.asarray(sources, dtype=np.int64)
+        dst = np.asarray(targets, dtype=np.int64)
+        edge_codes = np.asarray(codes, dtype=np.int16)
+
+        out_indptr, out_indices, out_order = _csr(n, src, dst)
+        in_indptr, in_indices, in_order = _csr(n, dst, src)
+
+        # Undirected view without duplicate or self edges, for degree and communities
+        pairs = (
+            np.unique(
+                np.concatenate([np.stack([src, dst], axis=1), np.stack([dst, src], axis=1)]),
+                axis=0,
+            )
+            if len(src)
+            else np.zeros((0, 2), dtype=np.int64)
+        )
+        pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+        undirected_indptr, undirected_indices, _ = _csr(n, pairs[:, 0], pairs[:, 1])
+
+        return cls(
+            ids=ids,
+            types=[node[1] or "unknown" for node in nodes],
+            titles=[node[2] or "" for node in nodes],
+            relationship_types=relationship_types,
+            out_indptr=out_indptr,
+            out_indices=out_indices,
+            out_edge_types=edge_codes[out_order],
+            in_indptr=in_indptr,
+            in_indices=in_indices,
+            in_edge_types=edge_codes[in_order],
+            undirected_indptr=undirected_indptr,
+            undirected_indices=undirected_indices,
+            pagerank=pagerank(n, src, dst, iterations=pagerank_iterations),
+            degree=np.diff(undirected_indptr).astype(np.int32),
+            community=label_propagation(n, undirected_indptr, undirected_indices),
+            graph_epoch=graph_epoch,
+            index=index,
+        )
+
+    @classmethod
+    def load(
+        cls,
+        driver: Driver,
+        database: str,
+        timeout: float = 30,
+        pagerank_iterations: int = 20,
+        graph_epoch: int = 0,
+    ) -> "GraphSnapshot":
+        """Load Document nodes and the edges between them from Neo4j"""
+        with driver.session(database=database) as session:
+            nodes = [
+                (record["id"], record["type"], record["title"])
+                for record in session.run(Query(NODES_QUERY, timeout=timeout))
+                if record["id"] is not None
+            ]
+            edges = [
+                (record["source"], record["target"], record["type"])
+                for record in session.run(Query(EDGES_QUERY, timeout=timeout))
+            ]
+        return cls.from_edges(nodes, edges, pagerank_iterations, graph_epoch)
+
+    @classmethod
+    async def aload(
+        cls,
+        driver: AsyncDriver,
+        database: str,
+        timeout: float = 30,
+        pagerank_iterations: int = 20,
+        graph_epoch: int = 0,
+    ) -> "GraphSnapshot":
+        """Load the snapshot on the Neo4j async driver, building it in a worker thread"""
+        async with driver.session(database=database) as session:
+            result = await session.run(Query(NODES_QUERY, timeout=timeout))
+            nodes = [
+                (record["id"], record["type"], record["title"])
+                async for record in result
+                if record["id"] is not None
+            ]
+            result = await session.run(Query(EDGES_QUERY, timeout=timeout))
+            edges = [
+                (record["source"], record["target"], record["type"]) async for record in result
+            ]
+        return await asyncio.to_thread(
+            cls.from_edges, nodes, edges, pagerank_iterations, graph_epoch
+        )
+
+    def __contains__(self, document_id: object) -> bool:
+        return document_id in self.index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def age(self) -> float:
+        """Seconds since the snapshot was built"""
+        return time.time() - self.built_at
+
+    def centrality(self, document_id: str) -> float:
+        """PageRank relative to the most central document, in [0, 1]"""
+        i = self.index.get(document_id)
+        if i is None or self._max_pagerank <= 0:
+            return 0.0
+        return float(self.pagerank[i] / self._max_pagerank)
+
+    def reachable(self, document_id: str, max_hops: int = 3) -> Set[int]:
+        """Node indices reachable within max_hops, ignoring direction (excluding the start)"""
+        start = self.index[document_id]
+        seen = {start}
+        frontier = np.array([start])
+        for _ in range(max_hops):
+            if len(frontier) == 0:
+                break
+            neighbors = np.concatenate(
+                [
+                    self.undirected_indices[
+                        self.undirected_indptr[i] : self.undirected_indptr[i + 1]
+                    ]
+                    for i in frontier
+                ]
+            )
+            new = set(np.unique(neighbors).tolist()) - seen
+            seen |= new
+            frontier = np.fromiter(new, dtype=np.int64)
+        seen.discard(start)
+        return seen
+
+    def dependents(
+        self,
+        document_id: str,
+        max_hops: int = 3,
+        relationship_types: Sequence[str] = DEPENDENCY_TYPES,
+        limit: int = 10,
+    ) -> List[int]:
+        """Documents pointing at this one through the given types, nearest first"""
+        allowed = {
+            code for code, name in enumerate(self.relationship_types) if name in relationship_types
+        }
+        start = self.index[document_id]
+        seen = {start}
+        order: List[int] = []
+        frontier = [start]
+        for _ in range(max_hops):
+            next_frontier = []
+            for node in frontier:
+                lo, hi = self.in_indptr[node], self.in_indptr[node + 1]
+                for source, code in zip(self.in_indices[lo:hi], self.in_edge_types[lo:hi]):
+                    source = int(source)
+                    if int(code) in allowed and source not in seen:
+                        seen.add(source)
+                        order.append(source)
+                        next_frontier.append(source)
+            frontier = next_frontier
+        return order[:limit]
+
+    def impact(self, document_id: str) -> Dict[str, Any]:
+        """Impact analysis in the format of GraphRAGIntegration.analyze_document_impact"""
+        i = self.index[document_id]
+        connections = []
+        seen_connections = set()
+        for indptr, indices, edge_types in (
+            (self.out_indptr, self.out_indices, self.out_edge_types),
+            (self.in_indptr, self.in_indices, self.in_edge_types),
+        ):
+            for j, code in zip(
+                indices[indptr[i] : indptr[i + 1]], edge_types[indptr[i] : indptr[i + 1]]
+            ):
+                key = (int(j), int(code))
+                if key not in seen_connections:
+                    seen_connections.add(key)
+                    connections.append(
+                        {
+                            "id": self.ids[int(j)],
+                            "type": self.types[int(j)],
+                            "relationship": self.relationship_types[int(code)],
+                        }
+                    )
+
+        direct = int(self.degree[i])
+        total_reachable = len(self.reachable(document_id, max_hops=3))
+        return {
+            "document_id": document_id,
+            "direct_connections": direct,
+            "total_reachable": total_reachable,
+            "dependency_chain": [
+                {"id": self.ids[j], "title": self.titles[j]} for j in self.dependents(document_id)
+            ],
+            "impacted_documents": connections,
+            "central_score": direct / total_reachable if total_reachable else 0.0,
+            "pagerank": float(self.pagerank[i]),
+            "community": int(self.community[i]),
+        }
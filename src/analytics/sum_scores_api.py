@@ -4,20 +4,44 @@ sum_scores_api.py: Advanced vector search with sum-of-scores ranking
 
 This component provides:
 1. Multi-query search with score aggregation
-2. Contextual re-ranking based on document relationships
+2. Contextual re-ranking by vector similarity to context documents
 3. Temporal decay for outdated documents
 4. Boost factors for document types
+5. Hybrid dense + sparse (lexical) retrieval with rank fusion
 """
 
+import copy
 import json
-from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Dict, List, Optional, cast
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, cast
 
 import click
+import numpy as np
 import yaml
 from qdrant_client import QdrantClient
-from qdrant_client.models import FieldCondition, Filter, MatchValue
+from qdrant_client.models import (
+    FieldCondition,
+    Filter,
+    MatchAny,
+    MatchValue,
+    QueryRequest,
+    SearchParams,
+)
+
+from src.core.utils import to_epoch_seconds
+from src.storage.hash_diff_embedder import compute_point_id
+from src.storage.hybrid import SPARSE_VECTOR_NAME, dense_vector, encode_query, fuse_points
+from src.storage.neo4j_init import DOCUMENT_TYPES
+from src.storage.query_cache import QueryResultCache, vector_scope
+from src.storage.vector_db_init import get_collection_profile
+from src.storage.vector_mirror import LocalVectorMirror, batched_cosine
+
+# Per-point score aggregations accepted by search_multi
+AGGREGATIONS = ("sum", "max", "avg")
 
 
 @dataclass
@@ -41,7 +65,10 @@ class SumScoresAPI:
     """Advanced vector search with sum-of-scores ranking"""
 
     def __init__(
-        self, config_path: str = ".ctxrc.yaml", perf_config_path: str = "performance.yaml"
+        self,
+        config_path: str = ".ctxrc.yaml",
+        perf_config_path: str = "performance.yaml",
+        vector_mirror: Optional[LocalVectorMirror] = None,
     ):
         self.config = self._load_config(config_path)
         self.perf_config = self._load_perf_config(perf_config_path)
@@ -54,6 +81,7 @@ class SumScoresAPI:
         ranking_config = self.perf_config.get("search", {}).get("ranking", {})
         self.decay_days = ranking_config.get("temporal_decay_days", 30)
         self.decay_rate = ranking_config.get("temporal_decay_rate", 0.01)
+        self.rerank_oversample = max(1, ranking_config.get("rerank_oversample", 3))
 
         # Document type boost factors from config
         self.type_boosts = ranking_config.get(
@@ -69,6 +97,48 @@ class SumScoresAPI:
             },
         )
 
+        # Hybrid retrieval: sparse lexical matches fused with dense results
+        hybrid_config = self.perf_config.get("search", {}).get("hybrid", {})
+        self.hybrid_enabled = hybrid_config.get("enabled", False)
+        self.fusion = hybrid_config.get("fusion", "rrf")
+        self.rrf_k = hybrid_config.get("rrf_k", 60)
+        self.fusion_weights = [
+            hybrid_config.get("dense_weight", 1.0),
+            hybrid_config.get("sparse_weight", 1.0),
+        ]
+
+        # Search planning: filtered HNSW vs exact scan of the matching points
+        search_config = self.perf_config.get("vector_db", {}).get("search", {})
+        self.ef_search = search_config.get("ef_search", 128)
+        self.exact_scan_threshold = search_config.get("exact_scan_threshold", 1000)
+        self.cardinality_ttl = search_config.get("cardinality_cache_seconds", 60)
+        self._cardinality_cache: Dict[str, Tuple[float, int]] = {}
+
+        # Index statistics are exact counts, cached briefly
+        self.statistics_ttl = search_config.get("statistics_cache_seconds", 30)
+        self.max_facet_values = 1000
+        self._statistics_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+
+        # Quantized collections are searched with rescoring/oversampling
+        collection_config = self.perf_config.get("vector_db", {}).get("collection", {})
+        self.quantization_params = get_collection_profile(self.perf_config).search_params(
+            collection_config.get("oversampling")
+        )
+
+        # Optional local vector mirror for exact contextual similarities
+        self.vector_mirror = vector_mirror
+        mirror_config = self.perf_config.get("vector_db", {}).get("mirror", {})
+        if self.vector_mirror is None and mirror_config.get("enabled", False):
+            mirror = LocalVectorMirror(
+                path=Path(mirror_config.get("path", "context/.embeddings_cache/vector_mirror")),
+                dtype=mirror_config.get("dtype", "float16"),
+            )
+            if mirror.load():
+                self.vector_mirror = mirror
+
+        # Result cache, created on connect when vector_db.cache is enabled
+        self.query_cache: Optional[QueryResultCache] = None
+
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from .ctxrc.yaml"""
         try:
@@ -98,95 +168,287 @@ class SumScoresAPI:
             self.client = QdrantClient(host=host, port=port)
             if self.client is not None:
                 self.client.get_collections()
-            return True
         except Exception as e:
             click.echo(f"Failed to connect to Qdrant: {e}", err=True)
             return False
 
-    def _calculate_temporal_decay(self, last_modified: str) -> float:
-        """Calculate temporal decay factor based on document age"""
-        try:
-            if not last_modified:
-                return 1.0
-
-            mod_date = datetime.fromisoformat(last_modified.replace("Z", "+00:00"))
-            age_days = (datetime.now() - mod_date).days
+        cache_config = self.perf_config.get("vector_db", {}).get("cache", {})
+        if cache_config.get("enabled", False):
+            self.query_cache = QueryResultCache.from_config(self.config, cache_config)
+
+        return True
+
+    def _cache_key(
+        self, namespace: str, query_vectors: List[List[float]], **params: Any
+    ) -> Optional[str]:
+        """Cache key for a search, or None when caching is disabled"""
+        if self.query_cache is None:
+            return None
+        return self.query_cache.make_key(
+            namespace,
+            query_vectors,
+            [vector_scope(self.collection_name)],
+            collection=self.collection_name,
+            **params,
+        )
 
-            if age_days <= self.decay_days:
-                return 1.0
+    def _get_cached(self, key: Optional[str]) -> Optional[List[SearchResult]]:
+        """Return cached search results for a key, if any"""
+        if key is None or self.query_cache is None:
+            return None
+        try:
+            cached = self.query_cache.get(key)
+            return [SearchResult(**r) for r in cached] if cached is not None else None
+        except Exception:
+            return None
 
-            # Exponential decay after threshold
-            decay = 1.0 - (self.decay_rate * (age_days - self.decay_days))
-            return float(max(0.5, decay))  # Minimum 50% score
+    def _set_cached(self, key: Optional[str], results: List[SearchResult]) -> None:
+        """Store search results under a key"""
+        if key is not None and self.query_cache is not None:
+            self.query_cache.set(key, [asdict(r) for r in results])
 
-        except Exception:
-            return 1.0
+    def _calculate_temporal_decay(self, last_modified: Any) -> float:
+        """Calculate temporal decay factor based on document age"""
+        epoch = to_epoch_seconds(last_modified)
+        epochs = np.array([np.nan if epoch is None else epoch], dtype=np.float64)
+        return float(self._calculate_temporal_decays(epochs)[0])
+
+    def _calculate_temporal_decays(self, epochs: np.ndarray) -> np.ndarray:
+        """Vectorized temporal decay for last-modified epoch seconds (NaN = unknown)"""
+        ages = np.floor((time.time() - epochs) / 86400.0)
+        decay = np.maximum(0.5, 1.0 - self.decay_rate * (ages - self.decay_days))
+        # Unknown dates (NaN ages) and recent documents are not decayed
+        return np.where(np.isnan(ages) | (ages <= self.decay_days), 1.0, decay)
+
+    @staticmethod
+    def _payload_epochs(payloads: List[Dict[str, Any]]) -> np.ndarray:
+        """Last-modified epoch seconds per payload, parsing dates only for legacy points"""
+        epochs = np.full(len(payloads), np.nan)
+        for i, payload in enumerate(payloads):
+            epoch = payload.get("last_modified_epoch")
+            if not isinstance(epoch, (int, float)):
+                epoch = to_epoch_seconds(payload.get("last_modified"))
+            if epoch is not None:
+                epochs[i] = epoch
+        return epochs
 
     def _get_type_boost(self, document_type: str) -> float:
         """Get boost factor for document type"""
         return float(self.type_boosts.get(document_type, 1.0))
 
+    def _build_filter(self, filter_conditions: Optional[Dict[str, Any]]) -> Optional[Filter]:
+        """Build an exact-match Qdrant filter from field/value pairs"""
+        if not filter_conditions:
+            return None
+
+        conditions = [
+            FieldCondition(key=field, match=MatchValue(value=value))
+            for field, value in filter_conditions.items()
+        ]
+        return Filter(must=cast(Any, conditions))
+
+    def _estimate_filter_cardinality(
+        self, query_filter: Filter, filter_conditions: Dict[str, Any]
+    ) -> Optional[int]:
+        """Approximate number of points matching a filter, cached briefly per filter"""
+        if self.client is None:
+            return None
+
+        cache_key = json.dumps(filter_conditions, sort_keys=True, default=str)
+        cached = self._cardinality_cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < self.cardinality_ttl:
+            return cached[1]
+
+        try:
+            # Approximate counts are answered from the payload index
+            count = int(
+                self.client.count(
+                    collection_name=self.collection_name,
+                    count_filter=query_filter,
+                    exact=False,
+                ).count
+            )
+        except Exception:
+            return None
+
+        self._cardinality_cache[cache_key] = (time.monotonic(), count)
+        return count
+
+    def _plan_search(
+        self, query_filter: Optional[Filter], filter_conditions: Optional[Dict[str, Any]]
+    ) -> SearchParams:
+        """Choose between (filtered) HNSW and an exact scan of the filtered points
+
+        Highly selective filters match too few points for the HNSW graph to stay
+        connected; scanning them exactly is both faster and precise.
+        """
+        if query_filter is not None and filter_conditions:
+            cardinality = self._estimate_filter_cardinality(query_filter, filter_conditions)
+            if cardinality is not None and cardinality <= self.exact_scan_threshold:
+                return SearchParams(exact=True, quantization=self.quantization_params)
+        return SearchParams(hnsw_ef=self.ef_search, quantization=self.quantization_params)
+
+    def _rank_results(
+        self,
+        point_ids: List[str],
+        payloads: List[Dict[str, Any]],
+        scores: np.ndarray,
+        raw_scores: List[List[float]],
+        limit: int,
+    ) -> List[SearchResult]:
+        """Apply decay and boost factors to all candidates, then keep the top `limit`"""
+        decay_factors = self._calculate_temporal_decays(self._payload_epochs(payloads))
+        boost_factors = np.array(
+            [self._get_type_boost(p.get("document_type", "unknown")) for p in payloads]
+        )
+        final_scores = scores * decay_factors * boost_factors
+
+        order = np.argsort(-final_scores, kind="stable")[:limit]
+        return [
+            SearchResult(
+                vector_id=point_ids[i],
+                document_id=payloads[i].get("document_id", ""),
+                document_type=payloads[i].get("document_type", ""),
+                file_path=payloads[i].get("file_path", ""),
+                title=payloads[i].get("title", ""),
+                score=float(scores[i]),
+                raw_scores=raw_scores[i],
+                decay_factor=float(decay_factors[i]),
+                boost_factor=float(boost_factors[i]),
+                final_score=float(final_scores[i]),
+                payload=payloads[i],
+            )
+            for i in order
+        ]
+
     def search_single(
         self,
         query_vector: List[float],
         limit: int = 10,
         filter_conditions: Optional[Dict[str, Any]] = None,
+        query_text: Optional[str] = None,
     ) -> List[SearchResult]:
-        """Perform single vector search"""
+        """Perform single vector search (hybrid when enabled and the query text is given)"""
+        if query_text and self.hybrid_enabled:
+            return self.search_hybrid(query_vector, query_text, limit, filter_conditions)
+
+        cache_key = self._cache_key(
+            "single", [query_vector], limit=limit, filters=filter_conditions
+        )
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+
+        if self.client is None:
+            return []
+
+        # Over-fetch so decay/boost can reorder candidates before truncation
+        query_filter = self._build_filter(filter_conditions)
         search_params = {
             "collection_name": self.collection_name,
             "query_vector": query_vector,
-            "limit": limit,
+            "limit": limit * self.rerank_oversample,
             "with_payload": True,
+            "search_params": self._plan_search(query_filter, filter_conditions),
         }
 
         # Add filters if provided
-        if filter_conditions:
-            conditions = []
-            for field, value in filter_conditions.items():
-                conditions.append(FieldCondition(key=field, match=MatchValue(value=value)))
-            search_params["query_filter"] = Filter(must=cast(Any, conditions))
+        if query_filter is not None:
+            search_params["query_filter"] = query_filter
 
         # Search
-        if self.client is None:
+        try:
+            results = self.client.search(**search_params)
+        except Exception as e:
+            click.echo(f"Search failed: {e}", err=True)
             return []
-        results = self.client.search(**search_params)
 
-        # Convert to SearchResult objects
-        search_results = []
-        for result in results:
-            payload = result.payload if result.payload else {}
+        scores = np.array([r.score for r in results], dtype=np.float64)
+        search_results = self._rank_results(
+            [str(r.id) for r in results],
+            [r.payload if r.payload else {} for r in results],
+            scores,
+            [[r.score] for r in results],
+            limit,
+        )
 
-            # Calculate factors
-            decay_factor = self._calculate_temporal_decay(
-                payload.get("last_modified", "") if payload else ""
-            )
-            boost_factor = self._get_type_boost(
-                payload.get("document_type", "unknown") if payload else "unknown"
-            )
+        self._set_cached(cache_key, search_results)
+        return search_results
 
-            # Calculate final score
-            final_score = result.score * decay_factor * boost_factor
-
-            search_results.append(
-                SearchResult(
-                    vector_id=str(result.id),
-                    document_id=payload.get("document_id", "") if payload else "",
-                    document_type=payload.get("document_type", "") if payload else "",
-                    file_path=payload.get("file_path", "") if payload else "",
-                    title=payload.get("title", "") if payload else "",
-                    score=result.score,
-                    raw_scores=[result.score],
-                    decay_factor=decay_factor,
-                    boost_factor=boost_factor,
-                    final_score=final_score,
-                    payload=payload,
-                )
-            )
+    def search_hybrid(
+        self,
+        query_vector: List[float],
+        query_text: str,
+        limit: int = 10,
+        filter_conditions: Optional[Dict[str, Any]] = None,
+    ) -> List[SearchResult]:
+        """Fuse dense (semantic) and sparse (lexical) retrieval
+
+        Both candidate lists are fetched in one batch request and fused (RRF or
+        weighted) before decay/boost ranking, so exact identifiers missed by the
+        embedding still surface. Collections without the sparse vector fall back
+        to dense-only search.
+        """
+        sparse_query = encode_query(query_text)
+        if not sparse_query.indices:
+            return self.search_single(query_vector, limit, filter_conditions)
+
+        cache_key = self._cache_key(
+            "hybrid",
+            [query_vector],
+            text=query_text,
+            limit=limit,
+            filters=filter_conditions,
+            fusion=self.fusion,
+        )
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
 
-        # Sort by final score
-        search_results.sort(key=lambda x: x.final_score, reverse=True)
+        if self.client is None:
+            return []
+
+        query_filter = self._build_filter(filter_conditions)
+        candidates = limit * self.rerank_oversample
+        requests = [
+            QueryRequest(
+                query=query_vector,
+                filter=query_filter,
+                params=self._plan_search(query_filter, filter_conditions),
+                limit=candidates,
+                with_payload=True,
+            ),
+            QueryRequest(
+                query=sparse_query,
+                using=SPARSE_VECTOR_NAME,
+                filter=query_filter,
+                limit=candidates,
+                with_payload=True,
+            ),
+        ]
+        try:
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name, requests=requests
+            )
+        except Exception as e:
+            click.echo(f"Hybrid search failed, using dense search: {e}", err=True)
+            return self.search_single(query_vector, limit, filter_conditions)
+
+        fused = fuse_points(
+            [response.points for response in responses],
+            self.fusion_weights,
+            self.fusion,
+            self.rrf_k,
+        )
+        search_results = self._rank_results(
+            [str(point.id) for point, _, _ in fused],
+            [point.payload or {} for point, _, _ in fused],
+            np.array([score for _, score, _ in fused], dtype=np.float64),
+            [raw for _, _, raw in fused],
+            limit,
+        )
 
+        self._set_cached(cache_key, search_results)
         return search_results
 
     def search_multi(
@@ -196,39 +458,114 @@ class SumScoresAPI:
         aggregation: str = "sum",
         filter_conditions: Optional[Dict[str, Any]] = None,
     ) -> List[SearchResult]:
-        """Perform multi-query search with score aggregation"""
-
-        # Collect results from all queries
-        all_results: Dict[str, SearchResult] = {}
+        """Perform multi-query search with score aggregation
+
+        All query vectors are sent to Qdrant in a single batch request; scores are
+        then aggregated per point and decayed/boosted as NumPy arrays.
+        """
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"aggregation must be one of {', '.join(AGGREGATIONS)}")
+        if self.client is None or not query_vectors:
+            return []
 
-        for query_vector in query_vectors:
-            results = self.search_single(
-                query_vector, limit=limit * 2, filter_conditions=filter_conditions
+        cache_key = self._cache_key(
+            "multi",
+            query_vectors,
+            limit=limit,
+            aggregation=aggregation,
+            filters=filter_conditions,
+        )
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+
+        query_filter = self._build_filter(filter_conditions)
+        search_params = self._plan_search(query_filter, filter_conditions)
+        requests = [
+            QueryRequest(
+                query=query_vector,
+                filter=query_filter,
+                params=search_params,
+                limit=limit * 2,
+                with_payload=True,
             )
+            for query_vector in query_vectors
+        ]
+        try:
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name, requests=requests
+            )
+        except Exception as e:
+            click.echo(f"Multi-query search failed: {e}", err=True)
+            return []
 
-            for result in results:
-                if result.vector_id in all_results:
-                    # Aggregate scores
-                    existing = all_results[result.vector_id]
-                    existing.raw_scores.append(result.score)
+        # Score matrix: one row per query, one column per distinct point (NaN = not returned)
+        column: Dict[str, int] = {}
+        payloads: List[Dict[str, Any]] = []
+        hits = []
+        for row, response in enumerate(responses):
+            for point in response.points:
+                point_id = str(point.id)
+                if point_id not in column:
+                    column[point_id] = len(payloads)
+                    payloads.append(point.payload or {})
+                hits.append((row, column[point_id], point.score))
+
+        if not payloads:
+            return []
 
-                    if aggregation == "sum":
-                        existing.score += result.score
-                    elif aggregation == "max":
-                        existing.score = max(existing.score, result.score)
-                    elif aggregation == "avg":
-                        existing.score = sum(existing.raw_scores) / len(existing.raw_scores)
-                else:
-                    all_results[result.vector_id] = result
+        scores = np.full((len(responses), len(payloads)), np.nan)
+        for row, col, score in hits:
+            scores[row, col] = score
+
+        if aggregation == "max":
+            aggregated = np.nanmax(scores, axis=0)
+        elif aggregation == "avg":
+            aggregated = np.nanmean(scores, axis=0)
+        else:  # sum
+            aggregated = np.nansum(scores, axis=0)
+
+        search_results = self._rank_results(
+            list(column),
+            payloads,
+            aggregated,
+            [[float(v) for v in scores[:, i] if not np.isnan(v)] for i in range(len(payloads))],
+            limit,
+        )
 
-        # Recalculate final scores
-        for result in all_results.values():
-            result.final_score = result.score * result.decay_factor * result.boost_factor
+        self._set_cached(cache_key, search_results)
+        return search_results
 
-        # Sort and limit
-        sorted_results = sorted(all_results.values(), key=lambda x: x.final_score, reverse=True)
+    def _get_vectors(self, point_ids: List[str]) -> Dict[str, np.ndarray]:
+        """Look up stored vectors by point ID
+
+        Served from the local vector mirror where possible; the remainder is
+        fetched with a single retrieve request.
+        """
+        vectors: Dict[str, np.ndarray] = {}
+        if self.vector_mirror is not None:
+            found, matrix = self.vector_mirror.get_vectors(point_ids)
+            vectors.update(zip(found, matrix))
+
+        missing = [pid for pid in point_ids if pid not in vectors]
+        if not missing or self.client is None:
+            return vectors
+
+        try:
+            records = self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=missing,
+                with_payload=False,
+                with_vectors=True,
+            )
+            for record in records:
+                vector = dense_vector(record.vector)
+                if vector is not None:
+                    vectors[str(record.id)] = np.asarray(vector, dtype=np.float32)
+        except Exception as e:
+            click.echo(f"Failed to retrieve vectors: {e}", err=True)
 
-        return sorted_results[:limit]
+        return vectors
 
     def search_contextual(
         self,
@@ -239,111 +576,120 @@ class SumScoresAPI:
     ) -> List[SearchResult]:
         """Search with contextual re-ranking based on related documents"""
 
+        cache_key = self._cache_key(
+            "contextual",
+            [query_vector],
+            limit=limit,
+            context=context_doc_ids,
+            context_weight=context_weight,
+        )
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+
         # Get base results
         base_results = self.search_single(query_vector, limit=limit * 2)
+        if not base_results or not context_doc_ids:
+            return base_results[:limit]
 
-        # Get vectors for context documents
-        context_vectors = []
-        for doc_id in context_doc_ids:
-            try:
-                # Search by document_id
-                filter_cond = {"document_id": doc_id}
-                context_results = self.search_single(
-                    [0.0] * 1536, limit=1, filter_conditions=filter_cond
-                )
-                if context_results:
-                    context_vectors.append(context_results[0])
-            except Exception:
-                continue
+        # Context and candidate vectors in one lookup (mirror first, then Qdrant)
+        context_ids = [compute_point_id(doc_id) for doc_id in context_doc_ids]
+        candidate_ids = [r.vector_id for r in base_results]
+        vectors = self._get_vectors(list(dict.fromkeys(context_ids + candidate_ids)))
+
+        context_vectors = [vectors[pid] for pid in context_ids if pid in vectors]
+        scored = [r for r in base_results if r.vector_id in vectors]
 
-        # Re-rank based on similarity to context
+        # Re-rank by mean cosine similarity to the context documents; candidates
+        # without a vector get a neutral similarity of 0 on the same scale
         if context_vectors:
+            similarity_by_id: Dict[str, float] = {}
+            if scored:
+                similarities = batched_cosine(
+                    np.stack(context_vectors), np.stack([vectors[r.vector_id] for r in scored])
+                ).mean(axis=0)
+                similarity_by_id = {
+                    r.vector_id: float(similarity) for r, similarity in zip(scored, similarities)
+                }
+
             for result in base_results:
-                # Calculate average similarity to context documents
-                context_scores = []
-
-                for context in context_vectors:
-                    # This would require actual vector similarity calculation
-                    # For now, we'll use a simple heuristic based on document relationships
-                    if result.document_type == context.document_type:
-                        context_scores.append(0.8)
-                    elif result.payload.get("sprint_number") == context.payload.get(
-                        "sprint_number"
-                    ):
-                        context_scores.append(0.7)
-                    else:
-                        context_scores.append(0.5)
-
-                if context_scores:
-                    avg_context_score = sum(context_scores) / len(context_scores)
-                    # Blend original score with context score
-                    result.final_score = (
-                        result.final_score * (1 - context_weight)
-                        + avg_context_score * context_weight
-                    )
+                similarity = similarity_by_id.get(result.vector_id, 0.0)
+                result.final_score = (
+                    result.final_score * (1 - context_weight) + similarity * context_weight
+                )
 
         # Sort by final score
         base_results.sort(key=lambda x: x.final_score, reverse=True)
 
+        self._set_cached(cache_key, base_results[:limit])
         return base_results[:limit]
 
+    def _count_points(self, query_filter: Optional[Filter] = None) -> int:
+        """Exact number of points matching a filter (answered from payload indexes)"""
+        if self.client is None:
+            return 0
+        return int(
+            self.client.count(
+                collection_name=self.collection_name, count_filter=query_filter, exact=True
+            ).count
+        )
+
+    def _document_type_counts(self) -> Dict[str, int]:
+        """Exact per-type point counts
+
+        A single facet request over the document_type index covers every type. Servers
+        without facet support get one indexed count per configured or known type, plus
+        one count of the points outside them, reported as "other".
+        """
+        if self.client is None:
+            return {}
+        try:
+            response = self.client.facet(
+                collection_name=self.collection_name,
+                key="document_type",
+                limit=self.max_facet_values,
+                exact=True,
+            )
+            return {str(hit.value): int(hit.count) for hit in response.hits}
+        except Exception:
+            pass
+
+        known_types = list(dict.fromkeys([*self.type_boosts, *(t[0] for t in DOCUMENT_TYPES)]))
+        counts: Counter = Counter()
+        for doc_type in known_types:
+            counts[doc_type] = self._count_points(
+                Filter(must=[FieldCondition(key="document_type", match=MatchValue(value=doc_type))])
+            )
+        counts["other"] = self._count_points(
+            Filter(must_not=[FieldCondition(key="document_type", match=MatchAny(any=known_types))])
+        )
+        return {doc_type: count for doc_type, count in counts.most_common() if count > 0}
+
     def get_statistics(self) -> Dict[str, Any]:
         """Get search index statistics"""
         try:
             if self.client is None:
                 return {"error": "Not connected to Qdrant"}
-            collection_info = self.client.get_collection(self.collection_name)
-
-            # Get document type distribution using sampling for large collections
-            total_points = collection_info.points_count
-            type_counts: Dict[str, int] = {}
-
-            if total_points and total_points > 1000:
-                # Sample for large collections
-                sample_size = min(500, total_points)
-                sample_ids = []
-
-                # Get a sample of point IDs
-                if self.client is not None:
-                    points, _ = self.client.scroll(
-                        collection_name=self.collection_name, limit=sample_size, with_payload=False
-                    )
-                    sample_ids = [p.id for p in points]
-
-                    # Retrieve payloads for sampled points
-                    retrieved = self.client.retrieve(
-                        collection_name=self.collection_name, ids=sample_ids, with_payload=True
-                    )
-
-                for point in retrieved:
-                    if point.payload:
-                        doc_type = point.payload.get("document_type", "unknown")
-                        type_counts[doc_type] = type_counts.get(doc_type, 0) + 1
-
-                # Extrapolate counts
-                if sample_size and sample_size > 0:
-                    factor = total_points / sample_size
-                    type_counts = {k: int(v * factor) for k, v in type_counts.items()}
-            else:
-                # For small collections, get all points
-                offset = None
-                if self.client is not None:
-                    while True:
-                        points, next_offset = self.client.scroll(
-                            collection_name=self.collection_name,
-                            limit=100,
-                            offset=offset,
-                            with_payload=True,
-                        )
-
-                        for point in points:
-                            if point.payload:
-                                doc_type = point.payload.get("document_type", "unknown")
-                                type_counts[doc_type] = type_counts.get(doc_type, 0) + 1
-
-                        if next_offset is None:
-                            break
-                        offset = next_offset
+
+            if (
+                self._statistics_cache is not None
+                and time.monotonic() - self._statistics_cache[0] < self.statistics_ttl
+            ):
+                return copy.deepcopy(self._statistics_cache[1])
+
+            # Collection info, exact total and type distribution are independent requests
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                info_future = executor.submit(self.client.get_collection, self.collection_name)
+                total_future = executor.submit(self._count_points)
+                types_future = executor.submit(self._document_type_counts)
+                collection_info = info_future.result()
+                total_points = total_future.result()
+                type_counts = types_future.result()
+
+            # Points without a (counted) document type
+            untyped = total_points - sum(type_counts.values())
+            if untyped > 0:
+                type_counts["unknown"] = type_counts.get("unknown", 0) + untyped
 
             # Get vector parameters
             vector_params = collection_info.config.params.vectors
@@ -363,14 +709,16 @@ class SumScoresAPI:
                 vector_size = 0
                 distance_metric = "unknown"
 
-            return {
-                "total_vectors": collection_info.points_count,
+            statistics = {
+                "total_vectors": total_points,
                 "vector_size": vector_size,
                 "distance_metric": distance_metric,
                 "document_types": type_counts,
                 "type_boosts": self.type_boosts,
                 "decay_config": {"decay_days": self.decay_days, "decay_rate": self.decay_rate},
             }
+            self._statistics_cache = (time.monotonic(), copy.deepcopy(statistics))
+            return statistics
         except Exception as e:
             return {"error": str(e)}
 
@@ -406,7 +754,10 @@ def search(query: str, limit: int, doc_type: Optional[str], format: str):
 
     # Search
     results = api.search_single(
-        query_vector, limit=limit, filter_conditions=filters if filters else None
+        query_vector,
+        limit=limit,
+        filter_conditions=filters if filters else None,
+        query_text=query,
     )
 
     if format == "json":
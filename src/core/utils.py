@@ -4,6 +4,7 @@ utils.py: Common utility functions for the Agent-First Context System
 """
 
 import re
+from datetime import date, datetime, timezone
 from typing import Any, List, Optional
 
 
@@ -171,3 +172,37 @@ def get_secure_connection_config(config: dict[str, Any], service: str) -> dict[s
         secure_config["ssl_ca_path"] = service_config["ssl_ca_path"]
 
     return secure_config
+
+
+def to_epoch_seconds(value: Any) -> Optional[int]:
+    """
+    Convert a date, datetime or ISO-8601 string to UTC epoch seconds
+
+    Naive values are interpreted as UTC so that stored timestamps compare
+    consistently regardless of the machine's timezone.
+
+    Args:
+        value: date/datetime object, ISO-8601 string or epoch number
+
+    Returns:
+        Epoch seconds, or None if the value is empty or cannot be parsed
+    """
+    if value is None or value == "" or isinstance(value, bool):
+        return None
+
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    try:
+        if isinstance(value, datetime):
+            parsed = value
+        elif isinstance(value, date):
+            parsed = datetime(value.year, value.month, value.day)
+        else:
+            parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
@@ -3,19 +3,103 @@
 graphrag_integration.py: GraphRAG integration for enhanced context retrieval
 
 This component:
-1. Combines vector search with graph traversal
+1. Combines vector (dense or hybrid dense + lexical) search with graph traversal
 2. Implements GraphRAG patterns for context enhancement
 3. Provides multi-hop reasoning capabilities
 4. Generates contextual summaries from graph neighborhoods
+5. Scores centrality and impact from an in-memory graph snapshot when one is loaded
+6. Traverses the embedded graph of graph_backend.py instead of Neo4j when
+   neo4j.backend is "embedded"
 """
 
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, cast
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple, cast
 
 import click
 import yaml
-from neo4j import Driver, GraphDatabase
+from neo4j import Driver, GraphDatabase, Query
 from qdrant_client import QdrantClient
+from qdrant_client.models import QueryRequest
+
+from src.analytics.graph_snapshot import GraphSnapshot
+from src.storage.hybrid import SPARSE_VECTOR_NAME, encode_query, fuse_points
+from src.storage.query_cache import QueryResultCache, graph_scope, vector_scope
+
+if TYPE_CHECKING:
+    from src.storage.graph_backend import GraphBackend
+
+# Projection shared by the expansion plans: ids, types and titles only
+_EXPANSION_RETURN = """
+RETURN
+    d.id as source_id,
+    d.document_type as source_type,
+    d.title as source_title,
+    coalesce(connected.id, elementId(connected)) as target_id,
+    connected.document_type as target_type,
+    connected.title as target_title,
+    [r in relationships(path) | {type: type(r), properties: properties(r)}] as relationships,
+    length(path) as distance
+ORDER BY distance
+"""
+
+# Expand every seed document in one query (APOC path expander)
+APOC_EXPANSION_QUERY = """
+UNWIND $doc_ids AS doc_id
+MATCH (d:Document {id: doc_id})
+CALL apoc.path.expandConfig(d, {
+    minLevel: 1,
+    maxLevel: $max_hops,
+    uniqueness: 'NODE_GLOBAL',
+    limit: 50,
+    relationshipFilter: 'REFERENCES|IMPLEMENTS|RELATES_TO|DEPENDS_ON'
+}) YIELD path
+WITH d, path, last(nodes(path)) as connected
+WHERE connected:Document
+""" + _EXPANSION_RETURN
+
+# Procedures probed at connect time
+APOC_EXPAND_PROCEDURE = "apoc.path.expandConfig"
+PROCEDURE_PROBE_QUERY = """
+SHOW PROCEDURES YIELD name
+WHERE name STARTS WITH 'apoc.path.' OR name STARTS WITH 'gds.'
+RETURN name
+"""
+
+
+@lru_cache(maxsize=None)
+def cypher_expansion_query(max_hops: int) -> str:
+    """Expansion without APOC; one fixed query text per hop count
+
+    Variable-length bounds cannot be query parameters, so each hop count gets its
+    own text, which Neo4j then plans once and reuses from its query cache.
+    """
+    return f"""
+UNWIND $doc_ids AS doc_id
+MATCH (d:Document {{id: doc_id}})
+CALL {{
+    WITH d
+    MATCH path = (d)-[:REFERENCES|IMPLEMENTS|RELATES_TO|DEPENDS_ON*1..{int(max_hops)}]-
+                 (connected:Document)
+    RETURN path, connected
+    ORDER BY length(path)
+    LIMIT 50
+}}
+""" + _EXPANSION_RETURN
+
+
+@lru_cache(maxsize=None)
+def shortest_paths_query(max_path_length: int) -> str:
+    """Shortest paths between every pair of seed documents in one query"""
+    return f"""
+MATCH (d1:Document) WHERE d1.id IN $doc_ids
+MATCH (d2:Document) WHERE d2.id IN $doc_ids AND d1.id < d2.id
+MATCH path = shortestPath((d1)-[*..{int(max_path_length)}]-(d2))
+RETURN [n in nodes(path) | n.id] as nodes, length(path) as distance
+"""
 
 
 @dataclass
@@ -34,15 +118,51 @@ class GraphRAGResult:
 class GraphRAGIntegration:
     """GraphRAG integration for enhanced context retrieval"""
 
-    def __init__(self, config_path: str = ".ctxrc.yaml", verbose: bool = False):
+    def __init__(
+        self,
+        config_path: str = ".ctxrc.yaml",
+        verbose: bool = False,
+        perf_config_path: str = "performance.yaml",
+    ):
         self.config = self._load_config(config_path)
+        self.perf_config = self._load_perf_config(perf_config_path)
         self.neo4j_driver: Optional[Driver] = None
+        # Set instead of the Neo4j driver when neo4j.backend selects an embedded graph
+        self.graph_backend: Optional["GraphBackend"] = None
         self.qdrant_client: Optional[QdrantClient] = None
         self.verbose = verbose
         self.database = self.config.get("neo4j", {}).get("database", "context_graph")
         self.collection_name = self.config.get("qdrant", {}).get(
             "collection_name", "project_context"
         )
+        self.query_cache: Optional[QueryResultCache] = None
+
+        # Graph query settings; installed procedures are probed once per connection
+        query_config = self.perf_config.get("graph_db", {}).get("query", {})
+        self.query_timeout = query_config.get("query_timeout", 30)
+        self.max_path_length = query_config.get("max_path_length", 5)
+        self.procedures: Optional[Set[str]] = None
+
+        # In-memory graph snapshot for centrality scoring and impact analysis
+        graph_config = self.perf_config.get("graph_db", {})
+        snapshot_config = graph_config.get("snapshot", {})
+        self.snapshot_enabled = snapshot_config.get("enabled", False)
+        self.snapshot_refresh_seconds = snapshot_config.get("refresh_seconds", 300)
+        self.pagerank_iterations = graph_config.get("algorithms", {}).get("pagerank_iterations", 20)
+        self.snapshot: Optional[GraphSnapshot] = None
+        # When the last load failed, so the snapshot is retried after refresh_seconds
+        self.snapshot_failed_at: Optional[float] = None
+        self._snapshot_refresh: Optional[threading.Thread] = None
+
+        # Hybrid retrieval: sparse lexical matches fused with dense results
+        hybrid_config = self.perf_config.get("search", {}).get("hybrid", {})
+        self.hybrid_enabled = hybrid_config.get("enabled", False)
+        self.fusion = hybrid_config.get("fusion", "rrf")
+        self.rrf_k = hybrid_config.get("rrf_k", 60)
+        self.fusion_weights = [
+            hybrid_config.get("dense_weight", 1.0),
+            hybrid_config.get("sparse_weight", 1.0),
+        ]
 
     def __enter__(self):
         """Context manager entry"""
@@ -69,9 +189,30 @@ class GraphRAGIntegration:
         except FileNotFoundError:
             return {}
 
-    def connect(self, neo4j_username: str = "neo4j", neo4j_password: Optional[str] = None) -> bool:
-        """Connect to Neo4j and Qdrant"""
-        # Connect to Neo4j
+    def _load_perf_config(self, perf_config_path: str) -> Dict[str, Any]:
+        """Load performance configuration"""
+        try:
+            with open(perf_config_path, "r") as f:
+                result = yaml.safe_load(f)
+                return cast(Dict[str, Any], result) if isinstance(result, dict) else {}
+        except FileNotFoundError:
+            return {}
+
+    def _connect_graph(self, neo4j_username: str, neo4j_password: Optional[str]) -> bool:
+        """Open the embedded graph when configured, otherwise connect to Neo4j"""
+        # Import locally to avoid circular imports
+        from src.storage.graph_backend import create_backend
+
+        try:
+            self.graph_backend = create_backend(self.config)
+        except Exception as e:
+            click.echo(f"Failed to open embedded graph: {e}", err=True)
+            return False
+        if self.graph_backend is not None:
+            # No APOC or GDS procedures: the backend implements the traversals
+            self.procedures = set()
+            return True
+
         neo4j_config = self.config.get("neo4j", {})
         neo4j_host = neo4j_config.get("host", "localhost")
         neo4j_port = neo4j_config.get("port", 7687)
@@ -88,6 +229,7 @@ class GraphRAGIntegration:
             if self.neo4j_driver is not None:
                 with self.neo4j_driver.session() as session:
                     session.run("RETURN 1")
+                self.procedures = self._probe_procedures()
         except Exception as e:
             # Import locally to avoid circular imports
             from src.core.utils import sanitize_error_message
@@ -95,6 +237,12 @@ class GraphRAGIntegration:
             error_msg = sanitize_error_message(str(e), [neo4j_password, neo4j_username])
             click.echo(f"Failed to connect to Neo4j: {error_msg}", err=True)
             return False
+        return True
+
+    def connect(self, neo4j_username: str = "neo4j", neo4j_password: Optional[str] = None) -> bool:
+        """Connect to Neo4j (or the embedded graph) and Qdrant"""
+        if not self._connect_graph(neo4j_username, neo4j_password):
+            return False
 
         # Connect to Qdrant
         qdrant_config = self.config.get("qdrant", {})
@@ -109,138 +257,310 @@ class GraphRAGIntegration:
             click.echo(f"Failed to connect to Qdrant: {e}", err=True)
             return False
 
+        self._setup_query_cache()
+        if self.snapshot_enabled:
+            self.refresh_snapshot()
+
         return True
 
-    def _vector_search(self, query_vector: List[float], limit: int = 5) -> List[Dict[str, Any]]:
-        """Perform vector search in Qdrant"""
+    def _setup_query_cache(self) -> None:
+        """Create the query result cache when graph_db.query.use_query_cache is set"""
+        if self.perf_config.get("graph_db", {}).get("query", {}).get("use_query_cache", False):
+            cache_config = self.perf_config.get("vector_db", {}).get("cache", {})
+            self.query_cache = QueryResultCache.from_config(
+                self.config, cache_config, verbose=self.verbose
+            )
+
+    def _graph_epoch(self) -> int:
+        """Graph epoch from the query cache (bumped by GraphBuilder on writes)"""
+        if self.query_cache is None:
+            return 0
+        return self.query_cache.get_epoch(graph_scope(self.database))
+
+    def refresh_snapshot(self) -> bool:
+        """Rebuild the in-memory graph snapshot from Neo4j or the embedded graph"""
+        if self.neo4j_driver is None and self.graph_backend is None:
+            return False
+        start = time.time()
         try:
-            if self.qdrant_client is None:
-                return []
-            results = self.qdrant_client.search(
+            if self.graph_backend is not None:
+                self.snapshot = self.graph_backend.snapshot(
+                    pagerank_iterations=self.pagerank_iterations,
+                    graph_epoch=self._graph_epoch(),
+                )
+            else:
+                self.snapshot = GraphSnapshot.load(
+                    cast(Driver, self.neo4j_driver),
+                    self.database,
+                    timeout=self.query_timeout,
+                    pagerank_iterations=self.pagerank_iterations,
+                    graph_epoch=self._graph_epoch(),
+                )
+        except Exception as e:
+            self.snapshot = None
+            self.snapshot_failed_at = time.time()
+            if self.verbose:
+                click.echo(f"Graph snapshot unavailable, querying Neo4j: {e}", err=True)
+            return False
+
+        self.snapshot_failed_at = None
+        if self.verbose:
+            click.echo(
+                f"Graph snapshot: {len(self.snapshot)} documents " f"in {time.time() - start:.2f}s"
+            )
+        return True
+
+    def _graph_snapshot(self) -> Optional[GraphSnapshot]:
+        """Current snapshot, rebuilt when it is older than refresh_seconds or the graph
+        changed, and retried refresh_seconds after a failed load
+
+        The rebuild runs in a background thread; callers keep the previous snapshot
+        (or the Neo4j fallback) until it is done.
+        """
+        refreshing = self._snapshot_refresh is not None and self._snapshot_refresh.is_alive()
+        if not refreshing and self._snapshot_stale():
+            self._snapshot_refresh = threading.Thread(
+                target=self.refresh_snapshot, name="graph-snapshot-refresh", daemon=True
+            )
+            self._snapshot_refresh.start()
+        return self.snapshot
+
+    def _snapshot_stale(self) -> bool:
+        """Whether the snapshot should be (re)loaded before it is used"""
+        if self.snapshot is None:
+            return (
+                self.snapshot_failed_at is not None
+                and time.time() - self.snapshot_failed_at > self.snapshot_refresh_seconds
+            )
+        return (
+            self.snapshot.age() > self.snapshot_refresh_seconds
+            or self.snapshot.graph_epoch != self._graph_epoch()
+        )
+
+    def _hybrid_requests(
+        self, query_vector: List[float], sparse_query: Any, limit: int
+    ) -> List[QueryRequest]:
+        """Dense and sparse requests for one batch call"""
+        return [
+            QueryRequest(query=query_vector, limit=limit, with_payload=True),
+            QueryRequest(
+                query=sparse_query, using=SPARSE_VECTOR_NAME, limit=limit, with_payload=True
+            ),
+        ]
+
+    def _fuse_hybrid(self, responses: List[Any], limit: int) -> List[Any]:
+        """Fuse dense and sparse responses into one ranked point list"""
+        fused = fuse_points(
+            [response.points for response in responses],
+            self.fusion_weights,
+            self.fusion,
+            self.rrf_k,
+        )
+        # Fused scores replace raw similarities so combined scoring stays in [0, 1]
+        return [point.model_copy(update={"score": score}) for point, score, _ in fused[:limit]]
+
+    def _hybrid_points(
+        self, query_vector: List[float], query_text: str, limit: int
+    ) -> Optional[List[Any]]:
+        """Dense and sparse candidates from one batch request, fused (None if unavailable)"""
+        sparse_query = encode_query(query_text)
+        if self.qdrant_client is None or not sparse_query.indices:
+            return None
+
+        try:
+            responses = self.qdrant_client.query_batch_points(
                 collection_name=self.collection_name,
-                query_vector=query_vector,
-                limit=limit,
-                with_payload=True,
+                requests=self._hybrid_requests(query_vector, sparse_query, limit),
             )
+        except Exception as e:
+            if self.verbose:
+                click.echo(f"Hybrid search unavailable, using dense search: {e}", err=True)
+            return None
+
+        return self._fuse_hybrid(responses, limit)
+
+    @staticmethod
+    def _format_vector_results(points: List[Any]) -> List[Dict[str, Any]]:
+        """Flatten scored points into the result dicts used by search"""
+        return [
+            {
+                "id": r.id,
+                "score": r.score,
+                "document_id": r.payload.get("document_id", "") if r.payload else "",
+                "document_type": r.payload.get("document_type", "") if r.payload else "",
+                "title": r.payload.get("title", "") if r.payload else "",
+                "file_path": r.payload.get("file_path", "") if r.payload else "",
+                "payload": r.payload if r.payload else {},
+            }
+            for r in points
+        ]
+
+    def _vector_search(
+        self, query_vector: List[float], limit: int = 5, query_text: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Perform vector search in Qdrant (hybrid when enabled and the query text is given)"""
+        try:
+            if self.qdrant_client is None:
+                return []
 
-            return [
-                {
-                    "id": r.id,
-                    "score": r.score,
-                    "document_id": r.payload.get("document_id", "") if r.payload else "",
-                    "document_type": r.payload.get("document_type", "") if r.payload else "",
-                    "title": r.payload.get("title", "") if r.payload else "",
-                    "file_path": r.payload.get("file_path", "") if r.payload else "",
-                    "payload": r.payload if r.payload else {},
-                }
-                for r in results
-            ]
+            results = None
+            if query_text and self.hybrid_enabled:
+                results = self._hybrid_points(query_vector, query_text, limit)
+            if results is None:
+                results = self.qdrant_client.search(
+                    collection_name=self.collection_name,
+                    query_vector=query_vector,
+                    limit=limit,
+                    with_payload=True,
+                )
+
+            return self._format_vector_results(results)
         except Exception as e:
             if self.verbose:
                 click.echo(f"Vector search error: {e}", err=True)
             return []
 
+    def _probe_procedures(self) -> Set[str]:
+        """Names of the installed APOC path and GDS procedures"""
+        if self.neo4j_driver is None:
+            return set()
+        try:
+            with self.neo4j_driver.session(database=self.database) as session:
+                result = session.run(Query(PROCEDURE_PROBE_QUERY, timeout=self.query_timeout))
+                return {record["name"] for record in result}
+        except Exception as e:
+            if self.verbose:
+                click.echo(f"Procedure probe failed, using plain Cypher: {e}", err=True)
+            return set()
+
+    @property
+    def has_apoc(self) -> bool:
+        """Whether the APOC path expander is available (probed once, then cached)"""
+        if self.procedures is None:
+            self.procedures = self._probe_procedures()
+        return APOC_EXPAND_PROCEDURE in self.procedures
+
+    @property
+    def has_gds(self) -> bool:
+        """Whether Graph Data Science procedures are available"""
+        if self.procedures is None:
+            self.procedures = self._probe_procedures()
+        return any(name.startswith("gds.") for name in self.procedures)
+
+    def _clamp_hops(self, max_hops: int) -> int:
+        """Keep requested hops within 1..graph_db.query.max_path_length"""
+        return max(1, min(int(max_hops), int(self.max_path_length)))
+
+    @staticmethod
+    def _expansion_plans(max_hops: int, use_apoc: bool) -> List[Tuple[str, str]]:
+        """Expansion queries to try in order: APOC when installed, then plain Cypher"""
+        plans = [("cypher", cypher_expansion_query(max_hops))]
+        if use_apoc:
+            plans.insert(0, ("apoc", APOC_EXPANSION_QUERY))
+        return plans
+
+    @staticmethod
+    def _add_expansion_records(neighborhood: Dict[str, Any], records: List[Any]) -> None:
+        """Merge expansion query records into a neighborhood"""
+        for record in records:
+            source_id = record["source_id"]
+            if source_id not in neighborhood["nodes"]:
+                neighborhood["nodes"][source_id] = {
+                    "id": source_id,
+                    "document_type": record["source_type"],
+                    "title": record["source_title"],
+                }
+
+            target_id = record["target_id"]
+            if target_id not in neighborhood["nodes"]:
+                neighborhood["nodes"][target_id] = {
+                    "id": target_id,
+                    "document_type": record["target_type"],
+                    "title": record["target_title"],
+                }
+
+            # Add relationships
+            for rel in record["relationships"]:
+                neighborhood["relationships"].append(
+                    {
+                        "source": source_id,
+                        "target": target_id,
+                        "type": rel["type"],
+                        "properties": rel.get("properties", {}),
+                    }
+                )
+
     def _graph_neighborhood(self, document_ids: List[str], max_hops: int = 2) -> Dict[str, Any]:
-        """Get graph neighborhood for documents"""
+        """Get graph neighborhood for documents
+
+        All seeds are expanded by one UNWIND query and all pairwise shortest paths
+        come from a second one, so the round trips no longer grow with top_k. Only
+        id/type/title projections of the nodes are returned. Failures are reported
+        under "error" instead of silently yielding an empty context.
+        """
         neighborhood: Dict[str, Any] = {"nodes": {}, "relationships": [], "paths": []}
+        if not document_ids:
+            return neighborhood
+
+        max_hops = self._clamp_hops(max_hops)
+        if self.graph_backend is not None:
+            try:
+                self._add_expansion_records(
+                    neighborhood, self.graph_backend.expand(document_ids, max_hops)
+                )
+                if len(document_ids) > 1:
+                    neighborhood["paths"] = self.graph_backend.shortest_paths(
+                        document_ids, self.max_path_length
+                    )
+            except Exception as e:
+                click.echo(f"Graph traversal error: {e}", err=True)
+                neighborhood["error"] = str(e)
+            return neighborhood
+
+        if self.neo4j_driver is None:
+            return neighborhood
+        plans = self._expansion_plans(max_hops, self.has_apoc)
 
         try:
-            if self.neo4j_driver is None:
-                return neighborhood
             with self.neo4j_driver.session(database=self.database) as session:
-                # Get direct neighbors
-                for doc_id in document_ids:
-                    # Get node and its relationships up to max_hops with early termination
-                    # Try APOC first for better performance, fallback to standard query
+                # Results are consumed inside the try, since Neo4j streams them lazily
+                records = None
+                for plan, query in plans:
                     try:
-                        query = """
-                        MATCH (d:Document {id: $doc_id})
-                        CALL apoc.path.expandConfig(d, {
-                            maxLevel: $max_hops,
-                            uniqueness: 'NODE_GLOBAL',
-                            limit: 50,
-                            relationshipFilter: 'REFERENCES|IMPLEMENTS|RELATES_TO|DEPENDS_ON'
-                        }) YIELD path
-                        WITH path, d, last(nodes(path)) as connected, relationships(path) as rels
-                        WHERE connected:Document
-                        RETURN
-                            d as source,
-                            connected as target,
-                            [r in rels | {type: type(r),
-                                          properties: properties(r)}] as relationships,
-                            length(path) as distance
-                        ORDER BY distance
-                        """
-                        result = session.run(query, doc_id=doc_id, max_hops=max_hops)
-                    except Exception:
-                        # Fallback to standard Cypher without APOC
-                        query = """
-                        MATCH path = (d:Document {id: $doc_id})-
-                              [r:REFERENCES|IMPLEMENTS|RELATES_TO|DEPENDS_ON*1..2]-
-                              (connected:Document)
-                        WITH d, connected, path, relationships(path) as rels,
-                             length(path) as distance
-                        WHERE distance <= $max_hops
-                        RETURN
-                            d as source,
-                            connected as target,
-                            [r in rels | {type: type(r),
-                                          properties: properties(r)}] as relationships,
-                            distance
-                        ORDER BY distance
-                        LIMIT 50
-                        """
-                        result = session.run(query, doc_id=doc_id, max_hops=max_hops)
-
-                    for record in result:
-                        # Add source node
-                        source = record["source"]
-                        source_id = source["id"]
-                        if source_id not in neighborhood["nodes"]:
-                            neighborhood["nodes"][source_id] = dict(source)
-
-                        # Add target node
-                        target = record["target"]
-                        target_id = target.get("id", str(target.id))
-                        if target_id not in neighborhood["nodes"]:
-                            neighborhood["nodes"][target_id] = dict(target)
-
-                        # Add relationships
-                        for rel in record["relationships"]:
-                            neighborhood["relationships"].append(
-                                {
-                                    "source": source_id,
-                                    "target": target_id,
-                                    "type": rel["type"],
-                                    "properties": rel.get("properties", {}),
-                                }
+                        records = list(
+                            session.run(
+                                Query(query, timeout=self.query_timeout),
+                                doc_ids=document_ids,
+                                max_hops=max_hops,
                             )
-
-                # Get common patterns
+                        )
+                        break
+                    except Exception as e:
+                        click.echo(f"Graph expansion ({plan}) failed: {e}", err=True)
+                        neighborhood["error"] = str(e)
+
+                if records is None:
+                    return neighborhood
+                neighborhood.pop("error", None)
+                self._add_expansion_records(neighborhood, records)
+
+                # Get common patterns: shortest paths between every pair of seeds
                 if len(document_ids) > 1:
-                    pattern_query = """
-                    MATCH (d1:Document {id: $id1})
-                    MATCH (d2:Document {id: $id2})
-                    MATCH path = shortestPath((d1)-[*..5]-(d2))
-                    RETURN path, length(path) as distance
-                    """
-
-                    for i in range(len(document_ids)):
-                        for j in range(i + 1, len(document_ids)):
-                            result = session.run(
-                                pattern_query, id1=document_ids[i], id2=document_ids[j]
-                            )
-
-                            for record in result:
-                                path = record["path"]
-                                nodes = [n["id"] for n in path.nodes]
-                                neighborhood["paths"].append(
-                                    {"nodes": nodes, "distance": record["distance"]}
-                                )
+                    result = session.run(
+                        Query(
+                            shortest_paths_query(self.max_path_length),
+                            timeout=self.query_timeout,
+                        ),
+                        doc_ids=document_ids,
+                    )
+                    for record in result:
+                        neighborhood["paths"].append(
+                            {"nodes": record["nodes"], "distance": record["distance"]}
+                        )
 
         except Exception as e:
-            if self.verbose:
-                click.echo(f"Graph traversal error: {e}", err=True)
+            click.echo(f"Graph traversal error: {e}", err=True)
+            neighborhood["error"] = str(e)
 
         return neighborhood
 
@@ -323,9 +643,14 @@ class GraphRAGIntegration:
         self, query: str, query_vector: List[float], max_hops: int = 2, top_k: int = 5
     ) -> GraphRAGResult:
         """Perform GraphRAG search combining vector and graph retrieval"""
+        cache_key = self._search_cache_key(query, query_vector, max_hops, top_k)
+        if cache_key is not None and self.query_cache is not None:
+            cached = self.query_cache.get(cache_key)
+            if cached is not None:
+                return GraphRAGResult(**cached)
 
         # Step 1: Vector search
-        vector_results = self._vector_search(query_vector, limit=top_k)
+        vector_results = self._vector_search(query_vector, limit=top_k, query_text=query)
 
         # Step 2: Extract document IDs from vector results
         doc_ids = [r["document_id"] for r in vector_results if r["document_id"]]
@@ -333,23 +658,62 @@ class GraphRAGIntegration:
         # Step 3: Get graph neighborhood
         neighborhood = self._graph_neighborhood(doc_ids, max_hops=max_hops)
 
+        graphrag_result = self._build_result(query, vector_results, neighborhood)
+
+        if cache_key is not None and self.query_cache is not None:
+            self.query_cache.set(cache_key, asdict(graphrag_result))
+
+        return graphrag_result
+
+    def _search_cache_key(
+        self, query: str, query_vector: List[float], max_hops: int, top_k: int
+    ) -> Optional[str]:
+        """Cache key for a GraphRAG search, or None when caching is disabled"""
+        if self.query_cache is None:
+            return None
+        return self.query_cache.make_key(
+            "graphrag",
+            [query_vector],
+            [vector_scope(self.collection_name), graph_scope(self.database)],
+            query=query,
+            max_hops=max_hops,
+            top_k=top_k,
+            hybrid=self.hybrid_enabled,
+        )
+
+    def _build_result(
+        self,
+        query: str,
+        vector_results: List[Dict[str, Any]],
+        neighborhood: Dict[str, Any],
+    ) -> GraphRAGResult:
+        """Score, summarize and assemble a GraphRAG result from both stages"""
+        doc_ids = [r["document_id"] for r in vector_results if r["document_id"]]
+
         # Step 4: Extract reasoning path
         reasoning_path = self._extract_reasoning_path(neighborhood)
 
         # Step 5: Calculate combined scores
         # Combine vector similarity with graph centrality
+        # PageRank from the snapshot when available, otherwise connections in the neighborhood
+        snapshot = self._graph_snapshot()
+        incident: Counter = Counter()
+        for rel in neighborhood["relationships"]:
+            incident[rel["source"]] += 1
+            if rel["target"] != rel["source"]:
+                incident[rel["target"]] += 1
+
         combined_scores = {}
         for result in vector_results:
             doc_id = result["document_id"]
             vector_score = result["score"]
 
-            # Simple graph centrality: count of connections
-            graph_score: float = 0.0
-            for rel in neighborhood["relationships"]:
-                if rel["source"] == doc_id or rel["target"] == doc_id:
-                    graph_score += 0.1
+            if snapshot is not None and doc_id in snapshot:
+                graph_score = 0.3 * snapshot.centrality(doc_id)
+            else:
+                graph_score = min(0.1 * incident[doc_id], 0.3)
 
-            combined_scores[doc_id] = vector_score * 0.7 + min(graph_score, 0.3)
+            combined_scores[doc_id] = vector_score * 0.7 + graph_score
 
         # Step 6: Generate summary
         summary = self._generate_summary(query, vector_results, neighborhood)
@@ -390,6 +754,13 @@ class GraphRAGIntegration:
 
     def analyze_document_impact(self, document_id: str) -> Dict[str, Any]:
         """Analyze the impact and connections of a specific document"""
+        snapshot = self._graph_snapshot()
+        if snapshot is None and self.graph_backend is not None:
+            # The embedded graph answers impact questions from a one-off snapshot
+            snapshot = self.graph_backend.snapshot(pagerank_iterations=self.pagerank_iterations)
+        if snapshot is not None and document_id in snapshot:
+            return snapshot.impact(document_id)
+
         impact = {
             "document_id": document_id,
             "direct_connections": 0,
@@ -403,10 +774,11 @@ class GraphRAGIntegration:
             if self.neo4j_driver is None:
                 return impact
             with self.neo4j_driver.session(database=self.database) as session:
-                # Get direct connections
+                # Get direct connections (Document neighbours only, as in the snapshot)
                 result = session.run(
                     """
-                    MATCH (d:Document {id: $doc_id})-[r]-(connected)
+                    MATCH (d:Document {id: $doc_id})-[r]-(connected:Document)
+                    WHERE connected <> d
                     RETURN count(DISTINCT connected) as direct_count,
                            collect(DISTINCT {
                                id: connected.id,
@@ -422,10 +794,11 @@ class GraphRAGIntegration:
                     impact["direct_connections"] = record["direct_count"]
                     impact["impacted_documents"] = record["connections"]
 
-                # Get reachability (up to 3 hops)
+                # Get reachability (up to 3 hops, through documents only)
                 result = session.run(
                     """
-                    MATCH (d:Document {id: $doc_id})-[*1..3]-(reachable:Document)
+                    MATCH p = (d:Document {id: $doc_id})-[*1..3]-(reachable:Document)
+                    WHERE reachable <> d AND all(n IN nodes(p) WHERE n:Document)
                     RETURN count(DISTINCT reachable) as total
                 """,
                     doc_id=document_id,
@@ -448,10 +821,12 @@ class GraphRAGIntegration:
                 # Get dependency chain (documents that depend on this one)
                 result = session.run(
                     """
-                    MATCH (d:Document {id: $doc_id})<-
+                    MATCH p = (d:Document {id: $doc_id})<-
                           [:DEPENDS_ON|IMPLEMENTS|REFERENCES*1..3]-
                           (dependent:Document)
-                    RETURN DISTINCT dependent.id as id, dependent.title as title
+                    WHERE dependent <> d AND all(n IN nodes(p) WHERE n:Document)
+                    RETURN dependent.id as id, dependent.title as title, min(length(p)) as hops
+                    ORDER BY hops
                     LIMIT 10
                 """,
                     doc_id=document_id,
@@ -472,6 +847,11 @@ class GraphRAGIntegration:
         """Close connections"""
         exceptions = []
 
+        # Let a background snapshot load finish before its driver goes away
+        if self._snapshot_refresh is not None:
+            self._snapshot_refresh.join(timeout=self.query_timeout)
+            self._snapshot_refresh = None
+
         # Close Neo4j
         if self.neo4j_driver:
             try:
@@ -481,6 +861,10 @@ class GraphRAGIntegration:
             finally:
                 self.neo4j_driver = None
 
+        if self.graph_backend is not None:
+            self.graph_backend.close()
+            self.graph_backend = None
+
         # Close Qdrant if needed (currently using stateless client)
         # In future, if we use persistent connections, close here
 
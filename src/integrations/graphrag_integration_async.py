@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+graphrag_integration_async.py: Async GraphRAG search with overlapping stages
+
+This component:
+1. Runs vector search on AsyncQdrantClient and graph queries on the Neo4j async driver
+2. Searches and expands the leading vector hits while the top_k search is still
+   running, concurrently with the expansion of the remaining hits and the
+   pairwise shortest-path query
+3. Runs the synchronous query cache (Redis) lookups in worker threads
+4. Sets up the query cache and loads the graph snapshot on the async driver
+5. Enforces a request-level deadline, returning partial results when stages
+   do not finish in time
+6. Runs traversals of the embedded graph backend in worker threads when
+   neo4j.backend is "embedded"
+"""
+
+import asyncio
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Set
+
+import click
+from neo4j import AsyncDriver, AsyncGraphDatabase, Query
+from qdrant_client import AsyncQdrantClient
+
+from src.analytics.graph_snapshot import GraphSnapshot
+from src.integrations.graphrag_integration import (
+    APOC_EXPAND_PROCEDURE,
+    PROCEDURE_PROBE_QUERY,
+    GraphRAGIntegration,
+    GraphRAGResult,
+    shortest_paths_query,
+)
+from src.storage.hybrid import encode_query
+
+
+class AsyncGraphRAGIntegration(GraphRAGIntegration):
+    """GraphRAG integration with concurrent vector and graph stages"""
+
+    def __init__(
+        self,
+        config_path: str = ".ctxrc.yaml",
+        verbose: bool = False,
+        perf_config_path: str = "performance.yaml",
+    ):
+        super().__init__(config_path, verbose=verbose, perf_config_path=perf_config_path)
+        self.async_neo4j_driver: Optional[AsyncDriver] = None
+        self.async_qdrant_client: Optional[AsyncQdrantClient] = None
+        self._snapshot_task: Optional["asyncio.Task[bool]"] = None
+
+        # Latency budget per request and number of top hits expanded on their own
+        graphrag_config = self.perf_config.get("search", {}).get("graphrag", {})
+        self.deadline_seconds = graphrag_config.get("deadline_seconds", 2.0)
+        self.leading_seeds = graphrag_config.get("leading_seeds", 3)
+
+    async def __aenter__(self):
+        """Async context manager entry"""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit - ensure cleanup"""
+        try:
+            await self.aclose()
+        except Exception as e:
+            if self.verbose:
+                click.echo(f"Error during cleanup: {e}", err=True)
+        return False
+
+    async def aconnect(
+        self, neo4j_username: str = "neo4j", neo4j_password: Optional[str] = None
+    ) -> bool:
+        """Connect to Neo4j (or the embedded graph) and Qdrant with async clients"""
+        # Import locally to avoid circular imports
+        from src.storage.graph_backend import create_backend
+
+        try:
+            self.graph_backend = create_backend(self.config)
+        except Exception as e:
+            click.echo(f"Failed to open embedded graph: {e}", err=True)
+            return False
+
+        if self.graph_backend is not None:
+            self.procedures = set()
+        else:
+            neo4j_config = self.config.get("neo4j", {})
+            neo4j_uri = (
+                f"bolt://{neo4j_config.get('host', 'localhost')}:{neo4j_config.get('port', 7687)}"
+            )
+
+            if not neo4j_password:
+                click.echo("Error: Neo4j password is required", err=True)
+                return False
+
+            try:
+                self.async_neo4j_driver = AsyncGraphDatabase.driver(
+                    neo4j_uri, auth=(neo4j_username, neo4j_password)
+                )
+                async with self.async_neo4j_driver.session() as session:
+                    await session.run("RETURN 1")
+                self.procedures = await self._aprobe_procedures()
+            except Exception as e:
+                # Import locally to avoid circular imports
+                from src.core.utils import sanitize_error_message
+
+                error_msg = sanitize_error_message(str(e), [neo4j_password, neo4j_username])
+                click.echo(f"Failed to connect to Neo4j: {error_msg}", err=True)
+                return False
+
+        qdrant_config = self.config.get("qdrant", {})
+        try:
+            self.async_qdrant_client = AsyncQdrantClient(
+                host=qdrant_config.get("host", "localhost"),
+                port=qdrant_config.get("port", 6333),
+            )
+            await self.async_qdrant_client.get_collections()
+        except Exception as e:
+            click.echo(f"Failed to connect to Qdrant: {e}", err=True)
+            return False
+
+        self._setup_query_cache()
+        if self.snapshot_enabled:
+            await self.arefresh_snapshot()
+
+        return True
+
+    async def arefresh_snapshot(self) -> bool:
+        """Rebuild the graph snapshot on the async driver (or the embedded graph)"""
+        if self.graph_backend is not None:
+            return await asyncio.to_thread(self.refresh_snapshot)
+        if self.async_neo4j_driver is None:
+            return False
+        start = time.time()
+        try:
+            self.snapshot = await GraphSnapshot.aload(
+                self.async_neo4j_driver,
+                self.database,
+                timeout=self.query_timeout,
+                pagerank_iterations=self.pagerank_iterations,
+                graph_epoch=await asyncio.to_thread(self._graph_epoch),
+            )
+        except Exception as e:
+            self.snapshot = None
+            self.snapshot_failed_at = time.time()
+            if self.verbose:
+                click.echo(f"Graph snapshot unavailable, querying Neo4j: {e}", err=True)
+            return False
+
+        self.snapshot_failed_at = None
+        if self.verbose:
+            click.echo(
+                f"Graph snapshot: {len(self.snapshot)} documents " f"in {time.time() - start:.2f}s"
+            )
+        return True
+
+    def _graph_snapshot(self) -> Optional[GraphSnapshot]:
+        """Current snapshot; asearch schedules its rebuilds on the async driver"""
+        return self.snapshot
+
+    async def _aprobe_procedures(self) -> Set[str]:
+        """Names of the installed APOC path and GDS procedures"""
+        if self.async_neo4j_driver is None:
+            return set()
+        try:
+            async with self.async_neo4j_driver.session(database=self.database) as session:
+                result = await session.run(Query(PROCEDURE_PROBE_QUERY, timeout=self.query_timeout))
+                return {record["name"] async for record in result}
+        except Exception as e:
+            if self.verbose:
+                click.echo(f"Procedure probe failed, using plain Cypher: {e}", err=True)
+            return set()
+
+    async def _avector_search(
+        self, query_vector: List[float], limit: int, query_text: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Vector (or hybrid) search on the async Qdrant client"""
+        if self.async_qdrant_client is None:
+            return []
+
+        try:
+            if query_text and self.hybrid_enabled:
+                sparse_query = encode_query(query_text)
+                if sparse_query.indices:
+                    try:
+                        responses = await self.async_qdrant_client.query_batch_points(
+                            collection_name=self.collection_name,
+                            requests=self._hybrid_requests(query_vector, sparse_query, limit),
+                        )
+                        return self._format_vector_results(self._fuse_hybrid(responses, limit))
+                    except Exception as e:
+                        if self.verbose:
+                            click.echo(
+                                f"Hybrid search unavailable, using dense search: {e}", err=True
+                            )
+
+            response = await self.async_qdrant_client.query_points(
+                collection_name=self.collection_name,
+                query=query_vector,
+                limit=limit,
+                with_payload=True,
+            )
+            return self._format_vector_results(response.points)
+        except Exception as e:
+            if self.verbose:
+                click.echo(f"Vector search error: {e}", err=True)
+            return []
+
+    async def _aexpand(self, document_ids: List[str], max_hops: int) -> List[Any]:
+        """Expand seed documents in one query on its own session"""
+        if self.graph_backend is not None and document_ids:
+            return await asyncio.to_thread(self.graph_backend.expand, document_ids, max_hops)
+        if self.async_neo4j_driver is None or not document_ids:
+            return []
+        if self.procedures is None:
+            self.procedures = await self._aprobe_procedures()
+
+        last_error: Optional[Exception] = None
+        for plan, query in self._expansion_plans(
+            max_hops, APOC_EXPAND_PROCEDURE in self.procedures
+        ):
+            try:
+                async with self.async_neo4j_driver.session(database=self.database) as session:
+                    result = await session.run(
+                        Query(query, timeout=self.query_timeout),
+                        doc_ids=document_ids,
+                        max_hops=max_hops,
+                    )
+                    return [record async for record in result]
+            except Exception as e:
+                click.echo(f"Graph expansion ({plan}) failed: {e}", err=True)
+                last_error = e
+
+        raise RuntimeError(str(last_error))
+
+    async def _ashortest_paths(self, document_ids: List[str]) -> List[Dict[str, Any]]:
+        """Shortest paths between every pair of seeds, on its own session"""
+        if self.graph_backend is not None and len(document_ids) > 1:
+            return await asyncio.to_thread(
+                self.graph_backend.shortest_paths, document_ids, self.max_path_length
+            )
+        if self.async_neo4j_driver is None or len(document_ids) < 2:
+            return []
+        async with self.async_neo4j_driver.session(database=self.database) as session:
+            result = await session.run(
+                Query(shortest_paths_query(self.max_path_length), timeout=self.query_timeout),
+                doc_ids=document_ids,
+            )
+            return [
+                {"nodes": record["nodes"], "distance": record["distance"]}
+                async for record in result
+            ]
+
+    async def asearch(
+        self,
+        query: str,
+        query_vector: List[float],
+        max_hops: int = 2,
+        top_k: int = 5,
+        deadline_seconds: Optional[float] = None,
+    ) -> GraphRAGResult:
+        """GraphRAG search with overlapping stages and a request deadline
+
+        A speculative search for the leading hits runs alongside the top_k search,
+        and their neighborhood is expanded as soon as it returns, while the top_k
+        search is still in flight. The other hits expand once the top_k search is
+        back. Stages still running at the deadline are cancelled and the result is
+        marked partial in graph_context ("partial", "timed_out"); if only the top_k
+        search timed out, the speculative hits are returned instead.
+        """
+        # Cache lookups go to Redis with the synchronous client, so keep them off the loop
+        cache_key: Optional[str] = None
+        if self.query_cache is not None:
+            cache_key = await asyncio.to_thread(
+                self._search_cache_key, query, query_vector, max_hops, top_k
+            )
+            if cache_key is not None:
+                cached = await asyncio.to_thread(self.query_cache.get, cache_key)
+                if cached is not None:
+                    return GraphRAGResult(**cached)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (deadline_seconds or self.deadline_seconds)
+        max_hops = self._clamp_hops(max_hops)
+        timed_out: List[str] = []
+        expanded: Set[str] = set()
+        graph_tasks: Dict["asyncio.Task[Any]", str] = {}
+
+        def remaining() -> float:
+            return max(0.0, deadline - loop.time())
+
+        def expand(results: List[Dict[str, Any]]) -> None:
+            new_ids = [r["document_id"] for r in results if r["document_id"]]
+            new_ids = [doc_id for doc_id in dict.fromkeys(new_ids) if doc_id not in expanded]
+            if new_ids:
+                expanded.update(new_ids)
+                graph_tasks[asyncio.create_task(self._aexpand(new_ids, max_hops))] = "expansion"
+
+        # Stage 1: the top_k search, with the leading hits searched and expanded alongside
+        vector_task = asyncio.create_task(
+            self._avector_search(query_vector, top_k, query_text=query)
+        )
+        seed_results: List[Dict[str, Any]] = []
+        if 0 < self.leading_seeds < top_k:
+            seed_task = asyncio.create_task(
+                self._avector_search(query_vector, self.leading_seeds, query_text=query)
+            )
+            done, _ = await asyncio.wait(
+                {seed_task, vector_task}, timeout=remaining(), return_when=asyncio.FIRST_COMPLETED
+            )
+            if seed_task in done and vector_task not in done:
+                seed_results = seed_task.result()[: self.leading_seeds]
+                expand(seed_results)
+            else:
+                seed_task.cancel()
+
+        vector_results: List[Dict[str, Any]] = []
+        try:
+            vector_results = await asyncio.wait_for(vector_task, timeout=remaining())
+        except asyncio.TimeoutError:
+            timed_out.append("vector_search")
+            vector_results = seed_results
+        expand(vector_results[: self.leading_seeds])
+        expand(vector_results[self.leading_seeds :])
+
+        # Stage 2: pairwise paths between all seeds, concurrent with pending expansion
+        doc_ids = [r["document_id"] for r in vector_results if r["document_id"]]
+        if len(doc_ids) > 1:
+            graph_tasks[asyncio.create_task(self._ashortest_paths(doc_ids))] = "paths"
+
+        neighborhood: Dict[str, Any] = {"nodes": {}, "relationships": [], "paths": []}
+        if graph_tasks:
+            done, pending = await asyncio.wait(set(graph_tasks), timeout=remaining())
+            for task in pending:
+                task.cancel()
+                timed_out.append(graph_tasks[task])
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+            for task in done:
+                if task.exception() is not None:
+                    neighborhood["error"] = str(task.exception())
+                elif graph_tasks[task] == "paths":
+                    neighborhood["paths"].extend(task.result())
+                else:
+                    self._add_expansion_records(neighborhood, task.result())
+
+        if timed_out:
+            neighborhood["partial"] = True
+            neighborhood["timed_out"] = sorted(set(timed_out))
+
+        # Rebuild a stale snapshot in the background; this request uses the previous one
+        refreshing = self._snapshot_task is not None and not self._snapshot_task.done()
+        if not refreshing and await asyncio.to_thread(self._snapshot_stale):
+            self._snapshot_task = asyncio.create_task(self.arefresh_snapshot())
+
+        # Scoring reads the graph epoch from Redis when checking the snapshot
+        graphrag_result = await asyncio.to_thread(
+            self._build_result, query, vector_results, neighborhood
+        )
+
+        # Partial results are not cached, so the next request can complete them
+        if cache_key is not None and self.query_cache is not None and not timed_out:
+            await asyncio.to_thread(self.query_cache.set, cache_key, asdict(graphrag_result))
+
+        return graphrag_result
+
+    async def aclose(self) -> None:
+        """Close async connections"""
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+            await asyncio.gather(self._snapshot_task, return_exceptions=True)
+            self._snapshot_task = None
+
+        if self.async_neo4j_driver is not None:
+            try:
+                await self.async_neo4j_driver.close()
+            finally:
+                self.async_neo4j_driver = None
+
+        if self.async_qdrant_client is not None:
+            try:
+                await self.async_qdrant_client.close()
+            finally:
+                self.async_qdrant_client = None
+
+        self.close()
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+graph_backend.py: Pluggable graph storage, with an embedded backend for Neo4j-free runs
+
+This component:
+1. Defines the GraphBackend interface used by GraphBuilder, GraphRAGIntegration and
+   Neo4jInitializer when a backend is configured: replaying build statements,
+   paging and deleting documents, statistics, and the traversals GraphRAG needs
+   (k-hop expansion with a relationship filter, pairwise shortest paths, and
+   snapshots for centrality and dependents within 3 hops)
+2. Implements EmbeddedGraphBackend, which keeps the graph in memory in the merge
+   tables of the bulk export (same MERGE/MATCH semantics as the Cypher build)
+   and persists it to a JSON file, so no JVM or server is needed
+3. Selects the backend from neo4j.backend in .ctxrc.yaml; "neo4j" (the default)
+   keeps the Bolt driver paths of each component
+"""
+
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.analytics.graph_snapshot import GraphSnapshot
+from src.storage.graph_builder import Statement
+from src.storage.graph_export import GraphExport, node_key
+from src.storage.neo4j_init import AGENTS, DOCUMENT_TYPES
+
+# Relationship types followed by GraphRAG expansion, and targets kept per seed
+EXPANSION_TYPES = ("REFERENCES", "IMPLEMENTS", "RELATES_TO", "DEPENDS_ON")
+EXPANSION_LIMIT = 50
+
+DEFAULT_EMBEDDED_PATH = "context/.graph_cache/embedded_graph.json"
+
+# A node: (ID space, merge key)
+NodeRef = Tuple[str, str]
+
+
+class GraphBackend(ABC):
+    """Graph storage and the traversal patterns the context system uses"""
+
+    @abstractmethod
+    def write_statements(self, statements: List[Statement]) -> None:
+        """Apply build statements in order"""
+
+    @abstractmethod
+    def document_page(self, after: str, limit: int) -> List[Tuple[str, Optional[str]]]:
+        """(id, file_path) of up to limit documents with id > after, ordered by id"""
+
+    @abstractmethod
+    def delete_documents(self, document_ids: List[str]) -> int:
+        """Delete documents and their relationships; returns the number deleted"""
+
+    @abstractmethod
+    def delete_dangling(self, dependents: Sequence[Tuple[str, str]]) -> int:
+        """Delete (label, relationship type) nodes no longer attached; returns the count"""
+
+    @abstractmethod
+    def statistics(self, document_types: bool = False) -> Dict[str, Any]:
+        """node_counts, relationship_counts and optionally document_types, largest first"""
+
+    @abstractmethod
+    def expand(
+        self,
+        document_ids: List[str],
+        max_hops: int,
+        relationship_types: Sequence[str] = EXPANSION_TYPES,
+        limit: int = EXPANSION_LIMIT,
+    ) -> List[Dict[str, Any]]:
+        """Documents within max_hops of each seed, in the GraphRAG expansion record format"""
+
+    @abstractmethod
+    def shortest_paths(self, document_ids: List[str], max_length: int) -> List[Dict[str, Any]]:
+        """Shortest path between every pair of seeds: {"nodes": [ids], "distance"}"""
+
+    @abstractmethod
+    def snapshot(self, pagerank_iterations: int = 20, graph_epoch: int = 0) -> GraphSnapshot:
+        """In-memory snapshot of the document graph (centrality, impact, dependents)"""
+
+    @abstractmethod
+    def setup_schema(self, version: str, created_date: str) -> None:
+        """Create the system, agent and document type nodes"""
+
+    def close(self) -> None:
+        """Release resources"""
+
+
+class EmbeddedGraphBackend(GraphBackend):
+    """Graph held in process and persisted as JSON (path None keeps it in memory only)
+
+    Values JSON cannot hold, such as dates, are stored as strings. The file is
+    reloaded when another process has rewritten it.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.graph = GraphExport()
+        self._lock = threading.RLock()
+        self._loaded_mtime: Optional[int] = None
+        self._adjacency: Optional[Dict[NodeRef, List[Tuple[NodeRef, str, Dict[str, Any]]]]] = None
+        self._reload()
+
+    def _reload(self) -> None:
+        """Load the file if it changed since it was last loaded or saved"""
+        if self.path is None or not self.path.exists():
+            return
+        mtime = self.path.stat().st_mtime_ns
+        if mtime == self._loaded_mtime:
+            return
+        with open(self.path, "r") as f:
+            stored = json.load(f)
+
+        graph = GraphExport()
+        for id_space, key, labels, props in stored.get("nodes", []):
+            table = graph.node_table(id_space)
+            table.labels[key] = set(labels)
+            table.props[key] = props
+        for rel_type, start_space, end_space, start, end, props in stored.get("relationships", []):
+            graph.relate(rel_type, (start_space, start), (end_space, end), props)
+
+        self.graph = graph
+        self._loaded_mtime = mtime
+        self._adjacency = None
+
+    def _save(self) -> None:
+        """Persist the graph (atomically replacing the file)"""
+        self._adjacency = None
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        stored = {
+            "nodes": [
+                [id_space, key, sorted(table.labels[key]), props]
+                for id_space, table in self.graph.nodes.items()
+                for key, props in table.props.items()
+            ],
+            "relationships": [
+                [rel_type, start_space, end_space, start, end, props]
+                for (rel_type, start_space, end_space), table in self.graph.relationships.items()
+                for (start, end, _), props in table.rows.items()
+            ],
+        }
+        temp_path = self.path.with_suffix(".tmp")
+        with open(temp_path, "w") as f:
+            json.dump(stored, f, default=str)
+        os.replace(temp_path, self.path)
+        self._loaded_mtime = self.path.stat().st_mtime_ns
+
+    def _props(self, node: NodeRef) -> Dict[str, Any]:
+        return self.graph.node_table(node[0]).props.get(node[1], {})
+
+    def _neighbors(self) -> Dict[NodeRef, List[Tuple[NodeRef, str, Dict[str, Any]]]]:
+        """Undirected adjacency: node -> (neighbor, relationship type, properties)"""
+        if self._adjacency is None:
+            adjacency: Dict[NodeRef, List[Tuple[NodeRef, str, Dict[str, Any]]]] = defaultdict(list)
+            for (rel_type, start_space, end_space), table in self.graph.relationships.items():
+                for (start, end, _), props in table.rows.items():
+                    a, b = (start_space, start), (end_space, end)
+                    adjacency[a].append((b, rel_type, props))
+                    if a != b:
+                        adjacency[b].append((a, rel_type, props))
+            self._adjacency = dict(adjacency)
+        return self._adjacency
+
+    def write_statements(self, statements: List[Statement]) -> None:
+        with self._lock:
+            self._reload()
+            for statement in statements:
+                if not statement.op:
+                    raise ValueError("Statement has no operation for the embedded backend")
+                self.graph.apply(statement.op, statement.rows)
+            # Pending edges are tracked by GraphBuilder's graph index
+            self.graph.pending_edges.clear()
+            self._save()
+
+    def document_page(self, after: str, limit: int) -> List[Tuple[str, Optional[str]]]:
+        with self._lock:
+            self._reload()
+            documents = [
+                (str(props["id"]), props.get("file_path"))
+                for props in self.graph.node_table("Document").props.values()
+                if props.get("id") is not None and str(props["id"]) > after
+            ]
+        return sorted(documents)[:limit]
+
+    def delete_documents(self, document_ids: List[str]) -> int:
+        with self._lock:
+            self._reload()
+            deleted = self.graph.delete_nodes("Document", {node_key(i) for i in document_ids})
+            if deleted:
+                self._save()
+        return deleted
+
+    def delete_dangling(self, dependents: Sequence[Tuple[str, str]]) -> int:
+        deleted = 0
+        with self._lock:
+            self._reload()
+            for label, rel_type in dependents:
+                attached = {
+                    end
+                    for (table_type, _, end_space), table in self.graph.relationships.items()
+                    if table_type == rel_type and end_space == label
+                    for (_, end, _) in table.rows
+                }
+                keys = set(self.graph.node_table(label).props) - attached
+                deleted += self.graph.delete_nodes(label, keys)
+            if deleted:
+                self._save()
+        return deleted
+
+    def statistics(self, document_types: bool = False) -> Dict[str, Any]:
+        with self._lock:
+            self._reload()
+            type_counts: Counter = Counter()
+            if document_types:
+                type_counts.update(
+                    props.get("document_type")
+                    for props in self.graph.node_table("Document").props.values()
+                )
+            node_counts = self.graph.node_counts()
+            relationship_counts = self.graph.relationship_counts()
+
+        def by_count(counts: Dict[Any, int]) -> Dict[Any, int]:
+            return dict(sorted(((k, v) for k, v in counts.items() if v), key=lambda i: -i[1]))
+
+        stats = {
+            "node_counts": by_count(node_counts),
+            "relationship_counts": by_count(relationship_counts),
+        }
+        if document_types:
+            stats["document_types"] = by_count(type_counts)
+        return stats
+
+    def _expansion_record(
+        self, source: NodeRef, target: NodeRef, path: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        source_props, target_props = self._props(source), self._props(target)
+        return {
+            "source_id": source_props.get("id"),
+            "source_type": source_props.get("document_type"),
+            "source_title": source_props.get("title"),
+            "target_id": target_props.get("id", f"{target[0]}:{target[1]}"),
+            "target_type": target_props.get("document_type"),
+            "target_title": target_props.get("title"),
+            "relationships": path,
+            "distance": len(path),
+        }
+
+    def expand(
+        self,
+        document_ids: List[str],
+        max_hops: int,
+        relationship_types: Sequence[str] = EXPANSION_TYPES,
+        limit: int = EXPANSION_LIMIT,
+    ) -> List[Dict[str, Any]]:
+        allowed = set(relationship_types)
+        records: List[Dict[str, Any]] = []
+        with self._lock:
+            self._reload()
+            adjacency = self._neighbors()
+            for doc_id in document_ids:
+                start = self.graph.document(doc_id)
+                if start is None:
+                    continue
+                # Breadth-first, each node once (like APOC's NODE_GLOBAL uniqueness)
+                paths: Dict[NodeRef, List[Dict[str, Any]]] = {start: []}
+                frontier = [start]
+                found: List[NodeRef] = []
+                for _ in range(max_hops):
+                    next_frontier = []
+                    for node in frontier:
+                        for neighbor, rel_type, props in adjacency.get(node, []):
+                            if rel_type in allowed and neighbor not in paths:
+                                paths[neighbor] = paths[node] + [
+                                    {"type": rel_type, "properties": dict(props)}
+                                ]
+                                next_frontier.append(neighbor)
+                                if neighbor[0] == "Document":
+                                    found.append(neighbor)
+                    frontier = next_frontier
+                    if len(found) >= limit or not frontier:
+                        break
+                records.extend(
+                    self._expansion_record(start, node, paths[node]) for node in found[:limit]
+                )
+        return records
+
+    def shortest_paths(self, document_ids: List[str], max_length: int) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+        with self._lock:
+            self._reload()
+            adjacency = self._neighbors()
+            seeds = [
+                (doc_id, node)
+                for doc_id, node in sorted(
+                    (doc_id, self.graph.document(doc_id)) for doc_id in set(document_ids)
+                )
+                if node is not None
+            ]
+            for i, (_, start) in enumerate(seeds):
+                targets = {node for _, node in seeds[i + 1 :]}
+                if not targets:
+                    break
+                parents: Dict[NodeRef, Optional[NodeRef]] = {start: None}
+                frontier = [start]
+                for _ in range(max_length):
+                    next_frontier = []
+                    for node in frontier:
+                        for neighbor, _, _ in adjacency.get(node, []):
+                            if neighbor not in parents:
+                                parents[neighbor] = node
+                                next_frontier.append(neighbor)
+                    frontier = next_frontier
+                    if targets <= parents.keys() or not frontier:
+                        break
+
+                for _, target in seeds[i + 1 :]:
+                    if target not in parents:
+                        continue
+                    path: List[NodeRef] = []
+                    step: Optional[NodeRef] = target
+                    while step is not None:
+                        path.append(step)
+                        step = parents[step]
+                    results.append(
+                        {
+                            "nodes": [self._props(node).get("id") for node in reversed(path)],
+                            "distance": len(path) - 1,
+                        }
+                    )
+        return results
+
+    def snapshot(self, pagerank_iterations: int = 20, graph_epoch: int = 0) -> GraphSnapshot:
+        with self._lock:
+            self._reload()
+            documents = self.graph.node_table("Document").props
+            nodes = [
+                (props["id"], props.get("document_type"), props.get("title"))
+                for props in documents.values()
+                if props.get("id") is not None
+            ]
+            edges = [
+                (documents[start]["id"], documents[end]["id"], rel_type)
+                for (rel_type, start_space, end_space), table in self.graph.relationships.items()
+                if start_space == end_space == "Document"
+                for (start, end, _) in table.rows
+            ]
+        return GraphSnapshot.from_edges(nodes, edges, pagerank_iterations, graph_epoch)
+
+    def setup_schema(self, version: str, created_date: str) -> None:
+        with self._lock:
+            self._reload()
+            system = ("System", node_key("agent-context-system"))
+            self.graph.node_table("System").merge(
+                system[1],
+                ["System"],
+                {
+                    "id": "agent-context-system",
+                    "name": "Agent-First Context System",
+                    "version": version,
+                    "created_date": created_date,
+                },
+            )
+            for agent_id, name, description in AGENTS:
+                key = node_key(name)
+                self.graph.node_table("Agent").merge(
+                    key,
+                    ["Agent"],
+                    {"name": name, "id": agent_id, "description": description, "active": True},
+                )
+            for key in self.graph.node_table("Agent").props:
+                self.graph.relate("HAS_AGENT", system, ("Agent", key))
+            for type_id, type_name, rel_type in DOCUMENT_TYPES:
+                key = node_key(type_id)
+                self.graph.node_table("DocumentType").merge(
+                    key, ["DocumentType"], {"id": type_id, "name": type_name}
+                )
+                self.graph.relate(
+                    "HAS_DOCUMENT_TYPE", system, ("DocumentType", key), {"semantic_type": rel_type}
+                )
+            self._save()
+
+
+def create_backend(config: Dict[str, Any]) -> Optional[GraphBackend]:
+    """Graph backend selected by neo4j.backend, or None for the Neo4j driver"""
+    neo4j_config = config.get("neo4j", {})
+    if neo4j_config.get("backend", "neo4j") != "embedded":
+        return None
+    path = neo4j_config.get("embedded_path", DEFAULT_EMBEDDED_PATH)
+    return EmbeddedGraphBackend(None if path == ":memory:" else Path(path))
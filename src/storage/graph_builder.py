@@ -4,31 +4,520 @@ graph_builder.py: Build and maintain the context graph from YAML documents
 
 This component:
 1. Parses YAML documents and extracts entities
-2. Creates nodes and relationships in Neo4j
-3. Maintains graph consistency
-4. Provides graph update operations
+2. Creates nodes and relationships in Neo4j with batched UNWIND statements,
+   one transaction per graph_db.batch.size rows
+3. Builds in two phases (all document nodes, then all edges) and keeps a
+   pending-edge table so references to documents not yet ingested are
+   created once their targets appear
+4. Updates changed documents incrementally: unchanged files are skipped by
+   size and mtime, and only added or removed document edges are written
+5. Spreads writes over graph_db.batch.parallel_transactions concurrent sessions,
+   scheduled so that concurrent transactions never lock the same nodes
+6. Maintains graph consistency: orphan cleanup pages through document nodes,
+   compares them with one directory walk and deletes in batched transactions
+7. Provides graph update operations
+8. Reports statistics from the count store (per label and relationship type,
+   or apoc.meta.stats when installed), cached for graph_db.statistics.cache_seconds;
+   the per-document-type breakdown scans Document nodes and is opt-in
+9. Runs without Neo4j when neo4j.backend is "embedded", replaying the same
+   statements into the in-process graph of graph_backend.py
 """
 
+import copy
 import hashlib
 import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Optional, Set, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    cast,
+)
 
 import click
 import yaml
-from neo4j import Driver, GraphDatabase
+from neo4j import Driver, GraphDatabase, ManagedTransaction
+
+from src.storage.query_cache import QueryResultCache, graph_scope
+
+if TYPE_CHECKING:
+    from src.storage.graph_backend import GraphBackend
+
+# Relationship types accepted from graph_metadata (interpolated into Cypher, so whitelisted)
+ALLOWED_RELATIONSHIP_TYPES = {
+    "RELATES_TO",
+    "IMPLEMENTS",
+    "FOLLOWS",
+    "PREPARES",
+    "CONSTRAINS",
+    "REQUIRES",
+    "DEFINES",
+    "DEPENDS_ON",
+    "REFERENCES",
+    "CONTAINS",
+    "EXTENDS",
+    "MODIFIES",
+}
+
+# Directories of a context tree that hold no documents
+SKIPPED_DIRECTORIES = ("schemas", ".graph_cache", "archive")
+
+# Content references in one pass: explicit [[doc-id]] links, or @doc-id / #doc-id
+# mentions that are not part of a word, e-mail address, URL fragment or HTML entity
+REFERENCE_PATTERN = re.compile(r"\[\[([a-zA-Z0-9\-_]+)\]\]|(?<![\w&/])[@#]([a-zA-Z0-9\-_]+)")
+
+
+def scan_references(content: str) -> Tuple[Set[str], Set[str]]:
+    """Explicit [[doc-id]] links and @/# mentions (excluding ids already linked)"""
+    links: Set[str] = set()
+    mentions: Set[str] = set()
+    for match in REFERENCE_PATTERN.finditer(content):
+        link, mention = match.groups()
+        if link:
+            links.add(link)
+        else:
+            mentions.add(mention)
+    return links, mentions - links
+
+
+def document_files(directory: Path) -> Iterator[Path]:
+    """YAML documents under directory, excluding schemas, caches and archives"""
+    for yaml_file in directory.rglob("*.yaml"):
+        if not any(skip in yaml_file.parts for skip in SKIPPED_DIRECTORIES):
+            yield yaml_file
+
+
+PHASES_QUERY = """
+UNWIND $rows AS row
+MATCH (s:Sprint {id: row.sprint_id})
+MERGE (p:Phase {number: row.phase_num})
+ON CREATE SET p.name = row.name, p.duration_days = row.duration
+MERGE (s)-[:HAS_PHASE {status: row.status}]->(p)
+"""
+
+TASKS_QUERY = """
+UNWIND $rows AS row
+MATCH (p:Phase {number: row.phase_num})
+MERGE (t:Task {id: row.task_id})
+SET t.description = row.description, t.status = row.status, t.phase = row.phase_num
+MERGE (p)-[:HAS_TASK]->(t)
+"""
+
+TEAM_QUERY = """
+UNWIND $rows AS row
+MATCH (s:Sprint {id: row.sprint_id})
+MATCH (a:Agent {name: row.agent})
+MERGE (s)-[:HAS_TEAM_MEMBER {role: row.role}]->(a)
+"""
+
+ALTERNATIVES_QUERY = """
+UNWIND $rows AS row
+MATCH (d:Decision {id: row.decision_id})
+MERGE (a:Alternative {name: row.name})
+SET a.description = row.description
+MERGE (d)-[:CONSIDERED]->(a)
+"""
+
+RELATED_DECISIONS_QUERY = """
+UNWIND $rows AS row
+MATCH (d1:Decision {id: row.source_id})
+MATCH (d2:Decision {id: row.target_id})
+MERGE (d1)-[:RELATES_TO]->(d2)
+"""
+
+TIMELINE_QUERY = """
+UNWIND $rows AS row
+MATCH (d:Document {id: row.doc_id})
+MERGE (t:Timeline {date: row.date})
+MERGE (d)-[:CREATED_ON]->(t)
+"""
+
+# Keyset pagination over document nodes (served by the Document id constraint)
+DOCUMENT_PAGE_QUERY = """
+MATCH (d:Document)
+WHERE d.id > $after
+RETURN d.id as id, d.file_path as file_path
+ORDER BY d.id
+LIMIT $limit
+"""
+
+# Nodes that only exist for their owner, with the relationship that attaches them
+# (in deletion order: tasks hang off phases)
+DEPENDENT_NODES = (
+    ("Phase", "HAS_PHASE"),
+    ("Task", "HAS_TASK"),
+    ("Alternative", "CONSIDERED"),
+    ("Timeline", "CREATED_ON"),
+)
+
+
+def delete_documents_query(batch_size: int) -> str:
+    """DETACH DELETE documents by id, committing every batch_size rows
+
+    CALL { ... } IN TRANSACTIONS only runs in an auto-commit transaction (session.run).
+    """
+    return f"""
+UNWIND $ids AS id
+CALL {{
+    WITH id
+    MATCH (d:Document {{id: id}})
+    DETACH DELETE d
+}} IN TRANSACTIONS OF {int(batch_size)} ROWS
+"""
+
+
+def delete_dangling_query(label: str, rel_type: str, batch_size: int) -> str:
+    """DETACH DELETE nodes of a label no longer attached through rel_type"""
+    return f"""
+MATCH (n:{label})
+WHERE NOT ()-[:{rel_type}]->(n)
+CALL {{
+    WITH n
+    DETACH DELETE n
+}} IN TRANSACTIONS OF {int(batch_size)} ROWS
+"""
+
+
+# Statistics served by the count store: O(labels + relationship types), not O(graph)
+STATS_PROCEDURE_QUERY = """
+SHOW PROCEDURES YIELD name
+WHERE name = 'apoc.meta.stats'
+RETURN name
+"""
+
+APOC_STATS_QUERY = """
+CALL apoc.meta.stats() YIELD labels, relTypesCount
+RETURN labels, relTypesCount
+"""
+
+LABELS_QUERY = "CALL db.labels() YIELD label RETURN label"
+
+RELATIONSHIP_TYPES_QUERY = (
+    "CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType as type"
+)
+
+DOCUMENT_TYPES_QUERY = """
+MATCH (d:Document)
+RETURN d.document_type as type, count(*) as count
+ORDER BY count DESC
+"""
+
+
+def _escape_name(name: str) -> str:
+    """Backtick-quote a label or relationship type read from the database"""
+    return "`" + name.replace("`", "``") + "`"
+
+
+def label_count_query(label: str) -> str:
+    """Node count for one label (answered from the count store)"""
+    return f"MATCH (n:{_escape_name(label)}) RETURN count(n) as count"
+
+
+def relationship_count_query(rel_type: str) -> str:
+    """Relationship count for one type (answered from the count store)"""
+    return f"MATCH ()-[r:{_escape_name(rel_type)}]->() RETURN count(r) as count"
+
+
+def _by_count(counts: Dict[str, int]) -> Dict[str, int]:
+    """Counts ordered largest first, without empty entries"""
+    return dict(sorted(((k, v) for k, v in counts.items() if v), key=lambda item: -item[1]))
+
+
+# Nodes a row locks when written: (label, key) pairs
+LockKeys = Callable[[Dict[str, Any]], Tuple[Tuple[str, Any], ...]]
+
+
+class Statement(NamedTuple):
+    """An UNWIND query, its rows and the nodes each row locks
+
+    op names the operation (and its label string or relationship type) for
+    backends that replay statements without Cypher.
+    """
+
+    query: str
+    rows: List[Dict[str, Any]]
+    lock_keys: LockKeys
+    op: Tuple[str, ...] = ()
+
+
+def schedule_rows(
+    rows: List[Dict[str, Any]], lock_keys: LockKeys, workers: int
+) -> List[List[List[Dict[str, Any]]]]:
+    """Split rows into rounds of groups that can be written concurrently
+
+    Lock keys are hashed into 2 * workers partitions. Rows whose keys fall in one
+    partition are grouped by that partition; rows spanning two partitions are
+    grouped by the pair. Pairs are scheduled round-robin, so the groups of a
+    round cover disjoint partitions and their transactions cannot deadlock on
+    each other. Row order is preserved within a group.
+    """
+    if workers <= 1 or len(rows) <= 1:
+        return [[rows]] if rows else []
+
+    partitions = 2 * workers
+    groups: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+    for row in rows:
+        parts = {hash(key) % partitions for key in lock_keys(row)}
+        low, high = min(parts), max(parts)
+        if len(parts) > 2:
+            # More than two partitions cannot be paired; serialize in a final round
+            low, high = -1, -1
+        groups.setdefault((low, high), []).append(row)
+
+    # Round 0: rows within one partition; then the round-robin (circle) schedule of pairs
+    rounds = [[groups[(p, p)] for p in range(partitions) if (p, p) in groups]]
+    players = list(range(partitions))
+    for _ in range(partitions - 1):
+        pairs = [
+            (min(players[i], players[-1 - i]), max(players[i], players[-1 - i]))
+            for i in range(partitions // 2)
+        ]
+        rounds.append([groups[pair] for pair in pairs if pair in groups])
+        players = [players[0], players[-1]] + players[1:-1]
+    if (-1, -1) in groups:
+        rounds.append([groups[(-1, -1)]])
+    return [round_groups for round_groups in rounds if round_groups]
+
+
+def delete_relationships_query(rel_type: str) -> str:
+    """Delete document-to-document relationships of one whitelisted type"""
+    return f"""
+UNWIND $rows AS row
+MATCH (:Document {{id: row.source_id}})-[r:{rel_type}]->(:Document {{id: row.target_id}})
+DELETE r
+"""
+
+
+# Removes outgoing document edges that a document no longer declares; used for
+# documents without edge history in the index
+RECONCILE_EDGES_QUERY = f"""
+UNWIND $rows AS row
+MATCH (:Document {{id: row.source_id}})-[r]->(t:Document)
+WHERE type(r) IN {sorted(ALLOWED_RELATIONSHIP_TYPES)!r} AND NOT [type(r), t.id] IN row.edges
+DELETE r
+"""
+
+
+def _document_keys(*fields: str) -> LockKeys:
+    return lambda row: tuple(("Document", row[name]) for name in fields)
+
+
+def document_nodes_query(labels: str) -> str:
+    """MERGE document nodes with the given label string (labels cannot be parameters)"""
+    return f"""
+UNWIND $rows AS row
+MERGE (d:{labels} {{id: row.id}})
+SET d += row.props
+"""
+
+
+def relationships_query(rel_type: str) -> str:
+    """MERGE document-to-document relationships of one whitelisted type"""
+    return f"""
+UNWIND $rows AS row
+MATCH (d1:Document {{id: row.source_id}})
+MATCH (d2:Document {{id: row.target_id}})
+MERGE (d1)-[:{rel_type}]->(d2)
+"""
+
+
+@dataclass
+class GraphBatch:
+    """Node and relationship rows collected from a batch of documents"""
+
+    documents: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    phases: List[Dict[str, Any]] = field(default_factory=list)
+    tasks: List[Dict[str, Any]] = field(default_factory=list)
+    team: List[Dict[str, Any]] = field(default_factory=list)
+    alternatives: List[Dict[str, Any]] = field(default_factory=list)
+    related_decisions: List[Dict[str, Any]] = field(default_factory=list)
+    relationships: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    timeline: List[Dict[str, Any]] = field(default_factory=list)
+    # Processed-document cache entries to record once the batch is written
+    pending: Dict[str, str] = field(default_factory=dict)
+    # Document ids collected in this batch, with their cache keys
+    document_ids: Dict[str, str] = field(default_factory=dict)
+    # @/# mentions, linked once they name a known document (pending until then)
+    mentions: List[Dict[str, Any]] = field(default_factory=list)
+    # File signatures (mtime_ns, size) taken when documents were read
+    file_stats: Dict[str, List[int]] = field(default_factory=dict)
+    # Edge diff: relationships to delete, and documents to reconcile without history
+    removed_relationships: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    reconcile: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add_relationship(self, rel_type: str, source_id: str, target_id: str) -> None:
+        self.relationships.setdefault(rel_type, []).append(
+            {"source_id": source_id, "target_id": target_id}
+        )
+
+    def document_edges(self) -> List[Dict[str, str]]:
+        """Document-to-document edges as {type, source_id, target_id} rows"""
+        edges = [{"type": "RELATES_TO", **row} for row in self.related_decisions]
+        for rel_type, rows in self.relationships.items():
+            edges.extend({"type": rel_type, **row} for row in rows)
+        return edges
+
+    def node_statements(self) -> List[Statement]:
+        """Document node upserts"""
+        return [
+            Statement(
+                document_nodes_query(labels), rows, _document_keys("id"), ("documents", labels)
+            )
+            for labels, rows in self.documents.items()
+            if rows
+        ]
+
+    def statements(self) -> List[Statement]:
+        """Statements in write order: document nodes, then dependent nodes and edges"""
+        return self.node_statements() + self.edge_statements()
+
+    def keep_document_edges(self, keep: Callable[[Dict[str, str]], bool]) -> None:
+        """Drop document-to-document edge rows for which keep({type, source_id, target_id}) fails"""
+        self.related_decisions = [
+            row for row in self.related_decisions if keep({"type": "RELATES_TO", **row})
+        ]
+        self.relationships = {
+            rel_type: [row for row in rows if keep({"type": rel_type, **row})]
+            for rel_type, rows in self.relationships.items()
+        }
+
+    def edge_statements(self) -> List[Statement]:
+        """Dependent nodes and relationships, which need the document nodes to exist"""
+        statements = [
+            Statement(
+                delete_relationships_query(rel_type),
+                rows,
+                _document_keys("source_id", "target_id"),
+                ("delete_relationships", rel_type),
+            )
+            for rel_type, rows in self.removed_relationships.items()
+            if rel_type in ALLOWED_RELATIONSHIP_TYPES
+        ]
+        # Reconciliation touches targets unknown up front, so it runs as one group
+        statements.append(
+            Statement(
+                RECONCILE_EDGES_QUERY,
+                self.reconcile,
+                lambda row: (("Reconcile", 0),),
+                ("reconcile",),
+            )
+        )
+        statements += [
+            Statement(
+                PHASES_QUERY,
+                self.phases,
+                lambda row: (("Document", row["sprint_id"]), ("Phase", row["phase_num"])),
+                ("phases",),
+            ),
+            Statement(
+                TASKS_QUERY,
+                self.tasks,
+                lambda row: (("Phase", row["phase_num"]), ("Task", row["task_id"])),
+                ("tasks",),
+            ),
+            Statement(
+                TEAM_QUERY,
+                self.team,
+                lambda row: (("Document", row["sprint_id"]), ("Agent", row["agent"])),
+                ("team",),
+            ),
+            Statement(
+                ALTERNATIVES_QUERY,
+                self.alternatives,
+                lambda row: (("Document", row["decision_id"]), ("Alternative", row["name"])),
+                ("alternatives",),
+            ),
+            Statement(
+                RELATED_DECISIONS_QUERY,
+                self.related_decisions,
+                _document_keys("source_id", "target_id"),
+                ("related_decisions",),
+            ),
+        ]
+        statements += [
+            Statement(
+                relationships_query(rel_type),
+                rows,
+                _document_keys("source_id", "target_id"),
+                ("relationships", rel_type),
+            )
+            for rel_type, rows in self.relationships.items()
+            if rel_type in ALLOWED_RELATIONSHIP_TYPES
+        ]
+        statements.append(
+            Statement(
+                TIMELINE_QUERY,
+                self.timeline,
+                lambda row: (("Document", row["doc_id"]), ("Timeline", row["date"])),
+                ("timeline",),
+            )
+        )
+        return [statement for statement in statements if statement.rows]
+
+    def row_count(self) -> int:
+        """Node and relationship rows collected so far (list lengths only, so it is cheap)"""
+        row_lists = [
+            self.phases,
+            self.tasks,
+            self.team,
+            self.alternatives,
+            self.related_decisions,
+            self.timeline,
+            *self.documents.values(),
+            *self.relationships.values(),
+        ]
+        return sum(len(rows) for rows in row_lists)
 
 
 class GraphBuilder:
     """Build and maintain context graph from documents"""
 
-    def __init__(self, config_path: str = ".ctxrc.yaml", verbose: bool = False):
+    def __init__(
+        self,
+        config_path: str = ".ctxrc.yaml",
+        verbose: bool = False,
+        perf_config_path: str = "performance.yaml",
+    ):
         self.config = self._load_config(config_path)
+        self.perf_config = self._load_perf_config(perf_config_path)
         self.driver: Optional[Driver] = None
+        # Set instead of the driver when neo4j.backend selects an embedded graph
+        self.graph_backend: Optional["GraphBackend"] = None
+        self.query_cache: Optional[QueryResultCache] = None
         self.database = self.config.get("neo4j", {}).get("database", "context_graph")
         self.verbose = verbose
+        # Rows per write transaction and number of concurrent write sessions
+        batch_config = self.perf_config.get("graph_db", {}).get("batch", {})
+        self.batch_size = batch_config.get("size", 1000)
+        self.parallel_transactions = batch_config.get("parallel_transactions", 4)
+        # Seconds get_statistics serves cached counts; whether apoc.meta.stats exists
+        stats_config = self.perf_config.get("graph_db", {}).get("statistics", {})
+        self.stats_cache_seconds = stats_config.get("cache_seconds", 60)
+        self.stats_procedure: Optional[bool] = None
+        self._stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
         self.processed_cache_path = Path("context/.graph_cache/processed.json")
         self.processed_docs: Dict[str, str] = self._load_processed_cache()
+        # Known document ids (id -> file path) and edges waiting for their target
+        graph_index = self._load_graph_index()
+        self.document_ids: Dict[str, str] = graph_index["documents"]
+        self.pending_edges: List[Dict[str, str]] = graph_index["pending_edges"]
+        # Outgoing document edges per document ([type, target] pairs) and file signatures
+        self.owned_edges: Dict[str, List[List[str]]] = graph_index["owned_edges"]
+        self.file_stats: Dict[str, List[int]] = graph_index["files"]
+        # Whether document ids were checked against the graph (done once without an index)
+        self.index_seeded = False
 
     def __enter__(self) -> "GraphBuilder":
         """Context manager entry"""
@@ -56,6 +545,15 @@ class GraphBuilder:
         except FileNotFoundError:
             return {}
 
+    def _load_perf_config(self, perf_config_path: str) -> Dict[str, Any]:
+        """Load performance configuration"""
+        try:
+            with open(perf_config_path, "r") as f:
+                result = yaml.safe_load(f)
+                return cast(Dict[str, Any], result) if isinstance(result, dict) else {}
+        except FileNotFoundError:
+            return {}
+
     def _load_processed_cache(self) -> Dict[str, str]:
         """Load cache of processed documents"""
         if self.processed_cache_path.exists():
@@ -74,13 +572,85 @@ class GraphBuilder:
         with open(self.processed_cache_path, "w") as f:
             json.dump(self.processed_docs, f, indent=2)
 
+    @property
+    def graph_index_path(self) -> Path:
+        """Index of known document ids and pending edges, next to the processed cache"""
+        return self.processed_cache_path.parent / "graph_index.json"
+
+    def _load_graph_index(self) -> Dict[str, Any]:
+        """Load known document ids and pending edges"""
+        index: Dict[str, Any] = {
+            "documents": {},
+            "pending_edges": [],
+            "owned_edges": {},
+            "files": {},
+        }
+        if self.graph_index_path.exists():
+            try:
+                with open(self.graph_index_path, "r") as f:
+                    stored = json.load(f)
+                if isinstance(stored, dict):
+                    for key, default in index.items():
+                        index[key] = type(default)(stored.get(key, default))
+            except Exception:
+                pass
+        return index
+
+    def _save_graph_index(self) -> None:
+        """Save known document ids and pending edges"""
+        self.graph_index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.graph_index_path, "w") as f:
+            json.dump(
+                {
+                    "documents": self.document_ids,
+                    "pending_edges": self.pending_edges,
+                    "owned_edges": self.owned_edges,
+                    "files": self.file_stats,
+                },
+                f,
+                indent=2,
+            )
+
+    @staticmethod
+    def _file_signature(file_path: Path) -> List[int]:
+        """Modification time and size, to skip unchanged files without parsing them"""
+        stat = file_path.stat()
+        return [stat.st_mtime_ns, stat.st_size]
+
     def _compute_doc_hash(self, data: Dict[str, Any]) -> str:
         """Compute hash of document content"""
         content = json.dumps(data, sort_keys=True)
         return hashlib.sha256(content.encode()).hexdigest()
 
+    @property
+    def connected(self) -> bool:
+        """Whether a Neo4j driver or an embedded backend is available"""
+        return self.driver is not None or self.graph_backend is not None
+
+    def _setup_query_cache(self) -> None:
+        """Cached GraphRAG results are invalidated through a shared graph epoch"""
+        query_config = self.perf_config.get("graph_db", {}).get("query", {})
+        if query_config.get("use_query_cache", False):
+            cache_config = self.perf_config.get("vector_db", {}).get("cache", {})
+            self.query_cache = QueryResultCache.from_config(
+                self.config, cache_config, verbose=self.verbose
+            )
+
     def connect(self, username: str = "neo4j", password: Optional[str] = None) -> bool:
-        """Connect to Neo4j"""
+        """Connect to Neo4j, or open the embedded graph when it is configured"""
+        # Import locally to avoid circular imports
+        from src.storage.graph_backend import create_backend
+
+        try:
+            self.graph_backend = create_backend(self.config)
+        except Exception as e:
+            if self.verbose:
+                click.echo(f"Failed to open embedded graph: {e}", err=True)
+            return False
+        if self.graph_backend is not None:
+            self._setup_query_cache()
+            return True
+
         neo4j_config = self.config.get("neo4j", {})
         host = neo4j_config.get("host", "localhost")
         port = neo4j_config.get("port", 7687)
@@ -92,12 +662,23 @@ class GraphBuilder:
                 click.echo("Error: Neo4j password is required", err=True)
             return False
 
+        # Enough pooled connections for the concurrent write sessions
+        pool_config = self.perf_config.get("graph_db", {}).get("connection_pool", {})
+        max_pool_size = max(pool_config.get("max_size", 100), self.parallel_transactions)
+
         try:
-            self.driver = GraphDatabase.driver(uri, auth=(username, password))
+            self.driver = GraphDatabase.driver(
+                uri,
+                auth=(username, password),
+                max_connection_pool_size=max_pool_size,
+                connection_acquisition_timeout=pool_config.get("acquisition_timeout", 60),
+            )
             # Test connection
             if self.driver:
                 with self.driver.session() as session:
                     session.run("RETURN 1")
+
+                self._setup_query_cache()
                 return True
             return False
         except Exception as e:
@@ -114,10 +695,18 @@ class GraphBuilder:
                 click.echo(f"Failed to connect to Neo4j: {error_msg}", err=True)
             return False
 
-    def _create_document_node(self, session: Any, data: Dict[str, Any], file_path: Path) -> str:
-        """Create or update a document node"""
+    def _invalidate_query_cache(self) -> None:
+        """Bump the graph epoch so cached GraphRAG results are recomputed"""
+        self._stats_cache = None
+        if self.query_cache is not None:
+            self.query_cache.bump_epoch(graph_scope(self.database))
+
+    def _document_row(
+        self, data: Dict[str, Any], file_path: Path
+    ) -> Tuple[str, str, Dict[str, Any]]:
+        """Document id, label string and properties for a document node"""
         doc_type = data.get("document_type", "document")
-        doc_id = data.get("id", file_path.stem)
+        doc_id = str(data.get("id", file_path.stem))
 
         # Base properties
         props = {
@@ -148,78 +737,48 @@ class GraphBuilder:
                 }
             )
 
-        # Create node with multiple labels
+        # Node with multiple labels
         labels = ["Document", doc_type.capitalize()]
-        labels_str = ":".join(labels)
-
-        query = f"""
-        MERGE (d:{labels_str} {{id: $id}})
-        SET d += $props
-        RETURN d
-        """
-
-        session.run(query, id=doc_id, props=props)
-        # Ensure we return a string
-        return str(doc_id)
+        return doc_id, ":".join(labels), props
 
-    def _create_relationships(self, session: Any, data: Dict[str, Any], doc_id: str) -> None:
-        """Create relationships based on document content"""
+    def _collect_relationships(self, batch: GraphBatch, data: Dict[str, Any], doc_id: str) -> None:
+        """Add relationship rows for document content to the batch"""
         doc_type = data.get("document_type")
 
         # Sprint relationships
         if doc_type == "sprint":
             # Link to phases
-            phases = data.get("phases", [])
-            for phase in phases:
+            for phase in data.get("phases", []):
                 phase_num = phase.get("phase")
-                if phase_num is not None:
-                    session.run(
-                        """
-                        MATCH (s:Sprint {id: $sprint_id})
-                        MERGE (p:Phase {number: $phase_num})
-                        ON CREATE SET p.name = $name, p.duration_days = $duration
-                        MERGE (s)-[:HAS_PHASE {status: $status}]->(p)
-                    """,
-                        sprint_id=doc_id,
-                        phase_num=phase_num,
-                        name=phase.get("name", ""),
-                        duration=phase.get("duration_days", 0),
-                        status=phase.get("status", "pending"),
-                    )
+                if phase_num is None:
+                    continue
+                batch.phases.append(
+                    {
+                        "sprint_id": doc_id,
+                        "phase_num": phase_num,
+                        "name": phase.get("name", ""),
+                        "duration": phase.get("duration_days", 0),
+                        "status": phase.get("status", "pending"),
+                    }
+                )
 
-                    # Link tasks to phases
-                    tasks = phase.get("tasks", [])
-                    for i, task in enumerate(tasks):
-                        task_id = f"{doc_id}-phase{phase_num}-task{i}"
-                        session.run(
-                            """
-                            MATCH (p:Phase {number: $phase_num})
-                            MERGE (t:Task {id: $task_id})
-                            SET t.description = $description,
-                                t.status = $status,
-                                t.phase = $phase_num
-                            MERGE (p)-[:HAS_TASK]->(t)
-                        """,
-                            phase_num=phase_num,
-                            task_id=task_id,
-                            description=task,
-                            status="pending",
-                        )
+                # Link tasks to phases
+                for i, task in enumerate(phase.get("tasks", [])):
+                    batch.tasks.append(
+                        {
+                            "phase_num": phase_num,
+                            "task_id": f"{doc_id}-phase{phase_num}-task{i}",
+                            "description": task,
+                            "status": "pending",
+                        }
+                    )
 
             # Link to team members
-            team = data.get("team", [])
-            for member in team:
+            for member in data.get("team", []):
                 agent = member.get("agent")
                 if agent:
-                    session.run(
-                        """
-                        MATCH (s:Sprint {id: $sprint_id})
-                        MATCH (a:Agent {name: $agent})
-                        MERGE (s)-[:HAS_TEAM_MEMBER {role: $role}]->(a)
-                    """,
-                        sprint_id=doc_id,
-                        agent=agent,
-                        role=member.get("role", ""),
+                    batch.team.append(
+                        {"sprint_id": doc_id, "agent": agent, "role": member.get("role", "")}
                     )
 
         # Decision relationships
@@ -227,56 +786,22 @@ class GraphBuilder:
             # Link alternatives
             alternatives = data.get("alternatives_considered", {})
             for alt_name, alt_desc in alternatives.items():
-                session.run(
-                    """
-                    MATCH (d:Decision {id: $decision_id})
-                    MERGE (a:Alternative {name: $name})
-                    SET a.description = $description
-                    MERGE (d)-[:CONSIDERED]->(a)
-                """,
-                    decision_id=doc_id,
-                    name=alt_name,
-                    description=alt_desc,
+                batch.alternatives.append(
+                    {"decision_id": doc_id, "name": alt_name, "description": alt_desc}
                 )
 
             # Link related decisions
-            related = data.get("related_decisions", [])
-            for related_id in related:
-                session.run(
-                    """
-                    MATCH (d1:Decision {id: $decision_id})
-                    MATCH (d2:Decision {id: $related_id})
-                    MERGE (d1)-[:RELATES_TO]->(d2)
-                """,
-                    decision_id=doc_id,
-                    related_id=related_id,
-                )
+            for related_id in data.get("related_decisions", []):
+                batch.related_decisions.append({"source_id": doc_id, "target_id": related_id})
 
         # Graph metadata relationships
         graph_meta = data.get("graph_metadata", {})
         if graph_meta:
-            # Define allowed relationship types for security
-            ALLOWED_REL_TYPES = {
-                "RELATES_TO",
-                "IMPLEMENTS",
-                "FOLLOWS",
-                "PREPARES",
-                "CONSTRAINS",
-                "REQUIRES",
-                "DEFINES",
-                "DEPENDS_ON",
-                "REFERENCES",
-                "CONTAINS",
-                "EXTENDS",
-                "MODIFIES",
-            }
-
-            relationships = graph_meta.get("relationships", [])
-            for rel in relationships:
+            for rel in graph_meta.get("relationships", []):
                 rel_type = rel.get("type", "RELATES_TO").upper()
 
                 # Validate relationship type to prevent injection
-                if rel_type not in ALLOWED_REL_TYPES:
+                if rel_type not in ALLOWED_RELATIONSHIP_TYPES:
                     if self.verbose:
                         click.echo(
                             f"Warning: Skipping invalid relationship type: {rel_type}", err=True
@@ -285,40 +810,26 @@ class GraphBuilder:
 
                 target = rel.get("target")
                 if target:
-                    # Use parameterized query with validated rel_type
-                    query = f"""
-                        MATCH (d1:Document {{id: $source_id}})
-                        MATCH (d2:Document {{id: $target_id}})
-                        MERGE (d1)-[:{rel_type}]->(d2)
-                    """
-                    session.run(
-                        query,
-                        source_id=doc_id,
-                        target_id=target,
-                    )
-
-    def _extract_references(self, content: str) -> Set[str]:
-        """Extract document references from content"""
-        import re
+                    batch.add_relationship(rel_type, doc_id, target)
 
-        references = set()
-
-        # Look for patterns like [[doc-id]] or @doc-id
-        patterns = [
-            r"\[\[([a-zA-Z0-9\-_]+)\]\]",  # [[doc-id]]
-            r"@([a-zA-Z0-9\-_]+)",  # @doc-id
-            r"#([a-zA-Z0-9\-_]+)",  # #doc-id
-        ]
+    def _collect_document(self, batch: GraphBatch, file_path: Path, force: bool = False) -> bool:
+        """Add a changed document's rows to the batch
 
-        for pattern in patterns:
-            matches = re.findall(pattern, content)
-            references.update(matches)
-
-        return references
-
-    def process_document(self, file_path: Path, force: bool = False) -> bool:
-        """Process a single document and update graph"""
+        Returns False if the document cannot be processed; unchanged documents
+        are skipped and count as processed.
+        """
         try:
+            cache_key = str(file_path)
+            signature = self._file_signature(file_path)
+            if (
+                not force
+                and cache_key in self.processed_docs
+                and self.file_stats.get(cache_key) == signature
+            ):
+                if self.verbose:
+                    click.echo(f"  Skipping {file_path} - no changes")
+                return True
+
             # Load document
             with open(file_path, "r") as f:
                 data = yaml.safe_load(f)
@@ -328,188 +839,476 @@ class GraphBuilder:
 
             # Check if needs processing
             doc_hash = self._compute_doc_hash(data)
-            cache_key = str(file_path)
 
-            if not force and cache_key in self.processed_docs:
-                if self.processed_docs[cache_key] == doc_hash:
-                    if self.verbose:
-                        click.echo(f"  Skipping {file_path} - no changes")
-                    return True
-
-            # Process in transaction
-            if not self.driver:
+            if not force and self.processed_docs.get(cache_key) == doc_hash:
+                # Touched but unchanged: remember the new signature to skip parsing next time
+                self.file_stats[cache_key] = signature
                 if self.verbose:
-                    click.echo("Not connected to Neo4j", err=True)
-                return False
+                    click.echo(f"  Skipping {file_path} - no changes")
+                return True
 
-            with self.driver.session(database=self.database) as session:
-                # Create/update document node
-                doc_id = self._create_document_node(session, data, file_path)
-
-                # Create relationships
-                self._create_relationships(session, data, doc_id)
-
-                # Extract and link references from content
-                content_fields = ["description", "content", "rationale"]
-                all_content = " ".join(str(data.get(f, "")) for f in content_fields)
-
-                references = self._extract_references(all_content)
-                for ref_id in references:
-                    session.run(
-                        """
-                        MATCH (d1:Document {id: $source_id})
-                        MATCH (d2:Document {id: $target_id})
-                        MERGE (d1)-[:REFERENCES]->(d2)
-                    """,
-                        source_id=doc_id,
-                        target_id=ref_id,
-                    )
+            doc_id, labels, props = self._document_row(data, file_path)
+            batch.documents.setdefault(labels, []).append({"id": doc_id, "props": props})
 
-                # Create timeline relationships
-                if "created_date" in data:
-                    session.run(
-                        """
-                        MATCH (d:Document {id: $doc_id})
-                        MERGE (t:Timeline {date: $date})
-                        MERGE (d)-[:CREATED_ON]->(t)
-                    """,
-                        doc_id=doc_id,
-                        date=data["created_date"],
-                    )
+            self._collect_relationships(batch, data, doc_id)
 
-            # Update cache
-            self.processed_docs[cache_key] = doc_hash
+            # Extract and link references from content
+            content_fields = ["description", "content", "rationale"]
+            all_content = " ".join(str(data.get(f, "")) for f in content_fields)
+            links, mentions = scan_references(all_content)
+            for ref_id in sorted(links):
+                batch.add_relationship("REFERENCES", doc_id, ref_id)
+            batch.mentions.extend(
+                {"source_id": doc_id, "target_id": ref_id} for ref_id in sorted(mentions)
+            )
 
-            if self.verbose:
-                click.echo(f"  ✓ Processed {file_path}")
+            # Timeline relationships
+            if "created_date" in data:
+                batch.timeline.append({"doc_id": doc_id, "date": data["created_date"]})
 
+            batch.pending[cache_key] = doc_hash
+            batch.document_ids[doc_id] = cache_key
+            batch.file_stats[cache_key] = signature
             return True
 
         except Exception as e:
             click.echo(f"  ✗ Failed to process {file_path}: {e}", err=True)
             return False
 
+    @staticmethod
+    def _run_rows(tx: ManagedTransaction, query: str, rows: List[Dict[str, Any]]) -> None:
+        """Transaction function running one UNWIND statement"""
+        tx.run(query, rows=rows).consume()
+
+    def _write_rows(self, session: Any, query: str, rows: List[Dict[str, Any]]) -> None:
+        """Write rows with one transaction per batch_size rows"""
+        for start in range(0, len(rows), self.batch_size):
+            session.execute_write(self._run_rows, query, rows[start : start + self.batch_size])
+
+    def _write_group(self, query: str, rows: List[Dict[str, Any]]) -> None:
+        """Write one group of rows on its own session
+
+        Managed transactions retry transient errors, including deadlocks, with backoff.
+        """
+        if self.driver is None:
+            raise RuntimeError("Not connected to Neo4j")
+        with self.driver.session(database=self.database) as session:
+            self._write_rows(session, query, rows)
+
+    def _write_statements(self, statements: List[Statement]) -> None:
+        """Write statements in order, each over up to parallel_transactions sessions"""
+        if self.graph_backend is not None:
+            self.graph_backend.write_statements(statements)
+            return
+
+        workers = max(1, self.parallel_transactions)
+        if workers == 1:
+            for statement in statements:
+                self._write_group(statement.query, statement.rows)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for statement in statements:
+                for groups in schedule_rows(statement.rows, statement.lock_keys, workers):
+                    futures = [
+                        executor.submit(self._write_group, statement.query, group)
+                        for group in groups
+                    ]
+                    for future in futures:
+                        future.result()
+
+    def _write_nodes(self, batch: GraphBatch, written: Dict[str, str]) -> None:
+        """Phase 1: upsert the batch's document nodes, then clear them from the batch
+
+        Cache entries of documents whose nodes were written are moved to `written`.
+        """
+        if batch.pending:
+            if not self.connected:
+                if self.verbose:
+                    click.echo("Not connected to Neo4j", err=True)
+            else:
+                try:
+                    self._write_statements(batch.node_statements())
+                    written.update(batch.pending)
+                except Exception as e:
+                    click.echo(f"  ✗ Failed to write {len(batch.pending)} documents: {e}", err=True)
+        batch.documents.clear()
+        batch.pending.clear()
+
+    def _write_edges(self, batch: GraphBatch, written: Dict[str, str]) -> bool:
+        """Phase 2: write edges once all nodes exist, retrying pending edges
+
+        Edges whose target is not a known document are still attempted (the target
+        may predate the index) and kept in the pending-edge table until a
+        document with that id is ingested.
+        """
+        new_ids = {
+            doc_id: cache_key
+            for doc_id, cache_key in batch.document_ids.items()
+            if cache_key in written
+        }
+        known = set(self.document_ids) | set(new_ids)
+
+        # Without a saved index, unknown targets may still be documents in the graph
+        targets = [mention["target_id"] for mention in batch.mentions]
+        targets += [edge["target_id"] for edge in batch.document_edges()]
+        if not self.index_seeded and not known.issuperset(targets):
+            self._seed_document_ids()
+            known = set(self.document_ids) | set(new_ids)
+
+        # Mentions become references only when they name a known document
+        for mention in batch.mentions:
+            if mention["source_id"] in new_ids and mention["target_id"] in known:
+                batch.add_relationship("REFERENCES", mention["source_id"], mention["target_id"])
+
+        # Edges each written document declares now, diffed against the stored ones;
+        # unresolved mentions are declared too, so they wait as pending edges
+        current: Dict[str, Set[Tuple[str, str]]] = {doc_id: set() for doc_id in new_ids}
+        for edge in batch.document_edges():
+            if edge["source_id"] in current:
+                current[edge["source_id"]].add((edge["type"], edge["target_id"]))
+        for mention in batch.mentions:
+            if mention["source_id"] in current:
+                current[mention["source_id"]].add(("REFERENCES", mention["target_id"]))
+
+        stored: Dict[str, Set[Tuple[str, str]]] = {}
+        for doc_id, edges in current.items():
+            if doc_id in self.owned_edges:
+                stored[doc_id] = {
+                    (rel_type, target) for rel_type, target in self.owned_edges[doc_id]
+                }
+                for rel_type, target in sorted(stored[doc_id] - edges):
+                    batch.removed_relationships.setdefault(rel_type, []).append(
+                        {"source_id": doc_id, "target_id": target}
+                    )
+            else:
+                batch.reconcile.append(
+                    {"source_id": doc_id, "edges": [list(edge) for edge in sorted(edges)]}
+                )
+        batch.keep_document_edges(
+            lambda edge: (edge["type"], edge["target_id"])
+            not in stored.get(edge["source_id"], set())
+        )
+
+        # Pending edges whose target has now appeared
+        resolved = [edge for edge in self.pending_edges if edge["target_id"] in new_ids]
+        for edge in resolved:
+            batch.add_relationship(edge["type"], edge["source_id"], edge["target_id"])
+
+        # Pending edges of rewritten documents are recomputed from what they declare now
+        pending = [
+            edge
+            for edge in self.pending_edges
+            if edge["target_id"] not in new_ids and edge["source_id"] not in new_ids
+        ]
+        pending += [
+            {"type": rel_type, "source_id": doc_id, "target_id": target}
+            for doc_id, edges in current.items()
+            for rel_type, target in sorted(edges)
+            if target not in known
+        ]
+
+        statements = batch.edge_statements()
+        if statements:
+            if not self.connected:
+                if self.verbose:
+                    click.echo("Not connected to Neo4j", err=True)
+                return False
+            try:
+                self._write_statements(statements)
+            except Exception as e:
+                click.echo(f"  ✗ Failed to write relationships: {e}", err=True)
+                return False
+
+        self.document_ids.update(new_ids)
+        self.owned_edges.update(
+            {doc_id: [list(edge) for edge in sorted(edges)] for doc_id, edges in current.items()}
+        )
+        self.pending_edges = list(
+            {(e["type"], e["source_id"], e["target_id"]): e for e in pending}.values()
+        )
+        if resolved and self.verbose:
+            click.echo(f"  Resolved {len(resolved)} pending relationships")
+        return True
+
+    def _seed_document_ids(self) -> None:
+        """Load document ids from the graph when no graph index has been saved yet
+
+        Without the index (first run, or a deleted cache) documents already in the
+        graph would look unknown, and mentions of them would be dropped.
+        """
+        self.index_seeded = True
+        if self.graph_index_path.exists() or not self.connected:
+            return
+        try:
+            after = ""
+            while True:
+                page = self._document_page(after, self.batch_size)
+                for doc_id, file_path in page:
+                    self.document_ids.setdefault(doc_id, file_path or "")
+                if len(page) < self.batch_size:
+                    break
+                after = page[-1][0]
+        except Exception as e:
+            if self.verbose:
+                click.echo(f"Could not load document ids from the graph: {e}", err=True)
+
+    def _record_processed(self, batch: GraphBatch, written: Dict[str, str]) -> None:
+        """Record documents whose nodes and edges were written"""
+        self.processed_docs.update(written)
+        for cache_key in written:
+            self.file_stats[cache_key] = batch.file_stats[cache_key]
+        if self.verbose:
+            for file_path in written:
+                click.echo(f"  ✓ Processed {file_path}")
+
+    def process_document(self, file_path: Path, force: bool = False) -> bool:
+        """Process a single document and update graph"""
+        batch = GraphBatch()
+        if not self._collect_document(batch, file_path, force=force):
+            return False
+        if not batch.pending:
+            return True  # unchanged
+
+        written: Dict[str, str] = {}
+        self._write_nodes(batch, written)
+        if not written:
+            return False
+        # Nodes are written even when the edges fail, so cached results are stale either way
+        self._invalidate_query_cache()
+        if not self._write_edges(batch, written):
+            return False
+        self._record_processed(batch, written)
+
+        # Save cache
+        self._save_processed_cache()
+        self._save_graph_index()
+        return True
+
     def process_directory(self, directory: Path, force: bool = False) -> Tuple[int, int]:
-        """Process all documents in directory"""
+        """Process all documents in directory: all nodes first, then all edges
+
+        Document nodes are flushed whenever batch_size rows (nodes, dependent
+        nodes and edges) have been collected since the last flush; the other
+        rows wait until every node exists.
+        """
         processed = 0
         total = 0
+        batch = GraphBatch()
+        written: Dict[str, str] = {}
+        flushed_rows = 0
 
-        for yaml_file in directory.rglob("*.yaml"):
-            # Skip system files
-            if any(skip in yaml_file.parts for skip in ["schemas", ".graph_cache", "archive"]):
-                continue
-
+        for yaml_file in document_files(directory):
             total += 1
-            if self.process_document(yaml_file, force=force):
-                processed += 1
+            collected = len(batch.pending)
+            if self._collect_document(batch, yaml_file, force=force):
+                if len(batch.pending) == collected:
+                    processed += 1  # unchanged
+
+            if batch.row_count() - flushed_rows >= self.batch_size:
+                self._write_nodes(batch, written)
+                flushed_rows = batch.row_count()
+
+        self._write_nodes(batch, written)
+        if written and self._write_edges(batch, written):
+            self._record_processed(batch, written)
+            processed += len(written)
 
         # Save cache
         self._save_processed_cache()
+        self._save_graph_index()
 
-        return processed, total
+        if processed:
+            self._invalidate_query_cache()
 
-    def cleanup_orphaned_nodes(self) -> int:
-        """Remove nodes for documents that no longer exist"""
-        removed = 0
+        return processed, total
 
-        if not self.driver:
+    @staticmethod
+    def _walk_existing_files(root: Path) -> Set[str]:
+        """Collect every file path under root with a single directory walk"""
+        existing: Set[str] = set()
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                existing.add(os.path.normpath(os.path.join(dirpath, filename)))
+        return existing
+
+    def cleanup_orphaned_nodes(self, root: Path = Path("context"), page_size: int = 1000) -> int:
+        """Remove nodes for documents that no longer exist
+
+        Pages through document ids and paths (one short read per page), compares
+        them with one walk of root, then deletes orphans and the Phase, Task,
+        Alternative and Timeline nodes left dangling, committing every
+        batch_size rows. Returns the number of documents removed.
+        """
+        if not self.connected:
             if self.verbose:
                 click.echo("Not connected to Neo4j", err=True)
             return 0
 
+        removed = 0
         try:
-            with self.driver.session(database=self.database) as session:
-                # Get all document nodes
-                result = session.run(
-                    """
-                    MATCH (d:Document)
-                    RETURN d.id as id, d.file_path as file_path
-                """
-                )
-
-                for record in result:
-                    file_path = Path(record["file_path"])
-                    if not file_path.exists():
-                        # Delete node and relationships
+            root_norm = os.path.normpath(root)
+            root_prefix = "" if root_norm == os.curdir else root_norm + os.sep
+            existing_files = self._walk_existing_files(root)
+
+            orphans: Dict[str, str] = {}
+            after = ""
+            while True:
+                page = self._document_page(after, page_size)
+                for doc_id, file_path in page:
+                    # Nodes without a source file are not managed by the builder
+                    if not file_path:
+                        continue
+                    normalized = os.path.normpath(file_path)
+
+                    # Paths under root are answered by the walk; anything else
+                    # (absolute or out-of-tree paths) falls back to a stat call
+                    under_root = normalized.startswith(root_prefix) and (
+                        os.path.isabs(normalized) == os.path.isabs(root_norm)
+                    )
+                    if under_root:
+                        exists = normalized in existing_files
+                    else:
+                        exists = Path(file_path).exists()
+
+                    if not exists:
+                        orphans[doc_id] = str(file_path)
+                if len(page) < page_size:
+                    break
+                after = page[-1][0]
+
+            if orphans:
+                if self.graph_backend is not None:
+                    self.graph_backend.delete_documents(list(orphans))
+                else:
+                    with cast(Driver, self.driver).session(database=self.database) as session:
                         session.run(
-                            """
-                            MATCH (d:Document {id: $id})
-                            DETACH DELETE d
-                        """,
-                            id=record["id"],
-                        )
-
-                        removed += 1
-
-                        # Remove from cache
-                        cache_key = str(file_path)
-                        if cache_key in self.processed_docs:
-                            del self.processed_docs[cache_key]
-
-                        if self.verbose:
-                            click.echo(f"  Removed orphaned node: {record['id']}")
-
-            if removed > 0:
+                            delete_documents_query(self.batch_size), ids=list(orphans)
+                        ).consume()
+                removed = len(orphans)
+
+                # Remove from cache and index
+                for doc_id, cache_key in orphans.items():
+                    self.processed_docs.pop(cache_key, None)
+                    self.file_stats.pop(cache_key, None)
+                    self.document_ids.pop(doc_id, None)
+                    self.owned_edges.pop(doc_id, None)
+                    if self.verbose:
+                        click.echo(f"  Removed orphaned node: {doc_id}")
+                self.pending_edges = [
+                    edge for edge in self.pending_edges if edge["source_id"] not in orphans
+                ]
+                # Edges other documents declare to an orphan wait for it to be re-created
+                self.pending_edges += [
+                    {"type": rel_type, "source_id": source_id, "target_id": target_id}
+                    for source_id, edges in self.owned_edges.items()
+                    for rel_type, target_id in edges
+                    if target_id in orphans
+                ]
                 self._save_processed_cache()
+                self._save_graph_index()
+                self._invalidate_query_cache()
+
+            dangling = 0
+            if self.graph_backend is not None:
+                dangling = self.graph_backend.delete_dangling(DEPENDENT_NODES)
+            else:
+                with cast(Driver, self.driver).session(database=self.database) as session:
+                    for label, rel_type in DEPENDENT_NODES:
+                        summary = session.run(
+                            delete_dangling_query(label, rel_type, self.batch_size)
+                        ).consume()
+                        dangling += summary.counters.nodes_deleted
+            if dangling:
+                if self.verbose:
+                    click.echo(f"  Removed {dangling} dangling phase, task and timeline nodes")
+                if not removed:
+                    self._invalidate_query_cache()
 
         except Exception as e:
             click.echo(f"Error during cleanup: {e}", err=True)
 
         return removed
 
-    def get_statistics(self) -> Dict[str, Any]:
-        """Get graph statistics"""
+    def _document_page(self, after: str, limit: int) -> List[Tuple[str, Optional[str]]]:
+        """(id, file_path) of up to limit documents with id > after, ordered by id"""
+        if self.graph_backend is not None:
+            return self.graph_backend.document_page(after, limit)
+        with cast(Driver, self.driver).session(database=self.database) as session:
+            return [
+                (record["id"], record["file_path"])
+                for record in session.run(DOCUMENT_PAGE_QUERY, after=after, limit=limit)
+            ]
+
+    def _count_statistics(self, session: Any) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Node counts per label and relationship counts per type from the count store"""
+        if self.stats_procedure is None:
+            try:
+                self.stats_procedure = bool(list(session.run(STATS_PROCEDURE_QUERY)))
+            except Exception:
+                self.stats_procedure = False
+
+        if self.stats_procedure:
+            record = session.run(APOC_STATS_QUERY).single()
+            return dict(record["labels"]), dict(record["relTypesCount"])
+
+        labels = [record["label"] for record in session.run(LABELS_QUERY)]
+        node_counts = {
+            label: session.run(label_count_query(label)).single()["count"] for label in labels
+        }
+        rel_types = [record["type"] for record in session.run(RELATIONSHIP_TYPES_QUERY)]
+        rel_counts = {
+            rel_type: session.run(relationship_count_query(rel_type)).single()["count"]
+            for rel_type in rel_types
+        }
+        return node_counts, rel_counts
+
+    def get_statistics(self, refresh: bool = False, document_types: bool = False) -> Dict[str, Any]:
+        """Get graph statistics
+
+        Node and relationship counts come from the count store, so the cost grows with
+        the number of labels and types rather than the graph. document_types adds the
+        per-type breakdown, which needs one pass over Document nodes. Results are
+        cached for stats_cache_seconds (and dropped when the builder writes); refresh
+        bypasses it.
+        """
         stats: Dict[str, Any] = {}
 
-        if not self.driver:
+        if not self.connected:
             if self.verbose:
                 click.echo("Not connected to Neo4j", err=True)
             return stats
 
+        if not refresh and self._stats_cache is not None:
+            cached_at, cached = self._stats_cache
+            fresh = time.time() - cached_at < self.stats_cache_seconds
+            if fresh and (not document_types or "document_types" in cached):
+                stats = copy.deepcopy(cached)
+                if not document_types:
+                    stats.pop("document_types", None)
+                return stats
+
         try:
-            with self.driver.session(database=self.database) as session:
-                # Node counts by label
-                result = session.run(
-                    """
-                    MATCH (n)
-                    UNWIND labels(n) as label
-                    RETURN label, count(*) as count
-                    ORDER BY count DESC
-                """
-                )
+            if self.graph_backend is not None:
+                stats = self.graph_backend.statistics(document_types=document_types)
+                self._stats_cache = (time.time(), copy.deepcopy(stats))
+                return stats
 
-                label_counts = {}
-                for record in result:
-                    label_counts[record["label"]] = record["count"]
-                stats["node_counts"] = label_counts
-
-                # Relationship counts
-                result = session.run(
-                    """
-                    MATCH ()-[r]->()
-                    RETURN type(r) as type, count(*) as count
-                    ORDER BY count DESC
-                """
-                )
+            with cast(Driver, self.driver).session(database=self.database) as session:
+                node_counts, rel_counts = self._count_statistics(session)
+                stats["node_counts"] = _by_count(node_counts)
+                stats["relationship_counts"] = _by_count(rel_counts)
 
-                rel_counts = {}
-                for record in result:
-                    rel_counts[record["type"]] = record["count"]
-                stats["relationship_counts"] = rel_counts
-
-                # Document statistics
-                result = session.run(
-                    """
-                    MATCH (d:Document)
-                    RETURN d.document_type as type, count(*) as count
-                    ORDER BY count DESC
-                """
-                )
+                if document_types:
+                    # Document statistics (one pass over Document nodes only)
+                    result = session.run(DOCUMENT_TYPES_QUERY)
+
+                    doc_counts = {}
+                    for record in result:
+                        doc_counts[record["type"]] = record["count"]
+                    stats["document_types"] = doc_counts
 
-                doc_counts = {}
-                for record in result:
-                    doc_counts[record["type"]] = record["count"]
-                stats["document_types"] = doc_counts
+            self._stats_cache = (time.time(), copy.deepcopy(stats))
 
         except Exception as e:
             stats["error"] = str(e)
@@ -520,12 +1319,14 @@ class GraphBuilder:
         """Close driver connection"""
         if self.driver:
             self.driver.close()
+        if self.graph_backend is not None:
+            self.graph_backend.close()
 
 
 @click.command()
 @click.argument("path", type=click.Path(exists=True), default="context")
 @click.option("--username", default="neo4j", help="Neo4j username")
-@click.option("--password", help="Neo4j password (required)", required=True)
+@click.option("--password", help="Neo4j password (not needed with the embedded backend)")
 @click.option("--force", is_flag=True, help="Force reprocessing of all documents")
 @click.option("--cleanup", is_flag=True, help="Remove orphaned nodes")
 @click.option("--stats", is_flag=True, help="Show graph statistics")
@@ -534,7 +1335,7 @@ class GraphBuilder:
 def main(
     path: str,
     username: str,
-    password: str,
+    password: Optional[str],
     force: bool,
     cleanup: bool,
     stats: bool,
@@ -564,12 +1365,14 @@ def main(
         # Cleanup if requested
         if cleanup:
             click.echo("Cleaning up orphaned nodes...")
-            removed = builder.cleanup_orphaned_nodes()
+            path_obj = Path(path)
+            cleanup_root = path_obj if path_obj.is_dir() else path_obj.parent
+            removed = builder.cleanup_orphaned_nodes(root=cleanup_root)
             click.echo(f"Removed {removed} orphaned nodes\n")
 
         # Show statistics if requested
         if stats:
-            stats_data = builder.get_statistics()
+            stats_data = builder.get_statistics(document_types=True)
             click.echo("Graph Statistics:")
             click.echo("-" * 40)
 
@@ -0,0 +1,626 @@
+#!/usr/bin/env python3
+"""
+graph_export.py: Offline bulk export of the context graph for neo4j-admin import
+
+This component:
+1. Parses the context corpus with GraphBuilder's row collection (same labels,
+   properties and edge rules as the transactional build)
+2. Applies the MERGE semantics of the build queries in memory: nodes are
+   deduplicated by key, relationships need both ends to exist, and mentions
+   link only to documents in the corpus
+3. Writes node and relationship CSVs with typed headers, plus a manifest with
+   expected counts and the `neo4j-admin database import full` command
+4. Verifies an imported database against the manifest
+5. Optionally seeds the builder's processed cache and graph index, so the first
+   incremental build after an import skips unchanged documents
+"""
+
+import csv
+import datetime
+import itertools
+import json
+import shlex
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import click
+
+from src.storage.graph_builder import (
+    ALLOWED_RELATIONSHIP_TYPES,
+    GraphBatch,
+    GraphBuilder,
+    document_files,
+)
+from src.storage.neo4j_init import AGENTS
+
+MANIFEST_NAME = "manifest.json"
+ARRAY_DELIMITER = ";"
+
+MISSING_DOCUMENTS_QUERY = """
+UNWIND $ids AS id
+OPTIONAL MATCH (d:Document {id: id})
+WITH id, d
+WHERE d IS NULL
+RETURN collect(id) as missing
+"""
+
+
+def node_key(value: Any) -> str:
+    """Import ID for a merge key (1 and "1" are different nodes, as in MERGE)"""
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def _scalar_type(value: Any) -> str:
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "long"
+    if isinstance(value, float):
+        return "double"
+    if isinstance(value, datetime.datetime):
+        return "datetime" if value.tzinfo else "localdatetime"
+    if isinstance(value, datetime.date):
+        return "date"
+    return "string"
+
+
+def column_type(values: Iterable[Any]) -> str:
+    """neo4j-admin header type for a property column (mixed types fall back to string)"""
+    types: Set[str] = set()
+    for value in values:
+        if isinstance(value, (list, tuple)):
+            element_types = {_scalar_type(item) for item in value} or {"string"}
+            element = element_types.pop() if len(element_types) == 1 else "string"
+            types.add(f"{element}[]")
+        else:
+            types.add(_scalar_type(value))
+    if types == {"long", "double"}:
+        return "double"
+    return types.pop() if len(types) == 1 else "string"
+
+
+def format_cell(value: Any, value_type: str) -> Any:
+    """CSV cell for a property value; None leaves the property unset"""
+    if value is None:
+        return None
+    if value_type.endswith("[]"):
+        items = value if isinstance(value, (list, tuple)) else [value]
+        return ARRAY_DELIMITER.join(str(format_cell(item, value_type[:-2])) for item in items)
+    if value_type == "boolean":
+        return "true" if value else "false"
+    if value_type in ("long", "double"):
+        return value
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, sort_keys=True, default=str)
+    return str(value)
+
+
+def csv_cell(value: Any) -> str:
+    """CSV text for a formatted cell: strings quoted, numbers bare, None empty
+
+    neo4j-admin reads an empty unquoted cell as an unset property and "" as an
+    empty string, which csv.QUOTE_NONNUMERIC cannot tell apart.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+@dataclass
+class NodeTable:
+    """Nodes of one ID space, merged by key"""
+
+    id_space: str
+    labels: Dict[str, Set[str]] = field(default_factory=dict)
+    props: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def merge(
+        self,
+        key: str,
+        labels: Iterable[str],
+        props: Dict[str, Any],
+        on_create: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """MERGE a node: SET props (null removes), ON CREATE SET on_create"""
+        created = key not in self.props
+        node = self.props.setdefault(key, {})
+        self.labels.setdefault(key, set()).update(labels)
+        if created and on_create:
+            props = {**on_create, **props}
+        for name, value in props.items():
+            if value is None:
+                node.pop(name, None)
+            else:
+                node[name] = value
+
+    def has(self, key: str, label: Optional[str] = None) -> bool:
+        return key in self.props and (label is None or label in self.labels[key])
+
+    def __len__(self) -> int:
+        return len(self.props)
+
+
+@dataclass
+class RelationshipTable:
+    """Relationships of one type between two ID spaces, merged by ends and properties"""
+
+    rel_type: str
+    start_space: str
+    end_space: str
+    rows: Dict[Tuple[str, str, str], Dict[str, Any]] = field(default_factory=dict)
+
+    def merge(self, start: str, end: str, props: Optional[Dict[str, Any]] = None) -> None:
+        props = {name: value for name, value in (props or {}).items() if value is not None}
+        self.rows.setdefault((start, end, node_key(props)), props)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+@dataclass
+class GraphExport:
+    """The graph a full build of a corpus would produce, ready for bulk import"""
+
+    nodes: Dict[str, NodeTable] = field(default_factory=dict)
+    relationships: Dict[Tuple[str, str, str], RelationshipTable] = field(default_factory=dict)
+    # Document edges whose target is not in the corpus (pending in the builder)
+    pending_edges: List[Dict[str, str]] = field(default_factory=list)
+    # Agent names assumed to exist (created by schema setup after the import)
+    agents: Set[str] = field(default_factory=set)
+
+    def node_table(self, id_space: str) -> NodeTable:
+        return self.nodes.setdefault(id_space, NodeTable(id_space))
+
+    def relate(
+        self,
+        rel_type: str,
+        start: Tuple[str, str],
+        end: Tuple[str, str],
+        props: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        table = self.relationships.setdefault(
+            (rel_type, start[0], end[0]), RelationshipTable(rel_type, start[0], end[0])
+        )
+        table.merge(start[1], end[1], props)
+
+    def document(self, doc_id: Any, label: str = "Document") -> Optional[Tuple[str, str]]:
+        """(id space, key) of a document node carrying label, or None (MATCH fails)"""
+        key = node_key(doc_id)
+        return ("Document", key) if self.node_table("Document").has(key, label) else None
+
+    def apply(self, op: Tuple[str, ...], rows: List[Dict[str, Any]]) -> None:
+        """Replay one build statement (Statement.op) with the semantics of its Cypher
+
+        Nodes are merged by key, relationships need both ends to exist (MATCH)
+        and are merged by ends and properties. Document edges whose target does
+        not exist are recorded in pending_edges.
+        """
+        kind = op[0]
+        if kind == "documents":
+            documents = self.node_table("Document")
+            for row in rows:
+                documents.merge(node_key(row["id"]), op[1].split(":"), row["props"])
+
+        elif kind == "delete_relationships":
+            self.delete_relationships(
+                op[1], {(node_key(r["source_id"]), node_key(r["target_id"])) for r in rows}
+            )
+
+        elif kind == "reconcile":
+            for row in rows:
+                keep = {(rel_type, node_key(target)) for rel_type, target in row["edges"]}
+                source_key = node_key(row["source_id"])
+                for (rel_type, start, end), table in self.relationships.items():
+                    if (start, end) == ("Document", "Document") and (
+                        rel_type in ALLOWED_RELATIONSHIP_TYPES
+                    ):
+                        table.rows = {
+                            k: v
+                            for k, v in table.rows.items()
+                            if k[0] != source_key or (rel_type, k[1]) in keep
+                        }
+
+        elif kind == "phases":
+            phases = self.node_table("Phase")
+            for row in rows:
+                sprint = self.document(row["sprint_id"], "Sprint")
+                if sprint:
+                    key = node_key(row["phase_num"])
+                    phases.merge(
+                        key,
+                        ["Phase"],
+                        {"number": row["phase_num"]},
+                        on_create={"name": row["name"], "duration_days": row["duration"]},
+                    )
+                    self.relate("HAS_PHASE", sprint, ("Phase", key), {"status": row["status"]})
+
+        elif kind == "tasks":
+            phases, tasks = self.node_table("Phase"), self.node_table("Task")
+            for row in rows:
+                phase_key = node_key(row["phase_num"])
+                if phases.has(phase_key):
+                    key = node_key(row["task_id"])
+                    tasks.merge(
+                        key,
+                        ["Task"],
+                        {
+                            "id": row["task_id"],
+                            "description": row["description"],
+                            "status": row["status"],
+                            "phase": row["phase_num"],
+                        },
+                    )
+                    self.relate("HAS_TASK", ("Phase", phase_key), ("Task", key))
+
+        elif kind == "team":
+            agents = self.node_table("Agent")
+            for row in rows:
+                sprint = self.document(row["sprint_id"], "Sprint")
+                key = node_key(row["agent"])
+                if sprint and (agents.has(key) or row["agent"] in self.agents):
+                    if not agents.has(key):
+                        agents.merge(key, ["Agent"], {"name": row["agent"]})
+                    self.relate("HAS_TEAM_MEMBER", sprint, ("Agent", key), {"role": row["role"]})
+
+        elif kind == "alternatives":
+            alternatives = self.node_table("Alternative")
+            for row in rows:
+                decision = self.document(row["decision_id"], "Decision")
+                if decision:
+                    key = node_key(row["name"])
+                    alternatives.merge(
+                        key,
+                        ["Alternative"],
+                        {"name": row["name"], "description": row["description"]},
+                    )
+                    self.relate("CONSIDERED", decision, ("Alternative", key))
+
+        elif kind == "related_decisions":
+            for row in rows:
+                source = self.document(row["source_id"], "Decision")
+                target = self.document(row["target_id"], "Decision")
+                if source and target:
+                    self.relate("RELATES_TO", source, target)
+                elif source and not self.document(row["target_id"]):
+                    self.pending_edges.append({"type": "RELATES_TO", **row})
+
+        elif kind == "relationships":
+            rel_type = op[1]
+            for row in rows:
+                source, target = self.document(row["source_id"]), self.document(row["target_id"])
+                if source and target:
+                    self.relate(rel_type, source, target)
+                elif source:
+                    self.pending_edges.append({"type": rel_type, **row})
+
+        elif kind == "timeline":
+            timeline = self.node_table("Timeline")
+            for row in rows:
+                doc = self.document(row["doc_id"])
+                if doc:
+                    key = node_key(row["date"])
+                    timeline.merge(key, ["Timeline"], {"date": row["date"]})
+                    self.relate("CREATED_ON", doc, ("Timeline", key))
+
+        else:
+            raise ValueError(f"Unknown graph operation: {kind}")
+
+    def delete_relationships(self, rel_type: str, pairs: Set[Tuple[str, str]]) -> None:
+        """Delete document-to-document relationships of a type between (source, target) keys"""
+        table = self.relationships.get((rel_type, "Document", "Document"))
+        if table is not None:
+            table.rows = {k: v for k, v in table.rows.items() if (k[0], k[1]) not in pairs}
+
+    def delete_nodes(self, id_space: str, keys: Set[str]) -> int:
+        """DETACH DELETE nodes of an ID space; returns the number deleted"""
+        table = self.node_table(id_space)
+        deleted = [key for key in keys if key in table.props]
+        for key in deleted:
+            del table.props[key]
+            del table.labels[key]
+        if deleted:
+            gone = set(deleted)
+            for (_, start, end), rel_table in self.relationships.items():
+                if id_space in (start, end):
+                    rel_table.rows = {
+                        k: v
+                        for k, v in rel_table.rows.items()
+                        if not (
+                            (start == id_space and k[0] in gone)
+                            or (end == id_space and k[1] in gone)
+                        )
+                    }
+        return len(deleted)
+
+    @classmethod
+    def from_batch(cls, batch: GraphBatch, agents: Optional[Iterable[str]] = None) -> "GraphExport":
+        """Replay the build statements of a fully collected batch
+
+        Mentions of documents in the batch are promoted to REFERENCES edges in
+        the batch, as the builder does; other mentions are recorded as pending
+        edges. Team edges need an existing Agent node;
+        agents default to those created by Neo4jInitializer.
+        """
+        export = cls(agents=set(agents) if agents is not None else {n for _, n, _ in AGENTS})
+        for statement in batch.node_statements():
+            export.apply(statement.op, statement.rows)
+
+        for mention in batch.mentions:
+            if not export.document(mention["source_id"]):
+                continue
+            if export.document(mention["target_id"]):
+                batch.add_relationship("REFERENCES", mention["source_id"], mention["target_id"])
+            else:
+                export.pending_edges.append({"type": "REFERENCES", **mention})
+        batch.mentions.clear()
+
+        for statement in batch.edge_statements():
+            export.apply(statement.op, statement.rows)
+
+        export.pending_edges = list(
+            {(e["type"], e["source_id"], e["target_id"]): e for e in export.pending_edges}.values()
+        )
+        return export
+
+    def node_counts(self) -> Dict[str, int]:
+        """Expected node count per label"""
+        counts: Dict[str, int] = {}
+        for table in self.nodes.values():
+            for labels in table.labels.values():
+                for label in labels:
+                    counts[label] = counts.get(label, 0) + 1
+        return dict(sorted(counts.items()))
+
+    def relationship_counts(self) -> Dict[str, int]:
+        """Expected relationship count per type"""
+        counts: Dict[str, int] = {}
+        for table in self.relationships.values():
+            counts[table.rel_type] = counts.get(table.rel_type, 0) + len(table)
+        return dict(sorted(counts.items()))
+
+    @staticmethod
+    def _write_csv(path: Path, header: List[str], rows: Iterable[List[Any]]) -> None:
+        # Strings are quoted so that "" (empty string) differs from an unset property
+        with open(path, "w", newline="") as f:
+            for row in itertools.chain([header], rows):
+                f.write(",".join(csv_cell(value) for value in row) + "\r\n")
+
+    def write(
+        self, output_dir: Path, database: str = "neo4j", failed_documents: int = 0
+    ) -> Dict[str, Any]:
+        """Write one CSV per node ID space and relationship table, and the manifest"""
+        output_dir.mkdir(parents=True, exist_ok=True)
+        node_files: List[str] = []
+        relationship_files: List[str] = []
+
+        for id_space, table in sorted(self.nodes.items()):
+            if not table:
+                continue
+            columns = sorted({name for props in table.props.values() for name in props})
+            types = {
+                name: column_type(props[name] for props in table.props.values() if name in props)
+                for name in columns
+            }
+            path = output_dir / f"nodes_{id_space}.csv"
+            self._write_csv(
+                path,
+                [f":ID({id_space})"] + [f"{name}:{types[name]}" for name in columns] + [":LABEL"],
+                (
+                    [key]
+                    + [format_cell(props.get(name), types[name]) for name in columns]
+                    + [ARRAY_DELIMITER.join(sorted(table.labels[key]))]
+                    for key, props in table.props.items()
+                ),
+            )
+            node_files.append(path.name)
+
+        for (rel_type, start_space, end_space), rel_table in sorted(self.relationships.items()):
+            if not rel_table:
+                continue
+            columns = sorted({name for props in rel_table.rows.values() for name in props})
+            types = {
+                name: column_type(props[name] for props in rel_table.rows.values() if name in props)
+                for name in columns
+            }
+            path = output_dir / f"relationships_{rel_type}_{start_space}_{end_space}.csv"
+            self._write_csv(
+                path,
+                [f":START_ID({start_space})", f":END_ID({end_space})"]
+                + [f"{name}:{types[name]}" for name in columns]
+                + [":TYPE"],
+                (
+                    [start, end]
+                    + [format_cell(props.get(name), types[name]) for name in columns]
+                    + [rel_type]
+                    for (start, end, _), props in rel_table.rows.items()
+                ),
+            )
+            relationship_files.append(path.name)
+
+        manifest = {
+            "database": database,
+            "node_files": node_files,
+            "relationship_files": relationship_files,
+            "node_counts": self.node_counts(),
+            "relationship_counts": self.relationship_counts(),
+            "pending_edges": len(self.pending_edges),
+            "failed_documents": failed_documents,
+            "command": import_command(output_dir, node_files, relationship_files, database),
+        }
+        with open(output_dir / MANIFEST_NAME, "w") as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+
+def import_command(
+    output_dir: Path, node_files: List[str], relationship_files: List[str], database: str
+) -> str:
+    """neo4j-admin command importing the CSVs into an empty (or new) database"""
+    parts = [
+        "neo4j-admin",
+        "database",
+        "import",
+        "full",
+        f"--array-delimiter={ARRAY_DELIMITER}",
+    ]
+    parts += [f"--nodes={output_dir / name}" for name in node_files]
+    parts += [f"--relationships={output_dir / name}" for name in relationship_files]
+    parts.append(database)
+    return " ".join(shlex.quote(part) for part in parts)
+
+
+def collect_corpus(builder: GraphBuilder, directory: Path) -> Tuple[GraphBatch, int]:
+    """Collect every document under directory into one batch (ignoring the cache)"""
+    batch = GraphBatch()
+    failed = 0
+    for yaml_file in document_files(directory):
+        if not builder._collect_document(batch, yaml_file, force=True):
+            failed += 1
+    return batch, failed
+
+
+def seed_builder_index(builder: GraphBuilder, batch: GraphBatch, export: GraphExport) -> None:
+    """Record the exported documents as built, as a transactional build would"""
+    owned: Dict[str, Set[Tuple[str, str]]] = {doc_id: set() for doc_id in batch.document_ids}
+    for edge in batch.document_edges() + export.pending_edges:
+        if edge["source_id"] in owned:
+            owned[edge["source_id"]].add((edge["type"], edge["target_id"]))
+
+    builder.processed_docs.update(batch.pending)
+    builder.file_stats.update(batch.file_stats)
+    builder.document_ids.update(batch.document_ids)
+    builder.owned_edges.update(
+        {doc_id: [list(edge) for edge in sorted(edges)] for doc_id, edges in owned.items()}
+    )
+    builder.pending_edges = [dict(edge) for edge in export.pending_edges]
+    builder._save_processed_cache()
+    builder._save_graph_index()
+
+
+def export_graph(
+    builder: GraphBuilder,
+    directory: Path,
+    output_dir: Path,
+    database: Optional[str] = None,
+    seed_cache: bool = False,
+) -> Dict[str, Any]:
+    """Export the corpus under directory as neo4j-admin CSVs; returns the manifest"""
+    batch, failed = collect_corpus(builder, directory)
+    export = GraphExport.from_batch(batch)
+    manifest = export.write(output_dir, database or builder.database, failed)
+    if seed_cache:
+        seed_builder_index(builder, batch, export)
+    return manifest
+
+
+def verify_import(builder: GraphBuilder, output_dir: Path) -> Dict[str, Any]:
+    """Compare an imported database with the manifest written by export_graph
+
+    Run right after the import: schema setup (Neo4jInitializer) adds System,
+    DocumentType and more Agent nodes. Every Document id in the export must
+    exist.
+    """
+    with open(output_dir / MANIFEST_NAME, "r") as f:
+        manifest = json.load(f)
+
+    stats = builder.get_statistics(refresh=True)
+    if "error" in stats:
+        return {"ok": False, "error": stats["error"]}
+
+    mismatches: Dict[str, Dict[str, int]] = {}
+    for kind, counts in (
+        ("node_counts", manifest["node_counts"]),
+        ("relationship_counts", manifest["relationship_counts"]),
+    ):
+        actual_counts = stats.get(kind, {})
+        for name, expected in counts.items():
+            actual = actual_counts.get(name, 0)
+            if actual != expected:
+                mismatches[name] = {"expected": expected, "actual": actual}
+
+    missing: List[str] = []
+    if builder.driver is not None and "nodes_Document.csv" in manifest["node_files"]:
+        with open(output_dir / "nodes_Document.csv", newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            ids = [json.loads(row[0]) for row in reader]
+        with builder.driver.session(database=builder.database) as session:
+            record = session.run(MISSING_DOCUMENTS_QUERY, ids=ids).single()
+            missing = list(record["missing"]) if record else []
+
+    return {
+        "ok": not mismatches and not missing,
+        "mismatches": mismatches,
+        "missing_documents": missing,
+    }
+
+
+@click.command()
+@click.argument("path", type=click.Path(exists=True), default="context")
+@click.option("--output", default="graph_import", help="Directory for the CSVs and manifest")
+@click.option("--database", help="Target database name (defaults to the configured one)")
+@click.option("--seed-cache", is_flag=True, help="Record exported documents as built")
+@click.option("--verify", is_flag=True, help="Verify an imported database against --output")
+@click.option("--username", default="neo4j", help="Neo4j username")
+@click.option("--password", help="Neo4j password (required with --verify)")
+@click.option("--verbose", is_flag=True, help="Show detailed output")
+def main(
+    path: str,
+    output: str,
+    database: Optional[str],
+    seed_cache: bool,
+    verify: bool,
+    username: str,
+    password: Optional[str],
+    verbose: bool,
+):
+    """Export the context graph as CSVs for neo4j-admin database import"""
+    builder = GraphBuilder(verbose=verbose)
+    if database:
+        builder.database = database
+    output_dir = Path(output)
+
+    if verify:
+        if not builder.connect(username=username, password=password):
+            click.echo("Failed to connect to Neo4j", err=True)
+            return
+        try:
+            result = verify_import(builder, output_dir)
+        finally:
+            builder.close()
+
+        if result["ok"]:
+            click.echo("✓ Imported graph matches the export")
+            return
+        if "error" in result:
+            click.echo(f"✗ Verification failed: {result['error']}", err=True)
+            return
+        for name, counts in result["mismatches"].items():
+            click.echo(f"✗ {name}: expected {counts['expected']}, found {counts['actual']}")
+        if result["missing_documents"]:
+            click.echo(f"✗ Missing documents: {', '.join(result['missing_documents'][:20])}")
+        return
+
+    manifest = export_graph(builder, Path(path), output_dir, database, seed_cache=seed_cache)
+
+    click.echo("=== Graph Export ===\n")
+    for label, count in manifest["node_counts"].items():
+        click.echo(f"  {label}: {count}")
+    for rel_type, count in manifest["relationship_counts"].items():
+        click.echo(f"  {rel_type}: {count}")
+    if manifest["pending_edges"]:
+        click.echo(f"  Pending relationships (target not in corpus): {manifest['pending_edges']}")
+    if manifest["failed_documents"]:
+        click.echo(f"  Failed documents: {manifest['failed_documents']}", err=True)
+    click.echo("\nImport into a stopped or new database with:")
+    click.echo(f"  {manifest['command']}")
+    click.echo("Then create constraints and indexes with src.storage.neo4j_init")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,22 +7,42 @@ This component:
 2. Only re-embeds changed content
 3. Manages embedding cache efficiently
 4. Provides incremental updates to Qdrant
+5. Writes sparse lexical vectors alongside embeddings for hybrid search
 """
 
 import hashlib
 import json
 import os
 import time
+import uuid
 from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, cast
+from typing import Any, Dict, List, Optional, Set, Tuple, cast
 
 import click
 import openai
 import yaml
 from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct
+from qdrant_client.models import FilterSelector, PointIdsList, PointStruct
+
+from src.core.utils import to_epoch_seconds
+from src.storage.hybrid import has_sparse_vectors, point_vector
+from src.storage.qdrant_batcher import QdrantUpsertBatcher, stale_points_filter
+from src.storage.query_cache import QueryResultCache, vector_scope
+from src.storage.vector_mirror import LocalVectorMirror
+
+# Fixed namespace so every environment derives the same point IDs
+POINT_ID_NAMESPACE = uuid.UUID("6f1c2b9e-3d4a-5e7f-8a9b-0c1d2e3f4a5b")
+
+
+def compute_point_id(document_id: str, chunk_index: int = 0) -> str:
+    """Derive a stable Qdrant point ID (UUIDv5) for a document chunk
+
+    Re-embedding a document yields the same ID, so the upsert overwrites the
+    previous vector in place instead of creating a new point.
+    """
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{document_id}#{chunk_index}"))
 
 
 @dataclass
@@ -40,8 +60,14 @@ class DocumentHash:
 class HashDiffEmbedder:
     """Smart embedder with hash-based change detection"""
 
-    def __init__(self, config_path: str = ".ctxrc.yaml", verbose: bool = False):
+    def __init__(
+        self,
+        config_path: str = ".ctxrc.yaml",
+        verbose: bool = False,
+        perf_config_path: str = "performance.yaml",
+    ):
         self.config = self._load_config(config_path)
+        self.perf_config = self._load_perf_config(perf_config_path)
         self.hash_cache_path = Path("context/.embeddings_cache/hash_cache.json")
         self.hash_cache: Dict[str, DocumentHash] = self._load_hash_cache()
         self.client: Optional[QdrantClient] = None
@@ -49,6 +75,19 @@ class HashDiffEmbedder:
             "embedding_model", "text-embedding-ada-002"
         )
         self.verbose = verbose
+        self.batcher: Optional[QdrantUpsertBatcher] = None
+        self.query_cache: Optional[QueryResultCache] = None
+        self.sparse_vectors = False
+
+        # Batched upsert settings
+        upsert_config = self.perf_config.get("vector_db", {}).get("upsert", {})
+        self.upsert_batch_size = upsert_config.get("batch_size", 256)
+        self.upsert_max_batch_bytes = upsert_config.get("max_batch_bytes", 8 * 1024 * 1024)
+        self.upsert_wait = upsert_config.get("wait", False)
+
+        # Local vector mirror settings
+        self.mirror_config = self.perf_config.get("vector_db", {}).get("mirror", {})
+        self.cache_config = self.perf_config.get("vector_db", {}).get("cache", {})
 
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from .ctxrc.yaml"""
@@ -60,6 +99,15 @@ class HashDiffEmbedder:
             click.echo(f"Error: {config_path} not found", err=True)
             return {}
 
+    def _load_perf_config(self, perf_config_path: str) -> Dict[str, Any]:
+        """Load performance configuration"""
+        try:
+            with open(perf_config_path, "r") as f:
+                result = yaml.safe_load(f)
+                return cast(Dict[str, Any], result) if isinstance(result, dict) else {}
+        except FileNotFoundError:
+            return {}
+
     def _load_hash_cache(self) -> Dict[str, DocumentHash]:
         """Load hash cache from disk"""
         if self.hash_cache_path.exists():
@@ -97,10 +145,22 @@ class HashDiffEmbedder:
         host = qdrant_config.get("host", "localhost")
         port = qdrant_config.get("port", 6333)
 
+        client_kwargs: Dict[str, Any] = {"host": host, "port": port, "timeout": 5}
+        if qdrant_config.get("prefer_grpc", False):
+            client_kwargs["prefer_grpc"] = True
+            client_kwargs["grpc_port"] = qdrant_config.get("grpc_port", 6334)
+
         try:
-            self.client = QdrantClient(host=host, port=port, timeout=5)
+            self.client = QdrantClient(**client_kwargs)
             if self.client is not None:
                 self.client.get_collections()
+                self.sparse_vectors = self._collection_has_sparse_vectors()
+
+            # Search result caches are invalidated through a shared collection epoch
+            if self.cache_config.get("enabled", False):
+                self.query_cache = QueryResultCache.from_config(
+                    self.config, self.cache_config, verbose=self.verbose
+                )
 
             # Check OpenAI API key
             api_key = os.getenv("OPENAI_API_KEY")
@@ -123,6 +183,23 @@ class HashDiffEmbedder:
             click.echo(f"Failed to connect: {e}", err=True)
             return False
 
+    def _collection_has_sparse_vectors(self) -> bool:
+        """Whether the collection declares the sparse vector used for hybrid search"""
+        if self.client is None:
+            return False
+        collection_name = self.config.get("qdrant", {}).get("collection_name", "project_context")
+        try:
+            return has_sparse_vectors(self.client.get_collection(collection_name))
+        except Exception:
+            return False
+
+    def _invalidate_query_cache(self) -> None:
+        """Bump the collection epoch so cached search results are recomputed"""
+        if self.query_cache is None:
+            return
+        collection_name = self.config.get("qdrant", {}).get("collection_name", "project_context")
+        self.query_cache.bump_epoch(vector_scope(collection_name))
+
     def needs_embedding(self, file_path: Path) -> Tuple[bool, Optional[str]]:
         """Check if a document needs re-embedding"""
         try:
@@ -206,32 +283,58 @@ class HashDiffEmbedder:
             embedding = response.data[0].embedding
             embedding_hash = self._compute_embedding_hash(embedding)
 
-            # Generate vector ID
+            # Stable vector ID so re-embedding overwrites the point in place
             doc_id = data.get("id", file_path.stem)
-            vector_id = f"{doc_id}-{embedding_hash[:8]}"
+            vector_id = compute_point_id(doc_id)
+
+            # A previous version only needs deleting if it lives under another ID
+            # (legacy "<doc_id>-<hash>" IDs or a changed document id)
+            cached = self.hash_cache.get(str(file_path))
+            previous_id = existing_id or (cached.vector_id if cached else None)
+            replaces_existing = bool(previous_id and previous_id != vector_id)
 
             # Prepare payload
             payload = {
                 "document_id": doc_id,
+                "chunk_index": 0,
                 "document_type": data.get("document_type", "unknown"),
                 "file_path": str(file_path),
                 "title": data.get("title", ""),
                 "created_date": data.get("created_date", ""),
                 "last_modified": data.get("last_modified", ""),
+                "last_modified_epoch": to_epoch_seconds(data.get("last_modified")),
                 "content_hash": self._compute_content_hash(yaml.dump(data)),
                 "embedding_hash": embedding_hash,
                 "embedded_at": datetime.now().isoformat(),
             }
+            # Sprint documents are filtered by number (integer payload index)
+            if isinstance(data.get("sprint_number"), int):
+                payload["sprint_number"] = data["sprint_number"]
 
             # Store in Qdrant
             collection_name = self.config.get("qdrant", {}).get(
                 "collection_name", "project_context"
             )
-            if self.client is not None:
-                self.client.upsert(
-                    collection_name=collection_name,
-                    points=[PointStruct(id=vector_id, vector=embedding, payload=payload)],
-                )
+            point = PointStruct(
+                id=vector_id,
+                vector=point_vector(embedding, embedding_text, self.sparse_vectors),
+                payload=payload,
+            )
+            if self.batcher is not None:
+                # Only documents stored under another ID need their old points removed
+                self.batcher.add(point, replaces_existing=replaces_existing)
+            elif self.client is not None:
+                self.client.upsert(collection_name=collection_name, points=[point])
+                # Remove the version stored under another ID, matched by file path
+                # since legacy IDs are not valid in an ID list
+                if replaces_existing:
+                    self.client.delete(
+                        collection_name=collection_name,
+                        points_selector=FilterSelector(
+                            filter=stale_points_filter("file_path", [str(file_path)], [vector_id])
+                        ),
+                    )
+                self._invalidate_query_cache()
 
             # Update cache
             self.hash_cache[str(file_path)] = DocumentHash(
@@ -243,10 +346,6 @@ class HashDiffEmbedder:
                 vector_id=vector_id,
             )
 
-            # Delete old version if exists
-            if existing_id and existing_id != vector_id and self.client is not None:
-                self.client.delete(collection_name=collection_name, points_selector=[existing_id])
-
             return vector_id
 
         except Exception as e:
@@ -258,62 +357,157 @@ class HashDiffEmbedder:
         embedded_count = 0
         total_count = 0
 
-        for yaml_file in directory.rglob("*.yaml"):
-            # Skip schemas and other system files
-            if any(skip in yaml_file.parts for skip in ["schemas", ".embeddings_cache", "archive"]):
-                continue
+        if self.client is not None:
+            collection_name = self.config.get("qdrant", {}).get(
+                "collection_name", "project_context"
+            )
+            self.batcher = QdrantUpsertBatcher(
+                self.client,
+                collection_name,
+                batch_size=self.upsert_batch_size,
+                max_batch_bytes=self.upsert_max_batch_bytes,
+                wait=self.upsert_wait,
+                verbose=self.verbose,
+            )
 
-            total_count += 1
-            vector_id = self.embed_document(yaml_file, force=force)
-            if vector_id:
-                embedded_count += 1
+        try:
+            for yaml_file in directory.rglob("*.yaml"):
+                # Skip schemas and other system files
+                if any(
+                    skip in yaml_file.parts for skip in ["schemas", ".embeddings_cache", "archive"]
+                ):
+                    continue
+
+                total_count += 1
+                vector_id = self.embed_document(yaml_file, force=force)
+                if vector_id:
+                    embedded_count += 1
+        finally:
+            if self.batcher is not None:
+                self.batcher.close()
+
+                # Documents from failed batches are re-embedded on the next run
+                for failed_path in self.batcher.failed_keys:
+                    if self.hash_cache.pop(failed_path, None) is not None:
+                        embedded_count -= 1
+                if self.batcher.flushed_points:
+                    self._invalidate_query_cache()
+                self.batcher = None
 
         # Save cache after batch
         self._save_hash_cache()
 
         return embedded_count, total_count
 
-    def cleanup_orphaned_vectors(self) -> int:
-        """Remove vectors for documents that no longer exist"""
+    def _walk_existing_files(self, root: Path) -> Set[str]:
+        """Collect every file path under root with a single directory walk"""
+        existing: Set[str] = set()
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                existing.add(os.path.normpath(os.path.join(dirpath, filename)))
+        return existing
+
+    def cleanup_orphaned_vectors(
+        self,
+        root: Path = Path("context"),
+        page_size: int = 1000,
+        delete_batch_size: int = 1000,
+    ) -> int:
+        """Remove vectors for documents that no longer exist
+
+        Streams every point (file_path payload only, no vectors), compares it with
+        one walk of root and deletes orphans in batches of point IDs.
+        """
         collection_name = self.config.get("qdrant", {}).get("collection_name", "project_context")
         removed_count = 0
 
-        # Get all vectors from Qdrant
         try:
-            # Scroll through all points
             if self.client is None:
                 return 0
-            points, _ = self.client.scroll(
-                collection_name=collection_name, limit=1000, with_payload=True
-            )
 
-            for point in points:
-                # Check if file still exists
-                if point.payload:
-                    file_path = Path(point.payload.get("file_path", ""))
-                    if not file_path.exists():
+            root_norm = os.path.normpath(root)
+            root_prefix = "" if root_norm == os.curdir else root_norm + os.sep
+            existing_files = self._walk_existing_files(root)
+
+            orphan_ids: List[Any] = []
+            orphan_paths: List[str] = []
+            offset = None
+
+            while True:
+                points, next_offset = self.client.scroll(
+                    collection_name=collection_name,
+                    limit=page_size,
+                    offset=offset,
+                    with_payload=["file_path"],
+                    with_vectors=False,
+                )
+
+                for point in points:
+                    # Points without a source file are not managed by the embedder
+                    if not point.payload or not point.payload.get("file_path"):
+                        continue
+                    file_path = str(point.payload["file_path"])
+                    normalized = os.path.normpath(file_path)
+
+                    # Paths under root are answered by the walk; anything else
+                    # (absolute or out-of-tree paths) falls back to a stat call
+                    under_root = normalized.startswith(root_prefix) and (
+                        os.path.isabs(normalized) == os.path.isabs(root_norm)
+                    )
+                    if under_root:
+                        exists = normalized in existing_files
+                    else:
+                        exists = Path(file_path).exists()
+
+                    if not exists:
                         if self.verbose:
                             click.echo(f"  Removing orphaned vector: {point.id}")
+                        orphan_ids.append(point.id)
+                        orphan_paths.append(file_path)
 
-                        if self.client is not None:
-                            self.client.delete(
-                                collection_name=collection_name, points_selector=[point.id]
-                            )
-                        removed_count += 1
+                if next_offset is None:
+                    break
+                offset = next_offset
 
-                        # Remove from cache
-                        cache_key = str(file_path)
-                        if cache_key in self.hash_cache:
-                            del self.hash_cache[cache_key]
+            for i in range(0, len(orphan_ids), delete_batch_size):
+                batch = orphan_ids[i : i + delete_batch_size]
+                self.client.delete(
+                    collection_name=collection_name,
+                    points_selector=PointIdsList(points=batch),
+                )
+                removed_count += len(batch)
+
+            # Remove from cache
+            for cache_key in orphan_paths:
+                self.hash_cache.pop(cache_key, None)
 
             if removed_count > 0:
                 self._save_hash_cache()
+                self._invalidate_query_cache()
 
         except Exception as e:
             click.echo(f"Error during cleanup: {e}", err=True)
 
         return removed_count
 
+    def sync_vector_mirror(self) -> Dict[str, int]:
+        """Refresh the local vector mirror for documents in the hash index"""
+        if not self.client:
+            return {"fetched": 0, "removed": 0, "total": 0}
+
+        mirror = LocalVectorMirror(
+            path=Path(self.mirror_config.get("path", "context/.embeddings_cache/vector_mirror")),
+            dtype=self.mirror_config.get("dtype", "float16"),
+            verbose=self.verbose,
+        )
+        collection_name = self.config.get("qdrant", {}).get("collection_name", "project_context")
+
+        try:
+            return mirror.sync(self.client, collection_name, self.hash_cache)
+        except Exception as e:
+            click.echo(f"Error syncing vector mirror: {e}", err=True)
+            return {"fetched": 0, "removed": 0, "total": len(mirror)}
+
 
 @click.command()
 @click.argument("path", type=click.Path(exists=True), default="context")
@@ -331,14 +525,16 @@ def main(path: str, force: bool, cleanup: bool, verbose: bool):
 
     click.echo("=== Hash-Diff Embedder ===\n")
 
+    path_obj = Path(path)
+
     # Cleanup orphaned vectors if requested
     if cleanup:
         click.echo("Cleaning up orphaned vectors...")
-        removed = embedder.cleanup_orphaned_vectors()
+        cleanup_root = path_obj if path_obj.is_dir() else path_obj.parent
+        removed = embedder.cleanup_orphaned_vectors(root=cleanup_root)
         click.echo(f"Removed {removed} orphaned vectors\n")
 
     # Embed documents
-    path_obj = Path(path)
     if path_obj.is_file():
         vector_id = embedder.embed_document(path_obj, force=force)
         if vector_id:
@@ -351,6 +547,10 @@ def main(path: str, force: bool, cleanup: bool, verbose: bool):
         click.echo(f"  Embedded: {embedded}/{total}")
         click.echo(f"  Skipped: {total - embedded} (no changes)")
 
+    if embedder.mirror_config.get("enabled", False):
+        stats = embedder.sync_vector_mirror()
+        click.echo(f"  Vector mirror: {stats['total']} vectors ({stats['fetched']} fetched)")
+
     click.echo("\n✓ Embedding complete!")
 
 
@@ -6,6 +6,7 @@ This component:
 1. Provides async/batch processing for OpenAI embeddings
 2. Implements better rate limiting and concurrency control
 3. Supports parallel document processing
+4. Groups the point writes of concurrent tasks into batched upserts
 """
 
 import asyncio
@@ -23,7 +24,13 @@ import click
 import yaml
 from openai import AsyncOpenAI
 from qdrant_client import AsyncQdrantClient
-from qdrant_client.models import PointStruct
+from qdrant_client.models import FilterSelector, PointStruct
+
+from src.core.utils import to_epoch_seconds
+from src.storage.hash_diff_embedder import compute_point_id
+from src.storage.hybrid import has_sparse_vectors, point_vector
+from src.storage.qdrant_batcher import AsyncQdrantUpsertBatcher, stale_points_filter
+from src.storage.query_cache import QueryResultCache, vector_scope
 
 
 @dataclass
@@ -55,6 +62,9 @@ class AsyncHashDiffEmbedder:
             "embedding_model", "text-embedding-ada-002"
         )
         self.verbose = verbose
+        self.batcher: Optional[AsyncQdrantUpsertBatcher] = None
+        self.query_cache: Optional[QueryResultCache] = None
+        self.sparse_vectors = False
 
         # Performance settings
         embed_config = self.perf_config.get("vector_db", {}).get("embedding", {})
@@ -64,6 +74,12 @@ class AsyncHashDiffEmbedder:
         self.retry_backoff_factor = embed_config.get("retry_backoff_factor", 2.0)
         self.request_timeout = embed_config.get("request_timeout", 30)
 
+        # Batched upsert settings
+        upsert_config = self.perf_config.get("vector_db", {}).get("upsert", {})
+        self.upsert_batch_size = upsert_config.get("batch_size", 256)
+        self.upsert_max_batch_bytes = upsert_config.get("max_batch_bytes", 8 * 1024 * 1024)
+        self.upsert_wait = upsert_config.get("wait", False)
+
         # Rate limiting
         self.semaphore = asyncio.Semaphore(10)  # Max concurrent API calls
 
@@ -114,6 +130,7 @@ class AsyncHashDiffEmbedder:
             # Test connection
             if self.client is not None:
                 await self.client.get_collections()
+                self.sparse_vectors = await self._collection_has_sparse_vectors()
 
             # Initialize OpenAI client
             api_key = os.getenv("OPENAI_API_KEY")
@@ -123,12 +140,28 @@ class AsyncHashDiffEmbedder:
 
             self.openai_client = AsyncOpenAI(api_key=api_key)
 
+            cache_config = self.perf_config.get("vector_db", {}).get("cache", {})
+            if cache_config.get("enabled", False):
+                self.query_cache = QueryResultCache.from_config(
+                    self.config, cache_config, verbose=self.verbose
+                )
+
             return True
 
         except Exception as e:
             click.echo(f"Failed to connect: {e}", err=True)
             return False
 
+    async def _collection_has_sparse_vectors(self) -> bool:
+        """Whether the collection declares the sparse vector used for hybrid search"""
+        if self.client is None:
+            return False
+        collection_name = self.config.get("qdrant", {}).get("collection_name", "project_context")
+        try:
+            return has_sparse_vectors(await self.client.get_collection(collection_name))
+        except Exception:
+            return False
+
     async def _embed_with_retry(self, text: str) -> List[float]:
         """Embed text with retry logic"""
         retry_delay = self.initial_retry_delay
@@ -171,32 +204,57 @@ class AsyncHashDiffEmbedder:
             # Get embedding
             embedding = await self._embed_with_retry(embedding_text)
 
-            # Generate vector ID
+            # Stable vector ID so re-embedding overwrites the point in place
             embedding_hash = hashlib.sha256(json.dumps(embedding).encode()).hexdigest()
-            vector_id = f"{task.document_id}-{embedding_hash[:8]}"
+            vector_id = compute_point_id(task.document_id)
+
+            # A previous version under another ID (legacy "<doc_id>-<hash>" IDs or
+            # a changed document id) is deleted after the upsert
+            cached = self.hash_cache.get(str(task.file_path), {})
+            previous_id = cached.get("vector_id")
+            replaces_existing = bool(previous_id and previous_id != vector_id)
 
             # Prepare payload
             payload = {
                 "document_id": task.document_id,
+                "chunk_index": 0,
                 "document_type": task.data.get("document_type", "unknown"),
                 "file_path": str(task.file_path),
                 "title": task.data.get("title", ""),
                 "created_date": task.data.get("created_date", ""),
                 "last_modified": task.data.get("last_modified", ""),
+                "last_modified_epoch": to_epoch_seconds(task.data.get("last_modified")),
                 "content_hash": hashlib.sha256(task.content.encode()).hexdigest(),
                 "embedding_hash": embedding_hash,
                 "embedded_at": datetime.now().isoformat(),
             }
+            # Sprint documents are filtered by number (integer payload index)
+            if isinstance(task.data.get("sprint_number"), int):
+                payload["sprint_number"] = task.data["sprint_number"]
 
             # Store in Qdrant
             collection_name = self.config.get("qdrant", {}).get(
                 "collection_name", "project_context"
             )
-            if self.client is not None:
-                await self.client.upsert(
-                    collection_name=collection_name,
-                    points=[PointStruct(id=vector_id, vector=embedding, payload=payload)],
-                )
+            point = PointStruct(
+                id=vector_id,
+                vector=point_vector(embedding, embedding_text, self.sparse_vectors),
+                payload=payload,
+            )
+            if self.batcher is not None:
+                # Only documents stored under another ID need their old points removed
+                await self.batcher.add(point, replaces_existing=replaces_existing)
+            elif self.client is not None:
+                await self.client.upsert(collection_name=collection_name, points=[point])
+                if replaces_existing:
+                    await self.client.delete(
+                        collection_name=collection_name,
+                        points_selector=FilterSelector(
+                            filter=stale_points_filter(
+                                "file_path", [str(task.file_path)], [vector_id]
+                            )
+                        ),
+                    )
 
             # Update cache
             self.hash_cache[str(task.file_path)] = {
@@ -258,22 +316,48 @@ class AsyncHashDiffEmbedder:
         if not tasks:
             return 0, total_count
 
+        collection_name = self.config.get("qdrant", {}).get("collection_name", "project_context")
+        if self.client is not None:
+            self.batcher = AsyncQdrantUpsertBatcher(
+                self.client,
+                collection_name,
+                batch_size=self.upsert_batch_size,
+                max_batch_bytes=self.upsert_max_batch_bytes,
+                wait=self.upsert_wait,
+                verbose=self.verbose,
+            )
+
         # Process in batches
         embedded_count = 0
-        for i in range(0, len(tasks), self.batch_size):
-            batch = tasks[i : i + self.batch_size]
-            if self.verbose:
-                click.echo(
-                    f"\nProcessing batch {i//self.batch_size + 1}/"
-                    f"{(len(tasks) + self.batch_size - 1)//self.batch_size}"
+        try:
+            for i in range(0, len(tasks), self.batch_size):
+                batch = tasks[i : i + self.batch_size]
+                if self.verbose:
+                    click.echo(
+                        f"\nProcessing batch {i//self.batch_size + 1}/"
+                        f"{(len(tasks) + self.batch_size - 1)//self.batch_size}"
+                    )
+
+                # Process batch concurrently; points are written by the shared batcher
+                results = await asyncio.gather(
+                    *[self._process_embedding_task(task) for task in batch],
+                    return_exceptions=True,
                 )
 
-            # Process batch concurrently
-            results = await asyncio.gather(
-                *[self._process_embedding_task(task) for task in batch], return_exceptions=True
-            )
+                embedded_count += sum(1 for r in results if r and not isinstance(r, Exception))
+        finally:
+            if self.batcher is not None:
+                await self.batcher.close()
+
+                # Documents from failed batches are re-embedded on the next run
+                for failed_path in self.batcher.failed_keys:
+                    if self.hash_cache.pop(failed_path, None) is not None:
+                        embedded_count -= 1
+                self.batcher = None
 
-            embedded_count += sum(1 for r in results if r and not isinstance(r, Exception))
+        # Invalidate cached search results for the collection
+        if embedded_count and self.query_cache is not None:
+            self.query_cache.bump_epoch(vector_scope(collection_name))
 
         # Save cache
         self.hash_cache_path.parent.mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+hybrid.py: Sparse lexical vectors and rank fusion for hybrid retrieval
+
+This component:
+1. Tokenizes documents and queries so exact identifiers (ADR IDs, issue
+   numbers, function names) survive as terms
+2. Encodes term frequencies as Qdrant sparse vectors; the collection applies
+   the IDF modifier, which turns dot products into BM25-style scores
+3. Fuses dense and sparse rankings with reciprocal rank fusion (RRF) or a
+   weighted sum of min-max normalized scores
+"""
+
+import hashlib
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from qdrant_client.models import SparseVector
+
+# Name of the sparse vector in the collection (the dense vector stays unnamed)
+SPARSE_VECTOR_NAME = "text"
+DENSE_VECTOR_NAME = ""
+
+# Identifier-like tokens: words joined by -, _, ., # or / ("ADR-012", "#123",
+# "hash_diff_embedder.py") are kept whole as well as split into their parts
+TOKEN_PATTERN = re.compile(r"#?[a-z0-9]+(?:[-_./#][a-z0-9]+)*")
+PART_PATTERN = re.compile(r"[a-z0-9]+")
+CAMEL_CASE_PATTERN = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+# BM25 term-frequency saturation (length normalization is omitted: b = 0)
+BM25_K1 = 1.2
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms, keeping compound identifiers and their parts"""
+    # camelCase -> camel case, so "searchSingle" matches "search single"
+    spaced = CAMEL_CASE_PATTERN.sub(" ", text)
+    terms: List[str] = []
+    for token in TOKEN_PATTERN.findall(spaced.lower()):
+        terms.append(token)
+        parts = PART_PATTERN.findall(token)
+        if len(parts) > 1 or parts[0] != token:
+            terms.extend(parts)
+    return terms
+
+
+def term_index(term: str) -> int:
+    """Stable 32-bit index for a term (Python's hash() is salted per process)"""
+    return int.from_bytes(hashlib.blake2b(term.encode(), digest_size=4).digest(), "big")
+
+
+def _sparse_vector(weights: Dict[int, float]) -> SparseVector:
+    indices = sorted(weights)
+    return SparseVector(indices=indices, values=[weights[i] for i in indices])
+
+
+def encode_document(text: str) -> SparseVector:
+    """Sparse vector of saturated term frequencies for a document"""
+    weights: Dict[int, float] = {}
+    for term, tf in Counter(tokenize(text)).items():
+        index = term_index(term)
+        weights[index] = weights.get(index, 0.0) + tf * (BM25_K1 + 1) / (tf + BM25_K1)
+    return _sparse_vector(weights)
+
+
+def encode_query(text: str) -> SparseVector:
+    """Sparse vector with unit weight per distinct query term"""
+    return _sparse_vector({term_index(term): 1.0 for term in set(tokenize(text))})
+
+
+def point_vector(embedding: List[float], text: str, with_sparse: bool) -> Any:
+    """Vector for a point upsert, adding the sparse vector when the collection has one"""
+    if not with_sparse:
+        return embedding
+    return {DENSE_VECTOR_NAME: embedding, SPARSE_VECTOR_NAME: encode_document(text)}
+
+
+def dense_vector(vector: Any) -> Optional[List[float]]:
+    """Extract the dense vector from a retrieved point vector"""
+    if isinstance(vector, dict):
+        vector = vector.get(DENSE_VECTOR_NAME, next(iter(vector.values()), None))
+    return vector if isinstance(vector, list) and vector else None
+
+
+def has_sparse_vectors(collection_info: Any) -> bool:
+    """Whether a collection (get_collection response) stores the sparse text vector"""
+    try:
+        sparse = collection_info.config.params.sparse_vectors
+    except AttributeError:
+        return False
+    return isinstance(sparse, dict) and SPARSE_VECTOR_NAME in sparse
+
+
+def fuse_rankings(
+    rankings: Sequence[Sequence[Any]],
+    scores: Optional[Sequence[Sequence[float]]] = None,
+    weights: Optional[Sequence[float]] = None,
+    method: str = "rrf",
+    rrf_k: int = 60,
+) -> Dict[Any, float]:
+    """Fuse ranked ID lists into one score per ID
+
+    "rrf" sums weight / (rrf_k + rank) and needs only the rankings; "weighted"
+    sums weight * min-max normalized score and needs the raw scores.
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused: Dict[Any, float] = {}
+
+    for i, ranking in enumerate(rankings):
+        if method == "weighted" and scores is not None:
+            list_scores = scores[i]
+            if not list_scores:
+                continue
+            low, high = min(list_scores), max(list_scores)
+            span = high - low
+            for item, score in zip(ranking, list_scores):
+                normalized = (score - low) / span if span > 0 else 1.0
+                fused[item] = fused.get(item, 0.0) + weights[i] * normalized
+        else:
+            for rank, item in enumerate(ranking, 1):
+                fused[item] = fused.get(item, 0.0) + weights[i] / (rrf_k + rank)
+
+    return fused
+
+
+def fuse_points(
+    point_lists: Sequence[Sequence[Any]],
+    weights: Optional[Sequence[float]] = None,
+    method: str = "rrf",
+    rrf_k: int = 60,
+) -> List[Tuple[Any, float, List[float]]]:
+    """Fuse ranked lists of scored points (e.g. dense and sparse query responses)
+
+    Returns (point, fused score, score in each list or 0.0) tuples, best first.
+    Fused scores are normalized to [0, 1], where 1 means ranked first (or scored
+    highest) in every list.
+    """
+    weights = list(weights or [1.0] * len(point_lists))
+    points: Dict[str, Any] = {}
+    list_scores: List[Dict[str, float]] = []
+    for point_list in point_lists:
+        scores: Dict[str, float] = {}
+        for point in point_list:
+            point_id = str(point.id)
+            points.setdefault(point_id, point)
+            scores[point_id] = point.score
+        list_scores.append(scores)
+
+    fused = fuse_rankings(
+        [list(scores) for scores in list_scores],
+        [list(scores.values()) for scores in list_scores],
+        weights,
+        method,
+        rrf_k,
+    )
+    best = float(sum(weights)) if method == "weighted" else sum(weights) / (rrf_k + 1)
+    ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)
+    return [
+        (
+            points[point_id],
+            score / best if best > 0 else 0.0,
+            [scores.get(point_id, 0.0) for scores in list_scores],
+        )
+        for point_id, score in ranked
+    ]
@@ -7,6 +7,8 @@ This script:
 2. Creates constraints and indexes
 3. Sets up node labels and relationship types
 4. Initializes the context graph schema
+5. Initializes the embedded graph instead when neo4j.backend is "embedded"
+   (it has no constraints or indexes, only the schema nodes)
 """
 
 import sys
@@ -17,6 +19,21 @@ import yaml
 from neo4j import Driver, GraphDatabase
 from neo4j.exceptions import AuthError, ServiceUnavailable
 
+# Agent nodes created with the schema: (id, name, description)
+AGENTS = [
+    ("code_agent", "Code Agent", "Primary implementation agent"),
+    ("doc_agent", "Documentation Agent", "Maintains documentation"),
+    ("pm_agent", "Project Manager Agent", "Manages sprints and tasks"),
+    ("ci_agent", "CI/CD Agent", "Handles testing and deployment"),
+]
+
+# Document type nodes: (id, name, semantic relationship type)
+DOCUMENT_TYPES = [
+    ("design", "Design Document", "DEFINES_ARCHITECTURE"),
+    ("decision", "Decision Record", "RECORDS_DECISION"),
+    ("sprint", "Sprint Plan", "TRACKS_PROGRESS"),
+]
+
 
 class Neo4jInitializer:
     """Initialize and configure Neo4j graph database"""
@@ -209,14 +226,7 @@ class Neo4jInitializer:
                 )
 
                 # Create agent nodes
-                agents = [
-                    ("code_agent", "Code Agent", "Primary implementation agent"),
-                    ("doc_agent", "Documentation Agent", "Maintains documentation"),
-                    ("pm_agent", "Project Manager Agent", "Manages sprints and tasks"),
-                    ("ci_agent", "CI/CD Agent", "Handles testing and deployment"),
-                ]
-
-                for agent_id, name, description in agents:
+                for agent_id, name, description in AGENTS:
                     session.run(
                         """
                         MERGE (a:Agent {name: $name})
@@ -239,13 +249,7 @@ class Neo4jInitializer:
                 )
 
                 # Create document type hierarchy
-                doc_types = [
-                    ("design", "Design Document", "DEFINES_ARCHITECTURE"),
-                    ("decision", "Decision Record", "RECORDS_DECISION"),
-                    ("sprint", "Sprint Plan", "TRACKS_PROGRESS"),
-                ]
-
-                for type_id, type_name, rel_type in doc_types:
+                for type_id, type_name, rel_type in DOCUMENT_TYPES:
                     # Create document type node with parameterized query
                     session.run(
                         """
@@ -363,6 +367,24 @@ def main(
 
     initializer = Neo4jInitializer()
 
+    # Import locally to avoid circular imports
+    from src.storage.graph_backend import create_backend
+
+    backend = create_backend(initializer.config)
+    if backend is not None:
+        system_config = initializer.config.get("system", {})
+        try:
+            if not skip_schema:
+                click.echo("Setting up embedded graph schema...")
+                backend.setup_schema(
+                    system_config.get("schema_version", "1.0.0"),
+                    system_config.get("created_date", "2025-07-11"),
+                )
+            click.echo("\n✓ Embedded graph initialization complete!")
+        finally:
+            backend.close()
+        return
+
     try:
         # Connect to Neo4j
         if not initializer.connect(username=username, password=password):
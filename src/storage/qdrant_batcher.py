@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+qdrant_batcher.py: Batched point writes for the Qdrant context collection
+
+This component:
+1. Buffers points and flushes them by point count and payload size
+2. Issues upserts with wait=False and a single blocking barrier at the end
+3. Coalesces stale-point deletions into one filter-based delete per batch, issued
+   only for documents whose point ID changed
+4. Tracks which documents were part of a failed batch so callers can retry them
+5. Provides the same batching for AsyncQdrantClient (AsyncQdrantUpsertBatcher)
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import click
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import (
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    HasIdCondition,
+    MatchAny,
+    PointStruct,
+)
+
+
+def stale_points_filter(stale_key: str, keys: Iterable[str], keep_ids: List[Any]) -> Filter:
+    """Filter matching the points of the given documents except the kept IDs
+
+    Deleting by filter works for any previous ID scheme, including legacy
+    "<doc_id>-<hash>" IDs that Qdrant rejects in an ID list.
+    """
+    return Filter(
+        must=[FieldCondition(key=stale_key, match=MatchAny(any=sorted(keys)))],
+        must_not=[HasIdCondition(has_id=keep_ids)],
+    )
+
+
+class _PointBuffer:
+    """Point buffer and counters shared by the sync and async batchers"""
+
+    def __init__(
+        self,
+        collection_name: str,
+        batch_size: int = 256,
+        max_batch_bytes: int = 8 * 1024 * 1024,
+        wait: bool = False,
+        stale_key: str = "file_path",
+        verbose: bool = False,
+    ):
+        self.collection_name = collection_name
+        self.batch_size = max(1, batch_size)
+        self.max_batch_bytes = max_batch_bytes
+        self.wait = wait
+        self.stale_key = stale_key
+        self.verbose = verbose
+
+        self._points: List[PointStruct] = []
+        self._stale_keys: Set[str] = set()
+        self._batch_bytes = 0
+        self._last_point: Optional[PointStruct] = None
+        self._unacknowledged = False
+
+        self.flushed_points = 0
+        self.requests = 0
+        self.failed_keys: List[str] = []
+
+    @staticmethod
+    def _estimate_point_bytes(point: PointStruct) -> int:
+        """Estimate the serialized size of a point (payload JSON + float32 vector)"""
+        payload_bytes = len(json.dumps(point.payload or {}, default=str))
+        vector = point.vector
+        if isinstance(vector, dict):
+            vector_len = sum(len(v) for v in vector.values() if isinstance(v, list))
+        elif isinstance(vector, list):
+            vector_len = len(vector)
+        else:
+            vector_len = 0
+        return payload_bytes + vector_len * 4
+
+    def _overflows(self, point_bytes: int) -> bool:
+        """Whether a point of this size must go into a new batch"""
+        return bool(self._points) and self._batch_bytes + point_bytes > self.max_batch_bytes
+
+    def _queue(self, point: PointStruct, point_bytes: int, replaces_existing: bool) -> bool:
+        """Buffer a point; returns True once the batch is full"""
+        self._points.append(point)
+        self._batch_bytes += point_bytes
+
+        if replaces_existing and point.payload and point.payload.get(self.stale_key):
+            self._stale_keys.add(str(point.payload[self.stale_key]))
+
+        return len(self._points) >= self.batch_size
+
+    def _take(self) -> Tuple[List[PointStruct], Set[str]]:
+        """Hand over the buffered points and stale keys, starting a new batch"""
+        points, stale_keys = self._points, self._stale_keys
+        self._points = []
+        self._stale_keys = set()
+        self._batch_bytes = 0
+        return points, stale_keys
+
+    def _stale_points_filter(self, points: List[PointStruct], keys: Set[str]) -> Optional[Filter]:
+        """Build a filter matching older points of the flagged documents"""
+        if not keys:
+            return None
+
+        return stale_points_filter(self.stale_key, keys, [p.id for p in points])
+
+    def _batch_failed(self, points: List[PointStruct], error: Exception) -> None:
+        """Record the documents of a batch that could not be written"""
+        click.echo(f"Failed to write batch of {len(points)} points: {error}", err=True)
+        self.failed_keys.extend(
+            str(p.payload[self.stale_key])
+            for p in points
+            if p.payload and p.payload.get(self.stale_key)
+        )
+
+    def _batch_written(self, points: List[PointStruct], wait: bool) -> None:
+        """Record a written batch; its last point is re-sent by the barrier"""
+        self._last_point = points[-1]
+        self._unacknowledged = not wait
+        self.flushed_points += len(points)
+
+        if self.verbose:
+            click.echo(f"  Flushed {len(points)} points to '{self.collection_name}'")
+
+    def _counters(self) -> Dict[str, int]:
+        """Counters returned by close()"""
+        return {
+            "points": self.flushed_points,
+            "requests": self.requests,
+            "failed": len(self.failed_keys),
+        }
+
+
+class QdrantUpsertBatcher(_PointBuffer):
+    """Group point upserts and stale-point deletes into few Qdrant requests"""
+
+    def __init__(
+        self,
+        client: QdrantClient,
+        collection_name: str,
+        batch_size: int = 256,
+        max_batch_bytes: int = 8 * 1024 * 1024,
+        wait: bool = False,
+        stale_key: str = "file_path",
+        verbose: bool = False,
+    ):
+        super().__init__(collection_name, batch_size, max_batch_bytes, wait, stale_key, verbose)
+        self.client = client
+
+    def __enter__(self) -> "QdrantUpsertBatcher":
+        """Context manager entry"""
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """Context manager exit - flush pending points and wait for them"""
+        self.close()
+
+    def add(self, point: PointStruct, replaces_existing: bool = False) -> None:
+        """Queue a point, flushing first if it would overflow the current batch
+
+        Points keep stable IDs, so an upsert overwrites the previous version in place.
+        Set replaces_existing when the document was stored under a different ID
+        (e.g. a legacy ID scheme) and its older points must be deleted.
+        """
+        point_bytes = self._estimate_point_bytes(point)
+
+        if self._overflows(point_bytes):
+            self.flush()
+
+        if self._queue(point, point_bytes, replaces_existing):
+            self.flush()
+
+    def flush(self, wait: Optional[bool] = None) -> int:
+        """Send buffered points in one upsert plus at most one stale-point delete"""
+        if not self._points:
+            return 0
+
+        wait = self.wait if wait is None else wait
+        points, stale_keys = self._take()
+
+        try:
+            # Qdrant applies updates to a collection in order, so the delete issued after
+            # the upsert never races with the points it must keep.
+            self.client.upsert(collection_name=self.collection_name, points=points, wait=wait)
+            self.requests += 1
+
+            stale_filter = self._stale_points_filter(points, stale_keys)
+            if stale_filter is not None:
+                self.client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=FilterSelector(filter=stale_filter),
+                    wait=wait,
+                )
+                self.requests += 1
+
+        except Exception as e:
+            self._batch_failed(points, e)
+            return 0
+
+        self._batch_written(points, wait)
+        return len(points)
+
+    def barrier(self) -> None:
+        """Block until every write issued by this batcher has been applied"""
+        if self._points:
+            self.flush(wait=True)
+            return
+
+        if not self._unacknowledged or self._last_point is None:
+            return
+
+        # Re-sending the last point is idempotent; waiting on it acknowledges
+        # every earlier write to the collection as well.
+        try:
+            self.client.upsert(
+                collection_name=self.collection_name, points=[self._last_point], wait=True
+            )
+            self.requests += 1
+            self._unacknowledged = False
+        except Exception as e:
+            click.echo(f"Failed to confirm pending writes: {e}", err=True)
+
+    def close(self) -> Dict[str, int]:
+        """Flush remaining points, wait for acknowledgement and return counters"""
+        self.barrier()
+        return self._counters()
+
+
+class AsyncQdrantUpsertBatcher(_PointBuffer):
+    """QdrantUpsertBatcher for AsyncQdrantClient
+
+    Points added by concurrent tasks share the current batch; a flush hands the
+    batch over before awaiting the upsert, so later points start the next one.
+    """
+
+    def __init__(
+        self,
+        client: AsyncQdrantClient,
+        collection_name: str,
+        batch_size: int = 256,
+        max_batch_bytes: int = 8 * 1024 * 1024,
+        wait: bool = False,
+        stale_key: str = "file_path",
+        verbose: bool = False,
+    ):
+        super().__init__(collection_name, batch_size, max_batch_bytes, wait, stale_key, verbose)
+        self.client = client
+
+    async def __aenter__(self) -> "AsyncQdrantUpsertBatcher":
+        """Async context manager entry"""
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """Async context manager exit - flush pending points and wait for them"""
+        await self.close()
+
+    async def add(self, point: PointStruct, replaces_existing: bool = False) -> None:
+        """Queue a point, flushing first if it would overflow the current batch"""
+        point_bytes = self._estimate_point_bytes(point)
+
+        if self._overflows(point_bytes):
+            await self.flush()
+
+        if self._queue(point, point_bytes, replaces_existing):
+            await self.flush()
+
+    async def flush(self, wait: Optional[bool] = None) -> int:
+        """Send buffered points in one upsert plus at most one stale-point delete"""
+        if not self._points:
+            return 0
+
+        wait = self.wait if wait is None else wait
+        points, stale_keys = self._take()
+
+        try:
+            await self.client.upsert(collection_name=self.collection_name, points=points, wait=wait)
+            self.requests += 1
+
+            stale_filter = self._stale_points_filter(points, stale_keys)
+            if stale_filter is not None:
+                await self.client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=FilterSelector(filter=stale_filter),
+                    wait=wait,
+                )
+                self.requests += 1
+
+        except Exception as e:
+            self._batch_failed(points, e)
+            return 0
+
+        self._batch_written(points, wait)
+        return len(points)
+
+    async def barrier(self) -> None:
+        """Wait until every write issued by this batcher has been applied"""
+        if self._points:
+            await self.flush(wait=True)
+            return
+
+        if not self._unacknowledged or self._last_point is None:
+            return
+
+        try:
+            await self.client.upsert(
+                collection_name=self.collection_name, points=[self._last_point], wait=True
+            )
+            self.requests += 1
+            self._unacknowledged = False
+        except Exception as e:
+            click.echo(f"Failed to confirm pending writes: {e}", err=True)
+
+    async def close(self) -> Dict[str, int]:
+        """Flush remaining points, wait for acknowledgement and return counters"""
+        await self.barrier()
+        return self._counters()
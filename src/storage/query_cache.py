@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+query_cache.py: Epoch-versioned cache for vector and graph search results
+
+This component:
+1. Keys results by a quantized hash of the query vector(s), filters, limit and
+   the current epoch of every store the result depends on
+2. Stores results in Redis with a TTL, or in an in-process LRU cache when no
+   Redis is configured
+3. Invalidates by bumping a monotonically increasing per-collection epoch in
+   Redis whenever a writer changes the underlying data
+4. Bypasses the cache while a configured Redis is unreachable (epochs from
+   other processes cannot be seen), retrying after retry_seconds; epoch bumps
+   made meanwhile are replayed once Redis answers again
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import click
+import numpy as np
+import redis
+
+
+def vector_scope(collection_name: str) -> str:
+    """Epoch scope for a Qdrant collection"""
+    return f"vector:{collection_name}"
+
+
+def graph_scope(database: str) -> str:
+    """Epoch scope for a Neo4j database"""
+    return f"graph:{database}"
+
+
+class QueryResultCache:
+    """Cache search results until their TTL expires or a store epoch changes"""
+
+    def __init__(
+        self,
+        redis_client: Optional["redis.Redis[str]"] = None,
+        ttl_seconds: int = 3600,
+        max_entries: int = 10000,
+        key_prefix: str = "cache:query:",
+        precision: int = 4,
+        retry_seconds: float = 30,
+        verbose: bool = False,
+    ):
+        self.redis_client = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.key_prefix = key_prefix
+        self.precision = precision
+        self.retry_seconds = retry_seconds
+        self.verbose = verbose
+
+        # In-process cache when no Redis is configured: key -> (expires_at, value)
+        self._local: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._local_epochs: Dict[str, int] = {}
+
+        # Redis outage: monotonic time of the next attempt, and bumps to replay
+        self._retry_at = 0.0
+        self._pending_bumps: Dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Dict[str, Any],
+        cache_settings: Optional[Dict[str, Any]] = None,
+        verbose: bool = False,
+    ) -> "QueryResultCache":
+        """Build a cache from .ctxrc.yaml (redis section) and performance.yaml settings
+
+        The Redis connection is opened lazily on first use; REDIS_PASSWORD is read
+        from the environment.
+        """
+        cache_settings = cache_settings or {}
+        redis_config = config.get("redis", {})
+        prefix = redis_config.get("prefixes", {}).get("cache", "cache:")
+
+        redis_client: Optional["redis.Redis[str]"] = None
+        if redis_config:
+            redis_client = redis.Redis(
+                host=redis_config.get("host", "localhost"),
+                port=redis_config.get("port", 6379),
+                db=redis_config.get("database", 0),
+                password=os.getenv("REDIS_PASSWORD"),
+                ssl=redis_config.get("ssl", False),
+                socket_connect_timeout=1,
+                socket_timeout=1,
+                decode_responses=True,
+            )
+
+        return cls(
+            redis_client=redis_client,
+            ttl_seconds=cache_settings.get("ttl_seconds", 3600),
+            max_entries=cache_settings.get("max_entries", 10000),
+            key_prefix=f"{prefix}query:",
+            retry_seconds=cache_settings.get("retry_seconds", 30),
+            verbose=verbose,
+        )
+
+    def _redis_failed(self, action: str, error: Exception) -> None:
+        """Bypass the cache until retry_seconds have passed"""
+        if self.verbose:
+            click.echo(
+                f"Query cache: Redis {action} failed, bypassing cache for "
+                f"{self.retry_seconds}s: {error}",
+                err=True,
+            )
+        self._retry_at = time.monotonic() + self.retry_seconds
+
+    def _redis_ready(self) -> bool:
+        """Whether Redis is configured and not in its retry backoff"""
+        return self.redis_client is not None and time.monotonic() >= self._retry_at
+
+    def _replay_bumps(self) -> None:
+        """Apply epoch bumps that failed while Redis was unreachable"""
+        if self.redis_client is None:
+            return
+        for scope, count in list(self._pending_bumps.items()):
+            self.redis_client.incrby(f"{self.key_prefix}epoch:{scope}", count)
+            del self._pending_bumps[scope]
+
+    def fingerprint(self, vectors: Sequence[Sequence[float]]) -> str:
+        """Hash query vectors after rounding, so float noise maps to the same key"""
+        digest = hashlib.sha256()
+        for vector in vectors:
+            quantized = np.round(np.asarray(vector, dtype=np.float32), self.precision) + 0.0
+            digest.update(quantized.tobytes())
+            digest.update(b"|")
+        return digest.hexdigest()
+
+    def get_epoch(self, scope: str) -> int:
+        """Current epoch of a store; results cached under an older epoch are ignored
+
+        Returns 0 while Redis is unreachable (the cache is bypassed then).
+        """
+        if self.redis_client is None:
+            return self._local_epochs.get(scope, 0)
+        if self._redis_ready():
+            try:
+                self._replay_bumps()
+                value = self.redis_client.get(f"{self.key_prefix}epoch:{scope}")
+                return int(value) if value else 0
+            except Exception as e:
+                self._redis_failed("read", e)
+        return 0
+
+    def bump_epoch(self, scope: str) -> int:
+        """Invalidate every cached result that depends on the given store
+
+        Always attempted, even during the retry backoff; a failed bump is kept
+        and replayed, so readers never keep an epoch that predates a write.
+        Returns the new epoch, or 0 when Redis could not be reached.
+        """
+        if self.redis_client is None:
+            self._local_epochs[scope] = self._local_epochs.get(scope, 0) + 1
+            return self._local_epochs[scope]
+
+        try:
+            self._replay_bumps()
+            epoch = int(self.redis_client.incr(f"{self.key_prefix}epoch:{scope}"))
+        except Exception as e:
+            self._pending_bumps[scope] = self._pending_bumps.get(scope, 0) + 1
+            self._redis_failed("epoch update", e)
+            return 0
+        self._retry_at = 0.0
+        return epoch
+
+    def make_key(
+        self,
+        namespace: str,
+        query_vectors: Sequence[Sequence[float]],
+        scopes: List[str],
+        **params: Any,
+    ) -> str:
+        """Build a cache key from the query, its parameters and the store epochs"""
+        key_data = {
+            "vectors": self.fingerprint(query_vectors),
+            "epochs": {scope: self.get_epoch(scope) for scope in scopes},
+            "params": params,
+        }
+        digest = hashlib.sha256(
+            json.dumps(key_data, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f"{self.key_prefix}{namespace}:{digest}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a cached value, or None on a miss"""
+        if self.redis_client is not None:
+            if not self._redis_ready():
+                self.misses += 1
+                return None
+            try:
+                data = self.redis_client.get(key)
+                if data is not None:
+                    self.hits += 1
+                    return json.loads(data)
+                self.misses += 1
+                return None
+            except Exception as e:
+                self._redis_failed("read", e)
+                self.misses += 1
+                return None
+
+        entry = self._local.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._local.pop(key, None)
+            self.misses += 1
+            return None
+
+        self._local.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value under the configured TTL"""
+        if self.redis_client is not None:
+            if self._redis_ready():
+                try:
+                    self.redis_client.setex(key, self.ttl_seconds, json.dumps(value, default=str))
+                except Exception as e:
+                    self._redis_failed("write", e)
+            return
+
+        # Round-trip through JSON so local hits match what Redis would return
+        self._local[key] = (
+            time.monotonic() + self.ttl_seconds,
+            json.loads(json.dumps(value, default=str)),
+        )
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
@@ -5,31 +5,115 @@ vector_db_init.py: Initialize Qdrant vector database for the Agent-First Context
 This script:
 1. Checks if Qdrant is running
 2. Creates the project_context collection
-3. Sets up vector configuration
-4. Initializes indexes
+3. Sets up vector storage and quantization from a collection profile, plus a
+   sparse vector for lexical (hybrid) search
+4. Initializes payload indexes from a declared schema
+5. Migrates an existing collection to another profile
 """
 
 import sys
 import time
-from typing import Any, Dict, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set, Union, cast
 
 import click
 import yaml
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Disabled,
     Distance,
     HnswConfigDiff,
+    Modifier,
     OptimizersConfigDiff,
+    PayloadSchemaType,
     PointStruct,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SparseVectorParams,
     VectorParams,
+    VectorParamsDiff,
 )
 
+from src.storage.hybrid import SPARSE_VECTOR_NAME
+
+# Payload fields that searches filter or rank on, with their index types
+PAYLOAD_INDEX_SCHEMA: Dict[str, PayloadSchemaType] = {
+    "document_id": PayloadSchemaType.KEYWORD,
+    "document_type": PayloadSchemaType.KEYWORD,
+    "file_path": PayloadSchemaType.KEYWORD,
+    "sprint_number": PayloadSchemaType.INTEGER,
+    "last_modified_epoch": PayloadSchemaType.INTEGER,
+}
+
+
+@dataclass
+class CollectionProfile:
+    """Vector storage layout and quantization for the context collection"""
+
+    on_disk: bool
+    quantization: Optional[Union[ScalarQuantization, BinaryQuantization]] = None
+    rescore: bool = False
+    oversampling: Optional[float] = None
+
+    def search_params(
+        self, oversampling: Optional[float] = None
+    ) -> Optional[QuantizationSearchParams]:
+        """Query-time quantization parameters (None for unquantized collections)"""
+        if self.quantization is None:
+            return None
+        return QuantizationSearchParams(
+            rescore=self.rescore, oversampling=oversampling or self.oversampling
+        )
+
+
+# Selectable via vector_db.collection.profile in performance.yaml
+COLLECTION_PROFILES: Dict[str, CollectionProfile] = {
+    # Full-precision vectors in RAM
+    "in_memory": CollectionProfile(on_disk=False),
+    # Originals memory-mapped from disk, int8 copies in RAM (~4x smaller),
+    # top candidates rescored against the originals
+    "on_disk_int8": CollectionProfile(
+        on_disk=True,
+        quantization=ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        ),
+        rescore=True,
+        oversampling=1.5,
+    ),
+    # Originals on disk, 1 bit per dimension in RAM (~32x smaller); needs
+    # oversampling plus rescoring to recover recall
+    "binary": CollectionProfile(
+        on_disk=True,
+        quantization=BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True)),
+        rescore=True,
+        oversampling=3.0,
+    ),
+}
+
+DEFAULT_COLLECTION_PROFILE = "in_memory"
+
+
+def get_collection_profile(perf_config: Dict[str, Any]) -> CollectionProfile:
+    """Resolve the configured collection profile, falling back to in-memory"""
+    name = perf_config.get("vector_db", {}).get("collection", {}).get("profile")
+    return (
+        COLLECTION_PROFILES.get(name or DEFAULT_COLLECTION_PROFILE)
+        or COLLECTION_PROFILES[DEFAULT_COLLECTION_PROFILE]
+    )
+
 
 class VectorDBInitializer:
     """Initialize and configure Qdrant vector database"""
 
-    def __init__(self, config_path: str = ".ctxrc.yaml"):
+    def __init__(
+        self, config_path: str = ".ctxrc.yaml", perf_config_path: str = "performance.yaml"
+    ):
         self.config = self._load_config(config_path)
+        self.perf_config = self._load_perf_config(perf_config_path)
         self.client: Optional[QdrantClient] = None
 
     def _load_config(self, config_path: str) -> Dict[str, Any]:
@@ -48,6 +132,33 @@ class VectorDBInitializer:
             click.echo(f"Error parsing {config_path}: {e}", err=True)
             sys.exit(1)
 
+    def _load_perf_config(self, perf_config_path: str) -> Dict[str, Any]:
+        """Load performance configuration (optional)"""
+        try:
+            with open(perf_config_path, "r") as f:
+                result = yaml.safe_load(f)
+                return cast(Dict[str, Any], result) if isinstance(result, dict) else {}
+        except (FileNotFoundError, yaml.YAMLError):
+            return {}
+
+    @property
+    def profile_name(self) -> str:
+        """Configured collection profile name"""
+        name = self.perf_config.get("vector_db", {}).get("collection", {}).get("profile")
+        return name if name in COLLECTION_PROFILES else DEFAULT_COLLECTION_PROFILE
+
+    def _optimizers_config(self) -> OptimizersConfigDiff:
+        """Segment optimizer settings, applying vector_db.indexing from performance.yaml"""
+        indexing = self.perf_config.get("vector_db", {}).get("indexing", {})
+        return OptimizersConfigDiff(
+            deleted_threshold=0.2,
+            vacuum_min_vector_number=1000,
+            default_segment_number=2,
+            flush_interval_sec=indexing.get("flush_interval_sec", 5),
+            memmap_threshold=indexing.get("memmap_threshold"),
+            max_segment_size=indexing.get("max_segment_size"),
+        )
+
     def connect(self) -> bool:
         """Connect to Qdrant instance"""
         # Import locally
@@ -95,6 +206,8 @@ class VectorDBInitializer:
             exists = any(c.name == collection_name for c in collections)
 
             if exists and not force:
+                # Backfill indexes declared since the collection was created
+                self.create_payload_indexes(collection_name)
                 click.echo(
                     f"Collection '{collection_name}' already exists. Use --force to recreate."
                 )
@@ -106,7 +219,8 @@ class VectorDBInitializer:
                 time.sleep(1)  # Give Qdrant time to process
 
             # Create collection with optimal settings for embeddings
-            click.echo(f"Creating collection '{collection_name}'...")
+            profile = COLLECTION_PROFILES[self.profile_name]
+            click.echo(f"Creating collection '{collection_name}' (profile: {self.profile_name})...")
 
             # Using text-embedding-ada-002 dimensions (1536)
             self.client.create_collection(
@@ -114,20 +228,23 @@ class VectorDBInitializer:
                 vectors_config=VectorParams(
                     size=1536,  # OpenAI ada-002 embedding size
                     distance=Distance.COSINE,
+                    on_disk=profile.on_disk,
                 ),
-                optimizers_config=OptimizersConfigDiff(
-                    deleted_threshold=0.2,
-                    vacuum_min_vector_number=1000,
-                    default_segment_number=2,
-                    flush_interval_sec=5,
-                ),
+                optimizers_config=self._optimizers_config(),
                 hnsw_config=HnswConfigDiff(
                     m=16,
                     ef_construct=128,
                     full_scan_threshold=10000,
                 ),
+                quantization_config=profile.quantization,
+                # Lexical term weights for hybrid search; Qdrant applies IDF at query time
+                sparse_vectors_config={
+                    SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)
+                },
             )
 
+            self.create_payload_indexes(collection_name)
+
             click.echo(f"✓ Collection '{collection_name}' created successfully")
             return True
 
@@ -135,6 +252,65 @@ class VectorDBInitializer:
             click.echo(f"✗ Failed to create collection: {e}", err=True)
             return False
 
+    def migrate_profile(self) -> bool:
+        """Apply the configured profile to an existing collection in place
+
+        Qdrant rebuilds segments (and quantized copies) in the background; the
+        collection stays searchable while it does.
+        """
+        collection_name = self.config.get("qdrant", {}).get("collection_name", "project_context")
+
+        if not self.client:
+            click.echo("✗ Not connected to Qdrant", err=True)
+            return False
+
+        profile = COLLECTION_PROFILES[self.profile_name]
+        try:
+            self.client.update_collection(
+                collection_name=collection_name,
+                vectors_config={"": VectorParamsDiff(on_disk=profile.on_disk)},
+                optimizers_config=self._optimizers_config(),
+                quantization_config=profile.quantization or Disabled.DISABLED,
+            )
+            click.echo(f"✓ Collection '{collection_name}' migrated to profile {self.profile_name}")
+            return True
+
+        except Exception as e:
+            click.echo(f"✗ Failed to migrate collection: {e}", err=True)
+            return False
+
+    def _existing_payload_indexes(self, collection_name: str) -> Set[str]:
+        """Names of payload fields that already have an index"""
+        if not self.client:
+            return set()
+        try:
+            payload_schema = self.client.get_collection(collection_name).payload_schema
+            return set(payload_schema) if isinstance(payload_schema, dict) else set()
+        except Exception:
+            return set()
+
+    def create_payload_indexes(self, collection_name: str) -> int:
+        """Create the payload indexes declared in PAYLOAD_INDEX_SCHEMA that are missing"""
+        if not self.client:
+            return 0
+
+        existing = self._existing_payload_indexes(collection_name)
+        created = 0
+        for field_name, field_schema in PAYLOAD_INDEX_SCHEMA.items():
+            if field_name in existing:
+                continue
+            try:
+                self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema,
+                )
+                created += 1
+            except Exception as e:
+                click.echo(f"✗ Failed to index payload field '{field_name}': {e}", err=True)
+
+        return created
+
     def verify_setup(self) -> bool:
         """Verify the Qdrant setup is correct"""
         collection_name = self.config.get("qdrant", {}).get("collection_name", "project_context")
@@ -229,7 +405,10 @@ class VectorDBInitializer:
 @click.command()
 @click.option("--force", is_flag=True, help="Force recreation of collection if exists")
 @click.option("--skip-test", is_flag=True, help="Skip test point insertion")
-def main(force: bool, skip_test: bool):
+@click.option(
+    "--migrate", is_flag=True, help="Apply the configured profile to an existing collection"
+)
+def main(force: bool, skip_test: bool, migrate: bool):
     """Initialize Qdrant vector database for the Agent-First Context System"""
     click.echo("=== Qdrant Vector Database Initialization ===\n")
 
@@ -245,6 +424,11 @@ def main(force: bool, skip_test: bool):
     if not initializer.create_collection(force=force):
         sys.exit(1)
 
+    # Migrate storage/quantization of an existing collection
+    if migrate and not force:
+        if not initializer.migrate_profile():
+            sys.exit(1)
+
     # Verify setup
     if not initializer.verify_setup():
         sys.exit(1)
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+vector_mirror.py: Local quantized mirror of the Qdrant context collection
+
+This component:
+1. Keeps a memory-mapped float16/int8 copy of collection vectors on disk
+2. Syncs incrementally using the embedder's hash index (embedding hashes)
+3. Provides a batched NumPy cosine kernel for re-ranking and duplicate checks
+4. Answers similarity queries without extra Qdrant round trips
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import click
+import numpy as np
+from qdrant_client import QdrantClient
+
+from src.storage.hybrid import dense_vector
+
+SUPPORTED_DTYPES = ("float16", "int8")
+
+
+def batched_cosine(queries: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """Cosine similarity of every query row against every matrix row
+
+    Args:
+        queries: (q, d) or (d,) array
+        matrix: (n, d) array
+
+    Returns:
+        (q, n) float32 array of similarities
+    """
+    q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    m = np.asarray(matrix, dtype=np.float32)
+    if q.size == 0 or m.size == 0:
+        return np.zeros((q.shape[0], m.shape[0] if m.ndim == 2 else 0), dtype=np.float32)
+
+    q_norms = np.linalg.norm(q, axis=1, keepdims=True)
+    m_norms = np.linalg.norm(m, axis=1, keepdims=True)
+    q_unit = q / np.where(q_norms == 0, 1.0, q_norms)
+    m_unit = m / np.where(m_norms == 0, 1.0, m_norms)
+    return np.asarray(q_unit @ m_unit.T, dtype=np.float32)
+
+
+def _entry_field(entry: Any, name: str) -> Any:
+    """Read a field from a hash cache entry (DocumentHash or plain dict)"""
+    if isinstance(entry, dict):
+        return entry.get(name)
+    return getattr(entry, name, None)
+
+
+class LocalVectorMirror:
+    """Memory-mapped, quantized copy of collection vectors for local similarity"""
+
+    def __init__(
+        self,
+        path: Path = Path("context/.embeddings_cache/vector_mirror"),
+        dtype: str = "float16",
+        verbose: bool = False,
+    ):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported mirror dtype: {dtype}")
+        self.path = Path(path)
+        self.dtype = dtype
+        self.verbose = verbose
+
+        self.dim = 0
+        self.point_ids: List[str] = []
+        self.document_ids: List[str] = []
+        self.embedding_hashes: List[str] = []
+        self._row_by_id: Dict[str, int] = {}
+        self._rows_by_document: Dict[str, List[int]] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+
+    @property
+    def _index_path(self) -> Path:
+        return self.path / "index.json"
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.path / "vectors.npy"
+
+    @property
+    def _scales_path(self) -> Path:
+        return self.path / "scales.npy"
+
+    def __len__(self) -> int:
+        return len(self.point_ids)
+
+    def __contains__(self, point_id: object) -> bool:
+        return str(point_id) in self._row_by_id
+
+    def _rebuild_lookups(self) -> None:
+        self._row_by_id = {pid: row for row, pid in enumerate(self.point_ids)}
+        self._rows_by_document = {}
+        for row, doc_id in enumerate(self.document_ids):
+            self._rows_by_document.setdefault(doc_id, []).append(row)
+
+    def load(self) -> bool:
+        """Memory-map an existing mirror from disk (read-only)"""
+        if not self._index_path.exists() or not self._vectors_path.exists():
+            return False
+
+        try:
+            with open(self._index_path, "r") as f:
+                index = json.load(f)
+
+            if index.get("dtype") != self.dtype:
+                click.echo(
+                    f"Warning: vector mirror dtype {index.get('dtype')} != {self.dtype}, "
+                    "it will be rebuilt on next sync",
+                    err=True,
+                )
+                return False
+
+            self.dim = int(index.get("dim", 0))
+            points = index.get("points", [])
+            self.point_ids = [p["id"] for p in points]
+            self.document_ids = [p.get("document_id", "") for p in points]
+            self.embedding_hashes = [p.get("embedding_hash", "") for p in points]
+            self._vectors = np.load(self._vectors_path, mmap_mode="r")
+            if self.dtype == "int8" and self._scales_path.exists():
+                self._scales = np.load(self._scales_path, mmap_mode="r")
+            self._rebuild_lookups()
+            return True
+
+        except Exception as e:
+            click.echo(f"Warning: Failed to load vector mirror: {e}", err=True)
+            return False
+
+    def _quantize(self, vectors: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Normalize rows and convert them to the storage dtype"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+
+        if self.dtype == "float16":
+            return vectors.astype(np.float16), None
+
+        # Symmetric per-row int8 quantization
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+        quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return quantized, scales
+
+    def _dequantize(self, rows: Sequence[int]) -> np.ndarray:
+        """Return float32 (unit length) vectors for the given rows"""
+        if self._vectors is None or not rows:
+            return np.zeros((0, self.dim), dtype=np.float32)
+
+        data = np.asarray(self._vectors[list(rows)], dtype=np.float32)
+        if self.dtype == "int8" and self._scales is not None:
+            data = data * np.asarray(self._scales[list(rows)], dtype=np.float32)[:, None]
+        return data
+
+    def _write(self, vectors: np.ndarray, scales: Optional[np.ndarray]) -> None:
+        """Atomically replace the on-disk mirror"""
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        tmp_vectors = self.path / "vectors.npy.tmp"
+        with open(tmp_vectors, "wb") as f:
+            np.save(f, vectors)
+        os.replace(tmp_vectors, self._vectors_path)
+
+        if scales is not None:
+            tmp_scales = self.path / "scales.npy.tmp"
+            with open(tmp_scales, "wb") as f:
+                np.save(f, scales)
+            os.replace(tmp_scales, self._scales_path)
+
+        index = {
+            "dtype": self.dtype,
+            "dim": self.dim,
+            "points": [
+                {"id": pid, "document_id": doc_id, "embedding_hash": emb_hash}
+                for pid, doc_id, emb_hash in zip(
+                    self.point_ids, self.document_ids, self.embedding_hashes
+                )
+            ],
+        }
+        tmp_index = self.path / "index.json.tmp"
+        with open(tmp_index, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_index, self._index_path)
+
+        self._vectors = np.load(self._vectors_path, mmap_mode="r")
+        self._scales = np.load(self._scales_path, mmap_mode="r") if scales is not None else None
+
+    def sync(
+        self,
+        client: QdrantClient,
+        collection_name: str,
+        hash_cache: Dict[str, Any],
+        batch_size: int = 256,
+    ) -> Dict[str, int]:
+        """Bring the mirror in line with the hash index
+
+        Only points whose embedding hash changed (or that are new) are fetched from
+        Qdrant; points no longer in the hash index are dropped.
+        """
+        if self._vectors is None:
+            self.load()
+
+        wanted: Dict[str, Tuple[str, str]] = {}
+        for entry in hash_cache.values():
+            point_id = _entry_field(entry, "vector_id")
+            if point_id:
+                wanted[str(point_id)] = (
+                    str(_entry_field(entry, "document_id") or ""),
+                    str(_entry_field(entry, "embedding_hash") or ""),
+                )
+
+        current = {pid: self.embedding_hashes[row] for pid, row in self._row_by_id.items()}
+        to_fetch = [pid for pid, (_, emb) in wanted.items() if current.get(pid) != emb]
+        removed = [pid for pid in current if pid not in wanted]
+
+        if not to_fetch and not removed:
+            return {"fetched": 0, "removed": 0, "total": len(self)}
+
+        fetched: Dict[str, np.ndarray] = {}
+        for i in range(0, len(to_fetch), batch_size):
+            records = client.retrieve(
+                collection_name=collection_name,
+                ids=to_fetch[i : i + batch_size],
+                with_payload=False,
+                with_vectors=True,
+            )
+            for record in records:
+                vector = dense_vector(record.vector)
+                if vector is not None:
+                    fetched[str(record.id)] = np.asarray(vector, dtype=np.float32)
+
+        if fetched and not self.dim:
+            self.dim = len(next(iter(fetched.values())))
+
+        # Rebuild row order: keep unchanged rows, then fetched ones. Points that
+        # changed but could not be fetched are dropped and retried on the next sync.
+        refresh = set(to_fetch)
+        keep_ids = [pid for pid in self.point_ids if pid in wanted and pid not in refresh]
+        new_ids = keep_ids + [pid for pid in to_fetch if pid in fetched]
+
+        parts: List[np.ndarray] = []
+        scale_parts: List[np.ndarray] = []
+        if keep_ids and self._vectors is not None:
+            keep_rows = [self._row_by_id[pid] for pid in keep_ids]
+            parts.append(np.asarray(self._vectors[keep_rows]))
+            if self.dtype == "int8" and self._scales is not None:
+                scale_parts.append(np.asarray(self._scales[keep_rows]))
+        if fetched:
+            quantized, scales = self._quantize(
+                np.stack([fetched[pid] for pid in new_ids[len(keep_ids) :]])
+            )
+            parts.append(quantized)
+            if scales is not None:
+                scale_parts.append(scales)
+
+        storage_dtype = np.float16 if self.dtype == "float16" else np.int8
+        vectors = np.concatenate(parts) if parts else np.zeros((0, self.dim), dtype=storage_dtype)
+        scales_arr = (
+            (np.concatenate(scale_parts) if scale_parts else np.zeros(0, dtype=np.float32))
+            if self.dtype == "int8"
+            else None
+        )
+
+        self.point_ids = new_ids
+        self.document_ids = [wanted[pid][0] for pid in new_ids]
+        self.embedding_hashes = [wanted[pid][1] for pid in new_ids]
+        self._rebuild_lookups()
+        self._write(vectors, scales_arr)
+
+        if self.verbose:
+            click.echo(
+                f"  Vector mirror: {len(fetched)} fetched, {len(removed)} removed, "
+                f"{len(self)} total"
+            )
+
+        return {"fetched": len(fetched), "removed": len(removed), "total": len(self)}
+
+    def get_vectors(self, point_ids: Iterable[Any]) -> Tuple[List[str], np.ndarray]:
+        """Return (found ids, float32 vectors) for the point IDs present in the mirror"""
+        found = [str(pid) for pid in point_ids if str(pid) in self._row_by_id]
+        rows = [self._row_by_id[pid] for pid in found]
+        return found, self._dequantize(rows)
+
+    def get_document_vectors(self, document_ids: Iterable[str]) -> Tuple[List[str], np.ndarray]:
+        """Return (document ids, float32 vectors) for every mirrored chunk of the documents"""
+        found: List[str] = []
+        rows: List[int] = []
+        for doc_id in document_ids:
+            for row in self._rows_by_document.get(doc_id, []):
+                found.append(doc_id)
+                rows.append(row)
+        return found, self._dequantize(rows)
+
+    def similarities(self, query_vectors: np.ndarray, point_ids: Iterable[Any]) -> np.ndarray:
+        """Cosine similarity of query vectors against mirrored points
+
+        Returns a (q, n) array aligned with point_ids; points missing from the mirror
+        get NaN so callers can fall back for them.
+        """
+        ids = [str(pid) for pid in point_ids]
+        queries = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        result = np.full((queries.shape[0], len(ids)), np.nan, dtype=np.float32)
+
+        present = [i for i, pid in enumerate(ids) if pid in self._row_by_id]
+        if present:
+            _, matrix = self.get_vectors(ids[i] for i in present)
+            result[:, present] = batched_cosine(queries, matrix)
+        return result
+
+    def near_duplicates(
+        self, threshold: float = 0.95, point_ids: Optional[Iterable[Any]] = None
+    ) -> List[Tuple[str, str, float]]:
+        """Find pairs of mirrored points whose cosine similarity is >= threshold"""
+        if point_ids is None:
+            ids, matrix = list(self.point_ids), self._dequantize(range(len(self)))
+        else:
+            ids, matrix = self.get_vectors(point_ids)
+
+        if len(ids) < 2:
+            return []
+
+        sims = batched_cosine(matrix, matrix)
+        rows, cols = np.nonzero(np.triu(sims >= threshold, k=1))
+        return [(ids[r], ids[c], float(sims[r, c])) for r, c in zip(rows, cols)]
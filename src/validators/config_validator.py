@@ -51,6 +51,8 @@ class ConfigValidator:
                 self.errors.append("neo4j.port must be an integer")
             elif port < 1 or port > 65535:
                 self.errors.append("neo4j.port must be between 1 and 65535")
+            if neo4j.get("backend", "neo4j") not in ("neo4j", "embedded"):
+                self.errors.append("neo4j.backend must be 'neo4j' or 'embedded'")
 
         # Validate Redis configuration
         if "redis" in config:
@@ -125,11 +127,75 @@ class ConfigValidator:
                         "vector_db.embedding.request_timeout must be a positive number"
                     )
 
+            # Upsert batching settings
+            if "upsert" in vdb:
+                upsert = vdb["upsert"]
+                if (
+                    not isinstance(upsert.get("batch_size", 256), int)
+                    or upsert.get("batch_size", 256) < 1
+                ):
+                    self.errors.append("vector_db.upsert.batch_size must be a positive integer")
+                if (
+                    not isinstance(upsert.get("max_batch_bytes", 8388608), int)
+                    or upsert.get("max_batch_bytes", 8388608) < 1
+                ):
+                    self.errors.append(
+                        "vector_db.upsert.max_batch_bytes must be a positive integer"
+                    )
+
+            # Local vector mirror settings
+            if "mirror" in vdb:
+                mirror = vdb["mirror"]
+                if mirror.get("dtype", "float16") not in ("float16", "int8"):
+                    self.errors.append("vector_db.mirror.dtype must be 'float16' or 'int8'")
+
+            # Collection profile (storage layout + quantization)
+            if "collection" in vdb:
+                collection = vdb["collection"]
+                if collection.get("profile", "in_memory") not in (
+                    "in_memory",
+                    "on_disk_int8",
+                    "binary",
+                ):
+                    self.errors.append(
+                        "vector_db.collection.profile must be 'in_memory', "
+                        "'on_disk_int8' or 'binary'"
+                    )
+                oversampling = collection.get("oversampling")
+                if oversampling is not None and (
+                    not isinstance(oversampling, (int, float)) or oversampling < 1
+                ):
+                    self.errors.append("vector_db.collection.oversampling must be >= 1")
+
+            # Query result cache settings
+            if "cache" in vdb:
+                cache = vdb["cache"]
+                if (
+                    not isinstance(cache.get("ttl_seconds", 3600), int)
+                    or cache.get("ttl_seconds", 3600) < 1
+                ):
+                    self.errors.append("vector_db.cache.ttl_seconds must be a positive integer")
+                if (
+                    not isinstance(cache.get("max_entries", 10000), int)
+                    or cache.get("max_entries", 10000) < 1
+                ):
+                    self.errors.append("vector_db.cache.max_entries must be a positive integer")
+                retry_seconds = cache.get("retry_seconds", 30)
+                if not isinstance(retry_seconds, (int, float)) or retry_seconds < 0:
+                    self.errors.append("vector_db.cache.retry_seconds must be non-negative")
+
             # Search settings
             if "search" in vdb:
                 search = vdb["search"]
                 if search.get("max_limit", 100) < search.get("default_limit", 10):
                     self.errors.append("vector_db.search.max_limit must be >= default_limit")
+                if (
+                    not isinstance(search.get("exact_scan_threshold", 1000), int)
+                    or search.get("exact_scan_threshold", 1000) < 0
+                ):
+                    self.errors.append(
+                        "vector_db.search.exact_scan_threshold must be a non-negative integer"
+                    )
 
         # Validate graph_db settings
         if "graph_db" in config:
@@ -154,6 +220,35 @@ class ConfigValidator:
                         "graph_db.query.max_path_length > 10 may cause performance issues"
                     )
 
+            if "batch" in gdb:
+                parallel = gdb["batch"].get("parallel_transactions", 4)
+                if not isinstance(parallel, int) or parallel < 1:
+                    self.errors.append(
+                        "graph_db.batch.parallel_transactions must be a positive integer"
+                    )
+                elif parallel > gdb.get("connection_pool", {}).get("max_size", 100):
+                    self.warnings.append(
+                        "graph_db.batch.parallel_transactions exceeds connection_pool.max_size; "
+                        "the pool is enlarged to match"
+                    )
+
+            if "algorithms" in gdb:
+                iterations = gdb["algorithms"].get("pagerank_iterations", 20)
+                if not isinstance(iterations, int) or iterations < 1:
+                    self.errors.append(
+                        "graph_db.algorithms.pagerank_iterations must be a positive integer"
+                    )
+
+            if "snapshot" in gdb:
+                refresh = gdb["snapshot"].get("refresh_seconds", 300)
+                if not isinstance(refresh, (int, float)) or refresh <= 0:
+                    self.errors.append("graph_db.snapshot.refresh_seconds must be positive")
+
+            if "statistics" in gdb:
+                cache_seconds = gdb["statistics"].get("cache_seconds", 60)
+                if not isinstance(cache_seconds, (int, float)) or cache_seconds < 0:
+                    self.errors.append("graph_db.statistics.cache_seconds must be non-negative")
+
         # Validate search settings
         if "search" in config:
             search = config["search"]
@@ -165,6 +260,12 @@ class ConfigValidator:
                 elif temporal_decay < 0 or temporal_decay > 1:
                     self.errors.append("search.ranking.temporal_decay_rate must be between 0 and 1")
 
+                oversample = ranking.get("rerank_oversample", 3)
+                if not isinstance(oversample, int) or oversample < 1:
+                    self.errors.append(
+                        "search.ranking.rerank_oversample must be a positive integer"
+                    )
+
                 # Validate type boosts
                 if "type_boosts" in ranking:
                     for doc_type, boost in ranking["type_boosts"].items():
@@ -174,6 +275,28 @@ class ConfigValidator:
                                 "non-negative number"
                             )
 
+            if "graphrag" in search:
+                graphrag = search["graphrag"]
+                deadline = graphrag.get("deadline_seconds", 2.0)
+                if not isinstance(deadline, (int, float)) or deadline <= 0:
+                    self.errors.append("search.graphrag.deadline_seconds must be positive")
+                seeds = graphrag.get("leading_seeds", 3)
+                if not isinstance(seeds, int) or seeds < 1:
+                    self.errors.append("search.graphrag.leading_seeds must be a positive integer")
+
+            if "hybrid" in search:
+                hybrid = search["hybrid"]
+                if hybrid.get("fusion", "rrf") not in ("rrf", "weighted"):
+                    self.errors.append("search.hybrid.fusion must be 'rrf' or 'weighted'")
+                if not isinstance(hybrid.get("rrf_k", 60), int) or hybrid.get("rrf_k", 60) < 1:
+                    self.errors.append("search.hybrid.rrf_k must be a positive integer")
+                for weight_name in ("dense_weight", "sparse_weight"):
+                    weight = hybrid.get(weight_name, 1.0)
+                    if not isinstance(weight, (int, float)) or weight < 0:
+                        self.errors.append(
+                            f"search.hybrid.{weight_name} must be a non-negative number"
+                        )
+
         # Validate resources
         if "resources" in config:
             resources = config["resources"]
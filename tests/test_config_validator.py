@@ -129,6 +129,27 @@ class TestConfigValidator:
         assert validator2.validate_main_config(config_path) is False
         assert any("neo4j.port must be between" in e for e in validator2.errors)
 
+    def test_invalid_neo4j_backend(self) -> None:
+        """Test with an unknown graph backend"""
+        config = {
+            "system": {"name": "test"},
+            "qdrant": {},
+            "neo4j": {"backend": "sqlite"},
+            "storage": {},
+            "agents": {},
+        }
+        config_path = self.create_config_file(".ctxrc.yaml", config)
+
+        validator = ConfigValidator()
+        assert validator.validate_main_config(config_path) is False
+        assert any("neo4j.backend must be" in e for e in validator.errors)
+
+        config["neo4j"]["backend"] = "embedded"
+        config_path = self.create_config_file(".ctxrc2.yaml", config)
+
+        validator2 = ConfigValidator()
+        assert validator2.validate_main_config(config_path) is True
+
     def test_redis_configuration(self) -> None:
         """Test Redis configuration validation"""
         # Invalid port type
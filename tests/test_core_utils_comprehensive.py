@@ -6,12 +6,14 @@ Targeted to boost critical domain coverage above 78.5% threshold
 
 import os
 import warnings
+from datetime import date, datetime, timedelta, timezone
 from unittest.mock import patch
 
 from src.core.utils import (
     get_environment,
     get_secure_connection_config,
     sanitize_error_message,
+    to_epoch_seconds,
 )
 
 
@@ -335,3 +337,32 @@ class TestGetSecureConnectionConfig:
             result = get_secure_connection_config(config, "service")
 
         assert result["port"] is None  # Should be None when not specified
+
+
+class TestToEpochSeconds:
+    """Test conversion of stored dates to epoch seconds"""
+
+    def test_date_and_naive_values_are_utc(self):
+        """Dates and naive datetimes are interpreted as UTC midnight/time"""
+        assert to_epoch_seconds(date(2025, 7, 11)) == 1752192000
+        assert to_epoch_seconds("2025-07-11") == 1752192000
+        assert to_epoch_seconds(datetime(2025, 7, 11, 12, 0)) == 1752192000 + 12 * 3600
+
+    def test_aware_values_keep_their_offset(self):
+        """Timezone-aware values are converted, not reinterpreted"""
+        assert to_epoch_seconds("2025-07-11T00:00:00Z") == 1752192000
+        assert to_epoch_seconds("2025-07-11T02:00:00+02:00") == 1752192000
+        aware = datetime(2025, 7, 11, tzinfo=timezone(timedelta(hours=-1)))
+        assert to_epoch_seconds(aware) == 1752192000 + 3600
+
+    def test_numbers_pass_through(self):
+        """Epoch numbers are returned as integers"""
+        assert to_epoch_seconds(1752192000) == 1752192000
+        assert to_epoch_seconds(1752192000.7) == 1752192000
+
+    def test_empty_and_invalid_values(self):
+        """Missing or unparseable values return None"""
+        assert to_epoch_seconds(None) is None
+        assert to_epoch_seconds("") is None
+        assert to_epoch_seconds("not-a-date") is None
+        assert to_epoch_seconds(True) is None
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Tests for the embedded graph backend used instead of Neo4j in local and CI runs
+"""
+
+from pathlib import Path
+
+import pytest
+import yaml
+
+from src.integrations.graphrag_integration import GraphRAGIntegration
+from src.integrations.graphrag_integration_async import AsyncGraphRAGIntegration
+from src.storage.graph_backend import EmbeddedGraphBackend, create_backend
+from src.storage.graph_builder import GraphBuilder, Statement
+from src.storage.graph_export import export_graph
+from src.storage.query_cache import QueryResultCache, graph_scope
+
+
+def _write(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.dump(data))
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """A sprint, two decisions and a design that implements and mentions them"""
+    root = tmp_path / "context"
+    _write(
+        root / "sprints" / "sprint-1.yaml",
+        {
+            "id": "sprint-1",
+            "document_type": "sprint",
+            "title": "Sprint 1",
+            "created_date": "2025-07-11",
+            "phases": [{"phase": 0, "name": "Setup", "tasks": ["a", "b"]}],
+        },
+    )
+    _write(
+        root / "decisions" / "adr-1.yaml",
+        {
+            "id": "adr-1",
+            "document_type": "decision",
+            "title": "Use CSV",
+            "created_date": "2025-07-11",
+            "alternatives_considered": {"bolt": "MERGE over Bolt"},
+            "related_decisions": ["adr-2"],
+        },
+    )
+    _write(
+        root / "decisions" / "adr-2.yaml",
+        {"id": "adr-2", "document_type": "decision", "title": "Use Neo4j"},
+    )
+    _write(
+        root / "design" / "graph.yaml",
+        {
+            "id": "design-graph",
+            "document_type": "design",
+            "title": "Graph",
+            "content": "See [[adr-1]] and @sprint-1",
+            "graph_metadata": {"relationships": [{"type": "implements", "target": "adr-2"}]},
+        },
+    )
+    return root
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / ".ctxrc.yaml"
+    path.write_text(
+        yaml.dump(
+            {
+                "neo4j": {
+                    "backend": "embedded",
+                    "embedded_path": str(tmp_path / ".graph_cache" / "embedded_graph.json"),
+                }
+            }
+        )
+    )
+    return str(path)
+
+
+@pytest.fixture
+def builder(tmp_path, config_path, corpus):
+    """Builder connected to the embedded backend, with the corpus already built"""
+    instance = GraphBuilder(
+        config_path=config_path, perf_config_path=str(tmp_path / "missing.yaml")
+    )
+    instance.processed_cache_path = tmp_path / ".graph_cache" / "processed.json"
+    assert instance.connect() is True
+    assert instance.process_directory(corpus) == (4, 4)
+    yield instance
+    instance.close()
+
+
+class TestCreateBackend:
+    """Test backend selection from .ctxrc.yaml"""
+
+    def test_neo4j_is_the_default(self):
+        assert create_backend({}) is None
+        assert create_backend({"neo4j": {"backend": "neo4j"}}) is None
+
+    def test_embedded_in_memory(self):
+        backend = create_backend({"neo4j": {"backend": "embedded", "embedded_path": ":memory:"}})
+
+        assert isinstance(backend, EmbeddedGraphBackend)
+        assert backend.path is None
+
+
+class TestEmbeddedBuild:
+    """Test building, cleaning and counting through GraphBuilder"""
+
+    def test_build_matches_export(self, builder, corpus, tmp_path):
+        exporter = GraphBuilder(config_path=str(tmp_path / "missing.yaml"))
+        exporter.processed_cache_path = tmp_path / "export_cache" / "processed.json"
+        manifest = export_graph(exporter, corpus, tmp_path / "import")
+
+        stats = builder.get_statistics(document_types=True)
+
+        assert stats["node_counts"] == manifest["node_counts"]
+        assert stats["relationship_counts"] == manifest["relationship_counts"]
+        assert stats["document_types"] == {"decision": 2, "sprint": 1, "design": 1}
+
+    def test_rebuild_is_idempotent(self, builder, corpus):
+        before = builder.get_statistics(refresh=True)
+
+        builder.process_directory(corpus, force=True)
+
+        assert builder.get_statistics(refresh=True) == before
+
+    def test_cleanup_removes_orphans_and_dangling_nodes(self, builder, corpus):
+        (corpus / "decisions" / "adr-1.yaml").unlink()
+
+        assert builder.cleanup_orphaned_nodes(root=corpus) == 1
+
+        stats = builder.get_statistics()
+        assert stats["node_counts"]["Document"] == 3
+        assert "Alternative" not in stats["node_counts"]
+        assert "RELATES_TO" not in stats["relationship_counts"]
+        assert "adr-1" not in builder.document_ids
+
+    def test_process_document_drops_cached_statistics(self, builder, corpus):
+        assert builder.get_statistics()["node_counts"]["Document"] == 4
+
+        path = corpus / "decisions" / "adr-3.yaml"
+        _write(path, {"id": "adr-3", "document_type": "decision", "title": "Use CSR"})
+        assert builder.process_document(path) is True
+
+        assert builder.get_statistics()["node_counts"]["Document"] == 5
+
+    def test_process_document_bumps_graph_epoch(self, builder, corpus):
+        builder.query_cache = QueryResultCache()
+        scope = graph_scope(builder.database)
+        path = corpus / "decisions" / "adr-2.yaml"
+
+        assert builder.process_document(path) is True
+        assert builder.query_cache.get_epoch(scope) == 0  # unchanged, nothing written
+
+        _write(path, {"id": "adr-2", "document_type": "decision", "title": "Use Neo4j 5"})
+        assert builder.process_document(path) is True
+        assert builder.query_cache.get_epoch(scope) == 1
+
+    def test_recreated_document_gets_incoming_edges_back(self, builder, corpus):
+        before = builder.get_statistics(refresh=True)
+        adr_path = corpus / "decisions" / "adr-1.yaml"
+        adr_text = adr_path.read_text()
+        adr_path.unlink()
+
+        assert builder.cleanup_orphaned_nodes(root=corpus) == 1
+        assert builder.pending_edges == [
+            {"type": "REFERENCES", "source_id": "design-graph", "target_id": "adr-1"}
+        ]
+
+        adr_path.write_text(adr_text)
+        builder.process_directory(corpus)
+
+        assert builder.get_statistics(refresh=True) == before
+        assert builder.pending_edges == []
+        targets = {r["target_id"] for r in builder.graph_backend.expand(["design-graph"], 1)}
+        assert "adr-1" in targets
+
+    def test_mention_of_a_later_document_is_linked(self, builder, corpus):
+        _write(
+            corpus / "design" / "notes.yaml",
+            {"id": "notes", "document_type": "design", "content": "Follows @adr-3"},
+        )
+        builder.process_directory(corpus)
+        assert {"type": "REFERENCES", "source_id": "notes", "target_id": "adr-3"} in (
+            builder.pending_edges
+        )
+
+        _write(
+            corpus / "decisions" / "adr-3.yaml",
+            {"id": "adr-3", "document_type": "decision", "title": "Use CSR"},
+        )
+        builder.process_directory(corpus)
+
+        records = builder.graph_backend.expand(["notes"], max_hops=1)
+        assert [r["target_id"] for r in records] == ["adr-3"]
+        assert builder.pending_edges == []
+
+    def test_persists_and_reloads(self, builder, tmp_path):
+        path = tmp_path / ".graph_cache" / "embedded_graph.json"
+        reopened = EmbeddedGraphBackend(path)
+
+        assert reopened.statistics() == builder.get_statistics()
+
+        # Writes from another process are picked up
+        reopened.setup_schema("1.0.0", "2025-07-11")
+        stats = builder.get_statistics(refresh=True)
+        assert stats["node_counts"]["DocumentType"] == 3
+        assert stats["relationship_counts"]["HAS_AGENT"] == 4
+
+    def test_statement_without_operation(self):
+        backend = EmbeddedGraphBackend()
+
+        with pytest.raises(ValueError):
+            backend.write_statements([Statement("MATCH (n) RETURN n", [{}], lambda row: ())])
+
+
+class TestEmbeddedTraversals:
+    """Test the traversal patterns GraphRAG relies on"""
+
+    def test_expand_with_filter_and_limit(self, builder):
+        backend = builder.graph_backend
+
+        records = backend.expand(["design-graph"], max_hops=1)
+        assert {r["target_id"] for r in records} == {"adr-1", "adr-2", "sprint-1"}
+        assert all(r["distance"] == 1 and r["source_id"] == "design-graph" for r in records)
+
+        records = backend.expand(["design-graph"], max_hops=2, relationship_types=["IMPLEMENTS"])
+        assert [r["target_id"] for r in records] == ["adr-2"]
+        assert records[0]["relationships"][0]["type"] == "IMPLEMENTS"
+
+        assert len(backend.expand(["design-graph"], max_hops=2, limit=1)) == 1
+        assert backend.expand(["unknown"], max_hops=2) == []
+
+    def test_expand_reaches_second_hop(self, builder):
+        records = builder.graph_backend.expand(["sprint-1"], max_hops=2)
+
+        distances = {r["target_id"]: r["distance"] for r in records}
+        assert distances == {"design-graph": 1, "adr-1": 2, "adr-2": 2}
+
+    def test_shortest_paths(self, builder):
+        paths = builder.graph_backend.shortest_paths(["sprint-1", "adr-2", "missing"], 5)
+
+        assert paths == [{"nodes": ["adr-2", "design-graph", "sprint-1"], "distance": 2}]
+        assert builder.graph_backend.shortest_paths(["sprint-1", "adr-2"], 1) == []
+
+
+class TestGraphRAGOnEmbeddedGraph:
+    """Test GraphRAG traversals without Neo4j"""
+
+    @pytest.fixture
+    def graphrag(self, builder, config_path, tmp_path):
+        instance = GraphRAGIntegration(
+            config_path=config_path, perf_config_path=str(tmp_path / "missing.yaml")
+        )
+        assert instance._connect_graph("neo4j", None) is True
+        yield instance
+        instance.close()
+
+    def test_graph_neighborhood(self, graphrag):
+        neighborhood = graphrag._graph_neighborhood(["design-graph", "adr-1"], max_hops=1)
+
+        assert "error" not in neighborhood
+        assert {"design-graph", "adr-1", "adr-2", "sprint-1"} <= set(neighborhood["nodes"])
+        assert neighborhood["paths"] == [{"nodes": ["adr-1", "design-graph"], "distance": 1}]
+
+    def test_impact_from_snapshot(self, graphrag):
+        impact = graphrag.analyze_document_impact("adr-2")
+
+        assert impact["dependency_chain"] == [{"id": "design-graph", "title": "Graph"}]
+        assert impact["direct_connections"] == 2
+        assert impact["total_reachable"] == 3
+
+    @pytest.mark.asyncio
+    async def test_async_stages(self, builder, config_path, tmp_path):
+        graphrag = AsyncGraphRAGIntegration(
+            config_path=config_path, perf_config_path=str(tmp_path / "missing.yaml")
+        )
+        graphrag.graph_backend = builder.graph_backend
+
+        records = await graphrag._aexpand(["adr-2"], max_hops=1)
+        paths = await graphrag._ashortest_paths(["adr-1", "adr-2"])
+
+        assert {r["target_id"] for r in records} == {"adr-1", "design-graph"}
+        assert paths == [{"nodes": ["adr-1", "adr-2"], "distance": 1}]
@@ -7,12 +7,30 @@ import json
 import shutil
 import tempfile
 from pathlib import Path
+from typing import Dict
 from unittest.mock import Mock, patch
 
 import pytest
 import yaml
 
-from src.storage.graph_builder import GraphBuilder
+from src.storage.graph_builder import (
+    APOC_STATS_QUERY,
+    DEPENDENT_NODES,
+    DOCUMENT_PAGE_QUERY,
+    DOCUMENT_TYPES_QUERY,
+    LABELS_QUERY,
+    RELATIONSHIP_TYPES_QUERY,
+    STATS_PROCEDURE_QUERY,
+    GraphBatch,
+    GraphBuilder,
+    delete_dangling_query,
+    delete_documents_query,
+    document_nodes_query,
+    label_count_query,
+    relationship_count_query,
+    scan_references,
+    schedule_rows,
+)
 
 
 class TestGraphBuilderCoverage:
@@ -43,9 +61,11 @@ class TestGraphBuilderCoverage:
         return str(config_path)
 
     @pytest.fixture
-    def builder(self, config_file):
+    def builder(self, config_file, temp_dir):
         """Create GraphBuilder instance"""
-        return GraphBuilder(config_path=config_file, verbose=True)
+        builder = GraphBuilder(config_path=config_file, verbose=True)
+        builder.processed_cache_path = temp_dir / ".graph_cache" / "processed.json"
+        return builder
 
     def test_init_with_default_config(self):
         """Test initialization with default config (no file)"""
@@ -205,10 +225,6 @@ class TestGraphBuilderCoverage:
 
     def test_create_document_node_basic(self, builder):
         """Test creating basic document node"""
-        mock_session = Mock()
-        mock_result = Mock()
-        mock_session.run.return_value = mock_result
-
         data = {
             "document_type": "design",
             "id": "design-001",
@@ -218,18 +234,16 @@ class TestGraphBuilderCoverage:
             "status": "active",
         }
 
-        doc_id = builder._create_document_node(mock_session, data, Path("test.yaml"))
+        doc_id, labels, props = builder._document_row(data, Path("test.yaml"))
 
         assert doc_id == "design-001"
-        mock_session.run.assert_called_once()
-        call_args = mock_session.run.call_args
-        assert "MERGE" in call_args[0][0]
-        assert call_args[1]["id"] == "design-001"
+        assert labels == "Document:Design"
+        assert props["id"] == "design-001"
+        assert props["file_path"] == "test.yaml"
+        assert "MERGE (d:Document:Design" in document_nodes_query(labels)
 
     def test_create_document_node_sprint(self, builder):
         """Test creating sprint document node"""
-        mock_session = Mock()
-
         data = {
             "document_type": "sprint",
             "id": "sprint-001",
@@ -240,19 +254,15 @@ class TestGraphBuilderCoverage:
             "status": "active",
         }
 
-        doc_id = builder._create_document_node(mock_session, data, Path("sprint.yaml"))
+        doc_id, _, props = builder._document_row(data, Path("sprint.yaml"))
 
         assert doc_id == "sprint-001"
-        call_args = mock_session.run.call_args[1]
-        props = call_args["props"]
         assert props["sprint_number"] == 1
         assert props["start_date"] == "2025-07-01"
         assert props["end_date"] == "2025-07-14"
 
     def test_create_document_node_decision(self, builder):
         """Test creating decision document node"""
-        mock_session = Mock()
-
         data = {
             "document_type": "decision",
             "id": "decision-001",
@@ -261,17 +271,15 @@ class TestGraphBuilderCoverage:
             "status": "approved",
         }
 
-        doc_id = builder._create_document_node(mock_session, data, Path("decision.yaml"))
+        doc_id, _, props = builder._document_row(data, Path("decision.yaml"))
 
         assert doc_id == "decision-001"
-        call_args = mock_session.run.call_args[1]
-        props = call_args["props"]
         assert props["decision_date"] == "2025-07-11"
         assert props["status"] == "approved"
 
     def test_create_relationships_sprint(self, builder):
         """Test creating relationships for sprint document"""
-        mock_session = Mock()
+        batch = GraphBatch()
 
         data = {
             "document_type": "sprint",
@@ -287,14 +295,29 @@ class TestGraphBuilderCoverage:
             "team": [{"agent": "agent1", "role": "Developer"}],
         }
 
-        builder._create_relationships(mock_session, data, "sprint-001")
+        builder._collect_relationships(batch, data, "sprint-001")
 
         # Should create phase, tasks, and team member relationships
-        assert mock_session.run.call_count >= 3
+        assert batch.phases == [
+            {
+                "sprint_id": "sprint-001",
+                "phase_num": 1,
+                "name": "Planning",
+                "duration": 3,
+                "status": "completed",
+            }
+        ]
+        assert [row["task_id"] for row in batch.tasks] == [
+            "sprint-001-phase1-task0",
+            "sprint-001-phase1-task1",
+        ]
+        assert batch.team == [{"sprint_id": "sprint-001", "agent": "agent1", "role": "Developer"}]
+        # One statement per kind of row
+        assert len(batch.statements()) == 3
 
     def test_create_relationships_decision(self, builder):
         """Test creating relationships for decision document"""
-        mock_session = Mock()
+        batch = GraphBatch()
 
         data = {
             "document_type": "decision",
@@ -302,14 +325,18 @@ class TestGraphBuilderCoverage:
             "related_decisions": ["decision-002"],
         }
 
-        builder._create_relationships(mock_session, data, "decision-001")
+        builder._collect_relationships(batch, data, "decision-001")
 
         # Should create alternative and related decision relationships
-        assert mock_session.run.call_count >= 3
+        assert [row["name"] for row in batch.alternatives] == ["Option A", "Option B"]
+        assert batch.related_decisions == [
+            {"source_id": "decision-001", "target_id": "decision-002"}
+        ]
+        assert len(batch.statements()) == 2
 
     def test_create_relationships_graph_metadata(self, builder):
         """Test creating relationships from graph metadata"""
-        mock_session = Mock()
+        batch = GraphBatch()
 
         data = {
             "document_type": "design",
@@ -321,21 +348,24 @@ class TestGraphBuilderCoverage:
             },
         }
 
-        builder._create_relationships(mock_session, data, "design-001")
+        builder._collect_relationships(batch, data, "design-001")
 
         # Should create metadata relationships
-        assert mock_session.run.call_count >= 2
+        assert batch.relationships == {
+            "IMPLEMENTS": [{"source_id": "design-001", "target_id": "design-002"}],
+            "DEPENDS_ON": [{"source_id": "design-001", "target_id": "design-003"}],
+        }
+        assert "MERGE (d1)-[:IMPLEMENTS]->(d2)" in batch.statements()[0][0]
 
-    def test_extract_references(self, builder):
-        """Test extracting document references from content"""
+    def test_scan_references(self):
+        """Test links are always found and @/# mentions only outside words and URLs"""
         content = """
-        This references [[doc-001]] and @doc-002.
-        Also mentions #doc-003 and [[doc-004]].
+        ## Overview
+        See [[doc-001]], #doc-003 and @doc-002; colors #fff and #abc123.
+        Mail admin@doc-002.com or open page#doc-003.
         """
 
-        refs = builder._extract_references(content)
-
-        assert refs == {"doc-001", "doc-002", "doc-003", "doc-004"}
+        assert scan_references(content) == ({"doc-001"}, {"doc-002", "doc-003", "fff", "abc123"})
 
     def test_process_document_empty_file(self, builder, temp_dir):
         """Test processing empty document"""
@@ -395,7 +425,7 @@ class TestGraphBuilderCoverage:
         # Should process despite cache
         result = builder.process_document(doc_path, force=True)
         assert result is True
-        assert mock_session.run.call_count > 0
+        assert mock_session.execute_write.call_count > 0
 
     def test_process_document_with_references(self, builder, temp_dir):
         """Test processing document with references"""
@@ -403,9 +433,10 @@ class TestGraphBuilderCoverage:
         data = {
             "id": "test",
             "title": "Test",
-            "content": "This references [[other-doc]] and @another-doc",
+            "content": "This references [[other-doc]], @another-doc and color #fff",
             "created_date": "2025-07-11",
         }
+        builder.document_ids = {"another-doc": "another.yaml"}
 
         with open(doc_path, "w") as f:
             yaml.dump(data, f)
@@ -422,8 +453,292 @@ class TestGraphBuilderCoverage:
         result = builder.process_document(doc_path)
         assert result is True
 
-        # Should create document, references, and timeline relationships
-        assert mock_session.run.call_count >= 3
+        # Should create document, references, and timeline relationships (after reconciling)
+        rows_by_query: Dict[str, list] = {}
+        for call in mock_session.execute_write.call_args_list:
+            rows_by_query.setdefault(call[0][1], []).extend(call[0][2])
+        assert len(rows_by_query) == 4
+        references = next(rows for query, rows in rows_by_query.items() if "[:REFERENCES]" in query)
+        assert sorted(row["target_id"] for row in references) == ["another-doc", "other-doc"]
+
+    def test_process_directory_batches_rows(self, builder, temp_dir):
+        """Test documents are written with UNWIND statements chunked by batch size"""
+        docs_dir = temp_dir / "docs"
+        docs_dir.mkdir()
+        for i in range(5):
+            with open(docs_dir / f"doc{i}.yaml", "w") as f:
+                yaml.dump({"id": f"doc-{i}", "document_type": "design"}, f)
+
+        mock_session = Mock()
+        mock_context = Mock()
+        mock_context.__enter__ = Mock(return_value=mock_session)
+        mock_context.__exit__ = Mock(return_value=None)
+        builder.driver = Mock()
+        builder.driver.session.return_value = mock_context
+        builder.processed_cache_path = temp_dir / ".graph_cache" / "processed.json"
+        builder.batch_size = 2
+        builder.parallel_transactions = 1
+
+        processed, total = builder.process_directory(docs_dir)
+
+        assert (processed, total) == (5, 5)
+        # Two full batches and a final batch of one, each one transaction
+        chunks = [
+            call[0][2]
+            for call in mock_session.execute_write.call_args_list
+            if "MERGE (d:Document" in call[0][1]
+        ]
+        assert [len(rows) for rows in chunks] == [2, 2, 1]
+        assert len(builder.processed_docs) == 5
+
+    def test_process_directory_flushes_by_rows(self, builder, temp_dir):
+        """Test the node flush counts every collected row, not documents"""
+        docs_dir = temp_dir / "docs"
+        docs_dir.mkdir()
+        for i in range(2):
+            with open(docs_dir / f"sprint{i}.yaml", "w") as f:
+                phases = [{"phase": n, "name": f"Phase {n}"} for n in range(2)]
+                yaml.dump({"id": f"sprint-{i}", "document_type": "sprint", "phases": phases}, f)
+
+        mock_session = Mock()
+        mock_context = Mock()
+        mock_context.__enter__ = Mock(return_value=mock_session)
+        mock_context.__exit__ = Mock(return_value=None)
+        builder.driver = Mock()
+        builder.driver.session.return_value = mock_context
+        builder.batch_size = 3
+        builder.parallel_transactions = 1
+
+        assert builder.process_directory(docs_dir) == (2, 2)
+
+        # Each sprint is one node and two phase rows, so each fills a batch on its own
+        chunks = [
+            call[0][2]
+            for call in mock_session.execute_write.call_args_list
+            if "MERGE (d:Document" in call[0][1]
+        ]
+        assert [len(rows) for rows in chunks] == [1, 1]
+
+    def test_parallel_writes_use_separate_sessions(self, builder):
+        """Test rows are spread over concurrent sessions and all written once"""
+        sessions = []
+
+        def new_session(**kwargs):
+            session = Mock()
+            session.execute_write.side_effect = lambda work, *args: work(session, *args)
+            sessions.append(session)
+            context = Mock()
+            context.__enter__ = Mock(return_value=session)
+            context.__exit__ = Mock(return_value=None)
+            return context
+
+        builder.driver = Mock()
+        builder.driver.session.side_effect = new_session
+        builder.parallel_transactions = 4
+
+        batch = GraphBatch()
+        for i in range(20):
+            batch.documents.setdefault("Document:Design", []).append(
+                {"id": f"doc-{i}", "props": {}}
+            )
+            batch.add_relationship("REFERENCES", f"doc-{i}", f"doc-{(i + 1) % 20}")
+
+        builder._write_statements(batch.statements())
+
+        assert len(sessions) > 2
+        written = [
+            row["id"] if "id" in row else (row["source_id"], row["target_id"])
+            for session in sessions
+            for call in session.run.call_args_list
+            for row in call.kwargs["rows"]
+        ]
+        assert len(written) == 40
+        assert len(set(written)) == 40
+
+    def test_forward_references_use_pending_edges(self, builder, temp_dir):
+        """Test edges to documents not yet ingested are created once the target appears"""
+        docs_dir = temp_dir / "docs"
+        docs_dir.mkdir()
+        with open(docs_dir / "a.yaml", "w") as f:
+            yaml.dump({"id": "doc-a", "content": "See [[doc-b]]"}, f)
+
+        mock_session = Mock()
+        mock_session.execute_write.side_effect = lambda work, *args: work(mock_session, *args)
+        mock_context = Mock()
+        mock_context.__enter__ = Mock(return_value=mock_session)
+        mock_context.__exit__ = Mock(return_value=None)
+        builder.driver = Mock()
+        builder.driver.session.return_value = mock_context
+        builder.processed_cache_path = temp_dir / ".graph_cache" / "processed.json"
+        builder.parallel_transactions = 1
+
+        builder.process_directory(docs_dir)
+
+        # Nodes are written before edges; the edge to doc-b waits for its target
+        queries = [call[0][0] for call in mock_session.run.call_args_list]
+        assert "MERGE (d:Document" in queries[0]
+        assert "[:REFERENCES]" in queries[-1]
+        assert builder.pending_edges == [
+            {"type": "REFERENCES", "source_id": "doc-a", "target_id": "doc-b"}
+        ]
+        assert builder.document_ids == {"doc-a": str(docs_dir / "a.yaml")}
+
+        # A later run that ingests doc-b retries the pending edge
+        with open(docs_dir / "b.yaml", "w") as f:
+            yaml.dump({"id": "doc-b", "title": "B"}, f)
+        mock_session.run.reset_mock()
+
+        rebuilt = GraphBuilder(verbose=True)
+        rebuilt.processed_cache_path = builder.processed_cache_path
+        rebuilt.processed_docs = rebuilt._load_processed_cache()
+        index = rebuilt._load_graph_index()
+        rebuilt.document_ids, rebuilt.pending_edges = index["documents"], index["pending_edges"]
+        rebuilt.driver = builder.driver
+        rebuilt.parallel_transactions = 1
+
+        processed, total = rebuilt.process_directory(docs_dir)
+
+        assert (processed, total) == (2, 2)
+        edge_rows = [
+            call.kwargs["rows"]
+            for call in mock_session.run.call_args_list
+            if "[:REFERENCES]" in call[0][0]
+        ]
+        assert edge_rows == [[{"source_id": "doc-a", "target_id": "doc-b"}]]
+        assert rebuilt.pending_edges == []
+
+    def test_changed_document_applies_edge_diff(self, builder, temp_dir):
+        """Test only added edges are written and removed edges are deleted"""
+        doc_path = temp_dir / "doc.yaml"
+
+        def write_doc(targets):
+            with open(doc_path, "w") as f:
+                yaml.dump(
+                    {
+                        "id": "doc",
+                        "graph_metadata": {
+                            "relationships": [
+                                {"type": "DEPENDS_ON", "target": target} for target in targets
+                            ]
+                        },
+                    },
+                    f,
+                )
+
+        mock_session = Mock()
+        mock_session.execute_write.side_effect = lambda work, *args: work(mock_session, *args)
+        mock_context = Mock()
+        mock_context.__enter__ = Mock(return_value=mock_session)
+        mock_context.__exit__ = Mock(return_value=None)
+        builder.driver = Mock()
+        builder.driver.session.return_value = mock_context
+        builder.parallel_transactions = 1
+        builder.document_ids = {"a": "a.yaml", "b": "b.yaml", "c": "c.yaml"}
+
+        write_doc(["a", "b"])
+        assert builder.process_document(doc_path) is True
+        assert builder.owned_edges["doc"] == [["DEPENDS_ON", "a"], ["DEPENDS_ON", "b"]]
+
+        mock_session.run.reset_mock()
+        write_doc(["b", "c"])
+        assert builder.process_document(doc_path) is True
+
+        calls = {call[0][0]: call.kwargs["rows"] for call in mock_session.run.call_args_list}
+        deleted = next(rows for query, rows in calls.items() if "DELETE r" in query)
+        merged = next(rows for query, rows in calls.items() if "MERGE (d1)-[:DEPENDS_ON]" in query)
+        assert deleted == [{"source_id": "doc", "target_id": "a"}]
+        assert merged == [{"source_id": "doc", "target_id": "c"}]
+        assert not any("row.edges" in query for query in calls)
+        assert builder.owned_edges["doc"] == [["DEPENDS_ON", "b"], ["DEPENDS_ON", "c"]]
+
+    def test_process_document_saves_caches(self, builder, temp_dir):
+        """Test a single processed document is in the caches a new builder loads"""
+        doc_path = temp_dir / "doc.yaml"
+        with open(doc_path, "w") as f:
+            yaml.dump({"id": "doc", "title": "Doc", "content": "See [[later-doc]]"}, f)
+
+        mock_session = Mock()
+        mock_context = Mock()
+        mock_context.__enter__ = Mock(return_value=mock_session)
+        mock_context.__exit__ = Mock(return_value=None)
+        builder.driver = Mock()
+        builder.driver.session.return_value = mock_context
+
+        assert builder.process_document(doc_path) is True
+
+        reloaded = GraphBuilder(config_path=str(temp_dir / "missing.yaml"))
+        reloaded.processed_cache_path = builder.processed_cache_path
+        assert str(doc_path) in reloaded._load_processed_cache()
+        index = reloaded._load_graph_index()
+        assert index["documents"] == {"doc": str(doc_path)}
+        assert index["pending_edges"] == builder.pending_edges != []
+
+    def test_mentions_of_existing_documents_without_index(self, builder, temp_dir):
+        """Test document ids are read from the graph once when no index was saved"""
+        doc_path = temp_dir / "doc.yaml"
+        with open(doc_path, "w") as f:
+            yaml.dump({"id": "doc", "title": "Doc", "content": "See [[old-doc]] and @nobody"}, f)
+
+        mock_session = Mock()
+        mock_context = Mock()
+        mock_context.__enter__ = Mock(return_value=mock_session)
+        mock_context.__exit__ = Mock(return_value=None)
+        builder.driver = Mock()
+        builder.driver.session.return_value = mock_context
+        builder.parallel_transactions = 1
+
+        with patch.object(
+            builder, "_document_page", return_value=[("old-doc", "old.yaml")]
+        ) as mock_page:
+            assert builder.process_document(doc_path) is True
+            assert builder.process_document(doc_path, force=True) is True
+
+        mock_page.assert_called_once_with("", builder.batch_size)
+        assert builder.document_ids["old-doc"] == "old.yaml"
+        references = [
+            row
+            for call in mock_session.execute_write.call_args_list
+            if "[:REFERENCES]" in call[0][1]
+            for row in call[0][2]
+        ]
+        assert {"source_id": "doc", "target_id": "old-doc"} in references
+        assert all(row["target_id"] != "nobody" for row in references)
+
+    def test_unchanged_files_are_not_parsed(self, builder, temp_dir):
+        """Test files with a recorded size and mtime are skipped before parsing"""
+        doc_path = temp_dir / "doc.yaml"
+        with open(doc_path, "w") as f:
+            yaml.dump({"id": "doc", "title": "Doc"}, f)
+        builder.processed_docs[str(doc_path)] = "hash"
+        builder.file_stats[str(doc_path)] = builder._file_signature(doc_path)
+
+        with patch("src.storage.graph_builder.yaml.safe_load") as mock_load:
+            assert builder.process_document(doc_path) is True
+
+        mock_load.assert_not_called()
+
+    def test_process_directory_write_failure(self, builder, temp_dir):
+        """Test documents in a failed batch are not marked as processed"""
+        docs_dir = temp_dir / "docs"
+        docs_dir.mkdir()
+        with open(docs_dir / "doc.yaml", "w") as f:
+            yaml.dump({"id": "doc", "title": "Doc"}, f)
+
+        mock_session = Mock()
+        mock_session.execute_write.side_effect = Exception("Deadlock detected")
+        mock_context = Mock()
+        mock_context.__enter__ = Mock(return_value=mock_session)
+        mock_context.__exit__ = Mock(return_value=None)
+        builder.driver = Mock()
+        builder.driver.session.return_value = mock_context
+        builder.processed_cache_path = temp_dir / ".graph_cache" / "processed.json"
+
+        with patch("click.echo") as mock_echo:
+            processed, total = builder.process_directory(docs_dir)
+
+        assert (processed, total) == (0, 1)
+        assert builder.processed_docs == {}
+        assert mock_echo.call_args.kwargs["err"] is True
 
     def test_process_document_exception(self, builder, temp_dir):
         """Test processing document with exception"""
@@ -510,25 +825,94 @@ class TestGraphBuilderCoverage:
         mock_context.__exit__ = Mock(return_value=None)
         mock_driver.session.return_value = mock_context
         builder.driver = mock_driver
+        builder.processed_cache_path = temp_dir / ".graph_cache" / "processed.json"
 
         # Create a temporary existing file
         existing_file = temp_dir / "existing.yaml"
         existing_file.touch()
 
         # Mock query results
-        mock_result = [
+        page = [
             {"id": "doc1", "file_path": "/nonexistent/doc1.yaml"},
             {"id": "doc2", "file_path": str(existing_file)},
         ]
-        mock_session.run.return_value = mock_result
+
+        def run(query, **params):
+            if query == DOCUMENT_PAGE_QUERY:
+                return page
+            result = Mock()
+            result.consume.return_value.counters.nodes_deleted = 0
+            return result
+
+        mock_session.run.side_effect = run
 
         # Add to cache
         builder.processed_docs["/nonexistent/doc1.yaml"] = "hash1"
 
-        removed = builder.cleanup_orphaned_nodes()
+        removed = builder.cleanup_orphaned_nodes(root=temp_dir)
         assert removed == 1  # Should remove only non-existent file
         assert "/nonexistent/doc1.yaml" not in builder.processed_docs
 
+    @patch("click.echo")
+    def test_cleanup_orphaned_nodes_pages_and_batches_deletes(self, mock_echo, builder, temp_dir):
+        """Test cleanup pages by id, checks one walk and deletes in batched transactions"""
+        mock_session = Mock()
+        mock_context = Mock()
+        mock_context.__enter__ = Mock(return_value=mock_session)
+        mock_context.__exit__ = Mock(return_value=None)
+        builder.driver = Mock()
+        builder.driver.session.return_value = mock_context
+        builder.processed_cache_path = temp_dir / ".graph_cache" / "processed.json"
+        builder.batch_size = 50
+        builder.verbose = True
+
+        (temp_dir / "design").mkdir()
+        kept = temp_dir / "design" / "kept.yaml"
+        kept.touch()
+        builder.document_ids = {"a-gone": "gone.yaml", "b-kept": str(kept)}
+        builder.pending_edges = [
+            {"type": "REFERENCES", "source_id": "a-gone", "target_id": "missing"}
+        ]
+
+        pages = [
+            [
+                {"id": "a-gone", "file_path": str(temp_dir / "gone.yaml")},
+                {"id": "b-kept", "file_path": str(kept)},
+            ],
+            [{"id": "c-gone", "file_path": str(temp_dir / "design" / "removed.yaml")}],
+        ]
+        calls = []
+
+        def run(query, **params):
+            calls.append((query, params))
+            if query == DOCUMENT_PAGE_QUERY:
+                return pages.pop(0)
+            result = Mock()
+            result.consume.return_value.counters.nodes_deleted = 2
+            return result
+
+        mock_session.run.side_effect = run
+
+        with patch("src.storage.graph_builder.Path.exists") as mock_exists:
+            removed = builder.cleanup_orphaned_nodes(root=temp_dir, page_size=2)
+
+        assert removed == 2
+        page_calls = [params for query, params in calls if query == DOCUMENT_PAGE_QUERY]
+        assert page_calls == [{"after": "", "limit": 2}, {"after": "b-kept", "limit": 2}]
+        # In-tree paths never hit the filesystem one by one
+        mock_exists.assert_not_called()
+
+        deletes = [(query, params) for query, params in calls if query != DOCUMENT_PAGE_QUERY]
+        assert deletes[0][0] == delete_documents_query(50)
+        assert deletes[0][1] == {"ids": ["a-gone", "c-gone"]}
+        assert "IN TRANSACTIONS OF 50 ROWS" in deletes[0][0]
+        assert [query for query, _ in deletes[1:]] == [
+            delete_dangling_query(label, rel_type, 50) for label, rel_type in DEPENDENT_NODES
+        ]
+        assert builder.document_ids == {"b-kept": str(kept)}
+        assert builder.pending_edges == []
+        mock_echo.assert_any_call("  Removed 8 dangling phase, task and timeline nodes")
+
     def test_cleanup_orphaned_nodes_exception(self, builder):
         """Test cleanup with exception"""
         mock_driver = Mock()
@@ -558,19 +942,84 @@ class TestGraphBuilderCoverage:
         mock_driver.session.return_value = mock_context
         builder.driver = mock_driver
 
-        # Mock query results
-        mock_results = [
-            [{"label": "Document", "count": 10}, {"label": "Sprint", "count": 5}],
-            [{"type": "REFERENCES", "count": 20}, {"type": "HAS_PHASE", "count": 8}],
-            [{"type": "design", "count": 6}, {"type": "sprint", "count": 4}],
-        ]
-        mock_session.run.side_effect = mock_results
+        # Mock query results: no APOC, so labels and types are counted one by one
+        counts = {
+            label_count_query("Document"): 10,
+            label_count_query("Sprint"): 5,
+            relationship_count_query("REFERENCES"): 20,
+            relationship_count_query("HAS_PHASE"): 8,
+        }
+
+        def run(query, **params):
+            if query == STATS_PROCEDURE_QUERY:
+                return []
+            if query == LABELS_QUERY:
+                return [{"label": "Sprint"}, {"label": "Document"}]
+            if query == RELATIONSHIP_TYPES_QUERY:
+                return [{"type": "HAS_PHASE"}, {"type": "REFERENCES"}]
+            if query == DOCUMENT_TYPES_QUERY:
+                return [{"type": "design", "count": 6}, {"type": "sprint", "count": 4}]
+            result = Mock()
+            result.single.return_value = {"count": counts[query]}
+            return result
+
+        mock_session.run.side_effect = run
 
         stats = builder.get_statistics()
 
         assert stats["node_counts"]["Document"] == 10
+        assert list(stats["node_counts"]) == ["Document", "Sprint"]
         assert stats["relationship_counts"]["REFERENCES"] == 20
-        assert stats["document_types"]["design"] == 6
+        assert "document_types" not in stats
+        # Only count-store queries: no scans over nodes or relationships
+        queries = [c[0][0] for c in mock_session.run.call_args_list]
+        assert not any("UNWIND labels(n)" in q or "MATCH ()-[r]->()" in q for q in queries)
+        assert DOCUMENT_TYPES_QUERY not in queries
+
+        # The per-type breakdown is opt-in, and not served from counts cached without it
+        stats = builder.get_statistics(document_types=True)
+        assert stats["document_types"] == {"design": 6, "sprint": 4}
+        assert "document_types" not in builder.get_statistics()
+
+    def test_get_statistics_uses_apoc_and_cache(self, builder):
+        """Test apoc.meta.stats is used when installed and results are cached"""
+        mock_session = Mock()
+        mock_context = Mock()
+        mock_context.__enter__ = Mock(return_value=mock_session)
+        mock_context.__exit__ = Mock(return_value=None)
+        builder.driver = Mock()
+        builder.driver.session.return_value = mock_context
+
+        def run(query, **params):
+            if query == STATS_PROCEDURE_QUERY:
+                return [{"name": "apoc.meta.stats"}]
+            if query == APOC_STATS_QUERY:
+                result = Mock()
+                result.single.return_value = {
+                    "labels": {"Document": 3, "Phase": 0},
+                    "relTypesCount": {"REFERENCES": 2},
+                }
+                return result
+            return [{"type": "design", "count": 3}]
+
+        mock_session.run.side_effect = run
+
+        stats = builder.get_statistics()
+        assert stats["node_counts"] == {"Document": 3}
+        assert stats["relationship_counts"] == {"REFERENCES": 2}
+        assert mock_session.run.call_count == 2
+
+        # Served from the cache, and callers cannot mutate the cached copy
+        stats["node_counts"]["Document"] = 99
+        assert builder.get_statistics()["node_counts"] == {"Document": 3}
+        assert mock_session.run.call_count == 2
+
+        # Writes drop the cache; the procedure probe is not repeated
+        builder._invalidate_query_cache()
+        builder.get_statistics()
+        assert mock_session.run.call_count == 3
+        builder.get_statistics(refresh=True)
+        assert mock_session.run.call_count == 4
 
     def test_get_statistics_exception(self, builder):
         """Test getting statistics with exception"""
@@ -708,3 +1157,30 @@ class TestGraphBuilderCoverage:
             )
             assert result.exit_code == 0
             assert any("Graph building complete" in str(call) for call in mock_echo.call_args_list)
+
+
+class TestScheduleRows:
+    """Test lock-aware scheduling of concurrent writes"""
+
+    @staticmethod
+    def _keys(row):
+        return (("Document", row["source_id"]), ("Document", row["target_id"]))
+
+    def test_groups_in_a_round_lock_disjoint_nodes(self):
+        rows = [{"source_id": f"doc-{i}", "target_id": f"doc-{(i * 7) % 50}"} for i in range(50)]
+
+        rounds = schedule_rows(rows, self._keys, workers=4)
+
+        scheduled = [row for groups in rounds for group in groups for row in group]
+        assert sorted(map(str, scheduled)) == sorted(map(str, rows))
+        for groups in rounds:
+            locked = [{key for row in group for key in self._keys(row)} for group in groups]
+            for i, keys in enumerate(locked):
+                for other in locked[i + 1 :]:
+                    assert not keys & other
+
+    def test_single_worker_keeps_one_group(self):
+        rows = [{"source_id": "a", "target_id": "b"}, {"source_id": "b", "target_id": "c"}]
+
+        assert schedule_rows(rows, self._keys, workers=1) == [[rows]]
+        assert schedule_rows([], self._keys, workers=4) == []
@@ -4,16 +4,20 @@ Tests for graph database components
 
 import shutil
 import tempfile
+import threading
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
+import yaml
 
+from src.analytics.graph_snapshot import GraphSnapshot
 from src.integrations.graphrag_integration import GraphRAGIntegration, GraphRAGResult
 from src.storage.graph_builder import GraphBuilder
 
 # Import components to test
 from src.storage.neo4j_init import Neo4jInitializer
+from src.storage.query_cache import QueryResultCache, graph_scope
 
 
 def create_mock_neo4j_driver():
@@ -24,6 +28,10 @@ def create_mock_neo4j_driver():
     mock_session_cm.__enter__ = Mock(return_value=mock_session)
     mock_session_cm.__exit__ = Mock(return_value=None)
     mock_driver.session.return_value = mock_session_cm
+    # Managed transactions run their work function against the session
+    mock_session.execute_write.side_effect = lambda work, *args, **kwargs: work(
+        mock_session, *args, **kwargs
+    )
     return mock_driver, mock_session
 
 
@@ -627,32 +635,21 @@ class TestGraphBuilder:
         }
 
         file_path = test_dir / "test.yaml"
+        with open(file_path, "w") as f:
+            yaml.dump(data, f)
 
         # Create node
-        doc_id = builder._create_document_node(mock_session, data, file_path)
+        assert builder.process_document(file_path) is True
 
-        assert doc_id == "test-design"
-
-        # Check query
-        mock_session.run.assert_called_once()
-        call_args = mock_session.run.call_args
-        assert "Document:Design" in call_args[0][0]
-        assert call_args[1]["id"] == "test-design"
-
-    def test_extract_references(self, builder):
-        """Test reference extraction from content"""
-        content = """
-        This references [[design-001]] and @sprint-001.
-        Also mentions #decision-002 and [[api-spec]].
-        """
-
-        references = builder._extract_references(content)
-
-        assert "design-001" in references
-        assert "sprint-001" in references
-        assert "decision-002" in references
-        assert "api-spec" in references
-        assert len(references) == 4
+        # Document node is merged first, then stale edges are reconciled and the timeline linked
+        assert mock_session.run.call_count == 3
+        query, params = (
+            mock_session.run.call_args_list[0][0][0],
+            mock_session.run.call_args_list[0][1],
+        )
+        assert "UNWIND $rows" in query
+        assert "Document:Design" in query
+        assert params["rows"][0]["id"] == "test-design"
 
     @patch("src.storage.graph_builder.GraphDatabase.driver")
     def test_process_document(self, mock_driver, builder, test_dir):
@@ -675,8 +672,6 @@ class TestGraphBuilder:
         }
 
         with open(test_file, "w") as f:
-            import yaml
-
             yaml.dump(test_data, f)
 
         # Process document
@@ -684,8 +679,16 @@ class TestGraphBuilder:
 
         assert success is True
 
-        # Check multiple queries were made
-        assert mock_session.run.call_count > 1
+        # One UNWIND statement per kind of row: document, edge reconciliation, phases, tasks, team
+        queries = {call[0][0] for call in mock_session.run.call_args_list}
+        assert len(queries) == 5
+        task_rows = [
+            row
+            for call in mock_session.run.call_args_list
+            if ":HAS_TASK" in call[0][0]
+            for row in call[1]["rows"]
+        ]
+        assert len(task_rows) == 2
 
         # Check cache was updated
         assert str(test_file) in builder.processed_docs
@@ -768,6 +771,285 @@ class TestGraphRAGIntegration:
         assert isinstance(result.summary, str)
         assert len(result.summary) > 0
 
+    def test_search_uses_query_cache(self, graphrag):
+        """Test repeated GraphRAG searches are served from the cache"""
+        graphrag.qdrant_client = Mock()
+        graphrag.neo4j_driver, mock_session = create_mock_neo4j_driver()
+        graphrag.query_cache = QueryResultCache()
+
+        mock_vector_result = Mock()
+        mock_vector_result.id = "vec1"
+        mock_vector_result.score = 0.85
+        mock_vector_result.payload = {"document_id": "doc1", "title": "Test Design"}
+        graphrag.qdrant_client.search.return_value = [mock_vector_result]
+        mock_session.run.return_value = []
+
+        first = graphrag.search("test query", [0.1] * 4, max_hops=2, top_k=5)
+        second = graphrag.search("test query", [0.1] * 4, max_hops=2, top_k=5)
+
+        graphrag.qdrant_client.search.assert_called_once()
+        assert isinstance(second, GraphRAGResult)
+        assert second.summary == first.summary
+
+        # Rebuilding the graph invalidates cached results
+        graphrag.query_cache.bump_epoch(graph_scope(graphrag.database))
+        graphrag.search("test query", [0.1] * 4, max_hops=2, top_k=5)
+        assert graphrag.qdrant_client.search.call_count == 2
+
+    def test_vector_search_hybrid(self, graphrag):
+        """Test hybrid retrieval fuses dense and lexical candidates in one request"""
+        from qdrant_client.models import ScoredPoint
+
+        graphrag.qdrant_client = Mock()
+        graphrag.hybrid_enabled = True
+
+        def point(doc_id, score):
+            return ScoredPoint(id=doc_id, version=0, score=score, payload={"document_id": doc_id})
+
+        graphrag.qdrant_client.query_batch_points.return_value = [
+            Mock(points=[point("doc1", 0.9), point("doc2", 0.7)]),
+            Mock(points=[point("adr-012", 8.0), point("doc1", 2.0)]),
+        ]
+
+        results = graphrag._vector_search([0.1] * 4, limit=2, query_text="ADR-012")
+
+        graphrag.qdrant_client.search.assert_not_called()
+        assert [r["document_id"] for r in results] == ["doc1", "adr-012"]
+        # Fused scores are normalized so combined scoring stays in [0, 1]
+        assert results[0]["score"] == pytest.approx((1 / 61 + 1 / 62) / (2 / 61))
+
+    def test_vector_search_hybrid_fallback(self, graphrag):
+        """Test dense search is used when the sparse vector is unavailable"""
+        graphrag.qdrant_client = Mock()
+        graphrag.hybrid_enabled = True
+        graphrag.qdrant_client.query_batch_points.side_effect = Exception("no sparse vector")
+        graphrag.qdrant_client.search.return_value = []
+
+        assert graphrag._vector_search([0.1] * 4, limit=2, query_text="ADR-012") == []
+        graphrag.qdrant_client.search.assert_called_once()
+
+    def test_graph_neighborhood_batches_seeds(self, graphrag):
+        """Test all seeds are expanded in one query and all pairs in another"""
+        graphrag.neo4j_driver, mock_session = create_mock_neo4j_driver()
+        graphrag.procedures = set()
+        expansion = [
+            {
+                "source_id": "doc1",
+                "source_type": "design",
+                "source_title": "Design",
+                "target_id": "doc9",
+                "target_type": "decision",
+                "target_title": "Decision",
+                "relationships": [{"type": "REFERENCES", "properties": {}}],
+                "distance": 1,
+            }
+        ]
+        paths = [{"nodes": ["doc1", "doc9", "doc2"], "distance": 2}]
+        mock_session.run.side_effect = [expansion, paths]
+
+        neighborhood = graphrag._graph_neighborhood(["doc1", "doc2", "doc3"], max_hops=2)
+
+        assert mock_session.run.call_count == 2
+        expand_call, paths_call = mock_session.run.call_args_list
+        assert "UNWIND $doc_ids" in expand_call.args[0].text
+        assert expand_call.kwargs["doc_ids"] == ["doc1", "doc2", "doc3"]
+        assert paths_call.kwargs["doc_ids"] == ["doc1", "doc2", "doc3"]
+
+        assert neighborhood["nodes"]["doc9"] == {
+            "id": "doc9",
+            "document_type": "decision",
+            "title": "Decision",
+        }
+        assert neighborhood["relationships"] == [
+            {"source": "doc1", "target": "doc9", "type": "REFERENCES", "properties": {}}
+        ]
+        assert neighborhood["paths"] == paths
+
+    def test_graph_neighborhood_plans_from_probed_procedures(self, graphrag):
+        """Test the APOC plan is chosen only when the probe found the procedure"""
+        graphrag.neo4j_driver, mock_session = create_mock_neo4j_driver()
+        graphrag.query_timeout = 12
+        mock_session.run.return_value = []
+
+        graphrag.procedures = {"apoc.path.expandConfig"}
+        graphrag._graph_neighborhood(["doc1"], max_hops=3)
+        query = mock_session.run.call_args.args[0]
+        assert "apoc.path.expandConfig" in query.text
+        assert query.timeout == 12
+
+        # Without APOC the Cypher plan honours max_hops instead of a fixed *1..2
+        graphrag.procedures = set()
+        graphrag._graph_neighborhood(["doc1"], max_hops=3)
+        query = mock_session.run.call_args.args[0]
+        assert "apoc" not in query.text
+        assert "*1..3]" in query.text
+
+    def test_graph_neighborhood_falls_back_on_lazy_failure(self, graphrag):
+        """Test APOC errors raised while streaming results still trigger the fallback"""
+        graphrag.neo4j_driver, mock_session = create_mock_neo4j_driver()
+        graphrag.procedures = {"apoc.path.expandConfig"}
+
+        def failing_stream():
+            raise RuntimeError("apoc failed mid-stream")
+            yield
+
+        record = {
+            "source_id": "doc1",
+            "source_type": "design",
+            "source_title": "Design",
+            "target_id": "doc2",
+            "target_type": "sprint",
+            "target_title": "Sprint",
+            "relationships": [],
+            "distance": 1,
+        }
+        mock_session.run.side_effect = [failing_stream(), [record]]
+
+        with patch("click.echo"):
+            neighborhood = graphrag._graph_neighborhood(["doc1"])
+
+        assert "doc2" in neighborhood["nodes"]
+        assert "error" not in neighborhood
+        assert "apoc" not in mock_session.run.call_args.args[0].text
+
+    def test_graph_neighborhood_reports_failures(self, graphrag):
+        """Test failed expansions are reported instead of returning silent empty context"""
+        graphrag.neo4j_driver, mock_session = create_mock_neo4j_driver()
+        graphrag.procedures = set()
+        mock_session.run.side_effect = Exception("Transaction timed out")
+
+        with patch("click.echo") as mock_echo:
+            neighborhood = graphrag._graph_neighborhood(["doc1"])
+
+        assert neighborhood["error"] == "Transaction timed out"
+        assert neighborhood["nodes"] == {}
+        assert mock_echo.call_args.kwargs["err"] is True
+
+    @patch("src.integrations.graphrag_integration.QdrantClient")
+    @patch("src.integrations.graphrag_integration.GraphDatabase.driver")
+    def test_connect_probes_procedures_once(self, mock_neo4j, mock_qdrant, graphrag):
+        """Test APOC/GDS availability is probed at connect and cached"""
+        mock_driver, mock_session = create_mock_neo4j_driver()
+        mock_neo4j.return_value = mock_driver
+        mock_session.run.side_effect = [
+            None,  # RETURN 1
+            [{"name": "apoc.path.expandConfig"}, {"name": "gds.pageRank.stream"}],
+            [{"id": "doc1", "type": "design", "title": "Doc 1"}],  # snapshot nodes
+            [],  # snapshot edges
+        ]
+        graphrag.snapshot_enabled = True
+
+        assert graphrag.connect(neo4j_password="secret") is True
+
+        assert graphrag.has_apoc is True
+        assert graphrag.has_gds is True
+        assert mock_session.run.call_count == 4
+        assert graphrag.snapshot is not None and "doc1" in graphrag.snapshot
+
+    def test_graph_neighborhood_without_seeds(self, graphrag):
+        """Test no queries are run when there is nothing to expand"""
+        graphrag.neo4j_driver, mock_session = create_mock_neo4j_driver()
+
+        neighborhood = graphrag._graph_neighborhood([])
+
+        mock_session.run.assert_not_called()
+        assert neighborhood == {"nodes": {}, "relationships": [], "paths": []}
+
+    def _snapshot(self):
+        return GraphSnapshot.from_edges(
+            [("doc1", "design", "Doc 1"), ("doc2", "decision", "Doc 2"), ("doc3", "sprint", "")],
+            [("doc2", "doc1", "IMPLEMENTS"), ("doc3", "doc2", "REFERENCES")],
+        )
+
+    def test_search_scores_with_snapshot_centrality(self, graphrag):
+        """Test snapshot PageRank replaces per-edge counting for known documents"""
+        graphrag.snapshot = self._snapshot()
+        neighborhood = {"nodes": {}, "relationships": [], "paths": []}
+        hit = {"title": "Doc", "document_type": "design", "payload": {}}
+        vector_results = [{**hit, "document_id": "doc1", "score": 1.0}]
+
+        result = graphrag._build_result("query", vector_results, neighborhood)
+
+        # doc1 collects the rank of the whole chain, so it is the most central
+        assert result.combined_score == pytest.approx(0.7 + 0.3)
+
+        # Documents missing from the snapshot fall back to neighborhood edges
+        vector_results = [{**hit, "document_id": "new-doc", "score": 1.0}]
+        neighborhood["relationships"] = [{"type": "REFERENCES", "source": "new-doc", "target": "x"}]
+        result = graphrag._build_result("query", vector_results, neighborhood)
+        assert result.combined_score == pytest.approx(0.7 + 0.1)
+
+    def test_analyze_document_impact_from_snapshot(self, graphrag):
+        """Test impact analysis is answered locally on a snapshot hit"""
+        graphrag.snapshot = self._snapshot()
+        graphrag.neo4j_driver = Mock()
+
+        impact = graphrag.analyze_document_impact("doc1")
+
+        graphrag.neo4j_driver.session.assert_not_called()
+        assert impact["direct_connections"] == 1
+        assert impact["total_reachable"] == 2
+        assert impact["central_score"] == 0.5
+        assert impact["impacted_documents"] == [
+            {"id": "doc2", "type": "decision", "relationship": "IMPLEMENTS"}
+        ]
+        assert impact["dependency_chain"] == [
+            {"id": "doc2", "title": "Doc 2"},
+            {"id": "doc3", "title": ""},
+        ]
+
+    def test_snapshot_refreshes_after_graph_changes(self, graphrag):
+        """Test a graph epoch bump rebuilds the snapshot before it is used"""
+        graphrag.query_cache = QueryResultCache()
+        graphrag.snapshot = self._snapshot()
+        graphrag.query_cache.bump_epoch(graph_scope(graphrag.database))
+
+        with patch.object(graphrag, "refresh_snapshot") as mock_refresh:
+            graphrag._graph_snapshot()
+            graphrag._snapshot_refresh.join()
+
+        mock_refresh.assert_called_once()
+
+    def test_stale_snapshot_served_while_refreshing(self, graphrag):
+        """Test a stale snapshot keeps serving while its rebuild runs in the background"""
+        graphrag.snapshot_refresh_seconds = 0
+        previous = self._snapshot()
+        graphrag.snapshot = previous
+        release = threading.Event()
+
+        def slow_refresh():
+            release.wait(5)
+            graphrag.snapshot = self._snapshot()
+
+        with patch.object(graphrag, "refresh_snapshot", side_effect=slow_refresh) as mock_refresh:
+            assert graphrag._graph_snapshot() is previous
+            assert graphrag._graph_snapshot() is previous
+            release.set()
+            graphrag._snapshot_refresh.join()
+
+        # One rebuild at a time, and the new snapshot is used once it is done
+        mock_refresh.assert_called_once()
+        assert graphrag.snapshot is not previous
+
+    def test_failed_snapshot_is_retried_after_refresh_seconds(self, graphrag):
+        """Test a failed load is not retried per request, but again once refresh_seconds pass"""
+        graphrag.neo4j_driver = Mock()
+        graphrag.snapshot_refresh_seconds = 300
+        with patch.object(GraphSnapshot, "load", side_effect=Exception("unavailable")):
+            assert graphrag.refresh_snapshot() is False
+        assert graphrag.snapshot is None
+
+        with patch.object(graphrag, "refresh_snapshot") as mock_refresh:
+            assert graphrag._graph_snapshot() is None
+        mock_refresh.assert_not_called()
+
+        graphrag.snapshot_failed_at -= 301
+        with patch.object(GraphSnapshot, "load", return_value=self._snapshot()):
+            graphrag._graph_snapshot()
+            graphrag._snapshot_refresh.join()
+        assert graphrag.snapshot is not None
+        assert graphrag.snapshot_failed_at is None
+
     def test_analyze_document_impact(self, graphrag):
         """Test document impact analysis"""
         with patch.object(graphrag, "neo4j_driver") as mock_driver:
@@ -798,3 +1080,9 @@ class TestGraphRAGIntegration:
             assert impact["total_reachable"] == 15
             assert impact["central_score"] == 5 / 15
             assert len(impact["impacted_documents"]) == 2
+
+            # Counted over Document neighbours and paths, like the snapshot
+            queries = [c[0][0] for c in mock_session.run.call_args_list]
+            assert "(connected:Document)" in queries[0]
+            assert "all(n IN nodes(p) WHERE n:Document)" in queries[1]
+            assert "all(n IN nodes(p) WHERE n:Document)" in queries[2]
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline neo4j-admin CSV export of the context graph
+"""
+
+import csv
+import datetime
+import json
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+import yaml
+
+from src.storage.graph_builder import GraphBatch, GraphBuilder, document_files
+from src.storage.graph_export import (
+    MANIFEST_NAME,
+    GraphExport,
+    column_type,
+    csv_cell,
+    export_graph,
+    format_cell,
+    verify_import,
+)
+
+
+def _write(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.dump(data))
+
+
+def _read_csv(path: Path):
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    return rows[0], rows[1:]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """A sprint, two decisions and a design with links, mentions and dangling edges"""
+    root = tmp_path / "context"
+    _write(
+        root / "sprints" / "sprint-1.yaml",
+        {
+            "id": "sprint-1",
+            "document_type": "sprint",
+            "title": "Sprint 1",
+            "sprint_number": 1,
+            "created_date": "2025-07-11",
+            "phases": [
+                {"phase": 0, "name": "Setup", "duration_days": 2, "tasks": ["a", "b"]},
+                {"phase": 1, "name": "Build", "tasks": ["c"]},
+            ],
+            "team": [{"agent": "Code Agent", "role": "lead"}, {"agent": "ghost", "role": "x"}],
+        },
+    )
+    _write(
+        root / "decisions" / "adr-1.yaml",
+        {
+            "id": "adr-1",
+            "document_type": "decision",
+            "title": "Use CSV",
+            "created_date": "2025-07-11",
+            "alternatives_considered": {"bolt": "MERGE over Bolt"},
+            "related_decisions": ["adr-2", "adr-9"],
+        },
+    )
+    _write(
+        root / "decisions" / "adr-2.yaml",
+        {"id": "adr-2", "document_type": "decision", "title": "Use Neo4j"},
+    )
+    _write(
+        root / "design" / "graph.yaml",
+        {
+            "id": "design-graph",
+            "document_type": "design",
+            "title": "Graph",
+            "content": "See [[adr-1]] and [[missing-doc]], @sprint-1 and color #fff",
+            "graph_metadata": {"relationships": [{"type": "implements", "target": "adr-2"}]},
+        },
+    )
+    _write(root / "schemas" / "ignored.yaml", {"id": "schema", "document_type": "schema"})
+    return root
+
+
+@pytest.fixture
+def builder(tmp_path):
+    instance = GraphBuilder(config_path=str(tmp_path / "missing.yaml"))
+    instance.processed_cache_path = tmp_path / ".graph_cache" / "processed.json"
+    return instance
+
+
+class TestColumnTypes:
+    """Test property typing and cell formatting"""
+
+    def test_column_type(self):
+        assert column_type([1, 2]) == "long"
+        assert column_type([1, 2.5]) == "double"
+        assert column_type([True]) == "boolean"
+        assert column_type([datetime.date(2025, 1, 1)]) == "date"
+        assert column_type([["a", "b"], ["c"]]) == "string[]"
+        assert column_type([1, "one"]) == "string"
+
+    def test_format_cell(self):
+        assert format_cell(None, "string") is None
+        assert format_cell(True, "boolean") == "true"
+        assert format_cell(datetime.date(2025, 1, 2), "date") == "2025-01-02"
+        assert format_cell(["a", "b"], "string[]") == "a;b"
+        assert format_cell(3, "long") == 3
+
+    def test_csv_cells_parse_back(self, tmp_path):
+        path = tmp_path / "nodes.csv"
+        rows = [["a", None, 1], ["b", "", None], ['"c"', "x,y", 2.5]]
+        GraphExport._write_csv(path, [":ID", "name:string", "n:long"], rows)
+
+        # Unset properties are bare empty cells; empty strings stay quoted
+        lines = path.read_text().splitlines()
+        assert lines[1:] == ['"a",,1', '"b","",', '"""c""","x,y",2.5']
+        assert _read_csv(path) == (
+            [":ID", "name:string", "n:long"],
+            [["a", "", "1"], ["b", "", ""], ['"c"', "x,y", "2.5"]],
+        )
+        assert csv_cell(True) == '"True"'
+
+
+class TestGraphExport:
+    """Test replaying the build rules into CSVs"""
+
+    def test_export_matches_build_rules(self, builder, corpus, tmp_path):
+        output = tmp_path / "import"
+
+        manifest = export_graph(builder, corpus, output)
+
+        assert manifest["node_counts"] == {
+            "Agent": 1,
+            "Alternative": 1,
+            "Decision": 2,
+            "Design": 1,
+            "Document": 4,
+            "Phase": 2,
+            "Sprint": 1,
+            "Task": 3,
+            "Timeline": 1,
+        }
+        assert manifest["relationship_counts"] == {
+            "CONSIDERED": 1,
+            "CREATED_ON": 2,
+            "HAS_PHASE": 2,
+            "HAS_TASK": 3,
+            "HAS_TEAM_MEMBER": 1,
+            "IMPLEMENTS": 1,
+            "REFERENCES": 2,
+            "RELATES_TO": 1,
+        }
+        # [[missing-doc]], adr-9 and #fff wait for documents with those ids
+        assert manifest["pending_edges"] == 3
+        assert manifest["failed_documents"] == 0
+        assert manifest["command"].startswith("neo4j-admin database import full")
+        assert f"--nodes={output / 'nodes_Document.csv'}" in manifest["command"]
+        assert json.loads((output / MANIFEST_NAME).read_text()) == manifest
+
+        header, rows = _read_csv(output / "nodes_Document.csv")
+        assert header[0] == ":ID(Document)" and header[-1] == ":LABEL"
+        assert "sprint_number:long" in header
+        assert "created_date:string" in header
+        labels = {json.loads(row[0]): row[-1] for row in rows}
+        assert labels["adr-1"] == "Decision;Document"
+
+        header, rows = _read_csv(output / "nodes_Phase.csv")
+        assert header == [
+            ":ID(Phase)",
+            "duration_days:long",
+            "name:string",
+            "number:long",
+            ":LABEL",
+        ]
+        assert ["0", "2", "Setup", "0", "Phase"] in rows
+
+        header, rows = _read_csv(output / "relationships_HAS_PHASE_Document_Phase.csv")
+        assert header == [":START_ID(Document)", ":END_ID(Phase)", "status:string", ":TYPE"]
+        assert {row[2] for row in rows} == {"pending"}
+
+    def test_merge_semantics(self):
+        batch = GraphBatch(
+            documents={"Document:Sprint": [{"id": "s1", "props": {"id": "s1", "x": 1}}]},
+            phases=[
+                {"sprint_id": "s1", "phase_num": 1, "name": "first", "duration": 1, "status": "a"},
+                {"sprint_id": "s1", "phase_num": 1, "name": "second", "duration": 2, "status": "a"},
+                {"sprint_id": "s1", "phase_num": "1", "name": "text", "duration": 3, "status": "b"},
+                {"sprint_id": "no", "phase_num": 2, "name": "orphan", "duration": 0, "status": "a"},
+            ],
+            tasks=[{"phase_num": 2, "task_id": "t", "description": "d", "status": "pending"}],
+        )
+
+        export = GraphExport.from_batch(batch)
+
+        phases = export.nodes["Phase"].props
+        # ON CREATE SET keeps the first name; 1 and "1" are different nodes
+        assert phases["1"]["name"] == "first"
+        assert phases['"1"']["name"] == "text"
+        assert len(export.relationships[("HAS_PHASE", "Document", "Phase")]) == 2
+        # Tasks of phases that were never created are dropped, as MATCH would
+        assert len(export.nodes["Task"]) == 0
+
+    def test_seed_cache_skips_unchanged_documents(self, builder, corpus, tmp_path):
+        export_graph(builder, corpus, tmp_path / "import", seed_cache=True)
+
+        assert builder.document_ids["adr-1"].endswith("adr-1.yaml")
+        assert ["REFERENCES", "missing-doc"] in builder.owned_edges["design-graph"]
+        assert ["REFERENCES", "fff"] in builder.owned_edges["design-graph"]
+        assert {e["target_id"] for e in builder.pending_edges} == {"missing-doc", "adr-9", "fff"}
+
+        # A builder loading the seeded cache treats every document as already built
+        reloaded = GraphBuilder(config_path=str(tmp_path / "missing.yaml"))
+        reloaded.processed_cache_path = builder.processed_cache_path
+        reloaded.processed_docs = reloaded._load_processed_cache()
+        reloaded.file_stats = reloaded._load_graph_index()["files"]
+        assert len(reloaded.processed_docs) == 4
+        for path in document_files(corpus):
+            batch = GraphBatch()
+            assert reloaded._collect_document(batch, path) is True
+            assert batch.pending == {}
+
+
+class TestVerifyImport:
+    """Test verifying an imported database against the manifest"""
+
+    def test_reports_mismatches_and_missing_documents(self, builder, corpus, tmp_path):
+        output = tmp_path / "import"
+        manifest = export_graph(builder, corpus, output)
+
+        node_counts = dict(manifest["node_counts"], Task=2)
+        builder.get_statistics = Mock(
+            return_value={
+                "node_counts": node_counts,
+                "relationship_counts": manifest["relationship_counts"],
+            }
+        )
+        session = Mock()
+        session.run.return_value.single.return_value = {"missing": ["adr-2"]}
+        session_cm = Mock()
+        session_cm.__enter__ = Mock(return_value=session)
+        session_cm.__exit__ = Mock(return_value=None)
+        builder.driver = Mock()
+        builder.driver.session.return_value = session_cm
+
+        result = verify_import(builder, output)
+
+        builder.get_statistics.assert_called_once_with(refresh=True)
+        assert result["ok"] is False
+        assert result["mismatches"] == {"Task": {"expected": 3, "actual": 2}}
+        assert result["missing_documents"] == ["adr-2"]
+        assert sorted(session.run.call_args[1]["ids"]) == [
+            "adr-1",
+            "adr-2",
+            "design-graph",
+            "sprint-1",
+        ]
+
+    def test_statistics_error(self, builder, corpus, tmp_path):
+        output = tmp_path / "import"
+        export_graph(builder, corpus, output)
+        builder.get_statistics = Mock(return_value={"error": "unavailable"})
+
+        assert verify_import(builder, output) == {"ok": False, "error": "unavailable"}
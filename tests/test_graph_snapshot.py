@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-memory graph snapshot
+"""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.analytics.graph_snapshot import GraphSnapshot, label_propagation, pagerank
+
+
+def _snapshot(edges, ids=("a", "b", "c", "d")):
+    return GraphSnapshot.from_edges([(doc_id, "design", doc_id.upper()) for doc_id in ids], edges)
+
+
+class TestAlgorithms:
+    """Test PageRank and community detection"""
+
+    def test_pagerank_sums_to_one_and_ranks_hubs(self):
+        # b, c and d all point at a; a is dangling
+        rank = pagerank(4, np.array([1, 2, 3]), np.array([0, 0, 0]), iterations=50)
+
+        assert rank.sum() == pytest.approx(1.0)
+        assert rank.argmax() == 0
+        assert rank[1] == pytest.approx(rank[2])
+
+    def test_pagerank_of_empty_graph(self):
+        assert len(pagerank(0, np.array([], dtype=int), np.array([], dtype=int))) == 0
+
+    def test_label_propagation_separates_components(self):
+        snapshot = _snapshot(
+            [("a", "b", "REFERENCES"), ("c", "d", "REFERENCES")],
+        )
+
+        assert snapshot.community[0] == snapshot.community[1]
+        assert snapshot.community[2] == snapshot.community[3]
+        assert snapshot.community[0] != snapshot.community[2]
+
+    def test_label_propagation_isolated_nodes(self):
+        indptr = np.zeros(3, dtype=np.int64)
+        assert label_propagation(2, indptr, np.array([], dtype=np.int32)).tolist() == [0, 1]
+
+    def test_label_propagation_joins_pairs_and_splits_cliques(self):
+        # A single edge settles on one label instead of swapping every pass
+        assert _snapshot([("a", "b", "REFERENCES")], ids=("a", "b")).community.tolist() == [0, 0]
+
+        # Two triangles joined by one bridge stay two communities
+        ids = ("a", "b", "c", "d", "e", "f")
+        edges = [("a", "b"), ("b", "c"), ("a", "c"), ("d", "e"), ("e", "f"), ("d", "f"), ("c", "d")]
+        community = _snapshot([(s, t, "REFERENCES") for s, t in edges], ids=ids).community
+
+        assert len(set(community[:3].tolist())) == 1
+        assert len(set(community[3:].tolist())) == 1
+        assert community[0] != community[3]
+
+
+class TestGraphSnapshot:
+    """Test CSR adjacency queries"""
+
+    def test_builds_csr_and_skips_unknown_endpoints(self):
+        snapshot = _snapshot(
+            [("a", "b", "DEPENDS_ON"), ("a", "c", "REFERENCES"), ("a", "zzz", "REFERENCES")]
+        )
+
+        assert len(snapshot) == 4
+        assert snapshot.out_indptr.tolist() == [0, 2, 2, 2, 2]
+        assert sorted(snapshot.out_indices.tolist()) == [1, 2]
+        assert snapshot.degree.tolist() == [2, 1, 1, 0]
+        assert "zzz" not in snapshot
+
+    def test_degree_ignores_duplicate_and_self_edges(self):
+        snapshot = _snapshot(
+            [("a", "b", "REFERENCES"), ("b", "a", "DEPENDS_ON"), ("a", "a", "REFERENCES")]
+        )
+
+        assert snapshot.degree.tolist() == [1, 1, 0, 0]
+
+    def test_reachable_within_hops(self):
+        snapshot = _snapshot(
+            [("a", "b", "REFERENCES"), ("c", "b", "REFERENCES"), ("c", "d", "REFERENCES")]
+        )
+
+        assert snapshot.reachable("a", max_hops=1) == {1}
+        assert snapshot.reachable("a", max_hops=3) == {1, 2, 3}
+
+    def test_dependents_follow_incoming_dependency_types(self):
+        snapshot = _snapshot(
+            [("b", "a", "DEPENDS_ON"), ("c", "b", "IMPLEMENTS"), ("d", "a", "RELATED_TO")]
+        )
+
+        assert [snapshot.ids[i] for i in snapshot.dependents("a")] == ["b", "c"]
+        assert snapshot.dependents("a", max_hops=1) == [1]
+
+    def test_centrality_is_relative_to_the_top_document(self):
+        snapshot = _snapshot([("b", "a", "REFERENCES"), ("c", "a", "REFERENCES")])
+
+        assert snapshot.centrality("a") == pytest.approx(1.0)
+        assert 0.0 < snapshot.centrality("b") < 1.0
+        assert snapshot.centrality("unknown") == 0.0
+
+    def test_load_from_neo4j(self):
+        driver = MagicMock()
+        session = driver.session.return_value.__enter__.return_value
+        session.run.side_effect = [
+            [
+                {"id": "a", "type": "design", "title": "A"},
+                {"id": None, "type": None, "title": None},
+            ],
+            [{"source": "a", "target": "a", "type": "REFERENCES"}],
+        ]
+
+        snapshot = GraphSnapshot.load(driver, "context_graph", graph_epoch=3)
+
+        driver.session.assert_called_once_with(database="context_graph")
+        assert snapshot.ids == ["a"]
+        assert snapshot.graph_epoch == 3
+        assert snapshot.relationship_types == ["REFERENCES"]
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Tests for async GraphRAG search with overlapping stages and deadlines
+"""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.integrations.graphrag_integration import GraphRAGResult
+from src.integrations.graphrag_integration_async import AsyncGraphRAGIntegration
+
+
+class _AsyncRecords:
+    """Async-iterable stand-in for a neo4j AsyncResult"""
+
+    def __init__(self, records):
+        self._records = list(records)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for record in self._records:
+            yield record
+
+
+def _async_driver(run):
+    """Async driver whose sessions delegate session.run to the given coroutine"""
+    session = Mock()
+    session.run = run
+    session_cm = Mock()
+    session_cm.__aenter__ = AsyncMock(return_value=session)
+    session_cm.__aexit__ = AsyncMock(return_value=None)
+    driver = Mock()
+    driver.session.return_value = session_cm
+    driver.close = AsyncMock()
+    return driver
+
+
+def _hit(doc_id: str, score: float):
+    return Mock(id=f"vec-{doc_id}", score=score, payload={"document_id": doc_id, "title": doc_id})
+
+
+def _expansion_record(source: str, target: str) -> dict:
+    return {
+        "source_id": source,
+        "source_type": "design",
+        "source_title": source,
+        "target_id": target,
+        "target_type": "decision",
+        "target_title": target,
+        "relationships": [{"type": "REFERENCES", "properties": {}}],
+        "distance": 1,
+    }
+
+
+@pytest.fixture
+def graphrag():
+    """Create async GraphRAG instance without caching or hybrid retrieval"""
+    instance = AsyncGraphRAGIntegration()
+    instance.hybrid_enabled = False
+    instance.procedures = set()
+    return instance
+
+
+class TestAsyncGraphRAGSearch:
+    """Test staged async search"""
+
+    @pytest.mark.asyncio
+    async def test_leading_seeds_expanded_separately(self, graphrag):
+        """Test the leading and other hits are expanded in separate queries"""
+        graphrag.leading_seeds = 1
+        hits = [_hit("doc1", 0.9), _hit("doc2", 0.8), _hit("doc3", 0.7)]
+
+        async def query_points(**kwargs):
+            return Mock(points=hits[: kwargs["limit"]])
+
+        graphrag.async_qdrant_client = Mock()
+        graphrag.async_qdrant_client.query_points = AsyncMock(side_effect=query_points)
+
+        calls = []
+
+        async def run(query, **params):
+            calls.append((query.text, params["doc_ids"]))
+            if "shortestPath" in query.text:
+                return _AsyncRecords([{"nodes": ["doc1", "doc2"], "distance": 1}])
+            return _AsyncRecords([_expansion_record(d, f"{d}-ref") for d in params["doc_ids"]])
+
+        graphrag.async_neo4j_driver = _async_driver(run)
+
+        result = await graphrag.asearch("query", [0.1] * 4, max_hops=2, top_k=3)
+
+        # The top_k search and the speculative search for the leading hits
+        limits = [
+            c.kwargs["limit"] for c in graphrag.async_qdrant_client.query_points.call_args_list
+        ]
+        assert limits == [3, 1]
+        expansions = [ids for text, ids in calls if "shortestPath" not in text]
+        assert expansions == [["doc1"], ["doc2", "doc3"]]
+        paths = [ids for text, ids in calls if "shortestPath" in text]
+        assert paths == [["doc1", "doc2", "doc3"]]
+
+        assert isinstance(result, GraphRAGResult)
+        assert [r["document_id"] for r in result.vector_results] == ["doc1", "doc2", "doc3"]
+        assert {"doc1-ref", "doc2-ref", "doc3-ref"} <= set(result.graph_context["nodes"])
+        assert result.graph_context["paths"] == [{"nodes": ["doc1", "doc2"], "distance": 1}]
+        assert "partial" not in result.graph_context
+
+    @pytest.mark.asyncio
+    async def test_leading_seeds_expand_during_vector_search(self, graphrag):
+        """Test the leading hits are expanded while the top_k search is still running"""
+        graphrag.leading_seeds = 1
+        hits = [_hit("doc1", 0.9), _hit("doc2", 0.8)]
+        events = []
+
+        async def query_points(**kwargs):
+            if kwargs["limit"] > 1:
+                await asyncio.sleep(0.1)
+            events.append(f"search:{kwargs['limit']}")
+            return Mock(points=hits[: kwargs["limit"]])
+
+        async def run(query, **params):
+            events.append(f"expand:{','.join(params['doc_ids'])}")
+            return _AsyncRecords([])
+
+        graphrag.async_qdrant_client = Mock()
+        graphrag.async_qdrant_client.query_points = query_points
+        graphrag.async_neo4j_driver = _async_driver(run)
+
+        await graphrag.asearch("query", [0.1] * 4, top_k=2)
+
+        assert events.index("expand:doc1") < events.index("search:2")
+        assert "expand:doc2" in events
+        assert events.count("expand:doc1") == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_vector_search_keeps_leading_hits(self, graphrag):
+        """Test the speculative leading hits are returned when the top_k search times out"""
+        graphrag.leading_seeds = 1
+
+        async def query_points(**kwargs):
+            if kwargs["limit"] > 1:
+                await asyncio.sleep(5)
+            return Mock(points=[_hit("doc1", 0.9)])
+
+        graphrag.async_qdrant_client = Mock()
+        graphrag.async_qdrant_client.query_points = query_points
+        graphrag.async_neo4j_driver = _async_driver(
+            AsyncMock(return_value=_AsyncRecords([_expansion_record("doc1", "doc9")]))
+        )
+
+        result = await graphrag.asearch("query", [0.1] * 4, top_k=5, deadline_seconds=0.1)
+
+        assert [r["document_id"] for r in result.vector_results] == ["doc1"]
+        assert result.graph_context["timed_out"] == ["vector_search"]
+        assert "doc9" in result.graph_context["nodes"]
+
+    @pytest.mark.asyncio
+    async def test_query_cache_runs_off_the_event_loop(self, graphrag):
+        """Test the synchronous query cache is called from worker threads"""
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def record(result=None):
+            def call(*args, **kwargs):
+                threads.append(threading.get_ident())
+                return result
+
+            return call
+
+        graphrag.query_cache = Mock()
+        graphrag.query_cache.make_key.side_effect = record("key")
+        graphrag.query_cache.get.side_effect = record()
+        graphrag.query_cache.set.side_effect = record()
+        graphrag.query_cache.get_epoch.side_effect = record(0)
+        graphrag.async_qdrant_client = Mock()
+        graphrag.async_qdrant_client.query_points = AsyncMock(return_value=Mock(points=[]))
+
+        await graphrag.asearch("query", [0.1] * 4, top_k=1)
+
+        graphrag.query_cache.get.assert_called_once_with("key")
+        graphrag.query_cache.set.assert_called_once()
+        assert threads and loop_thread not in threads
+
+    @pytest.mark.asyncio
+    async def test_stale_snapshot_refreshed_in_background(self, graphrag):
+        """Test a stale snapshot is rebuilt in a task while the search uses the previous one"""
+        previous = Mock(graph_epoch=0)
+        previous.age.return_value = 10**6
+        previous.__contains__ = Mock(return_value=False)
+        graphrag.snapshot = previous
+        release = asyncio.Event()
+
+        async def arefresh_snapshot():
+            await release.wait()
+            graphrag.snapshot = None
+            return True
+
+        graphrag.async_qdrant_client = Mock()
+        graphrag.async_qdrant_client.query_points = AsyncMock(
+            return_value=Mock(points=[_hit("doc1", 0.9)])
+        )
+        graphrag.async_neo4j_driver = _async_driver(AsyncMock(return_value=_AsyncRecords([])))
+
+        with patch.object(graphrag, "arefresh_snapshot", side_effect=arefresh_snapshot) as refresh:
+            # Awaiting the rebuild here would block until release is set
+            await asyncio.wait_for(graphrag.asearch("query", [0.1] * 4, top_k=1), timeout=1)
+            assert graphrag.snapshot is previous
+            await graphrag.asearch("query", [0.1] * 4, top_k=1)
+            release.set()
+            await graphrag._snapshot_task
+
+        refresh.assert_called_once()
+        assert graphrag.snapshot is None
+
+    @pytest.mark.asyncio
+    async def test_deadline_returns_partial_results(self, graphrag):
+        """Test slow graph stages are cancelled at the deadline"""
+        graphrag.async_qdrant_client = Mock()
+        graphrag.async_qdrant_client.query_points = AsyncMock(
+            return_value=Mock(points=[_hit("doc1", 0.9), _hit("doc2", 0.8)])
+        )
+
+        async def slow_run(query, **params):
+            await asyncio.sleep(5)
+
+        graphrag.async_neo4j_driver = _async_driver(slow_run)
+
+        result = await graphrag.asearch("query", [0.1] * 4, top_k=2, deadline_seconds=0.05)
+
+        assert len(result.vector_results) == 2
+        assert result.graph_context["partial"] is True
+        assert result.graph_context["timed_out"] == ["expansion", "paths"]
+        assert result.graph_context["nodes"] == {}
+
+    @pytest.mark.asyncio
+    async def test_slow_expansion_keeps_leading_neighborhood(self, graphrag):
+        """Test the leading hits' neighborhood is kept when the other expansion times out"""
+        graphrag.leading_seeds = 1
+        graphrag.async_qdrant_client = Mock()
+        graphrag.async_qdrant_client.query_points = AsyncMock(
+            return_value=Mock(points=[_hit("doc1", 0.9), _hit("doc2", 0.8)])
+        )
+
+        async def run(query, **params):
+            if params["doc_ids"] != ["doc1"]:
+                await asyncio.sleep(5)
+            return _AsyncRecords([_expansion_record("doc1", "doc9")])
+
+        graphrag.async_neo4j_driver = _async_driver(run)
+
+        result = await graphrag.asearch("query", [0.1] * 4, top_k=2, deadline_seconds=0.1)
+
+        assert [r["document_id"] for r in result.vector_results] == ["doc1", "doc2"]
+        assert result.graph_context["timed_out"] == ["expansion", "paths"]
+        assert "doc9" in result.graph_context["nodes"]
+
+    @pytest.mark.asyncio
+    async def test_slow_vector_search_times_out(self, graphrag):
+        """Test a vector search past the deadline returns an empty partial result"""
+
+        async def query_points(**kwargs):
+            await asyncio.sleep(5)
+
+        graphrag.async_qdrant_client = Mock()
+        graphrag.async_qdrant_client.query_points = query_points
+        graphrag.async_neo4j_driver = _async_driver(AsyncMock())
+
+        result = await graphrag.asearch("query", [0.1] * 4, top_k=5, deadline_seconds=0.05)
+
+        assert result.vector_results == []
+        assert result.graph_context["timed_out"] == ["vector_search"]
+        graphrag.async_neo4j_driver.session.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_expansion_is_reported(self, graphrag):
+        """Test expansion errors surface in the graph context"""
+        graphrag.async_qdrant_client = Mock()
+        graphrag.async_qdrant_client.query_points = AsyncMock(
+            return_value=Mock(points=[_hit("doc1", 0.9)])
+        )
+        graphrag.async_neo4j_driver = _async_driver(AsyncMock(side_effect=Exception("timed out")))
+
+        with patch("click.echo"):
+            result = await graphrag.asearch("query", [0.1] * 4, top_k=1)
+
+        assert result.graph_context["error"] == "timed out"
+        assert result.vector_results[0]["document_id"] == "doc1"
+
+
+class TestAsyncGraphRAGConnect:
+    """Test async connection setup"""
+
+    @pytest.mark.asyncio
+    @patch("src.integrations.graphrag_integration_async.AsyncQdrantClient")
+    @patch("src.integrations.graphrag_integration_async.AsyncGraphDatabase.driver")
+    async def test_aconnect_probes_procedures(self, mock_driver, mock_qdrant):
+        """Test procedures are probed, and the cache and snapshot set up, when connecting"""
+
+        async def run(query, **params):
+            text = query.text if hasattr(query, "text") else query
+            if "MATCH (d:Document)" in text:
+                return _AsyncRecords(
+                    [
+                        {"id": "doc1", "type": "design", "title": "Doc 1"},
+                        {"id": "doc2", "type": "decision", "title": "Doc 2"},
+                    ]
+                )
+            if "MATCH (a:Document)" in text:
+                return _AsyncRecords([{"source": "doc1", "target": "doc2", "type": "IMPLEMENTS"}])
+            return _AsyncRecords([{"name": "apoc.path.expandConfig"}])
+
+        mock_driver.return_value = _async_driver(run)
+        mock_qdrant.return_value.get_collections = AsyncMock()
+        mock_qdrant.return_value.close = AsyncMock()
+
+        graphrag = AsyncGraphRAGIntegration()
+        graphrag.perf_config = {
+            "graph_db": {"query": {"use_query_cache": True}, "snapshot": {"enabled": True}}
+        }
+        graphrag.snapshot_enabled = True
+        assert await graphrag.aconnect(neo4j_password="secret") is True
+        assert graphrag.procedures == {"apoc.path.expandConfig"}
+        assert graphrag.query_cache is not None
+        assert graphrag.snapshot is not None
+        assert len(graphrag.snapshot) == 2
+        assert "doc2" in graphrag.snapshot
+
+        await graphrag.aclose()
+        assert graphrag.async_neo4j_driver is None
+
+    @pytest.mark.asyncio
+    async def test_aconnect_requires_password(self):
+        """Test connecting without a Neo4j password fails fast"""
+        graphrag = AsyncGraphRAGIntegration()
+
+        with patch("click.echo") as mock_echo:
+            assert await graphrag.aconnect() is False
+
+        mock_echo.assert_called_with("Error: Neo4j password is required", err=True)
@@ -436,6 +436,22 @@ class TestErrorHandling:
             assert result is False
             mock_echo.assert_called_with("Failed to connect: Connection timeout", err=True)
 
+    @patch("src.storage.hash_diff_embedder.QdrantClient")
+    def test_connect_prefer_grpc(self, mock_qdrant_client: Mock) -> None:
+        """Test gRPC transport is only requested when prefer_grpc is set"""
+        embedder = HashDiffEmbedder()
+        embedder.config = {"qdrant": {"host": "localhost", "port": 6333}}
+
+        with patch("click.echo"):
+            embedder.connect()
+        assert "prefer_grpc" not in mock_qdrant_client.call_args[1]
+
+        embedder.config["qdrant"].update({"prefer_grpc": True, "grpc_port": 7334})
+        with patch("click.echo"):
+            embedder.connect()
+        assert mock_qdrant_client.call_args[1]["prefer_grpc"] is True
+        assert mock_qdrant_client.call_args[1]["grpc_port"] == 7334
+
     def test_document_hash_with_invalid_data(self) -> None:
         """Test DocumentHash dataclass with invalid data types"""
         # This should work - dataclass doesn't validate types at runtime
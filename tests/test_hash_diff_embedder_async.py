@@ -12,6 +12,7 @@ from unittest.mock import AsyncMock, patch
 import pytest
 import yaml
 
+from src.storage.hash_diff_embedder import compute_point_id
 from src.storage.hash_diff_embedder_async import AsyncHashDiffEmbedder, EmbeddingTask
 
 
@@ -356,7 +357,7 @@ class TestProcessEmbeddingTask:
             result = await embedder._process_embedding_task(embedding_task)
 
             assert result is not None
-            assert result.startswith("test-001-")
+            assert result == compute_point_id("test-001")
 
             # Check cache was updated
             cache_key = str(embedding_task.file_path)
@@ -383,7 +384,48 @@ class TestProcessEmbeddingTask:
             result = await embedder._process_embedding_task(task)
 
             assert result is not None
-            assert result.startswith("minimal-001-")
+            assert result == compute_point_id("minimal-001")
+            assert "sprint_number" not in embedder.client.upsert.call_args[1]["points"][0].payload
+
+    @pytest.mark.asyncio
+    async def test_process_embedding_task_writes_sprint_number(self, embedder, temp_dir) -> None:
+        """Test sprint numbers reach the payload for the integer payload index"""
+        task = EmbeddingTask(
+            file_path=temp_dir / "sprint.yaml",
+            document_id="sprint-4",
+            content="sprint",
+            data={"id": "sprint-4", "title": "Sprint 4", "sprint_number": 4},
+        )
+
+        with patch.object(embedder, "_embed_with_retry", return_value=[0.1, 0.2]):
+            embedder.client = AsyncMock()
+            await embedder._process_embedding_task(task)
+
+        assert embedder.client.upsert.call_args[1]["points"][0].payload["sprint_number"] == 4
+
+    @pytest.mark.asyncio
+    async def test_process_embedding_task_deletes_previous_point(
+        self, embedder, embedding_task
+    ) -> None:
+        """Test a document cached under a legacy ID has its old point deleted by filter"""
+        cache_key = str(embedding_task.file_path)
+        embedder.hash_cache[cache_key] = {"content_hash": "old", "vector_id": "test-001-1a2b"}
+
+        with patch.object(embedder, "_embed_with_retry", return_value=[0.1, 0.2, 0.3]):
+            embedder.client = AsyncMock()
+
+            result = await embedder._process_embedding_task(embedding_task)
+
+        assert result == compute_point_id("test-001")
+        selector = embedder.client.delete.call_args[1]["points_selector"]
+        assert selector.filter.must[0].match.any == [cache_key]
+        assert selector.filter.must_not[0].has_id == [result]
+
+        # Re-embedding under the stable ID needs no delete
+        embedder.client.delete.reset_mock()
+        with patch.object(embedder, "_embed_with_retry", return_value=[0.1, 0.2, 0.3]):
+            await embedder._process_embedding_task(embedding_task)
+        embedder.client.delete.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_process_embedding_task_failure(self, embedder, embedding_task) -> None:
@@ -547,6 +589,42 @@ class TestEmbedDirectory:
             assert embedded == 5
             assert total == 5
 
+    @pytest.mark.asyncio
+    async def test_embed_directory_batches_upserts(self, embedder, docs_dir) -> None:
+        """Test concurrent tasks write their points through one batched upsert"""
+        for i in range(3):
+            with open(docs_dir / f"doc{i}.yaml", "w") as f:
+                yaml.dump({"id": f"doc-{i:03d}", "title": f"Document {i}"}, f)
+        embedder.client = AsyncMock()
+
+        with patch.object(embedder, "_embed_with_retry", return_value=[0.1, 0.2, 0.3]):
+            embedded, total = await embedder.embed_directory(docs_dir)
+
+        assert (embedded, total) == (3, 3)
+        embedder.client.upsert.assert_awaited_once()
+        points = embedder.client.upsert.call_args[1]["points"]
+        assert sorted(p.id for p in points) == sorted(
+            compute_point_id(f"doc-{i:03d}") for i in range(3)
+        )
+        assert embedder.batcher is None
+
+    @pytest.mark.asyncio
+    async def test_embed_directory_drops_failed_batches_from_cache(
+        self, embedder, docs_dir
+    ) -> None:
+        """Test documents of a failed batch are re-embedded on the next run"""
+        doc_path = docs_dir / "doc.yaml"
+        with open(doc_path, "w") as f:
+            yaml.dump({"id": "doc-001", "title": "Document"}, f)
+        embedder.client = AsyncMock()
+        embedder.client.upsert.side_effect = Exception("Connection refused")
+
+        with patch.object(embedder, "_embed_with_retry", return_value=[0.1, 0.2, 0.3]):
+            embedded, total = await embedder.embed_directory(docs_dir)
+
+        assert (embedded, total) == (0, 1)
+        assert str(doc_path) not in embedder.hash_cache
+
     @pytest.mark.asyncio
     async def test_embed_directory_saves_cache(self, embedder, docs_dir) -> None:
         """Test that cache is saved to disk"""
@@ -9,8 +9,10 @@ from pathlib import Path
 from unittest.mock import Mock, patch
 
 import yaml
+from qdrant_client.models import FilterSelector
 
-from src.storage.hash_diff_embedder import DocumentHash, HashDiffEmbedder
+from src.storage.hash_diff_embedder import DocumentHash, HashDiffEmbedder, compute_point_id
+from src.storage.qdrant_batcher import stale_points_filter
 
 
 class TestHashDiffEmbedderCoverage:
@@ -248,7 +250,11 @@ class TestHashDiffEmbedderCoverage:
             call_args = mock_qdrant.delete.call_args
             # Check positional and keyword arguments
             assert call_args[1]["collection_name"] == "test_collection"
-            assert call_args[1]["points_selector"] == ["old_vector_id"]
+            assert call_args[1]["points_selector"] == FilterSelector(
+                filter=stale_points_filter(
+                    "file_path", [str(test_file)], [compute_point_id("update_doc")]
+                )
+            )
 
     def test_embed_directory_with_nested_files(self):
         """Test embed_directory with nested YAML files"""
@@ -291,6 +297,159 @@ class TestHashDiffEmbedderCoverage:
                 assert any("doc1.yaml" in str(p) for p in embed_calls)
                 assert any("doc2.yaml" in str(p) for p in embed_calls)
 
+    @patch("src.storage.hash_diff_embedder.openai.OpenAI")
+    def test_embed_directory_batches_upserts(self, mock_openai):
+        """Test embed_directory writes all documents through one batched upsert"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for i in range(3):
+                (Path(temp_dir) / f"doc{i}.yaml").write_text(
+                    yaml.dump({"id": f"doc{i}", "title": f"Document {i}"})
+                )
+
+            mock_client = Mock()
+            mock_response = Mock()
+            mock_response.data = [Mock(embedding=[0.1, 0.2, 0.3])]
+            mock_client.embeddings.create.return_value = mock_response
+            mock_openai.return_value = mock_client
+
+            mock_qdrant = Mock()
+            embedder = HashDiffEmbedder()
+            embedder.client = mock_qdrant
+            embedder.config = {"qdrant": {"collection_name": "test_collection"}}
+            embedder.hash_cache_path = Path(temp_dir) / ".embeddings_cache" / "hash_cache.json"
+
+            with patch.dict(os.environ, {"OPENAI_API_KEY": "test_key"}):
+                embedded, total = embedder.embed_directory(Path(temp_dir))
+
+            assert (embedded, total) == (3, 3)
+            # One upsert for the batch plus nothing else: the final flush waits
+            mock_qdrant.upsert.assert_called_once()
+            assert len(mock_qdrant.upsert.call_args[1]["points"]) == 3
+            assert mock_qdrant.upsert.call_args[1]["wait"] is True
+            # New documents have no previous points to delete
+            mock_qdrant.delete.assert_not_called()
+            assert embedder.batcher is None
+
+    @patch("src.storage.hash_diff_embedder.openai.OpenAI")
+    def test_embed_document_reembed_updates_in_place(self, mock_openai):
+        """Test changed content reuses the point ID and skips the delete round trip"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_file = Path(temp_dir) / "stable_doc.yaml"
+            test_file.write_text(yaml.dump({"id": "stable_doc", "title": "Version 1"}))
+
+            mock_client = Mock()
+            mock_client.embeddings.create.side_effect = [
+                Mock(data=[Mock(embedding=[0.1, 0.2, 0.3])]),
+                Mock(data=[Mock(embedding=[0.4, 0.5, 0.6])]),
+            ]
+            mock_openai.return_value = mock_client
+
+            mock_qdrant = Mock()
+            embedder = HashDiffEmbedder()
+            embedder.client = mock_qdrant
+            embedder.hash_cache = {}
+
+            with patch.dict(os.environ, {"OPENAI_API_KEY": "test_key"}):
+                first_id = embedder.embed_document(test_file)
+                test_file.write_text(yaml.dump({"id": "stable_doc", "title": "Version 2"}))
+                second_id = embedder.embed_document(test_file)
+
+            assert first_id == second_id == compute_point_id("stable_doc")
+            assert mock_qdrant.upsert.call_count == 2
+            mock_qdrant.delete.assert_not_called()
+
+    @patch("src.storage.hash_diff_embedder.openai.OpenAI")
+    def test_embed_document_writes_sprint_number(self, mock_openai):
+        """Test sprint numbers reach the payload for the integer payload index"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            sprint_file = Path(temp_dir) / "sprint.yaml"
+            sprint_file.write_text(yaml.dump({"id": "sprint-4", "sprint_number": 4}))
+            design_file = Path(temp_dir) / "design.yaml"
+            design_file.write_text(yaml.dump({"id": "design", "title": "No sprint"}))
+
+            mock_client = Mock()
+            mock_client.embeddings.create.return_value = Mock(
+                data=[Mock(embedding=[0.1, 0.2, 0.3])]
+            )
+            mock_openai.return_value = mock_client
+
+            embedder = HashDiffEmbedder()
+            embedder.client = Mock()
+            embedder.hash_cache = {}
+
+            with patch.dict(os.environ, {"OPENAI_API_KEY": "test_key"}):
+                embedder.embed_document(sprint_file)
+                embedder.embed_document(design_file)
+
+            sprint_call, design_call = embedder.client.upsert.call_args_list
+            assert sprint_call[1]["points"][0].payload["sprint_number"] == 4
+            assert "sprint_number" not in design_call[1]["points"][0].payload
+
+    @patch("src.storage.hash_diff_embedder.openai.OpenAI")
+    def test_embed_document_replaces_legacy_vector_id(self, mock_openai):
+        """Test a cached legacy ID is deleted once when migrating to stable IDs"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_file = Path(temp_dir) / "legacy_doc.yaml"
+            test_file.write_text(yaml.dump({"id": "legacy_doc", "title": "Changed"}))
+
+            mock_client = Mock()
+            mock_client.embeddings.create.return_value = Mock(
+                data=[Mock(embedding=[0.1, 0.2, 0.3])]
+            )
+            mock_openai.return_value = mock_client
+
+            mock_qdrant = Mock()
+            embedder = HashDiffEmbedder()
+            embedder.client = mock_qdrant
+            embedder.hash_cache = {
+                str(test_file): DocumentHash(
+                    document_id="legacy_doc",
+                    file_path=str(test_file),
+                    content_hash="outdated",
+                    embedding_hash="embed123",
+                    last_embedded="2024-01-01T00:00:00",
+                    vector_id="legacy_doc-1a2b3c4d",
+                )
+            }
+
+            with patch.dict(os.environ, {"OPENAI_API_KEY": "test_key"}):
+                vector_id = embedder.embed_document(test_file)
+
+            assert vector_id == compute_point_id("legacy_doc")
+            mock_qdrant.delete.assert_called_once()
+            # Legacy IDs are not valid in an ID list, so the delete matches the file path
+            selector = mock_qdrant.delete.call_args[1]["points_selector"]
+            assert selector.filter.must[0].key == "file_path"
+            assert selector.filter.must[0].match.any == [str(test_file)]
+            assert selector.filter.must_not[0].has_id == [vector_id]
+            assert embedder.hash_cache[str(test_file)].vector_id == vector_id
+
+    @patch("src.storage.hash_diff_embedder.openai.OpenAI")
+    @patch("click.echo")
+    def test_embed_directory_failed_batch_not_cached(self, mock_echo, mock_openai):
+        """Test documents from a failed batch are dropped from the hash cache"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "doc.yaml").write_text(yaml.dump({"id": "doc", "title": "Doc"}))
+
+            mock_client = Mock()
+            mock_response = Mock()
+            mock_response.data = [Mock(embedding=[0.1, 0.2, 0.3])]
+            mock_client.embeddings.create.return_value = mock_response
+            mock_openai.return_value = mock_client
+
+            mock_qdrant = Mock()
+            mock_qdrant.upsert.side_effect = Exception("Connection refused")
+            embedder = HashDiffEmbedder()
+            embedder.client = mock_qdrant
+            embedder.hash_cache = {}
+            embedder.hash_cache_path = Path(temp_dir) / ".embeddings_cache" / "hash_cache.json"
+
+            with patch.dict(os.environ, {"OPENAI_API_KEY": "test_key"}):
+                embedded, total = embedder.embed_directory(Path(temp_dir))
+
+            assert (embedded, total) == (0, 1)
+            assert embedder.hash_cache == {}
+
     @patch("src.storage.hash_diff_embedder.QdrantClient")
     @patch("click.echo")
     def test_cleanup_orphaned_vectors(self, mock_echo, mock_qdrant_class):
@@ -339,11 +498,53 @@ class TestHashDiffEmbedderCoverage:
         removed = embedder.cleanup_orphaned_vectors()
 
         assert removed == 2
-        # Verify delete was called for orphaned vectors
-        assert mock_qdrant.delete.call_count == 2
+        # Verify orphaned vectors were deleted in one batched request
+        mock_qdrant.delete.assert_called_once()
+        assert mock_qdrant.delete.call_args[1]["points_selector"].points == ["vec1", "vec3"]
+        # Verify only the file path payload was requested, without vectors
+        scroll_kwargs = mock_qdrant.scroll.call_args[1]
+        assert scroll_kwargs["with_payload"] == ["file_path"]
+        assert scroll_kwargs["with_vectors"] is False
         # Verify cache was updated
         assert len(embedder.hash_cache) == 0
 
+    @patch("click.echo")
+    def test_cleanup_orphaned_vectors_paginates_against_directory_walk(self, mock_echo):
+        """Test cleanup scrolls every page and checks in-tree paths against one walk"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "design").mkdir()
+            kept = root / "design" / "kept.yaml"
+            kept.write_text("title: Kept")
+
+            def make_point(point_id, file_path):
+                point = Mock()
+                point.id = point_id
+                point.payload = {"file_path": str(file_path)}
+                return point
+
+            mock_qdrant = Mock()
+            mock_qdrant.scroll.side_effect = [
+                ([make_point("p1", kept), make_point("p2", root / "gone.yaml")], "page-2"),
+                ([make_point("p3", root / "design" / "removed.yaml")], None),
+            ]
+
+            embedder = HashDiffEmbedder()
+            embedder.client = mock_qdrant
+            embedder.hash_cache = {}
+            embedder.hash_cache_path = root / ".embeddings_cache" / "hash_cache.json"
+
+            with patch("src.storage.hash_diff_embedder.Path.exists") as mock_exists:
+                removed = embedder.cleanup_orphaned_vectors(root=root, delete_batch_size=1)
+
+            assert removed == 2
+            assert mock_qdrant.scroll.call_count == 2
+            assert mock_qdrant.scroll.call_args_list[1][1]["offset"] == "page-2"
+            # In-tree paths never hit the filesystem one by one
+            mock_exists.assert_not_called()
+            deleted = [c[1]["points_selector"].points for c in mock_qdrant.delete.call_args_list]
+            assert deleted == [["p2"], ["p3"]]
+
     @patch("src.storage.hash_diff_embedder.QdrantClient")
     @patch("click.echo")
     def test_cleanup_orphaned_vectors_error(self, mock_echo, mock_qdrant_class):
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for sparse lexical vectors and rank fusion
+"""
+
+from unittest.mock import Mock
+
+import pytest
+from qdrant_client.models import ScoredPoint, SparseVector
+
+from src.storage.hybrid import (
+    SPARSE_VECTOR_NAME,
+    dense_vector,
+    encode_document,
+    encode_query,
+    fuse_points,
+    fuse_rankings,
+    has_sparse_vectors,
+    point_vector,
+    term_index,
+    tokenize,
+)
+
+
+def _point(point_id: str, score: float) -> ScoredPoint:
+    return ScoredPoint(id=point_id, version=0, score=score, payload={"document_id": point_id})
+
+
+class TestTokenize:
+    """Test identifier-preserving tokenization"""
+
+    def test_keeps_identifiers_and_parts(self):
+        terms = tokenize("See ADR-012 and issue #345")
+
+        assert "adr-012" in terms
+        assert {"adr", "012"} <= set(terms)
+        assert "#345" in terms and "345" in terms
+
+    def test_splits_code_identifiers(self):
+        terms = tokenize("searchSingle calls hash_diff_embedder.py")
+
+        assert {"search", "single"} <= set(terms)
+        assert "hash_diff_embedder.py" in terms
+        assert {"hash", "diff", "embedder", "py"} <= set(terms)
+
+    def test_term_index_is_stable(self):
+        assert term_index("adr-012") == term_index("adr-012")
+        assert 0 <= term_index("adr-012") < 2**32
+
+
+class TestSparseEncoding:
+    """Test document and query sparse vectors"""
+
+    def test_document_term_frequencies_saturate(self):
+        once = encode_document("cache")
+        many = encode_document("cache " * 50)
+
+        assert once.indices == many.indices == [term_index("cache")]
+        assert once.values[0] == pytest.approx(1.0)
+        assert many.values[0] < 2.2  # bounded by k1 + 1
+
+    def test_query_uses_unit_weights(self):
+        query = encode_query("ADR-012 adr-012")
+
+        assert query.indices == sorted(query.indices)
+        assert set(query.values) == {1.0}
+        assert len(query.indices) == 3
+
+    def test_point_vector_adds_sparse_only_when_supported(self):
+        embedding = [0.1, 0.2]
+
+        assert point_vector(embedding, "ADR-012", with_sparse=False) == embedding
+        vector = point_vector(embedding, "ADR-012", with_sparse=True)
+        assert vector[""] == embedding
+        assert isinstance(vector[SPARSE_VECTOR_NAME], SparseVector)
+
+    def test_dense_vector_extraction(self):
+        sparse = SparseVector(indices=[1], values=[1.0])
+
+        assert dense_vector([0.1, 0.2]) == [0.1, 0.2]
+        assert dense_vector({SPARSE_VECTOR_NAME: sparse, "": [0.3]}) == [0.3]
+        assert dense_vector([]) is None
+        assert dense_vector(None) is None
+
+    def test_has_sparse_vectors(self):
+        info = Mock()
+        info.config.params.sparse_vectors = {SPARSE_VECTOR_NAME: Mock()}
+        assert has_sparse_vectors(info) is True
+
+        info.config.params.sparse_vectors = None
+        assert has_sparse_vectors(info) is False
+        assert has_sparse_vectors(object()) is False
+
+
+class TestFusion:
+    """Test reciprocal rank and weighted fusion"""
+
+    def test_rrf_rewards_agreement(self):
+        fused = fuse_rankings([["a", "b", "c"], ["c", "a"]], rrf_k=60)
+
+        assert fused["a"] == pytest.approx(1 / 61 + 1 / 62)
+        assert fused["c"] == pytest.approx(1 / 63 + 1 / 61)
+        assert fused["b"] == pytest.approx(1 / 62)
+        assert max(fused, key=fused.__getitem__) == "a"
+
+    def test_weighted_normalizes_scores(self):
+        fused = fuse_rankings(
+            [["a", "b"], ["b", "c"]],
+            scores=[[0.9, 0.5], [12.0, 2.0]],
+            weights=[1.0, 0.5],
+            method="weighted",
+        )
+
+        assert fused == pytest.approx({"a": 1.0, "b": 0.5, "c": 0.0})
+
+    def test_fuse_points_normalizes_and_reports_list_scores(self):
+        dense = [_point("a", 0.9), _point("b", 0.8)]
+        sparse = [_point("c", 7.5), _point("a", 3.0)]
+
+        fused = fuse_points([dense, sparse])
+
+        assert [point.id for point, _, _ in fused] == ["a", "c", "b"]
+        assert 0.0 < fused[0][1] <= 1.0
+        assert fused[0][2] == [0.9, 3.0]
+        # Lexical-only hits have no dense score
+        assert fused[1][2] == [0.0, 7.5]
+
+    def test_fuse_points_first_everywhere_scores_one(self):
+        fused = fuse_points([[_point("a", 0.9)], [_point("a", 5.0)]])
+
+        assert fused[0][1] == pytest.approx(1.0)
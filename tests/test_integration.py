@@ -108,7 +108,7 @@ class TestIntegration:
 
         # Verify relationships were created
         create_calls = [
-            call for call in mock_session.run.call_args_list if "REFERENCES" in str(call)
+            call for call in mock_session.execute_write.call_args_list if "REFERENCES" in str(call)
         ]
         assert len(create_calls) > 0
 
@@ -145,8 +145,12 @@ class TestIntegration:
         mock_graph_result = Mock()
         mock_graph_result.__getitem__ = Mock(
             side_effect=lambda k: {
-                "source": {"id": "design-001"},
-                "target": {"id": "decision-001", "title": "Technology Stack"},
+                "source_id": "design-001",
+                "source_type": "design",
+                "source_title": "Test Architecture",
+                "target_id": "decision-001",
+                "target_type": "decision",
+                "target_title": "Technology Stack",
                 "relationships": [{"type": "REFERENCES"}],
                 "distance": 1,
             }[k]
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched Qdrant point writer
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from qdrant_client.models import FilterSelector, PointStruct
+
+from src.storage.qdrant_batcher import AsyncQdrantUpsertBatcher, QdrantUpsertBatcher
+
+
+def _point(point_id: str, file_path: str, size: int = 3) -> PointStruct:
+    return PointStruct(
+        id=point_id,
+        vector=[0.1] * size,
+        payload={"document_id": point_id, "file_path": file_path},
+    )
+
+
+class TestQdrantUpsertBatcher:
+    """Test batching, stale deletes and the final barrier"""
+
+    def test_flushes_when_batch_size_reached(self):
+        """Points are written in one upsert once batch_size is reached"""
+        client = Mock()
+        batcher = QdrantUpsertBatcher(client, "test_collection", batch_size=2)
+
+        batcher.add(_point("a", "a.yaml"))
+        client.upsert.assert_not_called()
+
+        batcher.add(_point("b", "b.yaml"))
+        client.upsert.assert_called_once()
+        call_kwargs = client.upsert.call_args[1]
+        assert call_kwargs["collection_name"] == "test_collection"
+        assert [p.id for p in call_kwargs["points"]] == ["a", "b"]
+        assert call_kwargs["wait"] is False
+
+    def test_flushes_when_byte_budget_exceeded(self):
+        """A point that would overflow the byte budget starts a new batch"""
+        client = Mock()
+        batcher = QdrantUpsertBatcher(
+            client, "test_collection", batch_size=100, max_batch_bytes=600
+        )
+
+        batcher.add(_point("a", "a.yaml", size=100))
+        batcher.add(_point("b", "b.yaml", size=100))
+
+        assert client.upsert.call_count == 1
+        assert [p.id for p in client.upsert.call_args[1]["points"]] == ["a"]
+
+    def test_in_place_updates_skip_delete(self):
+        """Points with unchanged IDs overwrite in place without a delete request"""
+        client = Mock()
+        batcher = QdrantUpsertBatcher(client, "test_collection", batch_size=2)
+
+        batcher.add(_point("a", "a.yaml"))
+        batcher.add(_point("b", "b.yaml"))
+
+        client.upsert.assert_called_once()
+        client.delete.assert_not_called()
+
+    def test_stale_points_deleted_with_one_filter(self):
+        """Older points of re-keyed documents are removed in a single delete"""
+        client = Mock()
+        batcher = QdrantUpsertBatcher(client, "test_collection", batch_size=3)
+
+        batcher.add(_point("a", "a.yaml"), replaces_existing=True)
+        batcher.add(_point("b", "b.yaml"))
+        batcher.add(_point("c", "c.yaml"), replaces_existing=True)
+
+        client.delete.assert_called_once()
+        selector = client.delete.call_args[1]["points_selector"]
+        assert isinstance(selector, FilterSelector)
+        assert selector.filter.must[0].key == "file_path"
+        assert selector.filter.must[0].match.any == ["a.yaml", "c.yaml"]
+        assert selector.filter.must_not[0].has_id == ["a", "b", "c"]
+
+    def test_close_waits_for_remaining_points(self):
+        """Remaining points are flushed with wait=True on close"""
+        client = Mock()
+        batcher = QdrantUpsertBatcher(client, "test_collection", batch_size=10)
+        batcher.add(_point("a", "a.yaml"))
+
+        stats = batcher.close()
+
+        assert client.upsert.call_args[1]["wait"] is True
+        assert stats == {"points": 1, "requests": 1, "failed": 0}
+
+    def test_barrier_after_unacknowledged_flush(self):
+        """An empty buffer still blocks on previously unacknowledged writes"""
+        client = Mock()
+        batcher = QdrantUpsertBatcher(client, "test_collection", batch_size=1)
+        batcher.add(_point("a", "a.yaml"))
+
+        batcher.close()
+
+        assert client.upsert.call_count == 2
+        assert client.upsert.call_args[1]["wait"] is True
+        assert [p.id for p in client.upsert.call_args[1]["points"]] == ["a"]
+
+    @patch("click.echo")
+    def test_failed_batch_records_keys(self, mock_echo):
+        """A failed write reports the affected documents instead of raising"""
+        client = Mock()
+        client.upsert.side_effect = Exception("Connection refused")
+        batcher = QdrantUpsertBatcher(client, "test_collection", batch_size=2)
+
+        batcher.add(_point("a", "a.yaml"))
+        batcher.add(_point("b", "b.yaml"))
+
+        assert batcher.failed_keys == ["a.yaml", "b.yaml"]
+        assert batcher.flushed_points == 0
+        assert any("Failed to write batch" in str(call) for call in mock_echo.call_args_list)
+
+
+class TestAsyncQdrantUpsertBatcher:
+    """Test the batcher on AsyncQdrantClient"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_adds_share_one_upsert(self):
+        """Points added by concurrent tasks are written in one request per batch"""
+        client = AsyncMock()
+        batcher = AsyncQdrantUpsertBatcher(client, "test_collection", batch_size=3)
+
+        await asyncio.gather(
+            *[
+                batcher.add(_point(p, f"{p}.yaml"), replaces_existing=p == "b")
+                for p in ["a", "b", "c", "d"]
+            ]
+        )
+        client.upsert.assert_awaited_once()
+        assert [p.id for p in client.upsert.call_args[1]["points"]] == ["a", "b", "c"]
+        assert client.delete.call_args[1]["points_selector"].filter.must[0].match.any == ["b.yaml"]
+
+        stats = await batcher.close()
+
+        assert client.upsert.call_args[1]["wait"] is True
+        assert [p.id for p in client.upsert.call_args[1]["points"]] == ["d"]
+        assert stats == {"points": 4, "requests": 3, "failed": 0}
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_records_keys(self):
+        """A failed write reports the affected documents instead of raising"""
+        client = AsyncMock()
+        client.upsert.side_effect = Exception("Connection refused")
+        batcher = AsyncQdrantUpsertBatcher(client, "test_collection", batch_size=2)
+
+        with patch("click.echo"):
+            await batcher.add(_point("a", "a.yaml"))
+            await batcher.add(_point("b", "b.yaml"))
+
+        assert batcher.failed_keys == ["a.yaml", "b.yaml"]
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for the epoch-versioned query result cache
+"""
+
+from unittest.mock import Mock
+
+import redis
+
+from src.storage.query_cache import QueryResultCache, graph_scope, vector_scope
+
+
+class TestQueryResultCache:
+    """Test key construction, local fallback and epoch invalidation"""
+
+    def test_local_roundtrip(self):
+        cache = QueryResultCache()
+        key = cache.make_key("single", [[0.1, 0.2]], [vector_scope("ctx")], limit=5)
+
+        assert cache.get(key) is None
+        cache.set(key, [{"id": "a", "score": 0.5}])
+
+        assert cache.get(key) == [{"id": "a", "score": 0.5}]
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_quantized_vectors_share_a_key(self):
+        cache = QueryResultCache(precision=3)
+        scopes = [vector_scope("ctx")]
+
+        key1 = cache.make_key("single", [[0.12341, 0.5]], scopes, limit=5)
+        key2 = cache.make_key("single", [[0.12342, 0.5]], scopes, limit=5)
+        key3 = cache.make_key("single", [[0.125, 0.5]], scopes, limit=5)
+
+        assert key1 == key2
+        assert key1 != key3
+
+    def test_parameters_change_the_key(self):
+        cache = QueryResultCache()
+        scopes = [vector_scope("ctx")]
+        base = cache.make_key("single", [[0.1]], scopes, limit=5, filters=None)
+
+        assert base != cache.make_key("single", [[0.1]], scopes, limit=10, filters=None)
+        assert base != cache.make_key(
+            "single", [[0.1]], scopes, limit=5, filters={"document_type": "design"}
+        )
+        assert base != cache.make_key("multi", [[0.1]], scopes, limit=5, filters=None)
+
+    def test_bumping_an_epoch_invalidates_dependent_keys(self):
+        cache = QueryResultCache()
+        vector_key = cache.make_key("single", [[0.1]], [vector_scope("ctx")])
+        graph_key = cache.make_key("graphrag", [[0.1]], [graph_scope("db")])
+
+        cache.bump_epoch(vector_scope("ctx"))
+
+        assert cache.make_key("single", [[0.1]], [vector_scope("ctx")]) != vector_key
+        assert cache.make_key("graphrag", [[0.1]], [graph_scope("db")]) == graph_key
+
+    def test_local_cache_evicts_least_recently_used(self):
+        cache = QueryResultCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_local_entries_expire(self):
+        cache = QueryResultCache(ttl_seconds=-1)
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+
+    def test_redis_backend(self):
+        redis_client = Mock()
+        redis_client.get.side_effect = lambda key: "3" if ":epoch:" in key else '{"x": 1}'
+        redis_client.incr.return_value = 4
+        cache = QueryResultCache(redis_client=redis_client, ttl_seconds=60, key_prefix="q:")
+
+        assert cache.get_epoch("vector:ctx") == 3
+        assert cache.bump_epoch("vector:ctx") == 4
+        redis_client.incr.assert_called_once_with("q:epoch:vector:ctx")
+
+        cache.set("q:single:abc", {"x": 1})
+        redis_client.setex.assert_called_once_with("q:single:abc", 60, '{"x": 1}')
+        assert cache.get("q:single:abc") == {"x": 1}
+
+    def test_redis_failure_bypasses_cache_until_retry(self):
+        redis_client = Mock()
+        redis_client.get.side_effect = redis.ConnectionError("refused")
+        cache = QueryResultCache(redis_client=redis_client, retry_seconds=60)
+
+        assert cache.get_epoch("vector:ctx") == 0
+        assert cache.redis_client is redis_client
+
+        # No local fallback: nothing is stored or served while Redis is down
+        redis_client.get.reset_mock()
+        cache.set("k", [1, 2])
+        assert cache.get("k") is None
+        redis_client.setex.assert_not_called()
+        redis_client.get.assert_not_called()
+
+    def test_recovers_and_sees_bumps_from_other_processes(self):
+        epochs = {"q:epoch:graph:ctx": 1}
+        redis_client = Mock()
+        redis_client.get.side_effect = lambda key: epochs.get(key)
+        cache = QueryResultCache(redis_client=redis_client, key_prefix="q:", retry_seconds=0)
+
+        # One transient failure, then Redis answers again
+        redis_client.get.side_effect = [redis.ConnectionError("timeout")]
+        assert cache.get_epoch("graph:ctx") == 0
+
+        # Another process bumps the epoch; this process must see it
+        epochs["q:epoch:graph:ctx"] = 2
+        redis_client.get.side_effect = lambda key: epochs.get(key)
+        assert cache.get_epoch("graph:ctx") == 2
+
+    def test_failed_bump_is_replayed(self):
+        redis_client = Mock()
+        redis_client.incr.side_effect = [redis.ConnectionError("refused"), 5]
+        cache = QueryResultCache(redis_client=redis_client, key_prefix="q:", retry_seconds=60)
+
+        assert cache.bump_epoch("vector:ctx") == 0
+        # Bumps are attempted during the backoff; the missed one is replayed first
+        assert cache.bump_epoch("graph:ctx") == 5
+        redis_client.incrby.assert_called_once_with("q:epoch:vector:ctx", 1)
+
+    def test_from_config_uses_redis_settings(self):
+        cache = QueryResultCache.from_config(
+            {"redis": {"host": "redis.local", "port": 6380, "prefixes": {"cache": "c:"}}},
+            {"ttl_seconds": 120, "max_entries": 50},
+        )
+
+        assert cache.redis_client is not None
+        assert cache.redis_client.connection_pool.connection_kwargs["host"] == "redis.local"
+        assert cache.key_prefix == "c:query:"
+        assert (cache.ttl_seconds, cache.max_entries) == (120, 50)
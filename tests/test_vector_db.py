@@ -4,17 +4,23 @@ Tests for vector database components
 
 import shutil
 import tempfile
+import uuid
 from pathlib import Path
 from typing import Generator
 from unittest.mock import Mock, patch
 
+import numpy as np
 import pytest
+from qdrant_client.models import PayloadSchemaType
 
 from src.analytics.sum_scores_api import SearchResult, SumScoresAPI
-from src.storage.hash_diff_embedder import DocumentHash, HashDiffEmbedder
+from src.storage.hash_diff_embedder import DocumentHash, HashDiffEmbedder, compute_point_id
+from src.storage.hybrid import term_index
+from src.storage.query_cache import QueryResultCache, vector_scope
 
 # Import components to test
 from src.storage.vector_db_init import VectorDBInitializer
+from src.storage.vector_mirror import LocalVectorMirror
 
 
 class TestVectorDBInitializer:
@@ -82,6 +88,11 @@ class TestVectorDBInitializer:
         assert call_args.kwargs["collection_name"] == "test_collection"
         assert call_args.kwargs["vectors_config"].size == 1536
 
+        # Integer payload index for the last-modified timestamp
+        index_kwargs = mock_client.create_payload_index.call_args.kwargs
+        assert index_kwargs["field_name"] == "last_modified_epoch"
+        assert index_kwargs["field_schema"] == PayloadSchemaType.INTEGER
+
 
 class TestHashDiffEmbedder:
     """Test hash-based embedder"""
@@ -169,6 +180,7 @@ class TestHashDiffEmbedder:
             "title": "Test Design",
             "description": "Test description",
             "created_date": "2025-07-11",
+            "last_modified": "2025-07-11",
         }
         with open(test_file, "w") as f:
             import yaml
@@ -179,7 +191,9 @@ class TestHashDiffEmbedder:
         vector_id = embedder.embed_document(test_file)
 
         assert vector_id is not None
-        assert vector_id.startswith("test-doc-")
+        # Stable UUIDv5 derived from the document id, valid as a Qdrant point ID
+        assert vector_id == compute_point_id("test-doc")
+        assert str(uuid.UUID(vector_id)) == vector_id
 
         # Check Qdrant upsert was called
         mock_client.upsert.assert_called_once()
@@ -195,6 +209,28 @@ class TestHashDiffEmbedder:
 
         assert len(points) == 1
         assert points[0].payload["document_id"] == "test-doc"
+        assert points[0].payload["last_modified_epoch"] == 1752192000
+        # Collections without a sparse vector get the dense embedding only
+        assert points[0].vector == [0.1] * 1536
+
+    @patch("src.storage.hash_diff_embedder.openai.OpenAI")
+    def test_embed_document_writes_sparse_vector(
+        self, mock_openai_class, embedder, test_dir
+    ) -> None:
+        """Test lexical vectors are written when the collection declares them"""
+        embedder.client = Mock()
+        embedder.sparse_vectors = True
+        mock_openai_class.return_value.embeddings.create.return_value = Mock(
+            data=[Mock(embedding=[0.1] * 4)]
+        )
+        test_file = test_dir / "adr.yaml"
+        test_file.write_text("id: adr-012\ntitle: ADR-012 Query caching\n")
+
+        embedder.embed_document(test_file)
+
+        point = embedder.client.upsert.call_args.kwargs["points"][0]
+        assert point.vector[""] == [0.1] * 4
+        assert term_index("adr-012") in point.vector["text"].indices
 
 
 class TestSumScoresAPI:
@@ -223,6 +259,136 @@ class TestSumScoresAPI:
         decay = api._calculate_temporal_decay(None)
         assert decay == 1.0
 
+    def test_calculate_temporal_decays_vectorized(self, api) -> None:
+        """Test vectorized decay over epoch timestamps"""
+        import time
+
+        now = time.time()
+        epochs = np.array([now, now - 60 * 86400, now - 365 * 86400, np.nan])
+
+        decays = api._calculate_temporal_decays(epochs)
+
+        assert decays == pytest.approx([1.0, 0.7, 0.5, 1.0])
+
+    def test_search_single_ranks_before_truncation(self, api) -> None:
+        """Test limit applies to final scores, using epoch payload fields"""
+        import time
+
+        api.client = Mock()
+        stale, fresh = Mock(), Mock()
+        stale.id, stale.score = "vec-stale", 0.9
+        stale.payload = {
+            "document_id": "stale",
+            "document_type": "design",
+            "last_modified_epoch": int(time.time()) - 365 * 86400,
+        }
+        fresh.id, fresh.score = "vec-fresh", 0.6
+        fresh.payload = {
+            "document_id": "fresh",
+            "document_type": "design",
+            "last_modified_epoch": int(time.time()),
+        }
+        api.client.search.return_value = [stale, fresh]
+
+        results = api.search_single([0.1] * 3, limit=1)
+
+        # Candidates are over-fetched so decay can reorder them
+        assert api.client.search.call_args[1]["limit"] == api.rerank_oversample
+        assert [r.document_id for r in results] == ["fresh"]
+        assert results[0].decay_factor == 1.0
+
+    def test_plan_search_uses_exact_scan_for_selective_filters(self, api) -> None:
+        """Test selective filters are scanned exactly and broad ones use HNSW"""
+        api.client = Mock()
+        api.exact_scan_threshold = 100
+        api.client.count.return_value = Mock(count=20)
+        selective = {"document_id": "doc-1"}
+
+        params = api._plan_search(api._build_filter(selective), selective)
+        assert params.exact is True
+        assert api.client.count.call_args[1]["exact"] is False
+
+        # The estimate is cached per filter
+        api._plan_search(api._build_filter(selective), selective)
+        api.client.count.assert_called_once()
+
+        api.client.count.return_value = Mock(count=5000)
+        broad = {"document_type": "design"}
+        params = api._plan_search(api._build_filter(broad), broad)
+        assert not params.exact
+        assert params.hnsw_ef == api.ef_search
+
+        # Unfiltered searches never need a cardinality estimate
+        assert api._plan_search(None, None).hnsw_ef == api.ef_search
+        assert api.client.count.call_count == 2
+
+    def test_search_single_passes_search_plan(self, api) -> None:
+        """Test the planned search params are sent with filtered searches"""
+        api.client = Mock()
+        api.client.count.return_value = Mock(count=3)
+        api.client.search.return_value = []
+
+        api.search_single([0.1] * 3, limit=5, filter_conditions={"sprint_number": 4})
+
+        call_kwargs = api.client.search.call_args[1]
+        assert call_kwargs["search_params"].exact is True
+        assert call_kwargs["query_filter"].must[0].key == "sprint_number"
+
+    def test_plan_search_rescores_quantized_profiles(self, tmp_path) -> None:
+        """Test quantized collection profiles search with rescoring and oversampling"""
+        import yaml
+
+        perf_path = tmp_path / "performance.yaml"
+        perf_path.write_text(
+            yaml.dump({"vector_db": {"collection": {"profile": "binary", "oversampling": 4.0}}})
+        )
+        api = SumScoresAPI(perf_config_path=str(perf_path))
+
+        params = api._plan_search(None, None)
+        assert params.quantization.rescore is True
+        assert params.quantization.oversampling == 4.0
+
+        # Unquantized collections send no quantization params
+        assert SumScoresAPI()._plan_search(None, None).quantization is None
+
+    def test_search_single_hybrid_fuses_lexical_matches(self, api) -> None:
+        """Test hybrid search surfaces exact-identifier matches missed by the embedding"""
+        api.client = Mock()
+        api.hybrid_enabled = True
+
+        def point(point_id, score):
+            return Mock(id=point_id, score=score, payload={"document_id": point_id})
+
+        api.client.query_batch_points.return_value = [
+            Mock(points=[point("semantic", 0.9), point("both", 0.8)]),
+            Mock(points=[point("adr-012", 9.0), point("both", 4.0)]),
+        ]
+
+        results = api.search_single([0.1] * 3, limit=3, query_text="ADR-012 caching")
+
+        requests = api.client.query_batch_points.call_args[1]["requests"]
+        assert requests[1].using == "text"
+        assert requests[1].limit == 3 * api.rerank_oversample
+        api.client.search.assert_not_called()
+        ids = [r.document_id for r in results]
+        assert ids[0] == "both"
+        assert set(ids) == {"both", "semantic", "adr-012"}
+        assert results[0].raw_scores == [0.8, 4.0]
+
+    @patch("click.echo")
+    def test_search_hybrid_falls_back_to_dense(self, mock_echo, api) -> None:
+        """Test collections without sparse vectors fall back to dense search"""
+        api.client = Mock()
+        api.client.query_batch_points.side_effect = Exception("Not existing vector name")
+        api.client.search.return_value = []
+
+        assert api.search_hybrid([0.1] * 3, "ADR-012", limit=5) == []
+        api.client.search.assert_called_once()
+
+        # Queries without any terms skip the sparse request entirely
+        api.search_hybrid([0.1] * 3, "  ...  ", limit=5)
+        api.client.query_batch_points.assert_called_once()
+
     def test_get_type_boost(self, api) -> None:
         """Test document type boosting"""
         assert api._get_type_boost("architecture") == 1.25
@@ -346,6 +512,27 @@ class TestSumScoresAPI:
             "Failed to connect to Qdrant: Connection failed", err=True
         )
 
+    def test_search_single_uses_query_cache(self, api) -> None:
+        """Test repeated searches are served from the cache until the epoch changes"""
+        api.client = Mock()
+        api.query_cache = QueryResultCache()
+        hit = Mock()
+        hit.id = "vec1"
+        hit.score = 0.8
+        hit.payload = {"document_id": "doc1", "document_type": "design"}
+        api.client.search.return_value = [hit]
+
+        first = api.search_single([0.1] * 3, limit=5)
+        second = api.search_single([0.1] * 3, limit=5)
+
+        api.client.search.assert_called_once()
+        assert second == first
+
+        # A write to the collection bumps the epoch and invalidates the entry
+        api.query_cache.bump_epoch(vector_scope(api.collection_name))
+        api.search_single([0.1] * 3, limit=5)
+        assert api.client.search.call_count == 2
+
     def test_calculate_temporal_decay_invalid_date(self, api) -> None:
         """Test temporal decay with invalid date format"""
         # Invalid date should return default 1.0
@@ -412,47 +599,42 @@ class TestSumScoresAPI:
         query_filter = call_args.kwargs["query_filter"]
         assert len(query_filter.must) == 2  # Two filter conditions
 
+    @staticmethod
+    def _batch_response(*scores: float) -> list:
+        """Build one query_batch_points response per score, each hitting vec1"""
+        responses = []
+        for score in scores:
+            point = Mock()
+            point.id = "vec1"
+            point.score = score
+            point.payload = {
+                "document_id": "doc1",
+                "document_type": "design",
+                "title": "Test Doc",
+                "file_path": "/test.yaml",
+                "last_modified": "2025-07-11",
+            }
+            responses.append(Mock(points=[point]))
+        return responses
+
     @patch("src.analytics.sum_scores_api.QdrantClient")
     def test_search_multi_sum_aggregation(self, mock_client_class, api) -> None:
         """Test multi-query search with sum aggregation"""
         mock_client = Mock()
         api.client = mock_client
-
-        # Mock search results for different queries
-        def mock_search(**kwargs):
-            if kwargs["query_vector"][0] == 0.1:
-                # First query results
-                mock_result = Mock()
-                mock_result.id = "vec1"
-                mock_result.score = 0.8
-                mock_result.payload = {
-                    "document_id": "doc1",
-                    "document_type": "design",
-                    "title": "Test Doc",
-                    "file_path": "/test.yaml",
-                    "last_modified": "2025-07-11",
-                }
-                return [mock_result]
-            else:
-                # Second query results (same document)
-                mock_result = Mock()
-                mock_result.id = "vec1"
-                mock_result.score = 0.6
-                mock_result.payload = {
-                    "document_id": "doc1",
-                    "document_type": "design",
-                    "title": "Test Doc",
-                    "file_path": "/test.yaml",
-                    "last_modified": "2025-07-11",
-                }
-                return [mock_result]
-
-        mock_client.search.side_effect = mock_search
+        mock_client.query_batch_points.return_value = self._batch_response(0.8, 0.6)
 
         # Perform multi-query search
         query_vectors = [[0.1] * 1536, [0.2] * 1536]
         results = api.search_multi(query_vectors, limit=5, aggregation="sum")
 
+        # All query vectors go to Qdrant in one request
+        mock_client.query_batch_points.assert_called_once()
+        requests = mock_client.query_batch_points.call_args[1]["requests"]
+        assert len(requests) == 2
+        assert requests[0].limit == 10
+        mock_client.search.assert_not_called()
+
         assert len(results) == 1
         result = results[0]
         assert result.score == 1.4  # 0.8 + 0.6
@@ -463,22 +645,7 @@ class TestSumScoresAPI:
         """Test multi-query search with max aggregation"""
         mock_client = Mock()
         api.client = mock_client
-
-        # Mock multiple results for the same document
-        def mock_search(**kwargs):
-            mock_result = Mock()
-            mock_result.id = "vec1"
-            mock_result.score = 0.8 if kwargs["query_vector"][0] == 0.1 else 0.6
-            mock_result.payload = {
-                "document_id": "doc1",
-                "document_type": "design",
-                "title": "Test Doc",
-                "file_path": "/test.yaml",
-                "last_modified": "2025-07-11",
-            }
-            return [mock_result]
-
-        mock_client.search.side_effect = mock_search
+        mock_client.query_batch_points.return_value = self._batch_response(0.8, 0.6)
 
         # Perform multi-query search with max aggregation
         query_vectors = [[0.1] * 1536, [0.2] * 1536]
@@ -493,22 +660,7 @@ class TestSumScoresAPI:
         """Test multi-query search with average aggregation"""
         mock_client = Mock()
         api.client = mock_client
-
-        # Mock multiple results for the same document
-        def mock_search(**kwargs):
-            mock_result = Mock()
-            mock_result.id = "vec1"
-            mock_result.score = 0.8 if kwargs["query_vector"][0] == 0.1 else 0.6
-            mock_result.payload = {
-                "document_id": "doc1",
-                "document_type": "design",
-                "title": "Test Doc",
-                "file_path": "/test.yaml",
-                "last_modified": "2025-07-11",
-            }
-            return [mock_result]
-
-        mock_client.search.side_effect = mock_search
+        mock_client.query_batch_points.return_value = self._batch_response(0.8, 0.6)
 
         # Perform multi-query search with average aggregation
         query_vectors = [[0.1] * 1536, [0.2] * 1536]
@@ -518,174 +670,215 @@ class TestSumScoresAPI:
         result = results[0]
         assert result.score == 0.7  # (0.8 + 0.6) / 2
 
-    @patch("src.analytics.sum_scores_api.QdrantClient")
-    def test_search_contextual(self, mock_client_class, api) -> None:
-        """Test contextual search with document relationships"""
-        mock_client = Mock()
-        api.client = mock_client
-
-        # Mock base search results
-        def mock_search(**kwargs):
-            if kwargs.get("filter_conditions"):
-                # Context document lookup
-                mock_result = Mock()
-                mock_result.id = "context-vec"
-                mock_result.score = 0.9
-                mock_result.payload = {
-                    "document_id": kwargs["filter_conditions"]["document_id"],
-                    "document_type": "design",
-                    "title": "Context Doc",
-                    "file_path": "/context.yaml",
-                    "sprint_number": 1,
-                }
-                return [mock_result]
-            else:
-                # Base search results
-                mock_result1 = Mock()
-                mock_result1.id = "result-vec-1"
-                mock_result1.score = 0.8
-                mock_result1.payload = {
-                    "document_id": "result-doc-1",
-                    "document_type": "design",  # Same type as context
-                    "title": "Result Doc 1",
-                    "file_path": "/result1.yaml",
-                    "sprint_number": 1,
-                }
-
-                mock_result2 = Mock()
-                mock_result2.id = "result-vec-2"
-                mock_result2.score = 0.7
-                mock_result2.payload = {
-                    "document_id": "result-doc-2",
-                    "document_type": "decision",  # Different type
-                    "title": "Result Doc 2",
-                    "file_path": "/result2.yaml",
-                    "sprint_number": 2,
-                }
-                return [mock_result1, mock_result2]
-
-        mock_client.search.side_effect = mock_search
+    def test_search_multi_ranks_with_decay_and_boost(self, api) -> None:
+        """Test multi-query ranking applies type boosts and limits results"""
+        api.client = Mock()
+        design, test_doc = Mock(), Mock()
+        design.id, design.score = "vec-design", 0.5
+        design.payload = {"document_id": "design-doc", "document_type": "design"}
+        test_doc.id, test_doc.score = "vec-test", 0.55
+        test_doc.payload = {"document_id": "test-doc", "document_type": "test"}
+        api.client.query_batch_points.return_value = [Mock(points=[test_doc, design])]
 
-        # Perform contextual search
-        query_vector = [0.1] * 1536
-        context_doc_ids = ["context-doc-1"]
-        results = api.search_contextual(query_vector, context_doc_ids, limit=5, context_weight=0.3)
+        results = api.search_multi([[0.1] * 3], limit=1)
 
-        assert len(results) == 2
-        # First result should have higher final score due to context matching
-        assert results[0].document_id == "result-doc-1"  # Same type as context
-        assert results[1].document_id == "result-doc-2"
+        # 0.5 * 1.2 (design) beats 0.55 * 0.9 (test)
+        assert [r.document_id for r in results] == ["design-doc"]
+        assert results[0].boost_factor == 1.2
+        assert results[0].decay_factor == 1.0
 
-    @patch("src.analytics.sum_scores_api.QdrantClient")
-    def test_search_contextual_with_exception(self, mock_client_class, api) -> None:
-        """Test contextual search when context lookup fails"""
-        mock_client = Mock()
-        api.client = mock_client
+    @patch("click.echo")
+    def test_search_errors_return_no_results(self, mock_echo, api) -> None:
+        """Test Qdrant errors yield empty results on every search path"""
+        api.client = Mock()
+        api.client.search.side_effect = Exception("unavailable")
+        api.client.query_batch_points.side_effect = Exception("unavailable")
+
+        assert api.search_single([0.1] * 3) == []
+        assert api.search_multi([[0.1] * 3, [0.2] * 3]) == []
+        mock_echo.assert_called_with("Multi-query search failed: unavailable", err=True)
+
+    def test_search_multi_rejects_unknown_aggregation(self, api) -> None:
+        """Test an unknown aggregation raises instead of falling back to sum"""
+        api.client = Mock()
+
+        with pytest.raises(ValueError, match="aggregation must be one of"):
+            api.search_multi([[0.1] * 3], aggregation="median")
+        api.client.query_batch_points.assert_not_called()
+
+    def test_search_multi_without_client(self, api) -> None:
+        """Test multi-query search returns nothing when not connected"""
+        api.client = None
+        assert api.search_multi([[0.1] * 3]) == []
+
+    @staticmethod
+    def _contextual_base_results() -> list:
+        """Base search hits used by the contextual re-ranking tests"""
+        results = []
+        for vec_id, doc_id, doc_type, score in [
+            ("result-vec-1", "result-doc-1", "design", 0.8),
+            ("result-vec-2", "result-doc-2", "decision", 0.7),
+        ]:
+            result = Mock()
+            result.id = vec_id
+            result.score = score
+            result.payload = {
+                "document_id": doc_id,
+                "document_type": doc_type,
+                "title": doc_id,
+                "file_path": f"/{doc_id}.yaml",
+            }
+            results.append(result)
+        return results
+
+    def test_search_contextual(self, api) -> None:
+        """Test contextual re-ranking by cosine similarity to context vectors"""
+        api.client = Mock()
+        api.client.search.return_value = self._contextual_base_results()
+        context_ids = [compute_point_id("context-doc-1"), compute_point_id("context-doc-2")]
+        api.client.retrieve.return_value = [
+            Mock(id=context_ids[0], vector=[1.0, 0.0, 0.0]),
+            Mock(id=context_ids[1], vector=[0.8, 0.2, 0.0]),
+            Mock(id="result-vec-1", vector=[0.0, 0.0, 1.0]),
+            Mock(id="result-vec-2", vector=[0.9, 0.1, 0.0]),
+        ]
+
+        results = api.search_contextual(
+            [0.1] * 3, ["context-doc-1", "context-doc-2"], limit=5, context_weight=0.5
+        )
 
-        # Mock search to raise exception for context lookup
-        def mock_search(**kwargs):
-            if kwargs.get("filter_conditions"):
-                raise Exception("Context lookup failed")
-            else:
-                # Base search results
-                mock_result = Mock()
-                mock_result.id = "result-vec-1"
-                mock_result.score = 0.8
-                mock_result.payload = {
-                    "document_id": "result-doc-1",
-                    "document_type": "design",
-                    "title": "Result Doc 1",
-                    "file_path": "/result1.yaml",
-                }
-                return [mock_result]
+        # One search plus one retrieve, regardless of the number of context documents
+        api.client.search.assert_called_once()
+        api.client.retrieve.assert_called_once()
+        retrieve_kwargs = api.client.retrieve.call_args[1]
+        assert retrieve_kwargs["ids"] == context_ids + ["result-vec-1", "result-vec-2"]
+        assert retrieve_kwargs["with_vectors"] is True
+
+        # result-doc-2 is close to the context, result-doc-1 orthogonal to it
+        assert [r.document_id for r in results] == ["result-doc-2", "result-doc-1"]
+        assert results[1].final_score == pytest.approx(0.8 * 1.2 * 0.5)
+
+    def test_search_contextual_candidate_without_vector(self, api) -> None:
+        """Test candidates without a stored vector are scaled with a similarity of 0"""
+        api.client = Mock()
+        api.client.search.return_value = self._contextual_base_results()
+        context_id = compute_point_id("context-doc-1")
+        api.client.retrieve.return_value = [
+            Mock(id=context_id, vector=[1.0, 0.0, 0.0]),
+            Mock(id="result-vec-2", vector=[0.9, 0.1, 0.0]),
+        ]
+
+        results = api.search_contextual([0.1] * 3, ["context-doc-1"], limit=5, context_weight=0.5)
+
+        # result-doc-1 has no vector, so it keeps only its share of the base score
+        assert [r.document_id for r in results] == ["result-doc-2", "result-doc-1"]
+        assert results[1].final_score == pytest.approx(0.8 * 1.2 * 0.5)
 
-        mock_client.search.side_effect = mock_search
+    @patch("click.echo")
+    def test_search_contextual_with_exception(self, mock_echo, api) -> None:
+        """Test contextual search when the vector lookup fails"""
+        api.client = Mock()
+        api.client.search.return_value = self._contextual_base_results()
+        api.client.retrieve.side_effect = Exception("Context lookup failed")
 
-        # Should handle exception gracefully
-        query_vector = [0.1] * 1536
-        context_doc_ids = ["invalid-context-doc"]
-        results = api.search_contextual(query_vector, context_doc_ids, limit=5)
+        results = api.search_contextual([0.1] * 3, ["invalid-context-doc"], limit=5)
 
-        assert len(results) == 1
-        assert results[0].document_id == "result-doc-1"
+        # Base ranking is kept unchanged
+        assert [r.document_id for r in results] == ["result-doc-1", "result-doc-2"]
+        assert results[0].final_score == pytest.approx(0.8 * 1.2)
 
     @patch("src.analytics.sum_scores_api.QdrantClient")
-    def test_get_statistics_small_collection(self, mock_client_class, api) -> None:
-        """Test statistics for small collection (full scan)"""
+    def test_get_statistics_exact_counts(self, mock_client_class, api) -> None:
+        """Test statistics use an exact total count and one facet request"""
         mock_client = Mock()
         api.client = mock_client
 
         # Mock collection info
         mock_collection_info = Mock()
-        mock_collection_info.points_count = 50
+        mock_collection_info.points_count = 4900
         mock_collection_info.config.params.vectors.size = 1536
         mock_collection_info.config.params.vectors.distance = "Cosine"
         mock_client.get_collection.return_value = mock_collection_info
-
-        # Mock scroll results for full scan
-        def mock_scroll(**kwargs):
-            if kwargs.get("offset") is None:
-                # First batch
-                points = [
-                    Mock(id="1", payload={"document_type": "design"}),
-                    Mock(id="2", payload={"document_type": "design"}),
-                    Mock(id="3", payload={"document_type": "decision"}),
-                ]
-                return points, "next_offset_1"
-            elif kwargs.get("offset") == "next_offset_1":
-                # Second batch
-                points = [
-                    Mock(id="4", payload={"document_type": "sprint"}),
-                    Mock(id="5", payload={"document_type": "unknown"}),
-                ]
-                return points, None  # No more results
-            else:
-                return [], None
-
-        mock_client.scroll.side_effect = mock_scroll
+        mock_client.count.return_value = Mock(count=5000)
+        mock_client.facet.return_value = Mock(
+            hits=[
+                Mock(value="design", count=3000),
+                Mock(value="decision", count=1500),
+                Mock(value="sprint", count=400),
+            ]
+        )
 
         stats = api.get_statistics()
 
-        assert stats["total_vectors"] == 50
+        assert stats["total_vectors"] == 5000
         assert stats["vector_size"] == 1536
         assert stats["distance_metric"] == "Cosine"
-        assert stats["document_types"]["design"] == 2
-        assert stats["document_types"]["decision"] == 1
-        assert stats["document_types"]["sprint"] == 1
-        assert stats["document_types"]["unknown"] == 1
+        assert stats["document_types"] == {
+            "design": 3000,
+            "decision": 1500,
+            "sprint": 400,
+            "unknown": 100,
+        }
+        assert stats["type_boosts"] == api.type_boosts
+        assert mock_client.count.call_args[1]["exact"] is True
+        assert mock_client.facet.call_args[1]["exact"] is True
+        mock_client.scroll.assert_not_called()
+        mock_client.retrieve.assert_not_called()
 
     @patch("src.analytics.sum_scores_api.QdrantClient")
-    def test_get_statistics_large_collection(self, mock_client_class, api) -> None:
-        """Test statistics for large collection (sampling)"""
+    def test_get_statistics_counts_types_without_facets(self, mock_client_class, api) -> None:
+        """Test servers without facet support get one count per known type and the rest"""
         mock_client = Mock()
         api.client = mock_client
+        api.type_boosts = {"design": 1.2, "api": 1.0}
 
-        # Mock collection info for large collection
         mock_collection_info = Mock()
-        mock_collection_info.points_count = 5000
         mock_collection_info.config.params.vectors.size = 1536
         mock_collection_info.config.params.vectors.distance = "Dot"
         mock_client.get_collection.return_value = mock_collection_info
+        mock_client.facet.side_effect = Exception("Not found")
+
+        type_counts = {"design": 2, "api": 0, "decision": 1, "sprint": 1}
 
-        # Mock scroll for sampling
-        sample_points = [Mock(id=str(i)) for i in range(500)]
-        mock_client.scroll.return_value = (sample_points, None)
+        def count(collection_name, count_filter=None, exact=True):
+            if count_filter is None:
+                return Mock(count=6)
+            if count_filter.must_not:
+                return Mock(count=2)
+            return Mock(count=type_counts[count_filter.must[0].match.value])
 
-        # Mock retrieve for sampled points
-        retrieved_points = [
-            Mock(id="1", payload={"document_type": "design"}),
-            Mock(id="2", payload={"document_type": "design"}),
-            Mock(id="3", payload={"document_type": "decision"}),
-        ] * 167  # Approximately 500 points with pattern
-        mock_client.retrieve.return_value = retrieved_points
+        mock_client.count.side_effect = count
 
         stats = api.get_statistics()
 
-        assert stats["total_vectors"] == 5000
-        assert stats["vector_size"] == 1536
-        # Should extrapolate based on sample
-        assert "document_types" in stats
-        assert stats["type_boosts"] == api.type_boosts
+        # Configured and known graph types are counted, the rest falls under "other"
+        assert stats["document_types"] == {"design": 2, "other": 2, "decision": 1, "sprint": 1}
+        mock_client.scroll.assert_not_called()
+        other_filter = [
+            c[1]["count_filter"] for c in mock_client.count.call_args_list if c[1]["count_filter"]
+        ][-1]
+        assert other_filter.must_not[0].match.any == ["design", "api", "decision", "sprint"]
+
+    def test_get_statistics_cached(self, api) -> None:
+        """Test statistics are cached for the configured TTL and returned as copies"""
+        api.client = Mock()
+        api.client.count.return_value = Mock(count=0)
+        api.client.facet.return_value = Mock(hits=[])
+
+        first = api.get_statistics()
+        first["document_types"]["design"] = 99
+        second = api.get_statistics()
+
+        assert second["document_types"] == {}
+        api.client.get_collection.assert_called_once()
+
+        api.statistics_ttl = 0
+        api.get_statistics()
+        assert api.client.get_collection.call_count == 2
+
+    def test_get_statistics_not_connected(self, api) -> None:
+        """Test statistics without a client report an error"""
+        assert api.get_statistics() == {"error": "Not connected to Qdrant"}
 
     @patch("src.analytics.sum_scores_api.QdrantClient")
     def test_get_statistics_error(self, mock_client_class, api) -> None:
@@ -861,38 +1054,72 @@ class TestSumScoresAPI:
         assert result.title == ""
         assert result.file_path == ""
 
-    @patch("src.analytics.sum_scores_api.QdrantClient")
-    def test_search_contextual_no_context_vectors(self, mock_client_class, api) -> None:
-        """Test contextual search when no context vectors found"""
-        mock_client = Mock()
-        api.client = mock_client
-
-        # Mock search that returns empty results for context lookup
-        def mock_search(**kwargs):
-            if kwargs.get("filter_conditions"):
-                return []  # No context documents found
-            else:
-                # Base search results
-                mock_result = Mock()
-                mock_result.id = "result-vec-1"
-                mock_result.score = 0.8
-                mock_result.payload = {
-                    "document_id": "result-doc-1",
-                    "document_type": "design",
-                    "title": "Result Doc 1",
-                    "file_path": "/result1.yaml",
-                }
-                return [mock_result]
-
-        mock_client.search.side_effect = mock_search
+    def test_search_contextual_no_context_vectors(self, api) -> None:
+        """Test contextual search when no context vectors are found"""
+        api.client = Mock()
+        api.client.search.return_value = self._contextual_base_results()
+        api.client.retrieve.return_value = [
+            Mock(id="result-vec-1", vector=[0.0, 0.0, 1.0]),
+            Mock(id="result-vec-2", vector=[0.9, 0.1, 0.0]),
+        ]
 
-        # Should handle no context vectors gracefully
-        query_vector = [0.1] * 1536
-        context_doc_ids = ["nonexistent-context-doc"]
-        results = api.search_contextual(query_vector, context_doc_ids, limit=5)
+        results = api.search_contextual([0.1] * 3, ["nonexistent-context-doc"], limit=1)
 
         assert len(results) == 1
         assert results[0].document_id == "result-doc-1"
+        assert results[0].final_score == pytest.approx(0.8 * 1.2)
+
+    def test_search_contextual_uses_vector_mirror(self, tmp_path) -> None:
+        """Test contextual re-ranking with exact similarities from the local mirror"""
+        mirror = LocalVectorMirror(path=tmp_path / "mirror")
+        mirror_client = Mock()
+        mirror_client.retrieve.return_value = [
+            Mock(id=compute_point_id("ctx-doc"), vector=[1.0, 0.0, 0.0]),
+            Mock(id="result-vec-1", vector=[0.0, 1.0, 0.0]),
+            Mock(id="result-vec-2", vector=[0.9, 0.1, 0.0]),
+        ]
+        mirror.sync(
+            mirror_client,
+            "project_context",
+            {
+                "ctx.yaml": {
+                    "document_id": "ctx-doc",
+                    "vector_id": compute_point_id("ctx-doc"),
+                    "embedding_hash": "a",
+                },
+                "r1.yaml": {
+                    "document_id": "result-doc-1",
+                    "vector_id": "result-vec-1",
+                    "embedding_hash": "b",
+                },
+                "r2.yaml": {
+                    "document_id": "result-doc-2",
+                    "vector_id": "result-vec-2",
+                    "embedding_hash": "c",
+                },
+            },
+        )
+
+        api = SumScoresAPI(vector_mirror=mirror)
+        api.client = Mock()
+        results = []
+        for vec_id, doc_id, score in [
+            ("result-vec-1", "result-doc-1", 0.8),
+            ("result-vec-2", "result-doc-2", 0.7),
+        ]:
+            result = Mock()
+            result.id = vec_id
+            result.score = score
+            result.payload = {"document_id": doc_id, "document_type": "design"}
+            results.append(result)
+        api.client.search.return_value = results
+
+        ranked = api.search_contextual([0.1] * 3, ["ctx-doc"], limit=5, context_weight=0.5)
+
+        # Only the base search hits Qdrant; all vectors come from the mirror
+        api.client.search.assert_called_once()
+        api.client.retrieve.assert_not_called()
+        assert [r.document_id for r in ranked] == ["result-doc-2", "result-doc-1"]
 
     def test_search_result_dataclass(self) -> None:
         """Test SearchResult dataclass creation"""
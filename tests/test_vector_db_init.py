@@ -7,9 +7,16 @@ from unittest.mock import Mock, mock_open, patch
 
 import yaml
 from click.testing import CliRunner
-from qdrant_client.models import Distance
+from qdrant_client.models import (
+    BinaryQuantization,
+    Disabled,
+    Distance,
+    Modifier,
+    PayloadSchemaType,
+    ScalarQuantization,
+)
 
-from src.storage.vector_db_init import VectorDBInitializer, main
+from src.storage.vector_db_init import PAYLOAD_INDEX_SCHEMA, VectorDBInitializer, main
 
 
 class TestVectorDBInitializer:
@@ -44,7 +51,8 @@ class TestVectorDBInitializer:
         initializer = VectorDBInitializer(".ctxrc.yaml")
 
         assert initializer.config == self.test_config
-        mock_file.assert_called_once_with(".ctxrc.yaml", "r")
+        mock_file.assert_any_call(".ctxrc.yaml", "r")
+        mock_file.assert_any_call("performance.yaml", "r")
 
     @patch("builtins.open", side_effect=FileNotFoundError)
     @patch("sys.exit")
@@ -392,6 +400,8 @@ class TestVectorDBInitializer:
         assert call_args[1]["collection_name"] == "project_context"
         assert call_args[1]["vectors_config"].size == 1536
         assert call_args[1]["vectors_config"].distance == Distance.COSINE
+        # Sparse lexical vectors for hybrid search, weighted by IDF at query time
+        assert call_args[1]["sparse_vectors_config"]["text"].modifier == Modifier.IDF
 
     @patch("builtins.open", new_callable=mock_open)
     @patch("yaml.safe_load")
@@ -445,6 +455,142 @@ class TestVectorDBInitializer:
         # Delete should not be called if verification failed
         assert not mock_client.delete.called
 
+    @patch("builtins.open", new_callable=mock_open)
+    @patch("yaml.safe_load")
+    @patch("click.echo")
+    def test_create_payload_indexes_from_schema(self, mock_echo, mock_yaml_load, mock_file):
+        """Test every declared payload field gets an index of its declared type"""
+        mock_yaml_load.return_value = self.test_config
+        mock_client = Mock()
+        mock_client.get_collection.return_value = Mock(payload_schema={})
+
+        initializer = VectorDBInitializer()
+        initializer.client = mock_client
+
+        assert initializer.create_payload_indexes("project_context") == len(PAYLOAD_INDEX_SCHEMA)
+        created = {
+            c.kwargs["field_name"]: c.kwargs["field_schema"]
+            for c in mock_client.create_payload_index.call_args_list
+        }
+        assert created == PAYLOAD_INDEX_SCHEMA
+        assert created["document_type"] == PayloadSchemaType.KEYWORD
+        assert created["sprint_number"] == PayloadSchemaType.INTEGER
+
+    @patch("builtins.open", new_callable=mock_open)
+    @patch("yaml.safe_load")
+    @patch("click.echo")
+    def test_existing_collection_backfills_missing_indexes(
+        self, mock_echo, mock_yaml_load, mock_file
+    ):
+        """Test an existing collection only gets the indexes it is missing"""
+        mock_yaml_load.return_value = self.test_config
+        mock_client = Mock()
+        mock_collection = Mock()
+        mock_collection.name = "project_context"
+        mock_client.get_collections.return_value = Mock(collections=[mock_collection])
+        existing = {field: Mock() for field in PAYLOAD_INDEX_SCHEMA if field != "sprint_number"}
+        mock_client.get_collection.return_value = Mock(payload_schema=existing)
+
+        initializer = VectorDBInitializer()
+        initializer.client = mock_client
+
+        assert initializer.create_collection(force=False) is True
+        mock_client.create_collection.assert_not_called()
+        mock_client.create_payload_index.assert_called_once_with(
+            collection_name="project_context",
+            field_name="sprint_number",
+            field_schema=PayloadSchemaType.INTEGER,
+        )
+
+    @patch("builtins.open", new_callable=mock_open)
+    @patch("yaml.safe_load")
+    def test_create_collection_applies_profile(self, mock_yaml_load, mock_file):
+        """Test the configured profile sets on-disk storage, quantization and segments"""
+        self.test_config["vector_db"]["collection"]["profile"] = "on_disk_int8"
+        self.test_config["vector_db"]["indexing"] = {
+            "memmap_threshold": 100000,
+            "max_segment_size": 200000,
+        }
+        mock_yaml_load.return_value = self.test_config
+        mock_client = Mock()
+        mock_client.get_collections.return_value = Mock(collections=[])
+
+        initializer = VectorDBInitializer()
+        initializer.client = mock_client
+
+        assert initializer.create_collection() is True
+        kwargs = mock_client.create_collection.call_args[1]
+        assert kwargs["vectors_config"].on_disk is True
+        assert isinstance(kwargs["quantization_config"], ScalarQuantization)
+        assert kwargs["optimizers_config"].memmap_threshold == 100000
+        assert kwargs["optimizers_config"].max_segment_size == 200000
+
+    @patch("builtins.open", new_callable=mock_open)
+    @patch("yaml.safe_load")
+    def test_unknown_profile_falls_back_to_in_memory(self, mock_yaml_load, mock_file):
+        """Test an unknown profile name creates an unquantized in-memory collection"""
+        self.test_config["vector_db"]["collection"]["profile"] = "nonexistent"
+        mock_yaml_load.return_value = self.test_config
+        mock_client = Mock()
+        mock_client.get_collections.return_value = Mock(collections=[])
+
+        initializer = VectorDBInitializer()
+        initializer.client = mock_client
+
+        assert initializer.create_collection() is True
+        kwargs = mock_client.create_collection.call_args[1]
+        assert kwargs["vectors_config"].on_disk is False
+        assert kwargs["quantization_config"] is None
+
+    @patch("builtins.open", new_callable=mock_open)
+    @patch("yaml.safe_load")
+    @patch("click.echo")
+    def test_migrate_profile(self, mock_echo, mock_yaml_load, mock_file):
+        """Test migrating an existing collection to the binary profile"""
+        self.test_config["vector_db"]["collection"]["profile"] = "binary"
+        mock_yaml_load.return_value = self.test_config
+        mock_client = Mock()
+
+        initializer = VectorDBInitializer()
+        initializer.client = mock_client
+
+        assert initializer.migrate_profile() is True
+        kwargs = mock_client.update_collection.call_args[1]
+        assert kwargs["collection_name"] == "project_context"
+        assert kwargs["vectors_config"][""].on_disk is True
+        assert isinstance(kwargs["quantization_config"], BinaryQuantization)
+
+    @patch("builtins.open", new_callable=mock_open)
+    @patch("yaml.safe_load")
+    @patch("click.echo")
+    def test_migrate_profile_disables_quantization(self, mock_echo, mock_yaml_load, mock_file):
+        """Test migrating back to in-memory removes quantization"""
+        mock_yaml_load.return_value = self.test_config
+        mock_client = Mock()
+
+        initializer = VectorDBInitializer()
+        initializer.client = mock_client
+
+        assert initializer.migrate_profile() is True
+        kwargs = mock_client.update_collection.call_args[1]
+        assert kwargs["vectors_config"][""].on_disk is False
+        assert kwargs["quantization_config"] == Disabled.DISABLED
+
+    @patch("builtins.open", new_callable=mock_open)
+    @patch("yaml.safe_load")
+    @patch("click.echo")
+    def test_migrate_profile_failure(self, mock_echo, mock_yaml_load, mock_file):
+        """Test migration errors are reported instead of raised"""
+        mock_yaml_load.return_value = self.test_config
+        mock_client = Mock()
+        mock_client.update_collection.side_effect = Exception("Update error")
+
+        initializer = VectorDBInitializer()
+        initializer.client = mock_client
+
+        assert initializer.migrate_profile() is False
+        assert any("Failed to migrate" in str(call) for call in mock_echo.call_args_list)
+
 
 class TestCLI:
     """Test CLI functionality"""
@@ -495,6 +641,22 @@ class TestCLI:
         assert result.exit_code == 0
         mock_initializer.create_collection.assert_called_with(force=True)
 
+    @patch("src.storage.vector_db_init.VectorDBInitializer")
+    def test_main_with_migrate(self, mock_initializer_class):
+        """Test main with migrate flag applies the profile to the existing collection"""
+        mock_initializer = Mock()
+        mock_initializer.connect.return_value = True
+        mock_initializer.create_collection.return_value = True
+        mock_initializer.migrate_profile.return_value = True
+        mock_initializer.verify_setup.return_value = True
+        mock_initializer.insert_test_point.return_value = True
+        mock_initializer_class.return_value = mock_initializer
+
+        result = self.runner.invoke(main, ["--migrate"])
+
+        assert result.exit_code == 0
+        mock_initializer.migrate_profile.assert_called_once()
+
     @patch("src.storage.vector_db_init.VectorDBInitializer")
     def test_main_skip_test(self, mock_initializer_class):
         """Test main with skip-test flag"""
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for the local quantized vector mirror
+"""
+
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from src.storage.vector_mirror import LocalVectorMirror, batched_cosine
+
+
+def _record(point_id: str, vector):
+    return Mock(id=point_id, vector=vector)
+
+
+def _entry(document_id: str, vector_id: str, embedding_hash: str) -> dict:
+    return {
+        "document_id": document_id,
+        "vector_id": vector_id,
+        "embedding_hash": embedding_hash,
+    }
+
+
+class TestBatchedCosine:
+    """Test the NumPy cosine kernel"""
+
+    def test_matches_pairwise_cosine(self):
+        queries = np.array([[1.0, 0.0], [1.0, 1.0]])
+        matrix = np.array([[2.0, 0.0], [0.0, 3.0], [-1.0, 0.0]])
+
+        sims = batched_cosine(queries, matrix)
+
+        assert sims.shape == (2, 3)
+        np.testing.assert_allclose(sims[0], [1.0, 0.0, -1.0], atol=1e-6)
+        np.testing.assert_allclose(sims[1], [0.70710677, 0.70710677, -0.70710677], atol=1e-6)
+
+    def test_zero_vectors_and_empty_input(self):
+        sims = batched_cosine(np.zeros(2), np.array([[1.0, 0.0]]))
+        assert sims[0, 0] == 0.0
+        assert batched_cosine(np.ones(2), np.zeros((0, 2))).shape == (1, 0)
+
+
+class TestLocalVectorMirror:
+    """Test syncing, loading and querying the mirror"""
+
+    @pytest.mark.parametrize("dtype", ["float16", "int8"])
+    def test_sync_and_reload(self, tmp_path, dtype):
+        client = Mock()
+        client.retrieve.return_value = [
+            _record("p1", [1.0, 0.0, 0.0]),
+            _record("p2", [0.0, 2.0, 0.0]),
+        ]
+        mirror = LocalVectorMirror(path=tmp_path, dtype=dtype)
+
+        stats = mirror.sync(
+            client, "ctx", {"a": _entry("doc-a", "p1", "h1"), "b": _entry("doc-b", "p2", "h2")}
+        )
+
+        assert stats == {"fetched": 2, "removed": 0, "total": 2}
+        assert client.retrieve.call_args[1]["with_vectors"] is True
+
+        reloaded = LocalVectorMirror(path=tmp_path, dtype=dtype)
+        assert reloaded.load()
+        assert "p1" in reloaded and len(reloaded) == 2
+        sims = reloaded.similarities(np.array([0.0, 1.0, 0.0]), ["p1", "p2"])
+        np.testing.assert_allclose(sims[0], [0.0, 1.0], atol=1e-2)
+
+    def test_incremental_sync_fetches_only_changes(self, tmp_path):
+        client = Mock()
+        client.retrieve.return_value = [_record("p1", [1.0, 0.0]), _record("p2", [0.0, 1.0])]
+        mirror = LocalVectorMirror(path=tmp_path)
+        mirror.sync(
+            client, "ctx", {"a": _entry("doc-a", "p1", "h1"), "b": _entry("doc-b", "p2", "h2")}
+        )
+
+        client.retrieve.reset_mock()
+        client.retrieve.return_value = [_record("p3", [1.0, 1.0])]
+        stats = mirror.sync(
+            client, "ctx", {"a": _entry("doc-a", "p1", "h1"), "c": _entry("doc-c", "p3", "h3")}
+        )
+
+        assert client.retrieve.call_args[1]["ids"] == ["p3"]
+        assert stats == {"fetched": 1, "removed": 1, "total": 2}
+        assert "p2" not in mirror
+        ids, vectors = mirror.get_document_vectors(["doc-c"])
+        assert ids == ["doc-c"]
+        np.testing.assert_allclose(vectors[0], [0.7071, 0.7071], atol=1e-3)
+
+    def test_unchanged_index_skips_qdrant(self, tmp_path):
+        client = Mock()
+        client.retrieve.return_value = [_record("p1", [1.0, 0.0])]
+        mirror = LocalVectorMirror(path=tmp_path)
+        cache = {"a": _entry("doc-a", "p1", "h1")}
+        mirror.sync(client, "ctx", cache)
+        client.retrieve.reset_mock()
+
+        assert mirror.sync(client, "ctx", cache) == {"fetched": 0, "removed": 0, "total": 1}
+        client.retrieve.assert_not_called()
+
+    def test_similarities_mark_missing_points(self, tmp_path):
+        client = Mock()
+        client.retrieve.return_value = [_record("p1", [1.0, 0.0])]
+        mirror = LocalVectorMirror(path=tmp_path)
+        mirror.sync(client, "ctx", {"a": _entry("doc-a", "p1", "h1")})
+
+        sims = mirror.similarities(np.array([[1.0, 0.0]]), ["p1", "missing"])
+
+        assert sims[0, 0] == pytest.approx(1.0, abs=1e-3)
+        assert np.isnan(sims[0, 1])
+
+    def test_near_duplicates(self, tmp_path):
+        client = Mock()
+        client.retrieve.return_value = [
+            _record("p1", [1.0, 0.0]),
+            _record("p2", [0.99, 0.01]),
+            _record("p3", [0.0, 1.0]),
+        ]
+        mirror = LocalVectorMirror(path=tmp_path, dtype="int8")
+        mirror.sync(
+            client,
+            "ctx",
+            {
+                "a": _entry("doc-a", "p1", "h1"),
+                "b": _entry("doc-b", "p2", "h2"),
+                "c": _entry("doc-c", "p3", "h3"),
+            },
+        )
+
+        pairs = mirror.near_duplicates(threshold=0.95)
+
+        assert [(a, b) for a, b, _ in pairs] == [("p1", "p2")]
+
+    def test_rejects_unknown_dtype(self, tmp_path):
+        with pytest.raises(ValueError):
+            LocalVectorMirror(path=tmp_path, dtype="float64")